@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Backtest the timeout models of the generated sub-tasks of a task.
+
+Splits the daily test history of a task into a training window followed by a replay window. The
+tests are divided into sub-suites and given exec timeouts from the training window, like
+evergreen_generate_resmoke_tasks.py does, and the daily test runtimes of the replay window give
+the runtime each sub-suite would have had on each day. For each timeout model, this reports how
+many of the replayed runs would have been killed, and how much host time a hung run of a sub-suite
+would burn before being killed, compared to the scaling model.
+"""
+import datetime
+import json
+import os
+import sys
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import click
+from evergreen import TestStats
+from evergreen.api import RetryingEvergreenApi
+
+# Get relative imports to work when the package is not installed on the PYTHONPATH.
+if __name__ == "__main__" and __package__ is None:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+import buildscripts.evergreen_generate_resmoke_tasks as generate_resmoke
+from buildscripts.simulate_suite_packing import load_test_stats
+from buildscripts.util.teststats import HistoricTaskData, TestStatsCache, get_stats_day
+# pylint: enable=wrong-import-position
+
+DEFAULT_PROJECT = "mongodb-mongo-master"
+DEFAULT_REPLAY_DAYS = 14
+
+MODELS = [generate_resmoke.SCALING_TIMEOUT_MODEL, generate_resmoke.PERCENTILE_TIMEOUT_MODEL]
+
+
+def split_history(daily_stats: List[TestStats],
+                  replay_days: int) -> Tuple[List[TestStats], Dict[str, List[TestStats]]]:
+    """
+    Split the daily test stats of a task into a training window and a replay window.
+
+    :param daily_stats: Test stats of each test for each day.
+    :param replay_days: Number of the latest days to replay.
+    :return: Test stats of the training window, and test stats of each day of the replay window.
+    """
+    days = sorted({get_stats_day(stats) for stats in daily_stats})
+    replayed = set(days[len(days) - replay_days:])
+    train_stats = []
+    replay_stats = defaultdict(list)
+    for stats in daily_stats:
+        day = get_stats_day(stats)
+        if day in replayed:
+            replay_stats[day].append(stats)
+        else:
+            train_stats.append(stats)
+    return (train_stats, dict(replay_stats))
+
+
+def create_suites(train_data: HistoricTaskData, target_minutes: int, max_suites: Optional[int],
+                  max_tests_per_suite: Optional[int],
+                  per_test_overhead: float) -> List[generate_resmoke.Suite]:
+    """
+    Divide the tests into sub-suites with the runtime distributions needed by each timeout model.
+
+    :param train_data: Historic test results of the training window.
+    :param target_minutes: Target runtime of each sub-suite.
+    :param max_suites: Maximum number of sub-suites to create.
+    :param max_tests_per_suite: Maximum number of tests in a sub-suite.
+    :param per_test_overhead: Runtime of the task-level hooks expected to run for each test.
+    :return: Sub-suites of the task.
+    """
+    suites = generate_resmoke.divide_tests_into_suites("backtest", train_data.get_tests_runtimes(),
+                                                       target_minutes * 60, max_suites,
+                                                       max_tests_per_suite)
+    for suite in suites:
+        suite.task_overhead = suite.get_test_count() * per_test_overhead
+    generate_resmoke.GenerateSubSuites.add_tests_runtime_stats(suites, train_data)
+    return suites
+
+
+def get_exec_timeout(suite: generate_resmoke.Suite, model: str,
+                     repeat_factor: int) -> Optional[int]:
+    """Get the exec timeout the given timeout model sets for a sub-suite, if any."""
+    timeout_est = suite.get_timeout_estimate()
+    if model == generate_resmoke.PERCENTILE_TIMEOUT_MODEL:
+        return timeout_est.calculate_task_timeout(repeat_factor)
+    return timeout_est._replace(tests_runtime_stats=None).calculate_task_timeout(repeat_factor)
+
+
+def replay_runtime(suite: generate_resmoke.Suite, day_runtimes: Dict[str, float],
+                   train_runtimes: Dict[str, float], per_test_overhead: float,
+                   repeat_factor: int) -> float:
+    """
+    Get the runtime a sub-suite would have had on a day, including the setup of the task.
+
+    Tests without runtimes on the day are expected to take their average runtime.
+    """
+    runtime = sum(day_runtimes.get(test, train_runtimes[test]) for test in suite.tests)
+    runtime += suite.get_test_count() * per_test_overhead
+    return runtime * repeat_factor + generate_resmoke.AVG_SETUP_TIME
+
+
+def backtest(train_data: HistoricTaskData, replay_stats: Dict[str, List[TestStats]],
+             suites: List[generate_resmoke.Suite], per_test_overhead: float,
+             repeat_factor: int) -> List[Dict]:
+    """
+    Replay the runs of the sub-suites of each day against the timeouts of each timeout model.
+
+    :param train_data: Historic test results of the training window.
+    :param replay_stats: Test stats of each day to replay.
+    :param suites: Sub-suites of the task.
+    :param per_test_overhead: Runtime of the task-level hooks expected to run for each test.
+    :param repeat_factor: How many times the suite will be repeated.
+    :return: The exec timeouts, killed runs and host time reclaimed of each timeout model.
+    """
+    train_runtimes = dict(train_data.get_tests_runtimes())
+    runtimes = []
+    for day_stats in replay_stats.values():
+        day_runtimes = dict(HistoricTaskData.from_stats_list(day_stats).get_tests_runtimes())
+        runtimes.append([
+            replay_runtime(suite, day_runtimes, train_runtimes, per_test_overhead, repeat_factor)
+            for suite in suites
+        ])
+
+    results = []
+    baseline = None
+    for model in MODELS:
+        timeouts = [get_exec_timeout(suite, model, repeat_factor) for suite in suites]
+        # Sub-suites without runtimes for all their tests keep the default timeouts.
+        timed = [idx for (idx, timeout) in enumerate(timeouts) if timeout is not None]
+        total_timeout = sum(timeouts[idx] for idx in timed)
+        if baseline is None:
+            baseline = total_timeout
+        results.append({
+            "model": model,
+            "num_suites": len(timed),
+            "avg_exec_timeout_secs": total_timeout / len(timed) if timed else 0,
+            "num_runs": len(runtimes) * len(timed),
+            "num_killed": sum(1 for day in runtimes for idx in timed if day[idx] > timeouts[idx]),
+            "reclaimed_secs_per_hang": (baseline - total_timeout) / len(timed) if timed else 0,
+        })
+    return results
+
+
+def format_results(results: List[Dict]) -> str:
+    """Format the results of the backtest as a table."""
+    lines = ["model       suites  exec_timeout  killed runs  reclaimed/hang"]
+    for result in results:
+        lines.append("{:<11} {:>6}  {:>11.1f}m  {:>5}/{:<5}  {:>13.1f}m".format(
+            result["model"], result["num_suites"], result["avg_exec_timeout_secs"] / 60,
+            result["num_killed"], result["num_runs"], result["reclaimed_secs_per_hang"] / 60))
+    return "\n".join(lines)
+
+
+def fetch_daily_stats(evg_api: RetryingEvergreenApi, project: str, build_variant: str, task: str,
+                      num_days: int) -> List[TestStats]:
+    """Fetch the daily test stats of a task, through the local test stats cache if configured."""
+    end_date = datetime.datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    start_date = end_date - datetime.timedelta(days=num_days)
+    cache = TestStatsCache.from_env()
+    if cache is not None:
+        return cache.get_daily_test_stats(evg_api, project, start_date, end_date, task,
+                                          build_variant)
+    return evg_api.test_stats_by_project(project, after_date=start_date, before_date=end_date,
+                                         tasks=[task], variants=[build_variant], group_by="test",
+                                         group_num_days=1)
+
+
+@click.command()
+@click.option("--project", type=str, default=DEFAULT_PROJECT, help="Evergreen project.")
+@click.option("--build-variant", type=str, help="Build variant of the task to backtest.")
+@click.option("--task", type=str, help="Task to backtest, without its _gen suffix.")
+@click.option("--history-file", type=str,
+              help="Read the daily test history from this file instead of from Evergreen.")
+@click.option("--save-history", type=str,
+              help="Save the daily test history fetched from Evergreen to this file.")
+@click.option("--lookback-days", type=int, default=generate_resmoke.LOOKBACK_DURATION_DAYS,
+              help="Number of days of test history to calculate the timeouts from.")
+@click.option("--replay-days", type=int, default=DEFAULT_REPLAY_DAYS,
+              help="Number of the latest days of test history to replay.")
+@click.option("--target-minutes", type=int,
+              default=generate_resmoke.DEFAULT_CONFIG_VALUES["target_resmoke_time"],
+              help="Target runtime of the sub-suites.")
+@click.option("--max-sub-suites", type=int,
+              default=generate_resmoke.DEFAULT_CONFIG_VALUES["max_sub_suites"],
+              help="Maximum number of sub-suites.")
+@click.option("--max-tests-per-suite", type=int,
+              default=generate_resmoke.DEFAULT_CONFIG_VALUES["max_tests_per_suite"],
+              help="Maximum number of tests in a sub-suite.")
+@click.option("--repeat-suites", type=int, default=1,
+              help="Number of times the sub-suites are repeated.")
+@click.option("--clean-every-n", type=int, default=1,
+              help="N of the CleanEveryN hook of the suite.")
+@click.option("--json-output", is_flag=True, default=False, help="Output the results as JSON.")
+@click.option("--evergreen-config", type=str, default=generate_resmoke.EVG_CONFIG_FILE,
+              help="Location of evergreen configuration file.")
+def main(  # pylint: disable=too-many-arguments,too-many-locals
+        project, build_variant, task, history_file, save_history, lookback_days, replay_days,
+        target_minutes, max_sub_suites, max_tests_per_suite, repeat_suites, clean_every_n,
+        json_output, evergreen_config):
+    """
+    Backtest the timeout models of the generated sub-tasks of a task.
+
+    The daily test history of the task is read from Evergreen, unless `--history-file` is given.
+    """
+    if history_file:
+        daily_stats = load_test_stats(history_file)
+    else:
+        if not build_variant or not task:
+            raise click.UsageError("--build-variant and --task are required without --history-file")
+        evg_api = RetryingEvergreenApi.get_api(config_file=evergreen_config)
+        daily_stats = fetch_daily_stats(evg_api, project, build_variant, task,
+                                        lookback_days + replay_days)
+        if save_history:
+            with open(save_history, "w") as fh:
+                json.dump([stats.json for stats in daily_stats], fh)
+
+    (train_stats, replay_stats) = split_history(daily_stats, replay_days)
+    if not train_stats or not replay_stats:
+        raise click.ClickException("Not enough days of test history to backtest")
+
+    train_data = HistoricTaskData.from_stats_list(train_stats)
+    per_test_overhead = train_data.get_avg_hook_runtime(
+        generate_resmoke.CLEAN_EVERY_N_HOOK) / clean_every_n
+    suites = create_suites(train_data, target_minutes, max_sub_suites, max_tests_per_suite,
+                           per_test_overhead)
+    results = backtest(train_data, replay_stats, suites, per_test_overhead, repeat_suites)
+    if json_output:
+        print(json.dumps(results, indent=4))
+    else:
+        print(format_results(results))
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -25,8 +25,10 @@ EVG_CONFIG_FILE = ".evergreen.yml"
 @click.option("--version-id", required=True, help="Evergreen version id of the current build.")
 @click.option("--json-artifact", required=True,
               help="The JSON file to write out the metadata of files to attach to task.")
+@click.option("--cache-dir", default=None,
+              help="Directory to cache the downloaded artifacts in across tasks.")
 def main(  # pylint: disable=too-many-arguments,too-many-locals
-        project, build_variant, revision, out_file, version_id, json_artifact):
+        project, build_variant, revision, out_file, version_id, json_artifact, cache_dir):
     """
     Create a file with expansions that can be used to bypass compile.
 
@@ -39,6 +41,7 @@ def main(  # pylint: disable=too-many-arguments,too-many-locals
     :param revision: The base revision being run against.
     :param out_file: File to write expansions to.
     :param version_id: Evergreen version id being run against.
+    :param cache_dir: Directory to cache the downloaded artifacts in across tasks.
     """
     logging.basicConfig(
         format="[%(asctime)s - %(name)s - %(levelname)s] %(message)s",
@@ -52,7 +55,7 @@ def main(  # pylint: disable=too-many-arguments,too-many-locals
     build = version.build_by_variant(build_variant)
 
     target = TargetBuild(project=project, revision=revision, build_variant=build_variant)
-    gather_artifacts_and_update_expansions(build, target, json_artifact, out_file)
+    gather_artifacts_and_update_expansions(build, target, json_artifact, out_file, cache_dir)
 
 
 if __name__ == "__main__":
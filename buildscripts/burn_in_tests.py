@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 """Command line utility for determining what jstests have been added or modified."""
 import copy
+import concurrent.futures
 import datetime
 import logging
 import os.path
 import shlex
 import subprocess
 import sys
+import time
 from collections import defaultdict
 from math import ceil
 from typing import Optional, Set, Tuple, List, Dict
@@ -56,6 +58,8 @@ CONFIG_FILE = ".evergreen.yml"
 DEFAULT_PROJECT = "mongodb-mongo-master"
 DEFAULT_VARIANT = "enterprise-rhel-62-64-bit-dynamic-required"
 ENTERPRISE_MODULE_PATH = "src/mongo/db/modules/enterprise"
+# Maximum number of tasks whose test runtime history is fetched from Evergreen at the same time.
+MAX_HISTORY_FETCH_WORKERS = 8
 DEFAULT_REPO_LOCATIONS = [".", f"./{ENTERPRISE_MODULE_PATH}"]
 REPEAT_SUITES = 2
 EVERGREEN_FILE = "etc/evergreen.yml"
@@ -542,6 +546,32 @@ def _get_task_runtime_history(evg_api: Optional[EvergreenApi], project: str, tas
             raise
 
 
+def _get_tasks_runtime_history(evg_api: Optional[EvergreenApi], project: str, tasks: List[str],
+                               variant: str) -> Dict[str, List[TestRuntime]]:
+    """
+    Fetch historical average runtime for all tests in several tasks concurrently.
+
+    Each task is only fetched once, however many times it is given.
+
+    :param evg_api: Evergreen API.
+    :param project: Project name.
+    :param tasks: Task names.
+    :param variant: Variant name.
+    :return: Test historical runtimes of each task.
+    """
+    unique_tasks = sorted(set(tasks))
+    start_time = time.time()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_HISTORY_FETCH_WORKERS) as executor:
+        futures = {
+            task: executor.submit(_get_task_runtime_history, evg_api, project, task, variant)
+            for task in unique_tasks
+        }
+        runtime_history = {task: future.result() for (task, future) in futures.items()}
+    LOGGER.info("Fetched test runtime history", num_tasks=len(unique_tasks), fetch_time_secs=round(
+        time.time() - start_time, 2))
+    return runtime_history
+
+
 def _create_task(index: int, test_count: int, test: str, task_data: Dict,
                  task_runtime_stats: List[TestRuntime], generate_config: GenerateConfig,
                  repeat_config: RepeatConfig, task_prefix: str) -> Task:
@@ -593,12 +623,14 @@ def create_generated_tasks(tests_by_task: Dict, task_prefix: str, generate_confi
     :return: Set of shrub tasks to run tests_by_task.
     """
     tasks: Set[Task] = set()
+    runtime_history = _get_tasks_runtime_history(
+        evg_api, generate_config.project,
+        [task_info["display_task_name"]
+         for task_info in tests_by_task.values()], generate_config.build_variant)
     for task in sorted(tests_by_task):
         task_info = tests_by_task[task]
         test_list = task_info["tests"]
-        task_runtime_stats = _get_task_runtime_history(evg_api, generate_config.project,
-                                                       task_info["display_task_name"],
-                                                       generate_config.build_variant)
+        task_runtime_stats = runtime_history[task_info["display_task_name"]]
         test_count = len(test_list)
         for index, test in enumerate(test_list):
             tasks.add(
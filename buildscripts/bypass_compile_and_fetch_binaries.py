@@ -1,17 +1,19 @@
 #!/usr/bin/env python3
 """Bypass compile and fetch binaries."""
 from collections import namedtuple
+from concurrent import futures
+from contextlib import contextmanager
+from functools import partial
 import json
 import logging
 import os
+import shutil
 import sys
 import tarfile
+import tempfile
 from tempfile import TemporaryDirectory
-import urllib.error
-import urllib.parse
 from urllib.parse import urlparse
-import urllib.request
-from typing import Any, Dict, List
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional
 
 import click
 
@@ -20,8 +22,15 @@ from git.repo import Repo
 import requests
 import structlog
 from structlog.stdlib import LoggerFactory
+import urllib3
 import yaml
 
+try:
+    import fcntl
+except ImportError:
+    # Windows, where the artifacts of a revision may be removed while another process uses them.
+    fcntl = None
+
 # Get relative imports to work when the package is not installed on the PYTHONPATH.
 if __name__ == "__main__" and __package__ is None:
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -38,6 +47,12 @@ DESTDIR = os.getenv("DESTDIR")
 
 _IS_WINDOWS = (sys.platform == "win32" or sys.platform == "cygwin")
 
+# Artifacts are downloaded concurrently, up to this many at a time.
+MAX_PARALLEL_DOWNLOADS = 4
+# Number of revisions whose artifacts are kept in the artifact cache.
+CACHED_REVISIONS = 3
+_CHUNK_SIZE = 1024 * 1024
+
 # If changes are only from files in the bypass_files list or the bypass_directories list, then
 # bypass compile, unless they are also found in the BYPASS_EXTRA_CHECKS_REQUIRED lists. All other
 # file changes lead to compile.
@@ -329,20 +344,221 @@ def extract_filename_from_url(url: str) -> str:
     return filename
 
 
-def download_file(download_url: str, download_location: str) -> None:
+class ArtifactCache(object):
+    """
+    Local cache of the compile artifacts downloaded before, by the revision they were built from.
+
+    The artifacts of a revision never change, so they are reused as long as they are cached. Only
+    the artifacts of the most recently used revisions are kept, except those another process is
+    still using.
+    """
+
+    def __init__(self, cache_dir: str) -> None:
+        """
+        Initialize the object.
+
+        :param cache_dir: Directory to keep the artifacts in.
+        """
+        self.cache_dir = cache_dir
+
+    def path(self, revision: str, filename: str) -> str:
+        """
+        Get the path of an artifact in the cache.
+
+        :param revision: Revision the artifact was built from.
+        :param filename: Name of the artifact.
+        :return: Path of the artifact in the cache.
+        """
+        return os.path.join(self.cache_dir, revision, filename)
+
+    def get(self, revision: str, filename: str) -> Optional[str]:
+        """
+        Get the path of an artifact if it is cached.
+
+        :param revision: Revision the artifact was built from.
+        :param filename: Name of the artifact.
+        :return: Path of the artifact in the cache, None if it isn't cached.
+        """
+        path = self.path(revision, filename)
+        if os.path.isfile(path):
+            return path
+        return None
+
+    @contextmanager
+    def lock(self, revision: str) -> Iterator[None]:
+        """
+        Keep other processes from removing the artifacts of a revision while they are used.
+
+        :param revision: Revision being used.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # The lock file is outside of the revision directory so that removing the directory
+        # doesn't remove the file locked by another process.
+        with open(os.path.join(self.cache_dir, revision) + ".lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_SH)
+            yield
+
+    @staticmethod
+    def _remove_unused(revision_dir: str) -> None:
+        """Remove the artifacts of a revision unless another process is using them."""
+        with open(revision_dir + ".lock", "a") as lock_file:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    LOGGER.info("Keeping cached artifacts in use", path=revision_dir)
+                    return
+            LOGGER.info("Removing cached artifacts", path=revision_dir)
+            shutil.rmtree(revision_dir, ignore_errors=True)
+
+    def prune(self, revision: str, keep: int = CACHED_REVISIONS) -> None:
+        """
+        Mark the given revision as used and remove the artifacts of the least recently used ones.
+
+        :param revision: Revision being used.
+        :param keep: Number of revisions to keep the artifacts of.
+        """
+        revision_dir = os.path.join(self.cache_dir, revision)
+        os.makedirs(revision_dir, exist_ok=True)
+        os.utime(revision_dir)
+        revision_dirs = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            try:
+                if os.path.isdir(path):
+                    revision_dirs.append((os.path.getmtime(path), path))
+            except FileNotFoundError:
+                # Another process removed it.
+                continue
+        revision_dirs.sort(reverse=True)
+        for (_, revision_dir) in revision_dirs[keep:]:
+            self._remove_unused(revision_dir)
+
+
+class _TeeReader(object):
+    """File-like object writing what is read from a source to a sink, to save it as it is used."""
+
+    def __init__(self, source: BinaryIO, sink: BinaryIO) -> None:
+        """
+        Initialize the object.
+
+        :param source: File object to read from.
+        :param sink: File object to write what is read to.
+        """
+        self._source = source
+        self._sink = sink
+        self.size = 0
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to 'size' bytes from the source."""
+        data = self._source.read(size if size > 0 else _CHUNK_SIZE)
+        self.size += len(data)
+        self._sink.write(data)
+        return data
+
+    def drain(self) -> None:
+        """Read the rest of the source, e.g. the padding after the end of a tar archive."""
+        while self.read(_CHUNK_SIZE):
+            pass
+
+
+def _stream_download(download_url: str, fh: BinaryIO,
+                     extract: Optional[Callable[[BinaryIO], None]]) -> bool:
+    """
+    Write the file at the given URL to a file object, extracting it as it is downloaded.
+
+    :param download_url: URL to download.
+    :param fh: File object to write the file to.
+    :param extract: Function to extract the file from a stream of its contents.
+    :return: True if the whole file was downloaded.
+    """
+    try:
+        with requests.get(download_url, stream=True) as response:
+            response.raise_for_status()
+            reader = _TeeReader(response.raw, fh)
+            if extract:
+                extract(reader)
+            reader.drain()
+            expected_size = response.headers.get("Content-Length")
+            return expected_size is None or int(expected_size) == reader.size
+    except (requests.RequestException, urllib3.exceptions.HTTPError) as err:
+        LOGGER.warning("Failed to download the artifact", url=download_url, error=str(err))
+        return False
+    except (tarfile.TarError, EOFError) as err:
+        # A download cut short ends the archive early.
+        LOGGER.warning("Failed to extract the artifact", url=download_url, error=str(err))
+        return False
+
+
+def _move_tree(source_dir: str, target_dir: str) -> None:
+    """Move the files under the source directory to the same paths under the target one."""
+    for (dirpath, dirnames, filenames) in os.walk(source_dir):
+        target_path = os.path.normpath(
+            os.path.join(target_dir, os.path.relpath(dirpath, source_dir)))
+        os.makedirs(target_path, exist_ok=True)
+        links = [name for name in dirnames if os.path.islink(os.path.join(dirpath, name))]
+        for name in filenames + links:
+            os.replace(os.path.join(dirpath, name), os.path.join(target_path, name))
+
+
+def download_file(download_url: str, download_location: str,
+                  extract: Optional[Callable[[BinaryIO, str], None]] = None) -> None:
     """
     Download the file at the specified path locally.
 
+    The file, and the files extracted from it, are only moved to their location once it is
+    completely downloaded.
+
     :param download_url: URL to download.
     :param download_location: Path to store the downloaded file.
-    """
+    :param extract: Function to extract the file from a stream of its contents into a directory
+        while it is being downloaded.
+    """
+    (fd, part_location) = tempfile.mkstemp(
+        dir=os.path.dirname(download_location) or ".",
+        prefix=f".{os.path.basename(download_location)}.")
+    extract_dir = None
+    extract_to_dir = None
+    if extract:
+        extract_dir = tempfile.mkdtemp(dir=".", prefix=".extract.")
+        extract_to_dir = partial(extract, path=extract_dir)
     try:
-        urllib.request.urlretrieve(download_url, download_location)
-    except urllib.error.ContentTooShortError:
-        LOGGER.warning(
-            "The artifact could not be completely downloaded. Default"
-            " compile bypass to false.", filename=download_location)
-        raise ValueError("No artifacts were found for the current task")
+        with os.fdopen(fd, "wb") as fh:
+            complete = _stream_download(download_url, fh, extract_to_dir)
+        if not complete:
+            LOGGER.warning(
+                "The artifact could not be completely downloaded. Default"
+                " compile bypass to false.", filename=download_location)
+            raise ValueError("No artifacts were found for the current task")
+        if extract_dir:
+            _move_tree(extract_dir, ".")
+        os.replace(part_location, download_location)
+    finally:
+        if os.path.exists(part_location):
+            os.remove(part_location)
+        if extract_dir:
+            shutil.rmtree(extract_dir, ignore_errors=True)
+
+
+def extract_artifacts_from_stream(fileobj: BinaryIO, path: str = ".") -> None:
+    """
+    Extract interests contents from a stream of the artifacts tar file, as it is read.
+
+    :param fileobj: File object to read the artifacts tar file from.
+    :param path: Directory to extract the contents into.
+    """
+    extract_files = {executable_name(artifact) for artifact in ARTIFACTS_TO_EXTRACT}
+    extracted = []
+    with tarfile.open(fileobj=fileobj, mode="r|gz") as tar:
+        for tarinfo in tar:
+            # The repo/ directory contains files needed by the package task. May
+            # need to add other files that would otherwise be generated by SCons
+            # if we did not bypass compile.
+            if tarinfo.name.startswith("repo/") or tarinfo.name in extract_files:
+                tar.extract(tarinfo, path)
+                extracted.append(tarinfo.name)
+    LOGGER.info("Extracted the files", files="\n".join(extracted))
 
 
 def extract_artifacts(filename: str) -> None:
@@ -351,18 +567,48 @@ def extract_artifacts(filename: str) -> None:
 
     :param filename: Path to artifacts file.
     """
-    extract_files = {executable_name(artifact) for artifact in ARTIFACTS_TO_EXTRACT}
-    with tarfile.open(filename, "r:gz") as tar:
-        # The repo/ directory contains files needed by the package task. May
-        # need to add other files that would otherwise be generated by SCons
-        # if we did not bypass compile.
-        subdir = [
-            tarinfo for tarinfo in tar.getmembers()
-            if tarinfo.name.startswith("repo/") or tarinfo.name in extract_files
-        ]
-        LOGGER.info("Extracting the files...", filename=filename,
-                    files="\n".join(tarinfo.name for tarinfo in subdir))
-        tar.extractall(members=subdir)
+    LOGGER.info("Extracting the files...", filename=filename)
+    with open(filename, "rb") as fh:
+        extract_artifacts_from_stream(fh)
+
+
+def _link_or_copy(source: str, target: str) -> None:
+    """Hard link the source file to the target, or copy it if it can't be linked."""
+    if os.path.exists(target):
+        os.remove(target)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+def retrieve_artifact(url: str, filename: str, revision: str, cache: Optional[ArtifactCache],
+                      extract: Optional[Callable[[BinaryIO, str], None]] = None) -> None:
+    """
+    Get an artifact from the cache if it is there, otherwise download it and add it to the cache.
+
+    :param url: URL to download the artifact from.
+    :param filename: Path to store the artifact.
+    :param revision: Revision the artifact was built from.
+    :param cache: Cache of the artifacts downloaded before, if any.
+    :param extract: Function to extract the artifact from a stream of its contents into a
+        directory.
+    """
+    if cache is None:
+        download_file(url, filename, extract)
+        return
+
+    cached_file = cache.get(revision, filename)
+    if cached_file:
+        LOGGER.info("Using cached artifact", filename=filename, path=cached_file)
+        if extract:
+            with open(cached_file, "rb") as fh:
+                extract(fh, ".")
+    else:
+        cached_file = cache.path(revision, filename)
+        os.makedirs(os.path.dirname(cached_file), exist_ok=True)
+        download_file(url, cached_file, extract)
+    _link_or_copy(cached_file, filename)
 
 
 def rename_artifact(filename: str, target_name: str) -> None:
@@ -388,12 +634,56 @@ def validate_url(url: str) -> None:
     requests.head(url).raise_for_status()
 
 
-def fetch_artifacts(build: Build, revision: str) -> List[Dict[str, str]]:
+def fetch_artifact(artifact: Any, build_id: str, revision: str,
+                   cache: Optional[ArtifactCache]) -> Optional[Dict[str, str]]:
+    """
+    Fetch an artifact of the compile task, or link it to this patch build.
+
+    :param artifact: Artifact of the compile task.
+    :param build_id: Build id of the compile task.
+    :param revision: The revision being fetched from.
+    :param cache: Cache of the artifacts downloaded before, if any.
+    :return: Metadata of the artifact if it should be linked to this patch build.
+    """
+    filename = extract_filename_from_url(artifact.url)
+    if filename.startswith(build_id):
+        LOGGER.info("Retrieving artifacts.tgz", filename=filename)
+        retrieve_artifact(artifact.url, filename, revision, cache, extract_artifacts_from_stream)
+
+    elif filename.startswith("debugsymbols"):
+        LOGGER.info("Retrieving debug symbols", filename=filename)
+        retrieve_artifact(artifact.url, filename, revision, cache)
+        rename_artifact(filename, "mongo-debugsymbols")
+
+    elif filename.startswith("mongo-src"):
+        LOGGER.info("Retrieving mongo source", filename=filename)
+        retrieve_artifact(artifact.url, filename, revision, cache)
+        rename_artifact(filename, "distsrc")
+
+    else:
+        # For other artifacts we just add their URLs to the JSON file to upload.
+        LOGGER.info("Linking base artifact to this patch build", filename=filename)
+        validate_url(artifact.url)
+        return {
+            "name": artifact.name,
+            "link": artifact.url,
+            "visibility": "private",
+        }
+
+    return None
+
+
+def fetch_artifacts(build: Build, revision: str,
+                    cache: Optional[ArtifactCache] = None) -> List[Dict[str, str]]:
     """
     Fetch artifacts from a given revision.
 
+    The artifacts are downloaded concurrently, and the artifacts tar file is extracted as it is
+    downloaded.
+
     :param build: Build id of the desired artifacts.
     :param revision: The revision being fetched from.
+    :param cache: Cache of the artifacts downloaded before, if any.
     :return: Artifacts from the revision.
     """
     LOGGER.info("Fetching artifacts", build_id=build.id, revision=revision)
@@ -406,35 +696,24 @@ def fetch_artifacts(build: Build, revision: str) -> List[Dict[str, str]]:
         raise ValueError("No artifacts were found for the current task")
 
     LOGGER.info("Fetching pre-existing artifacts from compile task", task_id=task.task_id)
-    artifacts = []
-    for artifact in task.artifacts:
-        filename = extract_filename_from_url(artifact.url)
-        if filename.startswith(build.id):
-            LOGGER.info("Retrieving artifacts.tgz", filename=filename)
-            download_file(artifact.url, filename)
-            extract_artifacts(filename)
-
-        elif filename.startswith("debugsymbols"):
-            LOGGER.info("Retrieving debug symbols", filename=filename)
-            download_file(artifact.url, filename)
-            rename_artifact(filename, "mongo-debugsymbols")
-
-        elif filename.startswith("mongo-src"):
-            LOGGER.info("Retrieving mongo source", filename=filename)
-            download_file(artifact.url, filename)
-            rename_artifact(filename, "distsrc")
-
-        else:
-            # For other artifacts we just add their URLs to the JSON file to upload.
-            LOGGER.info("Linking base artifact to this patch build", filename=filename)
-            validate_url(artifact.url)
-            artifacts.append({
-                "name": artifact.name,
-                "link": artifact.url,
-                "visibility": "private",
-            })
-
-    return artifacts
+    if cache is None:
+        return _fetch_task_artifacts(task, build.id, revision, None)
+    with cache.lock(revision):
+        cache.prune(revision)
+        return _fetch_task_artifacts(task, build.id, revision, cache)
+
+
+def _fetch_task_artifacts(task: Task, build_id: str, revision: str,
+                          cache: Optional[ArtifactCache]) -> List[Dict[str, str]]:
+    """Fetch the artifacts of the compile task concurrently, see fetch_artifacts."""
+    with futures.ThreadPoolExecutor(max_workers=MAX_PARALLEL_DOWNLOADS) as executor:
+        fetched = [
+            executor.submit(fetch_artifact, artifact, build_id, revision, cache)
+            for artifact in task.artifacts
+        ]
+        artifacts = [future.result() for future in fetched]
+
+    return [artifact for artifact in artifacts if artifact is not None]
 
 
 def update_artifact_permissions(permission_dict: Dict[str, int]) -> None:
@@ -448,7 +727,8 @@ def update_artifact_permissions(permission_dict: Dict[str, int]) -> None:
 
 
 def gather_artifacts_and_update_expansions(build: Build, target: TargetBuild,
-                                           json_artifact_file: str, expansions_file: str):
+                                           json_artifact_file: str, expansions_file: str,
+                                           cache_dir: Optional[str] = None):
     """
     Fetch the artifacts for this build and save them to be used by other tasks.
 
@@ -456,8 +736,10 @@ def gather_artifacts_and_update_expansions(build: Build, target: TargetBuild,
     :param target: Target build being bypassed.
     :param json_artifact_file: File to write json artifacts to.
     :param expansions_file: File to write expansions to.
+    :param cache_dir: Directory to cache the artifacts in across tasks, if any.
     """
-    artifacts = fetch_artifacts(build, target.revision)
+    cache = ArtifactCache(cache_dir) if cache_dir else None
+    artifacts = fetch_artifacts(build, target.revision, cache)
     update_artifact_permissions(ARTIFACTS_NEEDING_PERMISSIONS)
     write_out_artifacts(json_artifact_file, artifacts)
 
@@ -476,9 +758,11 @@ def gather_artifacts_and_update_expansions(build: Build, target: TargetBuild,
 @click.option("--out-file", required=True, help="File to write expansions to.")
 @click.option("--json-artifact", required=True,
               help="The JSON file to write out the metadata of files to attach to task.")
+@click.option("--cache-dir", default=None,
+              help="Directory to cache the downloaded artifacts in across tasks.")
 def main(  # pylint: disable=too-many-arguments,too-many-locals,too-many-statements
         project: str, build_variant: str, revision: str, patch_file: str, out_file: str,
-        json_artifact: str):
+        json_artifact: str, cache_dir: Optional[str]):
     """
     Create a file with expansions that can be used to bypass compile.
 
@@ -492,6 +776,7 @@ def main(  # pylint: disable=too-many-arguments,too-many-locals,too-many-stateme
     :param patch_file: A list of all files modified in patch build.
     :param out_file: File to write expansions to.
     :param json_artifact: The JSON file to write out the metadata of files to attach to task.
+    :param cache_dir: Directory to cache the downloaded artifacts in across tasks.
     """
     logging.basicConfig(
         format="[%(asctime)s - %(name)s - %(levelname)s] %(message)s",
@@ -510,7 +795,7 @@ def main(  # pylint: disable=too-many-arguments,too-many-locals,too-many-stateme
                            revision=revision, project=project)
             return
 
-        gather_artifacts_and_update_expansions(build, target, json_artifact, out_file)
+        gather_artifacts_and_update_expansions(build, target, json_artifact, out_file, cache_dir)
 
 
 if __name__ == "__main__":
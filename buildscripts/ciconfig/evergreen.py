@@ -7,8 +7,12 @@ from __future__ import annotations
 
 import datetime
 import distutils.spawn  # pylint: disable=no-name-in-module
+import hashlib
+import os
+import pickle
 import re
-from typing import Set
+from collections import defaultdict
+from typing import List, Set
 
 import yaml
 
@@ -16,14 +20,50 @@ import buildscripts.util.runcommand as runcommand
 
 ENTERPRISE_MODULE_NAME = "enterprise"
 
+# Environment variable setting the directory to cache the parsed project configurations in.
+CACHE_DIR_ENV = "MONGO_EVERGREEN_CONFIG_CACHE_DIR"
+# Number of parsed project configurations kept in the cache.
+MAX_CACHED_CONFIGS = 10
+# Version of the format of the cached configurations, part of their cache key.
+CACHE_VERSION = 1
 
-def parse_evergreen_file(path, evergreen_binary="evergreen"):
-    """Read an Evergreen file and return EvergreenProjectConfig instance."""
+_INCLUDE_FILENAME_RE = re.compile(r"^\s*-?\s*filename:\s*[\"']?([^\"'\s#]+)")
+
+
+def parse_evergreen_file(path, evergreen_binary="evergreen", cache_dir=None):
+    """
+    Read an Evergreen file and return EvergreenProjectConfig instance.
+
+    The parsed configuration is cached in `cache_dir`, which defaults to the directory set by the
+    MONGO_EVERGREEN_CONFIG_CACHE_DIR environment variable, if any. It is cached under the hash of
+    the file, of the files it includes and of the evergreen binary, so it is only evaluated and
+    parsed again once any of them changes. The configuration isn't cached if one of the files it
+    includes can't be read.
+    """
     if evergreen_binary:
         if not distutils.spawn.find_executable(evergreen_binary):
             raise EnvironmentError(
                 "Executable '{}' does not exist or is not in the PATH.".format(evergreen_binary))
 
+    if cache_dir is None:
+        cache_dir = os.environ.get(CACHE_DIR_ENV)
+    cache_key = _get_cache_key(path, evergreen_binary) if cache_dir else None
+    cache_file = None
+    if cache_key:
+        cache_file = os.path.join(cache_dir, "{}.pickle".format(cache_key))
+        config = _read_cached_config(cache_file)
+        if config is not None:
+            return EvergreenProjectConfig(config)
+
+    config = _load_evergreen_file(path, evergreen_binary)
+    if cache_file:
+        _write_cached_config(cache_file, config)
+    return EvergreenProjectConfig(config)
+
+
+def _load_evergreen_file(path, evergreen_binary):
+    """Read and parse an Evergreen file, evaluating it with the given evergreen binary if any."""
+    if evergreen_binary:
         # Call 'evergreen evaluate path' to pre-process the project configuration file.
         cmd = runcommand.RunCommand(evergreen_binary)
         cmd.add("evaluate")
@@ -36,7 +76,110 @@ def parse_evergreen_file(path, evergreen_binary="evergreen"):
         with open(path, "r") as fstream:
             config = yaml.safe_load(fstream)
 
-    return EvergreenProjectConfig(config)
+    return config
+
+
+def _get_included_files(contents):
+    """Get the files listed by the top-level 'include' section of an Evergreen file."""
+    included = []
+    in_include = False
+    for line in contents.splitlines():
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        if not line[0].isspace() and not line.startswith("-"):
+            in_include = line.startswith("include:")
+        elif in_include:
+            match = _INCLUDE_FILENAME_RE.match(line)
+            if match:
+                included.append(match.group(1))
+    return included
+
+
+def _get_project_root(path):
+    """Get the root of the git repository of an Evergreen file, or its directory if not in one."""
+    file_dir = os.path.dirname(os.path.abspath(path))
+    directory = file_dir
+    while True:
+        if os.path.exists(os.path.join(directory, ".git")):
+            return directory
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return file_dir
+        directory = parent
+
+
+def _get_cache_key(path, evergreen_binary):
+    """
+    Get the hash of an Evergreen file, the files it includes and the evergreen binary.
+
+    Return None if one of the included files can't be read, as its changes would go unnoticed.
+    """
+    hasher = hashlib.sha256()
+    hasher.update("{}\0{}\0".format(CACHE_VERSION, evergreen_binary).encode())
+    if evergreen_binary:
+        # Different versions of evergreen may evaluate the same file differently.
+        binary = distutils.spawn.find_executable(evergreen_binary)
+        stat = os.stat(binary)
+        hasher.update("{}\0{}\0{}\0".format(binary, stat.st_size, stat.st_mtime_ns).encode())
+
+    with open(path, "rb") as fstream:
+        contents = fstream.read()
+    hasher.update(contents + b"\0")
+    # The included files are relative to the root of the project.
+    project_root = _get_project_root(path)
+    for included_file in _get_included_files(contents.decode("utf-8", errors="replace")):
+        hasher.update(included_file.encode() + b"\0")
+        try:
+            with open(os.path.join(project_root, included_file), "rb") as fstream:
+                hasher.update(fstream.read())
+        except OSError:
+            return None
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+def _read_cached_config(cache_file):
+    """Read a cached project configuration, or return None if it isn't cached."""
+    try:
+        with open(cache_file, "rb") as fstream:
+            config = pickle.load(fstream)
+    except FileNotFoundError:
+        return None
+    except Exception:  # pylint: disable=broad-except
+        # A corrupt cache entry is evaluated again and replaced.
+        return None
+    # Keep the recently used configurations when pruning the cache.
+    try:
+        os.utime(cache_file)
+    except FileNotFoundError:
+        # Another process pruned it since.
+        pass
+    return config
+
+
+def _write_cached_config(cache_file, config):
+    """Cache a project configuration, removing the least recently used ones over the limit."""
+    cache_dir = os.path.dirname(cache_file)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_file = "{}.{}.tmp".format(cache_file, os.getpid())
+    with open(tmp_file, "wb") as fstream:
+        pickle.dump(config, fstream, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, cache_file)
+
+    # Other processes may be pruning the cache at the same time.
+    cached_files = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(".pickle"):
+            try:
+                cached_files.append((os.path.getmtime(os.path.join(cache_dir, name)), name))
+            except FileNotFoundError:
+                continue
+    cached_files.sort(reverse=True)
+    for (_, name) in cached_files[MAX_CACHED_CONFIGS:]:
+        try:
+            os.remove(os.path.join(cache_dir, name))
+        except FileNotFoundError:
+            pass
 
 
 class EvergreenProjectConfig(object):  # pylint: disable=too-many-instance-attributes
@@ -57,8 +200,15 @@ class EvergreenProjectConfig(object):  # pylint: disable=too-many-instance-attri
         ]
         self._variants_by_name = {variant.name: variant for variant in self.variants}
         self.distro_names = set()
+        self._variants_by_task_name = defaultdict(list)
         for variant in self.variants:
             self.distro_names.update(variant.distro_names)
+            for task_name in set(variant.task_names):
+                self._variants_by_task_name[task_name].append(variant)
+        self._task_names_by_tag = defaultdict(list)
+        for task in self.tasks:
+            for tag in task.tags:
+                self._task_names_by_tag[tag].append(task.name)
 
     @property
     def task_names(self):
@@ -93,7 +243,11 @@ class EvergreenProjectConfig(object):  # pylint: disable=too-many-instance-attri
 
     def get_task_names_by_tag(self, tag):
         """Return the list of tasks that have the given tag."""
-        return list(task.name for task in self.tasks if tag in task.tags)
+        return list(self._task_names_by_tag.get(tag, []))
+
+    def get_variants_by_task(self, task_name: str) -> List[Variant]:
+        """Return the list of build variants that run the given task."""
+        return list(self._variants_by_task_name.get(task_name, []))
 
 
 class Task(object):
@@ -268,8 +422,10 @@ class Variant(object):
                 self.tasks.append(
                     VariantTask(task_map.get(task["name"]), task.get("distros", run_on), self))
         self.distro_names = set(run_on)
+        self._tasks_by_name = {}
         for task in self.tasks:
             self.distro_names.update(task.run_on)
+            self._tasks_by_name.setdefault(task.name, task)
 
     def __repr__(self):
         """Create a string version of object for debugging."""
@@ -324,10 +480,7 @@ class Variant(object):
 
         Return None if this variant does not run the task.
         """
-        for task in self.tasks:
-            if task.name == task_name:
-                return task
-        return None
+        return self._tasks_by_name.get(task_name)
 
     def __str__(self):
         return self.name
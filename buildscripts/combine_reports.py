@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
-"""Combine JSON report files used in Evergreen."""
+"""Combine JSON report files used in Evergreen.
+
+The test results are written out as the reports are read, so only one report file is held in
+memory at a time. Report files ending in .jsonl are read one line at a time, each line being either
+a test result or a whole report.
+"""
 
-import errno
 import json
 import os
 import sys
@@ -21,6 +25,64 @@ def read_json_file(json_file):
         return json.load(json_data)
 
 
+def iter_report_results(report_file):
+    """Yield the test results of a JSON report file, or of a JSON-lines one."""
+    if not report_file.endswith(".jsonl"):
+        yield from read_json_file(report_file)["results"]
+        return
+
+    with open(report_file) as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if "results" in entry:
+                yield from entry["results"]
+            else:
+                yield entry
+
+
+class StreamingReportCombiner(object):
+    """Write the test results of several reports out as a single report, one result at a time.
+
+    Only the number of failures is kept rather than every test result, so the memory used doesn't
+    grow with the number of reports. The combined report is the same as the one of combining the
+    reports with TestReport.combine().
+    """
+
+    def __init__(self, fh):
+        """Initialize StreamingReportCombiner and start writing the combined report to 'fh'."""
+        self._fh = fh
+        self.num_results = 0
+        self.num_failures = 0
+        self.exit_code = 0
+        self._fh.write('{"results": [')
+
+    def add_report_file(self, report_file):
+        """Write the test results of 'report_file'."""
+        for result in iter_report_results(report_file):
+            self.add_result(result)
+
+    def add_result(self, result):
+        """Write a test result of a report."""
+        # The result is round-tripped through a _TestInfo for it to be written out the same way
+        # TestReport.as_dict() would.
+        test_info = report._TestInfo.from_dict(result)  # pylint: disable=protected-access
+        if self.num_results:
+            self._fh.write(", ")
+        json.dump(test_info.as_dict(), self._fh)
+        self.num_results += 1
+
+        if test_info.status in ["fail", "error", "timeout"]:
+            self.num_failures += 1
+        if test_info.status in ["fail", "timeout"]:
+            self.exit_code = 31
+
+    def finish(self):
+        """Finish writing the combined report."""
+        self._fh.write('], "failures": {:d}}}'.format(self.num_failures))
+
+
 def report_exit(combined_test_report):
     """Return report exit code.
 
@@ -64,37 +126,33 @@ def main():
     if not args:
         sys.exit("No report files were specified")
 
-    report_files = args
-    report_files_count = len(report_files)
-    test_reports = []
-
-    for report_file in report_files:
-        try:
-            report_file_json = read_json_file(report_file)
-            test_reports.append(report.TestReport.from_dict(report_file_json))
-        except IOError as err:
-            # errno.ENOENT is the error code for "No such file or directory".
-            if err.errno == errno.ENOENT:
-                report_files_count -= 1
-                continue
-            raise
-
-    combined_test_report = report.TestReport.combine(*test_reports)
-    combined_report = combined_test_report.as_dict()
+    # Report files which don't exist are skipped.
+    report_files = [report_file for report_file in args if os.path.exists(report_file)]
 
     if options.outfile == "-":
         outfile_exists = False  # Nothing will be overridden when writing to stdout.
     else:
         outfile_exists = os.path.exists(options.outfile)
 
-    check_error(report_files_count, outfile_exists)
+    check_error(len(report_files), outfile_exists)
+
+    if outfile_exists:
+        # There are no reports to combine.
+        sys.exit(0)
 
-    if not outfile_exists:
-        with utils.open_or_use_stdout(options.outfile) as fh:
-            json.dump(combined_report, fh)
+    # The combined report is written to a temporary file first so that a report failing to parse
+    # doesn't leave a partial output file behind.
+    tmp_outfile = options.outfile if options.outfile == "-" else options.outfile + ".tmp"
+    with utils.open_or_use_stdout(tmp_outfile) as fh:
+        combiner = StreamingReportCombiner(fh)
+        for report_file in report_files:
+            combiner.add_report_file(report_file)
+        combiner.finish()
+    if tmp_outfile != options.outfile:
+        os.replace(tmp_outfile, options.outfile)
 
     if options.report_exit:
-        sys.exit(report_exit(combined_test_report))
+        sys.exit(combiner.exit_code)
     else:
         sys.exit(0)
 
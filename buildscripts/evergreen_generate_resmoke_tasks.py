@@ -10,6 +10,7 @@ from copy import deepcopy
 import datetime
 from datetime import timedelta
 from inspect import getframeinfo, currentframe
+import json
 import logging
 import math
 import os
@@ -24,6 +25,7 @@ import structlog
 import yaml
 
 from evergreen.api import EvergreenApi, RetryingEvergreenApi
+from git import Repo
 from pydantic.main import BaseModel
 
 from shrub.v2 import Task, TaskDependency, BuildVariant, ExistingTask, ShrubProject
@@ -33,12 +35,20 @@ if __name__ == "__main__" and __package__ is None:
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # pylint: disable=wrong-import-position
+from buildscripts.burn_in_tests import DEFAULT_REPO_LOCATIONS
 import buildscripts.resmokelib.parser as _parser
 import buildscripts.resmokelib.suitesconfig as suitesconfig
 from buildscripts.util.fileops import write_file_to_dir, read_yaml_file
+import buildscripts.evergreen_resmoke_job_count as job_count
 import buildscripts.util.read_config as read_config
+import buildscripts.util.sub_task_cost_model as sub_task_cost_model
+import buildscripts.util.suite_packing as suite_packing
 import buildscripts.util.taskname as taskname
-from buildscripts.util.teststats import HistoricTaskData, TestRuntime, normalize_test_name
+import buildscripts.util.timeout_model as timeout_model
+from buildscripts.util.teststats import HistoricTaskData, TestFailureRate, TestRuntime, \
+    TestRuntimeStats, normalize_test_name
+from buildscripts.patch_builds.change_data import find_changed_files_in_repos
+from buildscripts.patch_builds.co_change_index import CoChangeIndex
 from buildscripts.patch_builds.task_generation import TimeoutInfo, resmoke_commands
 # pylint: enable=wrong-import-position
 
@@ -53,8 +63,27 @@ MAX_EXPECTED_TIMEOUT = int(timedelta(hours=48).total_seconds())
 LOOKBACK_DURATION_DAYS = 14
 GEN_SUFFIX = "_gen"
 CLEAN_EVERY_N_HOOK = "CleanEveryN"
+BURN_IN_TESTS_TASK = "burn_in_tests"
 ASAN_SIGNATURE = "detect_leaks=1"
 
+# How the tests are packed into sub-suites:
+#   - sequential: the tests are added to a sub-suite in order of decreasing runtime until it is
+#     full, then to the next one.
+#   - lpt: see buildscripts/util/suite_packing.py.
+#   - cost_model: the number of sub-suites is chosen by buildscripts/util/sub_task_cost_model.py,
+#     and the tests are packed into them like lpt.
+SEQUENTIAL_PACKING = "sequential"
+LPT_PACKING = "lpt"
+COST_MODEL_PACKING = "cost_model"
+
+# How the timeouts of the generated tasks are calculated:
+#   - scaling: a multiple of the average runtimes.
+#   - percentile: see buildscripts/util/timeout_model.py. The timeouts may be lower than those of
+#     the scaling model, which is still used for the sub-tasks whose tests lack a runtime
+#     distribution.
+SCALING_TIMEOUT_MODEL = "scaling"
+PERCENTILE_TIMEOUT_MODEL = "percentile"
+
 HEADER_TEMPLATE = """# DO NOT EDIT THIS FILE. All manual edits will be lost.
 # This file was generated by {file} from
 # {suite_file}.
@@ -87,11 +116,15 @@ DEFAULT_CONFIG_VALUES = {
     "generated_config_dir": "generated_resmoke_config",
     "max_tests_per_suite": 100,
     "max_sub_suites": 3,
+    "order_tests_by_failure_rate": False,
     "resmoke_args": "",
     "resmoke_repeat_suites": 1,
     "run_multiple_jobs": "true",
+    "suite_packing": SEQUENTIAL_PACKING,
     "target_resmoke_time": 60,
     "test_suites_dir": DEFAULT_TEST_SUITE_DIR,
+    "timeout_model": SCALING_TIMEOUT_MODEL,
+    "use_burn_in_failure_rates": False,
     "use_default_timeouts": False,
     "use_large_distro": False,
 }
@@ -100,6 +133,10 @@ CONFIG_FORMAT_FN = {
     "fallback_num_sub_suites": int,
     "max_sub_suites": int,
     "max_tests_per_suite": int,
+    "machine_time_budget_minutes": float,
+    "resmoke_jobs": int,
+    "resmoke_jobs_factor": float,
+    "sub_task_overhead_secs": float,
     "target_resmoke_time": int,
 }
 
@@ -193,6 +230,46 @@ class ConfigOptions(object):
         """Return name of build_id for s3 folder containing generated tasks config."""
         return self.build_id
 
+    @property
+    def order_tests_by_failure_rate(self):
+        """Whether the tests should be run in order of decreasing historic failure rate."""
+        order_tests = self._lookup(self.config, "order_tests_by_failure_rate")
+        if order_tests:
+            return strtobool(str(order_tests))
+        return False
+
+    @property
+    def weight_changed_area_failures(self):
+        """
+        Whether the failure rates should be weighted towards the tests related to the changed files.
+
+        The historic failure rates only cover the task as a whole. In patch builds with a
+        co_change_index, the tests related to the files changed by the patch are moved up by the
+        score of their relation, so the order reflects the likely failures of the changed area.
+        """
+        return bool(self.is_patch and self.co_change_index)
+
+    @property
+    def use_burn_in_failure_rates(self):
+        """Whether the burn_in history of the tests should count towards their failure rate."""
+        use_burn_in = self._lookup(self.config, "use_burn_in_failure_rates")
+        if use_burn_in:
+            return strtobool(str(use_burn_in))
+        return False
+
+    @property
+    def improve_suite_packing(self):
+        """Whether the lpt packing of the tests should be improved by moving tests around."""
+        improve = self._lookup(self.config, "improve_suite_packing")
+        if improve:
+            return strtobool(str(improve))
+        return False
+
+    @property
+    def failure_rates_filename(self):
+        """Filename for the failure rates used to order the tests."""
+        return f"{self.task}_failure_rates.json"
+
     @property
     def create_misc_suite(self):
         """Whether or not a _misc suite file should be created."""
@@ -375,6 +452,94 @@ def divide_tests_into_suites(suite_name, tests_runtimes: List[TestRuntime], max_
     return suites
 
 
+def pack_tests_into_suites(  # pylint: disable=too-many-arguments
+        suite_name, tests_runtimes: List[TestRuntime], max_time_seconds, max_suites=None,
+        max_tests_per_suite=None, per_test_overhead=0.0, improve=False):
+    """
+    Pack the given tests into suites that take about the same time to run.
+
+    :param suite_name: Name of suite being split.
+    :param tests_runtimes: List of tuples containing test names and test runtimes.
+    :param max_time_seconds: Target runtime of each suite.
+    :param max_suites: Maximum number of suites to create.
+    :param max_tests_per_suite: Maximum number of tests to add to a single suite.
+    :param per_test_overhead: Runtime of the task-level hooks expected to run for each test.
+    :param improve: Whether to improve the packing by moving tests between suites.
+    :return: List of Suite objects representing grouping of tests.
+    """
+    packing = suite_packing.pack_tests(tests_runtimes, max_time_seconds, max_suites,
+                                       max_tests_per_suite, per_test_overhead, improve)
+    LOGGER.debug("Packed tests into suites", num_suites=len(packing.bins),
+                 makespan=packing.makespan, imbalance=packing.imbalance)
+    return create_suites_from_packing(suite_name, packing)
+
+
+def get_changed_test_mappings(index_file: str) -> List[Dict]:
+    """
+    Get the tests related to the files changed by the patch from the co-change index.
+
+    :param index_file: Path to the co-change index.
+    :return: Related test files of each changed file.
+    """
+    if not os.path.exists(index_file):
+        LOGGER.warning("Co-change index not found, using task failure rates only",
+                       index_file=index_file)
+        return []
+
+    index = CoChangeIndex.from_file(index_file)
+    repos = [Repo(x) for x in DEFAULT_REPO_LOCATIONS if os.path.isdir(x)]
+    changed_files = find_changed_files_in_repos(repos)
+    LOGGER.debug("Found changed files", files=changed_files)
+    return index.get_test_mappings(0, changed_files)
+
+
+def weight_failure_rates_by_relation(failure_rates: List[TestFailureRate],
+                                     test_mappings: List[Dict]) -> List[TestFailureRate]:
+    """
+    Weight the failure rates of the tests related to the changed files by their relation.
+
+    A related test fails either as it did historically or because of the change, with the score of
+    its relation as the probability, so its rate becomes 1 - (1 - rate) * (1 - score). Related tests
+    without history are added with their score.
+
+    :param failure_rates: Historic failure rate of each test.
+    :param test_mappings: Related test files of each changed file.
+    :return: Failure rate of each test, ordered by decreasing failure rate.
+    """
+    scores = {}
+    for mapping in test_mappings:
+        for test_file in mapping["test_files"]:
+            test_name = normalize_test_name(test_file["name"])
+            scores[test_name] = max(scores.get(test_name, 0.0), test_file["score"])
+
+    weighted = []
+    for info in failure_rates:
+        score = scores.pop(info.test_name, None)
+        if score is not None:
+            info = info._replace(failure_rate=1 - (1 - info.failure_rate) * (1 - score))
+        weighted.append(info)
+    weighted.extend(TestFailureRate(test_name, score, 0) for test_name, score in scores.items())
+    return sorted(weighted, key=lambda x: (x.failure_rate, x.num_runs), reverse=True)
+
+
+def create_suites_from_packing(suite_name, packing: suite_packing.PackingResult):
+    """
+    Create a suite for each bin of the given packing.
+
+    :param suite_name: Name of suite being split.
+    :param packing: Tests of each sub-suite.
+    :return: List of Suite objects representing grouping of tests.
+    """
+    Suite.reset_current_index()
+    suites = []
+    for tests in packing.bins:
+        suite = Suite(suite_name)
+        for test_file, runtime in tests:
+            suite.add_test(test_file, runtime)
+        suites.append(suite)
+    return suites
+
+
 def read_suite_config(suite_dir, suite_name) -> Dict[str, Any]:
     """
     Read the given resmoke suite configuration.
@@ -505,6 +670,7 @@ class TimeoutEstimate(NamedTuple):
 
     max_test_runtime: Optional[float]
     expected_task_runtime: Optional[float]
+    tests_runtime_stats: Optional[List[TestRuntimeStats]] = None
 
     @classmethod
     def no_timeouts(cls) -> "TimeoutEstimate":
@@ -521,6 +687,13 @@ class TimeoutEstimate(NamedTuple):
         if self.max_test_runtime is None:
             return None
 
+        if self.tests_runtime_stats:
+            timeout = calculate_timeout(
+                timeout_model.estimate_test_timeout(self.tests_runtime_stats), 1)
+            LOGGER.debug("Setting timeout from runtime percentiles", timeout=timeout,
+                         max_runtime=self.max_test_runtime)
+            return timeout
+
         timeout = calculate_timeout(self.max_test_runtime, 3) * repeat_factor
         LOGGER.debug("Setting timeout", timeout=timeout, max_runtime=self.max_test_runtime,
                      factor=repeat_factor)
@@ -536,6 +709,14 @@ class TimeoutEstimate(NamedTuple):
         if self.expected_task_runtime is None:
             return None
 
+        if self.tests_runtime_stats:
+            exec_timeout = calculate_timeout(
+                timeout_model.estimate_task_timeout(self.tests_runtime_stats,
+                                                    self.expected_task_runtime, repeat_factor), 1)
+            LOGGER.debug("Setting exec_timeout from runtime percentiles", exec_timeout=exec_timeout,
+                         suite_runtime=self.expected_task_runtime, factor=repeat_factor)
+            return exec_timeout
+
         exec_timeout = calculate_timeout(self.expected_task_runtime, 3) * repeat_factor
         LOGGER.debug("Setting exec_timeout", exec_timeout=exec_timeout,
                      suite_runtime=self.expected_task_runtime, factor=repeat_factor)
@@ -573,7 +754,7 @@ class TimeoutEstimate(NamedTuple):
         return TimeoutInfo.overridden(timeout=test_timeout, exec_timeout=task_timeout)
 
 
-class Suite(object):
+class Suite(object):  # pylint: disable=too-many-instance-attributes
     """A suite of tests that can be run by evergreen."""
 
     _current_index = 0
@@ -590,6 +771,7 @@ class Suite(object):
         self.tests_with_runtime_info = 0
         self.source_name = source_name
         self.task_overhead = 0
+        self.tests_runtime_stats = None
 
         self.index = Suite._current_index
         Suite._current_index += 1
@@ -623,7 +805,8 @@ class Suite(object):
         """Get the estimated runtime of this task to for timeouts."""
         if self.should_overwrite_timeout():
             return TimeoutEstimate(max_test_runtime=self.max_runtime,
-                                   expected_task_runtime=self.total_runtime + self.task_overhead)
+                                   expected_task_runtime=self.total_runtime + self.task_overhead,
+                                   tests_runtime_stats=self.tests_runtime_stats)
         return TimeoutEstimate.no_timeouts()
 
     def get_runtime(self):
@@ -704,6 +887,12 @@ class EvergreenConfigGenerator(object):
                 resmoke_args, ["repeatSuites", "repeat"]):
             resmoke_args += f" --repeatSuites={self.options.repeat_suites} "
 
+        if self.options.order_tests_by_failure_rate:
+            # The failure rates are written next to the generated suite files.
+            failure_rates_file = "/".join(
+                [self.options.generated_config_dir, self.options.failure_rates_filename])
+            resmoke_args += f" --testOrderFile={failure_rates_file} "
+
         return resmoke_args
 
     def _get_run_tests_vars(self, suite_file: str) -> Dict[str, Any]:
@@ -854,6 +1043,9 @@ class GenerateSubSuites(object):
         if generate_config:
             self.generate_options = generate_config
         self.test_list = []
+        self.failure_rates = []
+        self.sub_task_overhead = AVG_SETUP_TIME
+        self.cost_model_result = None
 
         # Populate config values for methods like list_tests()
         _parser.set_run_options()
@@ -874,6 +1066,10 @@ class GenerateSubSuites(object):
             evg_stats = HistoricTaskData.from_evg(self.evergreen_api, self.config_options.project,
                                                   start_date, end_date, self.config_options.task,
                                                   self.config_options.variant)
+            if self.config_options.order_tests_by_failure_rate:
+                self.failure_rates = self.calculate_failure_rates(evg_stats, start_date, end_date)
+            if self.config_options.suite_packing == COST_MODEL_PACKING:
+                self.sub_task_overhead = self.get_sub_task_overhead(start_date, end_date)
             if not evg_stats:
                 LOGGER.debug("No test history, using fallback suites")
                 # This is probably a new suite, since there is no test history, just use the
@@ -891,6 +1087,94 @@ class GenerateSubSuites(object):
             else:
                 raise
 
+    def calculate_failure_rates(self, test_stats: HistoricTaskData, start_date: datetime,
+                                end_date: datetime) -> List[TestFailureRate]:
+        """
+        Determine the historic failure rate of the tests in the task being split.
+
+        :param test_stats: Historical test results for task being split.
+        :param start_date: Time to start historical analysis.
+        :param end_date: Time to end historical analysis.
+        :return: Failure rate of each test, ordered by decreasing failure rate.
+        """
+        historic_test_results = list(test_stats.historic_test_results)
+        if self.config_options.use_burn_in_failure_rates:
+            # Tests that fail under burn_in are likely to fail again when run by the task.
+            burn_in_stats = HistoricTaskData.from_evg(
+                self.evergreen_api, self.config_options.project, start_date, end_date,
+                BURN_IN_TESTS_TASK, self.config_options.variant)
+            historic_test_results.extend(burn_in_stats.historic_test_results)
+
+        failure_rates = HistoricTaskData(historic_test_results).get_tests_failure_rates()
+        if self.config_options.weight_changed_area_failures:
+            test_mappings = get_changed_test_mappings(self.config_options.co_change_index)
+            failure_rates = weight_failure_rates_by_relation(failure_rates, test_mappings)
+        LOGGER.debug("Calculated failure rates", num_tests=len(failure_rates),
+                     num_failing=len([info for info in failure_rates if info.failure_rate > 0]))
+        return failure_rates
+
+    def get_sub_task_overhead(self, start_date: datetime, end_date: datetime) -> float:
+        """
+        Determine the fixed overhead of running a sub-task, before it runs any test.
+
+        The misc sub-task runs few if any tests, so its historic runtime is mostly the overhead of
+        getting a host and setting up the task.
+
+        :param start_date: Time to start historical analysis.
+        :param end_date: Time to end historical analysis.
+        :return: Fixed overhead of a sub-task (in seconds).
+        """
+        if self.config_options.sub_task_overhead_secs is not None:
+            return self.config_options.sub_task_overhead_secs
+
+        misc_task = f"{self.config_options.task}_misc_{self.config_options.variant}"
+        task_stats = self.evergreen_api.task_stats_by_project(
+            self.config_options.project, start_date, end_date, tasks=[misc_task],
+            variants=[self.config_options.variant], group_num_days=LOOKBACK_DURATION_DAYS)
+        for stats in task_stats:
+            # The duration of successful runs is read from the json, it is not exposed as an
+            # attribute under its name in the Evergreen API.
+            if stats.json.get("num_success", 0) > 0:
+                return stats.json["avg_duration_success"]
+
+        LOGGER.debug("No history for the misc task, using the default overhead", task=misc_task)
+        return AVG_SETUP_TIME
+
+    def get_resmoke_jobs(self) -> int:
+        """Determine how many resmoke jobs each sub-task runs its tests on."""
+        if self.config_options.resmoke_jobs:
+            return self.config_options.resmoke_jobs
+        if self.config_options.run_multiple_jobs != "true":
+            return 1
+        # This uses the number of CPUs of the host generating the tasks, so the resmoke_jobs
+        # expansion should be set when the generated tasks run on a different distro.
+        return job_count.determine_jobs(self.config_options.task, self.config_options.variant,
+                                        self.config_options.distro_id,
+                                        int(self.config_options.resmoke_jobs_max
+                                            or 0), self.config_options.resmoke_jobs_factor or 1.0)
+
+    def choose_sub_tasks(self, tests_runtimes: List[TestRuntime],
+                         per_test_overhead: float) -> sub_task_cost_model.CostModelResult:
+        """
+        Choose the number of sub-tasks with the cost model and pack the tests into them.
+
+        :param tests_runtimes: Tests to split along with their runtimes.
+        :param per_test_overhead: Runtime of the task-level hooks expected to run for each test.
+        :return: Sub-task count chosen and the packing of the tests.
+        """
+        machine_time_budget = None
+        if self.config_options.machine_time_budget_minutes:
+            machine_time_budget = self.config_options.machine_time_budget_minutes * 60
+        result = sub_task_cost_model.choose_sub_tasks(
+            tests_runtimes, self.sub_task_overhead, self.get_resmoke_jobs(),
+            self.config_options.max_sub_suites, self.config_options.max_tests_per_suite,
+            per_test_overhead, self.config_options.repeat_suites, machine_time_budget,
+            self.config_options.improve_suite_packing)
+        LOGGER.debug("Chose number of sub-tasks", num_sub_tasks=result.chosen.num_sub_tasks,
+                     makespan=result.chosen.makespan, machine_time=result.chosen.machine_time,
+                     within_budget=result.within_budget)
+        return result
+
     def calculate_suites_from_evg_stats(self, test_stats: HistoricTaskData,
                                         execution_time_secs: int) -> List[Suite]:
         """
@@ -906,14 +1190,52 @@ class GenerateSubSuites(object):
             return self.calculate_fallback_suites()
 
         self.test_list = [info.test_name for info in tests_runtimes]
-        suites = divide_tests_into_suites(
-            self.config_options.generated_suite_filename, tests_runtimes, execution_time_secs,
-            self.config_options.max_sub_suites, self.config_options.max_tests_per_suite)
+        overhead_per_test = self.get_task_hook_overhead_per_test(test_stats)
+        if self.config_options.suite_packing == COST_MODEL_PACKING:
+            self.cost_model_result = self.choose_sub_tasks(tests_runtimes, overhead_per_test)
+            suites = create_suites_from_packing(self.config_options.generated_suite_filename,
+                                                self.cost_model_result.packing)
+        elif self.config_options.suite_packing == LPT_PACKING:
+            suites = pack_tests_into_suites(
+                self.config_options.generated_suite_filename, tests_runtimes, execution_time_secs,
+                self.config_options.max_sub_suites, self.config_options.max_tests_per_suite,
+                overhead_per_test, self.config_options.improve_suite_packing)
+        else:
+            suites = divide_tests_into_suites(
+                self.config_options.generated_suite_filename, tests_runtimes, execution_time_secs,
+                self.config_options.max_sub_suites, self.config_options.max_tests_per_suite)
 
-        self.add_task_hook_overhead(suites, test_stats)
+        self.add_task_hook_overhead(suites, overhead_per_test)
+        if self.config_options.timeout_model == PERCENTILE_TIMEOUT_MODEL:
+            self.add_tests_runtime_stats(suites, test_stats)
 
         return suites
 
+    @staticmethod
+    def add_tests_runtime_stats(suites: List[Suite], historic_stats: HistoricTaskData) -> None:
+        """
+        Add the runtime distribution of their tests to each suite, to calculate their timeouts.
+
+        The suites with a test whose history is too short to have a runtime distribution keep
+        the timeouts of the scaling model.
+
+        :param suites: List of suites that were created.
+        :param historic_stats: Historic runtime data of the suite.
+        """
+        runtime_stats = {test.test_name: test for test in historic_stats.get_tests_runtime_stats()}
+        num_scaling_suites = 0
+        for suite in suites:
+            tests_runtime_stats = [runtime_stats[test] for test in suite.tests]
+            if timeout_model.has_runtime_distributions(tests_runtime_stats):
+                suite.tests_runtime_stats = tests_runtime_stats
+            else:
+                num_scaling_suites += 1
+
+        if num_scaling_suites:
+            LOGGER.info(
+                "Not enough runtime history for percentile timeouts, using scaling timeouts",
+                num_suites=num_scaling_suites, min_samples=timeout_model.MIN_SAMPLES)
+
     def _get_hook_config(self, hook_name: str) -> Optional[Dict[str, Any]]:
         """
         Get the configuration for the given hook.
@@ -950,16 +1272,12 @@ class GenerateSubSuites(object):
 
         return clean_every_n_cadence
 
-    def add_task_hook_overhead(self, suites: List[Suite], historic_stats: HistoricTaskData) -> None:
+    def get_task_hook_overhead_per_test(self, historic_stats: HistoricTaskData) -> float:
         """
-        Add how much overhead task-level hooks each suite should account for.
+        Get how much overhead task-level hooks add to the runtime of a suite for each test.
 
-        Certain test hooks need to be accounted for on the task level instead of the test level
-        in order to calculate accurate timeouts. So we will add details about those hooks to
-        each suite here.
-
-        :param suites: List of suites that were created.
         :param historic_stats: Historic runtime data of the suite.
+        :return: Average runtime of the task-level hooks per test.
         """
         # The CleanEveryN hook is run every 'N' tests. The runtime of the
         # hook will be associated with whichever test happens to be running, which could be
@@ -968,10 +1286,23 @@ class GenerateSubSuites(object):
         avg_clean_every_n_runtime = historic_stats.get_avg_hook_runtime(CLEAN_EVERY_N_HOOK)
         LOGGER.info("task hook overhead", cadence=clean_every_n_cadence,
                     runtime=avg_clean_every_n_runtime)
-        if avg_clean_every_n_runtime != 0:
+        return avg_clean_every_n_runtime / clean_every_n_cadence
+
+    @staticmethod
+    def add_task_hook_overhead(suites: List[Suite], overhead_per_test: float) -> None:
+        """
+        Add how much overhead task-level hooks each suite should account for.
+
+        Certain test hooks need to be accounted for on the task level instead of the test level
+        in order to calculate accurate timeouts. So we will add details about those hooks to
+        each suite here.
+
+        :param suites: List of suites that were created.
+        :param overhead_per_test: Average runtime of the task-level hooks per test.
+        """
+        if overhead_per_test != 0:
             for suite in suites:
-                n_expected_runs = suite.get_test_count() / clean_every_n_cadence
-                suite.task_overhead += n_expected_runs * avg_clean_every_n_runtime
+                suite.task_overhead += suite.get_test_count() * overhead_per_test
 
     def filter_tests(self, tests_runtimes: List[TestRuntime]) -> List[TestRuntime]:
         """
@@ -1051,18 +1382,50 @@ class GenerateSubSuites(object):
         start_date = end_date - datetime.timedelta(days=LOOKBACK_DURATION_DAYS)
         return self.calculate_suites(start_date, end_date)
 
-    def run(self):
-        """Generate resmoke suites that run within a target execution time and write to disk."""
+    def format_dry_run_report(self, suites: List[Suite]) -> str:
+        """
+        Describe the sub-suites that would be generated and why.
+
+        :param suites: Sub-suites that would be generated.
+        :return: Report of the sub-suites.
+        """
+        lines = [
+            f"{self.config_options.task}: {len(suites)} sub-suites "
+            f"({self.config_options.suite_packing} packing)"
+        ]
+        if self.cost_model_result:
+            lines.append(self.cost_model_result.format_report())
+        for suite in suites:
+            lines.append(f"{suite.name}: {suite.get_test_count()} tests, "
+                         f"{(suite.get_runtime() + suite.task_overhead) / 60:.1f}m of tests")
+        return "\n".join(lines)
+
+    def run(self, dry_run: bool = False):
+        """
+        Generate resmoke suites that run within a target execution time and write to disk.
+
+        :param dry_run: Only report the sub-suites that would be generated, without writing them.
+        """
         LOGGER.debug("config options", config_options=self.config_options)
-        if not should_tasks_be_generated(self.evergreen_api, self.config_options.task_id):
+        if not dry_run and not should_tasks_be_generated(self.evergreen_api,
+                                                         self.config_options.task_id):
             LOGGER.info("Not generating configuration due to previous successful generation.")
             return
 
         suites = self.get_suites()
         LOGGER.debug("Creating suites", num_suites=len(suites), task=self.config_options.task,
                      dir=self.config_options.generated_config_dir)
+        if dry_run:
+            print(self.format_dry_run_report(suites))
+            return
 
         config_dict_of_suites = self.generate_suites_config(suites)
+        if self.config_options.order_tests_by_failure_rate:
+            # The file is written even without any history so the --testOrderFile argument of the
+            # generated tasks always refers to an existing file.
+            config_dict_of_suites[self.config_options.failure_rates_filename] = json.dumps(
+                {info.test_name: info.failure_rate
+                 for info in self.failure_rates}, indent=4)
 
         shrub_config = ShrubProject.empty()
         shrub_config.add_build_variant(self.generate_task_config(suites))
@@ -1088,7 +1451,9 @@ def filter_specified_tests(specified_tests: Set[str], tests_runtimes: List[TestR
 @click.option("--evergreen-config", type=str, default=EVG_CONFIG_FILE,
               help="Location of evergreen configuration file.")
 @click.option("--verbose", is_flag=True, default=False, help="Enable verbose logging.")
-def main(expansion_file, evergreen_config, verbose):
+@click.option("--dry-run", is_flag=True, default=False,
+              help="Report the sub-suites that would be generated without writing them.")
+def main(expansion_file, evergreen_config, verbose, dry_run):
     """
     Create a configuration for generate tasks to create sub suites for the specified resmoke suite.
 
@@ -1097,6 +1462,7 @@ def main(expansion_file, evergreen_config, verbose):
     :param expansion_file: Configuration file.
     :param evergreen_config: Evergreen configuration file.
     :param verbose: Use verbose logging.
+    :param dry_run: Report the sub-suites that would be generated without writing them.
     """
     enable_logging(verbose)
     evg_api = RetryingEvergreenApi.get_api(config_file=evergreen_config)
@@ -1104,7 +1470,7 @@ def main(expansion_file, evergreen_config, verbose):
     config_options = ConfigOptions.from_file(expansion_file, REQUIRED_CONFIG_KEYS,
                                              DEFAULT_CONFIG_VALUES, CONFIG_FORMAT_FN)
 
-    GenerateSubSuites(evg_api, config_options, generate_config).run()
+    GenerateSubSuites(evg_api, config_options, generate_config).run(dry_run)
 
 
 if __name__ == "__main__":
@@ -1,7 +1,8 @@
 """Tools for detecting changes in a commit."""
 import os
+import re
 from itertools import chain
-from typing import Any, Dict, Iterable, Set, Optional, List
+from typing import Any, Dict, Iterable, Iterator, Set, Optional, List, Tuple
 
 import structlog
 from evergreen import EvergreenApi
@@ -10,6 +11,10 @@ from git import DiffIndex, Repo
 LOGGER = structlog.get_logger(__name__)
 
 RevisionMap = Dict[str, str]
+# Lines changed in each file, None if the whole file changed.
+ChangedLines = Dict[str, Optional[Set[int]]]
+
+HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
 
 
 def _get_id_from_repo(repo: Repo) -> str:
@@ -134,3 +139,101 @@ def find_changed_files_in_repos(repos: Iterable[Repo],
     :return: Set of changed files.
     """
     return set(chain.from_iterable([find_changed_files(repo, revision_map) for repo in repos]))
+
+
+def _parse_changed_lines(diff_output: str) -> ChangedLines:
+    """
+    Get the lines of each file changed in the given diff, which must have no context lines.
+
+    The lines around removed lines are counted as changed. Deleted files count as changed as a
+    whole.
+
+    :param diff_output: Output of `git diff -U0`.
+    :return: Changed lines of each file, relative to the root of the repository.
+    """
+    changed_lines = {}
+    old_path = None
+    lines = None
+    for line in diff_output.splitlines():
+        if line.startswith("--- "):
+            old_path = line[len("--- a/"):] if line.startswith("--- a/") else None
+        elif line.startswith("+++ "):
+            if line.startswith("+++ b/"):
+                lines = changed_lines.setdefault(line[len("+++ b/"):], set())
+            else:
+                changed_lines[old_path] = None
+                lines = None
+        elif lines is not None:
+            match = HUNK_HEADER.match(line)
+            if match:
+                start = int(match.group(1))
+                count = int(match.group(2)) if match.group(2) is not None else 1
+                if count:
+                    lines.update(range(start, start + count))
+                else:
+                    lines.update({max(start, 1), start + 1})
+    return changed_lines
+
+
+def find_changed_lines(repo: Repo, revision_map: Optional[RevisionMap] = None) -> ChangedLines:
+    """
+    Find the lines that were changed in the repository since the base commit.
+
+    :param repo: Git repository.
+    :param revision_map: Map of revisions to compare against for repos.
+    :return: Changed lines of each file, None for untracked or deleted files.
+    """
+    if not revision_map:
+        revision_map = {}
+    base = revision_map.get(repo.git_dir, repo.head.commit.hexsha)
+    diff_output = repo.git.diff("-U0", "--no-color", "--no-ext-diff", base)
+    changed_lines = _parse_changed_lines(diff_output)
+    for path in repo.untracked_files:
+        changed_lines[path] = None
+
+    return {
+        os.path.relpath(f"{repo.working_dir}/{os.path.normpath(path)}", os.getcwd()): lines
+        for (path, lines) in changed_lines.items()
+    }
+
+
+def find_changed_lines_in_repos(repos: Iterable[Repo],
+                                revision_map: Optional[RevisionMap] = None) -> ChangedLines:
+    """
+    Find the changed lines of each changed file.
+
+    :param repos: List of repos containing changed files.
+    :param revision_map: Map of revisions to compare against for repos.
+    :return: Changed lines of each file, None for untracked or deleted files.
+    """
+    changed_lines = {}
+    for repo in repos:
+        changed_lines.update(find_changed_lines(repo, revision_map))
+    return changed_lines
+
+
+def iter_commit_changes(repo: Repo, since_revision: Optional[str] = None, until: str = "HEAD",
+                        max_count: Optional[int] = None) -> Iterator[Tuple[str, List[str]]]:
+    """
+    Iterate over the files changed by each commit in the history of a repository, oldest first.
+
+    The whole range is read with a single `git log`, instead of diffing each commit on its own.
+    Merge commits are skipped.
+
+    :param repo: Git repository.
+    :param since_revision: Revision to start after, from the start of the history if not given.
+    :param until: Revision to stop at.
+    :param max_count: Only iterate over this many of the latest commits of the range.
+    :return: Iterator of the hash of each commit and the files it changed.
+    """
+    rev_range = f"{since_revision}..{until}" if since_revision else until
+    args = ["--no-merges", "--reverse", "--name-only", "--format=%x00%H"]
+    if max_count:
+        args.append(f"--max-count={max_count}")
+    output = repo.git.log(*args, rev_range)
+    for entry in output.split("\0")[1:]:
+        lines = [line for line in entry.splitlines() if line]
+        yield (lines[0], [
+            os.path.relpath(f"{repo.working_dir}/{os.path.normpath(path)}", os.getcwd())
+            for path in lines[1:]
+        ])
@@ -0,0 +1,233 @@
+"""Local index of the tests and tasks related to source files, mined from the history of a repo.
+
+A test is related to a source file when commits that change the source file also change the test,
+or when the test fails on such commits. The score of the relation is the weight of these commits
+over the number of commits that change the source file, so a threshold query returns the same kind
+of test and task mappings as the selected-tests service, without the service.
+
+The index stores each file and task name once and the relations of each source file as pairs of
+ids and weights. It remembers the last commit indexed, so updating it only reads the new commits.
+"""
+import gzip
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import structlog
+from git import Repo
+
+from buildscripts.patch_builds.change_data import iter_commit_changes
+
+LOGGER = structlog.get_logger(__name__)
+
+INDEX_VERSION = 1
+# Commits changing more files than this are mass changes (reformatting, renames) that would
+# relate every file to every test they touch, so they are not indexed.
+MAX_FILES_PER_COMMIT = 200
+# Weight of a test or task failing on a commit that changed a source file, compared to a test
+# changing along with the source file.
+FAILURE_WEIGHT = 2
+
+# Tests and tasks that failed on a commit.
+Failures = Tuple[Iterable[str], Iterable[str]]
+
+
+def is_test_file(file_path: str) -> bool:
+    """
+    Check if the given path is a jstest, whether or not it still exists.
+
+    :param file_path: Path to file.
+    :return: True if the path is a jstest.
+    """
+    return os.path.splitext(file_path)[1] == ".js" and "jstests" in file_path
+
+
+class CoChangeIndex(object):  # pylint: disable=too-many-instance-attributes
+    """Index of the tests and tasks related to each source file."""
+
+    def __init__(self):
+        """Create an empty index."""
+        self.last_revision = None
+        self._files = []
+        self._file_ids = {}
+        self._tasks = []
+        self._task_ids = {}
+        self._source_changes = {}
+        self._test_weights = {}
+        self._task_weights = {}
+
+    @staticmethod
+    def _intern(name: str, names: List[str], ids: Dict[str, int]) -> int:
+        """Get the id of the given name, adding it to the names if needed."""
+        name_id = ids.get(name)
+        if name_id is None:
+            name_id = len(names)
+            names.append(name)
+            ids[name] = name_id
+        return name_id
+
+    def add_commit(self, changed_files: List[str], failed_tests: Iterable[str] = (),
+                   failed_tasks: Iterable[str] = ()) -> bool:
+        """
+        Add the changes and failures of a commit to the index.
+
+        :param changed_files: Files changed by the commit.
+        :param failed_tests: Tests that failed on the commit.
+        :param failed_tasks: Tasks that failed on the commit.
+        :return: True if the commit was indexed, False if it changed too many files.
+        """
+        if len(changed_files) > MAX_FILES_PER_COMMIT:
+            return False
+
+        sources = {self._intern(path, self._files, self._file_ids) for path in changed_files}
+        tests = {file_id: 1 for file_id in sources if is_test_file(self._files[file_id])}
+        for test in failed_tests:
+            test_id = self._intern(test, self._files, self._file_ids)
+            tests[test_id] = tests.get(test_id, 0) + FAILURE_WEIGHT
+        tasks = {self._intern(task, self._tasks, self._task_ids) for task in failed_tasks}
+
+        for source_id in sources:
+            self._source_changes[source_id] = self._source_changes.get(source_id, 0) + 1
+            test_weights = self._test_weights.setdefault(source_id, {})
+            for (test_id, weight) in tests.items():
+                if test_id != source_id:
+                    test_weights[test_id] = test_weights.get(test_id, 0) + weight
+            task_weights = self._task_weights.setdefault(source_id, {})
+            for task_id in tasks:
+                task_weights[task_id] = task_weights.get(task_id, 0) + FAILURE_WEIGHT
+        return True
+
+    def update(self, repo: Repo, until: str = "HEAD", max_commits: Optional[int] = None,
+               get_failures: Optional[Callable[[str], Failures]] = None) -> int:
+        """
+        Add the commits made since the last indexed commit to the index.
+
+        :param repo: Git repository to index.
+        :param until: Revision to index up to.
+        :param max_commits: Only index this many of the latest commits.
+        :param get_failures: Function returning the tests and tasks that failed on a commit.
+        :return: Number of commits indexed.
+        """
+        if self.last_revision and not repo.is_ancestor(self.last_revision, until):
+            raise ValueError(f"Indexed commit {self.last_revision} is not an ancestor of "
+                             f"{until}, the index needs to be rebuilt")
+
+        num_commits = 0
+        for (revision, changed_files) in iter_commit_changes(repo, self.last_revision, until,
+                                                             max_commits):
+            (failed_tests, failed_tasks) = get_failures(revision) if get_failures else ((), ())
+            if self.add_commit(changed_files, failed_tests, failed_tasks):
+                num_commits += 1
+            self.last_revision = revision
+        LOGGER.info("Updated co-change index", num_commits=num_commits,
+                    last_revision=self.last_revision)
+        return num_commits
+
+    def _get_mappings(  # pylint: disable=too-many-arguments
+            self, threshold: float, changed_files: Iterable[str],
+            weights: Dict[int, Dict[int, int]], names: List[str], key: str) -> List[Dict[str, Any]]:
+        """Get the names related to each changed file with a score of at least the threshold."""
+        mappings = []
+        for changed_file in sorted(changed_files):
+            source_id = self._file_ids.get(changed_file)
+            if source_id not in self._source_changes:
+                continue
+            changes = self._source_changes[source_id]
+            related = []
+            for (name_id, weight) in weights.get(source_id, {}).items():
+                score = min(1.0, weight / changes)
+                if score >= threshold:
+                    related.append({"name": names[name_id], "score": score})
+            if related:
+                related.sort(key=lambda relation: (-relation["score"], relation["name"]))
+                mappings.append({"source_file": changed_file, key: related})
+        return mappings
+
+    def get_test_mappings(self, threshold: float, changed_files: Iterable[str]) -> List[Dict]:
+        """
+        Get the tests related to the given changed files.
+
+        :param threshold: Lowest score of the relations to return.
+        :param changed_files: Set of changed_files.
+        :return: Related test files of each changed file, in the selected-tests service format.
+        """
+        return self._get_mappings(threshold, changed_files, self._test_weights, self._files,
+                                  "test_files")
+
+    def get_task_mappings(self, threshold: float, changed_files: Iterable[str]) -> List[Dict]:
+        """
+        Get the tasks related to the given changed files.
+
+        :param threshold: Lowest score of the relations to return.
+        :param changed_files: Set of changed_files.
+        :return: Related tasks of each changed file, in the selected-tests service format.
+        """
+        return self._get_mappings(threshold, changed_files, self._task_weights, self._tasks,
+                                  "tasks")
+
+    def to_json(self) -> Dict[str, Any]:
+        """Get the compact representation of the index."""
+        sources = []
+        for (source_id, changes) in self._source_changes.items():
+            tests = [
+                value for pair in self._test_weights.get(source_id, {}).items() for value in pair
+            ]
+            tasks = [
+                value for pair in self._task_weights.get(source_id, {}).items() for value in pair
+            ]
+            sources.append([source_id, changes, tests, tasks])
+        return {
+            "version": INDEX_VERSION,
+            "last_revision": self.last_revision,
+            "files": self._files,
+            "tasks": self._tasks,
+            "sources": sources,
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "CoChangeIndex":
+        """
+        Create an index from its compact representation.
+
+        :param data: Compact representation of the index.
+        :return: Index.
+        """
+        # pylint: disable=protected-access
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported co-change index version: {data.get('version')}")
+
+        index = cls()
+        index.last_revision = data["last_revision"]
+        index._files = data["files"]
+        index._file_ids = {name: name_id for (name_id, name) in enumerate(index._files)}
+        index._tasks = data["tasks"]
+        index._task_ids = {name: name_id for (name_id, name) in enumerate(index._tasks)}
+        for (source_id, changes, tests, tasks) in data["sources"]:
+            index._source_changes[source_id] = changes
+            index._test_weights[source_id] = dict(zip(tests[::2], tests[1::2]))
+            index._task_weights[source_id] = dict(zip(tasks[::2], tasks[1::2]))
+        return index
+
+    @classmethod
+    def from_file(cls, filename: str) -> "CoChangeIndex":
+        """
+        Read an index from the given file.
+
+        :param filename: Gzipped JSON file to read the index from.
+        :return: Index read from file.
+        """
+        with gzip.open(filename, "rt") as fh:
+            return cls.from_json(json.load(fh))
+
+    def write(self, filename: str) -> None:
+        """
+        Write the index to the given file.
+
+        The index is written to a temporary file first, so readers never see a partial index.
+
+        :param filename: Gzipped JSON file to write the index to.
+        """
+        tmp_filename = f"{filename}.{os.getpid()}.tmp"
+        with gzip.open(tmp_filename, "wt") as fh:
+            json.dump(self.to_json(), fh, separators=(",", ":"))
+        os.replace(tmp_filename, filename)
@@ -0,0 +1,254 @@
+"""Index of the jstests covering each function of the source files, from per-test coverage.
+
+The index is built once from an lcov tracefile of each test, captured from a coverage-instrumented
+build by record_test_coverage.py. Each source file is divided into regions starting at the first
+line of each of its functions, plus a region for the lines before the first function, and the
+index keeps the tests that ran each region. A changed line belongs to the region it is in, so the
+tests exercising a patch are the tests covering the regions of its changed lines.
+
+Since a region runs until the next function starts, lines between functions count as part of the
+function before them.
+"""
+import bisect
+import gzip
+import json
+import os
+from typing import Any, Dict, IO, Iterable, List, Optional, Set, Tuple
+
+from buildscripts.patch_builds.change_data import ChangedLines
+
+INDEX_VERSION = 1
+# Lowest cost of a test, so tests without runtimes don't get infinite scores.
+MIN_TEST_COST = 0.001
+
+# First line and covered state of each function of a source file, and covered lines before the
+# first function.
+FileCoverage = Tuple[Dict[str, Tuple[int, bool]], Set[int]]
+
+
+def parse_tracefile(fh: IO[str], source_root: str) -> Dict[str, FileCoverage]:
+    """
+    Read the coverage of each source file from an lcov tracefile.
+
+    :param fh: Tracefile to read.
+    :param source_root: Directory the paths of the index are relative to, files outside of it are
+        skipped.
+    :return: Coverage of each source file, by path relative to the source root.
+    """
+    coverage = {}
+    path = None
+    functions = {}
+    lines = set()
+    for line in fh:
+        (key, _, value) = line.rstrip("\n").partition(":")
+        if key == "SF":
+            path = os.path.relpath(value, source_root)
+            functions = {}
+            lines = set()
+        elif key == "FN":
+            (start, name) = value.split(",", 1)
+            functions[name] = (int(start), False)
+        elif key == "FNDA":
+            (count, name) = value.split(",", 1)
+            if int(count) > 0 and name in functions:
+                functions[name] = (functions[name][0], True)
+        elif key == "DA":
+            (line_number, count) = value.split(",")[:2]
+            if int(count) > 0:
+                lines.add(int(line_number))
+        elif key == "end_of_record":
+            if path is not None and not path.startswith(os.pardir):
+                coverage[path] = (functions, lines)
+            path = None
+    return coverage
+
+
+class _FileRegions(object):
+    """Tests covering each region of a source file."""
+
+    def __init__(self):
+        """Create a source file without regions."""
+        self.starts = [0]
+        self.names = [[]]
+        self.tests = [set()]
+
+    def _get_region(self, start: int) -> int:
+        """Get the index of the region starting at the given line, adding it if needed."""
+        idx = bisect.bisect_left(self.starts, start)
+        if idx == len(self.starts) or self.starts[idx] != start:
+            self.starts.insert(idx, start)
+            self.names.insert(idx, [])
+            self.tests.insert(idx, set())
+        return idx
+
+    def add_coverage(self, test_id: int, coverage: FileCoverage) -> None:
+        """Add the coverage of a test to the regions of the file."""
+        (functions, lines) = coverage
+        for (name, (start, covered)) in functions.items():
+            idx = self._get_region(start)
+            if name not in self.names[idx]:
+                self.names[idx].append(name)
+            if covered:
+                self.tests[idx].add(test_id)
+        first_function = min((start for (start, _) in functions.values()), default=None)
+        if any(first_function is None or line < first_function for line in lines):
+            self.tests[0].add(test_id)
+
+    def get_region(self, line: int) -> int:
+        """Get the index of the region the given line is in."""
+        return bisect.bisect_right(self.starts, line) - 1
+
+
+class CoverageIndex(object):
+    """Index of the tests covering each region of each source file."""
+
+    def __init__(self):
+        """Create an empty index."""
+        self._tests = []
+        self._files = {}
+
+    def add_test(self, test: str, coverage: Dict[str, FileCoverage]) -> None:
+        """
+        Add the coverage of a test to the index.
+
+        :param test: Test the coverage was captured from.
+        :param coverage: Coverage of each source file.
+        """
+        test_id = len(self._tests)
+        self._tests.append(test)
+        for (path, file_coverage) in coverage.items():
+            self._files.setdefault(path, _FileRegions()).add_coverage(test_id, file_coverage)
+
+    def get_covering_tests(self, path: str, line: Optional[int] = None) -> List[str]:
+        """
+        Get the tests covering the function of the given line, or any line of the given file.
+
+        :param path: Source file.
+        :param line: Line of the source file.
+        :return: Tests covering the line.
+        """
+        regions = self._files.get(path)
+        if regions is None:
+            return []
+        if line is None:
+            test_ids = set().union(*regions.tests)
+        else:
+            test_ids = regions.tests[regions.get_region(line)]
+        return sorted(self._tests[test_id] for test_id in test_ids)
+
+    def _get_changed_regions(self, changed_lines: ChangedLines) -> Dict[Tuple[str, int], Set[int]]:
+        """Get the tests covering each region with changed lines that any test covers."""
+        changed_regions = {}
+        for (path, lines) in changed_lines.items():
+            regions = self._files.get(path)
+            if regions is None:
+                continue
+            if lines is None:
+                indexes = range(len(regions.starts))
+            else:
+                indexes = {regions.get_region(line) for line in lines}
+            for idx in indexes:
+                if regions.tests[idx]:
+                    changed_regions[(path, idx)] = regions.tests[idx]
+        return changed_regions
+
+    def select_tests(self, changed_lines: ChangedLines,
+                     test_costs: Optional[Dict[str, float]] = None) -> List[str]:
+        """
+        Select a small set of tests that covers every changed region that any test covers.
+
+        Picking the smallest such set is the set cover problem, so tests are picked greedily by
+        the number of regions they cover that aren't covered yet for their cost.
+
+        :param changed_lines: Changed lines of each file, None if the whole file changed.
+        :param test_costs: Cost of running each test, such as its runtime, 1 if not given.
+        :return: Selected tests.
+        """
+        if test_costs is None:
+            test_costs = {}
+        uncovered = self._get_changed_regions(changed_lines)
+        regions_by_test = {}
+        for (region, test_ids) in uncovered.items():
+            for test_id in test_ids:
+                regions_by_test.setdefault(test_id, set()).add(region)
+
+        def score(test_id):
+            cost = max(test_costs.get(self._tests[test_id], 1.0), MIN_TEST_COST)
+            return (len(regions_by_test[test_id]) / cost, -test_id)
+
+        selected = []
+        while uncovered:
+            best = max(regions_by_test, key=score)
+            selected.append(self._tests[best])
+            for region in regions_by_test.pop(best):
+                for test_id in uncovered.pop(region):
+                    if test_id != best:
+                        regions_by_test[test_id].discard(region)
+        return sorted(selected)
+
+    def to_json(self) -> Dict[str, Any]:
+        """Get the compact representation of the index."""
+        files = {}
+        for (path, regions) in self._files.items():
+            file_regions = zip(regions.starts, regions.names, regions.tests)
+            files[path] = [[start, names, sorted(tests)] for (start, names, tests) in file_regions]
+        return {"version": INDEX_VERSION, "tests": self._tests, "files": files}
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "CoverageIndex":
+        """
+        Create an index from its compact representation.
+
+        :param data: Compact representation of the index.
+        :return: Index.
+        """
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported coverage index version: {data.get('version')}")
+
+        index = cls()
+        index._tests = data["tests"]  # pylint: disable=protected-access
+        for (path, file_regions) in data["files"].items():
+            regions = _FileRegions()
+            regions.starts = [start for (start, _, _) in file_regions]
+            regions.names = [names for (_, names, _) in file_regions]
+            regions.tests = [set(tests) for (_, _, tests) in file_regions]
+            index._files[path] = regions  # pylint: disable=protected-access
+        return index
+
+    @classmethod
+    def from_file(cls, filename: str) -> "CoverageIndex":
+        """
+        Read an index from the given file.
+
+        :param filename: Gzipped JSON file to read the index from.
+        :return: Index read from file.
+        """
+        with gzip.open(filename, "rt") as fh:
+            return cls.from_json(json.load(fh))
+
+    @classmethod
+    def from_tracefiles(cls, tracefiles: Iterable[Tuple[str, str]],
+                        source_root: str) -> "CoverageIndex":
+        """
+        Create an index from the tracefile of each test.
+
+        :param tracefiles: Each test and the path of its tracefile.
+        :param source_root: Directory the paths of the index are relative to.
+        :return: Index.
+        """
+        index = cls()
+        for (test, tracefile) in tracefiles:
+            with open(tracefile) as fh:
+                index.add_test(test, parse_tracefile(fh, source_root))
+        return index
+
+    def write(self, filename: str) -> None:
+        """
+        Write the index to the given file.
+
+        :param filename: Gzipped JSON file to write the index to.
+        """
+        tmp_filename = f"{filename}.{os.getpid()}.tmp"
+        with gzip.open(tmp_filename, "wt") as fh:
+            json.dump(self.to_json(), fh, separators=(",", ":"))
+        os.replace(tmp_filename, filename)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Record the coverage of each test of a suite and build the coverage index of selected_tests.py.
+
+Runs each test on its own against a build compiled with --gcov, capturing its coverage into an
+lcov tracefile, then inverts the tracefiles into an index of the tests covering each function of
+the source files. This takes a run of the whole suite per test, so it is meant to be run once per
+build, and it picks up where it left off when it is run again with the same output directory.
+"""
+import json
+import logging
+import os
+import subprocess
+import sys
+from typing import List, Optional, Tuple
+
+import click
+import structlog
+from structlog.stdlib import LoggerFactory
+
+# Get relative imports to work when the package is not installed on the PYTHONPATH.
+if __name__ == "__main__" and __package__ is None:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+import buildscripts.resmokelib.parser
+import buildscripts.resmokelib.suitesconfig as suitesconfig
+from buildscripts.patch_builds.coverage_index import CoverageIndex
+# pylint: enable=wrong-import-position
+
+structlog.configure(logger_factory=LoggerFactory())
+LOGGER = structlog.getLogger(__name__)
+
+MANIFEST_FILE = "tracefiles.json"
+DEFAULT_GCOV_DIR = "build"
+
+
+def read_manifest(output_dir: str) -> List[Tuple[str, str]]:
+    """Read the tests recorded so far and their tracefiles."""
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path) as fh:
+        return [tuple(entry) for entry in json.load(fh)]
+
+
+def write_manifest(output_dir: str, tracefiles: List[Tuple[str, str]]) -> None:
+    """Write the tests recorded so far and their tracefiles."""
+    with open(os.path.join(output_dir, MANIFEST_FILE), "w") as fh:
+        json.dump(tracefiles, fh, indent=4)
+
+
+def record_test(test: str, suite: str, tracefile: str, gcov_dir: str,
+                resmoke_args: List[str]) -> Optional[str]:
+    """
+    Run a test and capture its coverage.
+
+    :param test: Test to run.
+    :param suite: Suite to run the test with.
+    :param tracefile: Tracefile to capture the coverage into.
+    :param gcov_dir: Directory of the coverage data of the build.
+    :param resmoke_args: Additional arguments to resmoke.py.
+    :return: The tracefile, or None if no coverage was captured.
+    """
+    subprocess.check_call(["lcov", "--zerocounters", "--quiet", "--directory", gcov_dir])
+    cmd = [sys.executable, "buildscripts/resmoke.py", "run", f"--suites={suite}"]
+    returncode = subprocess.call(cmd + resmoke_args + [test])
+    if returncode != 0:
+        # The test may have failed after running most of what it covers, so its coverage counts.
+        LOGGER.warning("Test failed", test=test, returncode=returncode)
+
+    returncode = subprocess.call(
+        ["lcov", "--capture", "--quiet", "--directory", gcov_dir, "--output-file", tracefile])
+    if returncode != 0:
+        LOGGER.warning("No coverage captured", test=test)
+        return None
+    return tracefile
+
+
+@click.command()
+@click.option("--suite", type=str, required=True, help="Resmoke suite to run the tests with.")
+@click.option("--test", "tests", type=str, multiple=True,
+              help="Test to record, all tests of the suite if not given.")
+@click.option("--output-dir", type=str, required=True,
+              help="Directory to write the tracefiles of the tests to.")
+@click.option("--index-file", type=str, required=True, metavar="FILE",
+              help="Coverage index to write.")
+@click.option("--gcov-dir", type=str, default=DEFAULT_GCOV_DIR,
+              help="Directory of the coverage data of the build.")
+@click.option("--source-root", type=str, default=".",
+              help="Directory the paths of the source files are relative to.")
+@click.option("--resmoke-arg", "resmoke_args", type=str, multiple=True,
+              help="Additional argument to resmoke.py, can be given several times.")
+def main(  # pylint: disable=too-many-arguments
+        suite, tests, output_dir, index_file, gcov_dir, source_root, resmoke_args):
+    """
+    Record the coverage of each test of a suite and build the coverage index of selected_tests.py.
+
+    The build must have been compiled with --gcov.
+    """
+    logging.basicConfig(format="[%(asctime)s - %(name)s - %(levelname)s] %(message)s",
+                        level=logging.INFO, stream=sys.stdout)
+    buildscripts.resmokelib.parser.set_run_options()
+    if not tests:
+        tests = suitesconfig.get_suite(suite).tests
+
+    os.makedirs(output_dir, exist_ok=True)
+    tracefiles = read_manifest(output_dir)
+    recorded = {test for (test, _) in tracefiles}
+    for test in tests:
+        if test in recorded:
+            continue
+        tracefile = record_test(test, suite, os.path.join(output_dir, f"{len(tracefiles)}.info"),
+                                gcov_dir, list(resmoke_args))
+        if tracefile:
+            tracefiles.append((test, tracefile))
+            write_manifest(output_dir, tracefiles)
+
+    CoverageIndex.from_tracefiles(tracefiles, os.path.abspath(source_root)).write(index_file)
+    LOGGER.info("Wrote coverage index", index_file=index_file, num_tests=len(tracefiles))
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
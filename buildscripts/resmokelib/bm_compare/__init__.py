@@ -0,0 +1,3 @@
+"""Benchmark comparison module."""
+
+from buildscripts.resmokelib.bm_compare.bm_compare import BmComparePlugin
@@ -0,0 +1,230 @@
+"""Compare benchmark results offline to find regressions before pushing.
+
+Takes a baseline and one or more candidates, each of which is either a perf plugin report, as
+written to the --perfReportFile by the CombineBenchmarkResults hook, or the JSON report of a Google
+Benchmark executable. The benchmarks are aligned by their base name and thread count and each
+candidate is compared against the baseline.
+"""
+
+import json
+import sys
+
+from buildscripts.resmokelib.plugin import PluginInterface, Subcommand
+from buildscripts.resmokelib.testing.hooks import combine_benchmark_results as cbr
+from buildscripts.resmokelib.utils import stats
+
+SUBCOMMAND = "bm-compare"
+
+# Google Benchmark reports are converted the same way the CombineBenchmarkResults hook does.
+_BenchmarkThreadsReport = cbr._BenchmarkThreadsReport  # pylint: disable=protected-access
+
+# The status of each benchmark in the comparison.
+REGRESSION = "regression"
+IMPROVEMENT = "improvement"
+UNCHANGED = "unchanged"
+ADDED = "added"
+REMOVED = "removed"
+
+_TABLE_COLUMNS = ["benchmark", "threads", "baseline", "candidate", "speedup", "noise", "status"]
+
+
+def load_results(path):
+    """Return the ops_per_sec values of each (base name, thread count) in the report at 'path'.
+
+    The report is either a perf plugin report or a Google Benchmark report.
+    """
+    with open(path, "r") as fh:
+        report = json.load(fh)
+
+    if "benchmarks" in report:
+        return _results_from_benchmark_report(report)
+
+    results = {}
+    for result in report["results"]:
+        for (thread_count, thread_report) in result["results"].items():
+            results[(result["name"], str(thread_count))] = thread_report["ops_per_sec_values"]
+    return results
+
+
+def _results_from_benchmark_report(report):
+    """Return the ops_per_sec values of each (base name, thread count) in a Benchmark report."""
+    threads_reports = {}
+    for benchmark_res in report["benchmarks"]:
+        bm_name_obj = _BenchmarkThreadsReport.parse_bm_name(benchmark_res["name"])
+        if bm_name_obj.statistic_type is not None:
+            continue
+
+        if bm_name_obj.base_name not in threads_reports:
+            threads_reports[bm_name_obj.base_name] = _BenchmarkThreadsReport(report["context"])
+        threads_reports[bm_name_obj.base_name].add_report(bm_name_obj, benchmark_res)
+
+    results = {}
+    for (base_name, threads_report) in threads_reports.items():
+        for (thread_count, thread_report) in threads_report.generate_perf_plugin_dict().items():
+            results[(base_name, thread_count)] = thread_report["ops_per_sec_values"]
+    return results
+
+
+def _speedup(baseline_value, value):
+    """Return how many times faster 'value' is than 'baseline_value', or None if unknown.
+
+    The values are ops_per_sec values: either throughputs, or latencies negated so that higher is
+    better, as the CombineBenchmarkResults hook reports them.
+    """
+    if baseline_value > 0 and value > 0:
+        return value / baseline_value
+    if baseline_value < 0 and value < 0:
+        return baseline_value / value
+    return None
+
+
+def _noise(values):
+    """Return the interquartile range of 'values' relative to their median."""
+    summary = stats.summarize(values)
+    if summary["median"] == 0:
+        return 0.0
+    return summary["iqr"] / abs(summary["median"])
+
+
+def compare(baseline_results, results, threshold):
+    """Return a row for each benchmark of either 'baseline_results' or 'results'.
+
+    A benchmark regressed or improved if its mean changed by more than both 'threshold' and the
+    noise of the repetitions on either side, and the change is statistically significant when there
+    are enough repetitions to tell.
+    """
+    rows = []
+    for key in sorted(set(baseline_results) | set(results)):
+        (name, thread_count) = key
+        row = {
+            "benchmark": name, "threads": thread_count, "baseline": None, "candidate": None,
+            "speedup": None, "noise": None
+        }
+        rows.append(row)
+
+        baseline_values = baseline_results.get(key)
+        values = results.get(key)
+        if baseline_values is not None:
+            row["baseline"] = sum(baseline_values) / len(baseline_values)
+        if values is not None:
+            row["candidate"] = sum(values) / len(values)
+
+        if values is None:
+            row["status"] = REMOVED
+            continue
+        if baseline_values is None:
+            row["status"] = ADDED
+            continue
+
+        row["speedup"] = _speedup(row["baseline"], row["candidate"])
+        row["noise"] = max(_noise(baseline_values), _noise(values))
+
+        row["status"] = UNCHANGED
+        if row["speedup"] is None or abs(row["speedup"] - 1) <= max(threshold, row["noise"]):
+            continue
+        if len(baseline_values) > 1 and len(values) > 1 and \
+                not stats.is_significant_change(baseline_values, values):
+            continue
+        row["status"] = IMPROVEMENT if row["speedup"] > 1 else REGRESSION
+
+    return rows
+
+
+def _format_cell(column, value):
+    """Return the text of a cell of the regression table."""
+    if value is None:
+        return "-"
+    if column in ("baseline", "candidate"):
+        return "{:.6g}".format(value)
+    if column == "speedup":
+        return "{:.3f}x".format(value)
+    if column == "noise":
+        return "{:.1%}".format(value)
+    return str(value)
+
+
+def format_table(rows, show_all=False):
+    """Return the regression table of 'rows', only listing the changes unless 'show_all'."""
+    if not show_all:
+        rows = [row for row in rows if row["status"] != UNCHANGED]
+
+    cells = [_TABLE_COLUMNS]
+    cells.extend([_format_cell(column, row[column]) for column in _TABLE_COLUMNS] for row in rows)
+    widths = [max(len(row_cells[i]) for row_cells in cells) for i in range(len(_TABLE_COLUMNS))]
+
+    lines = []
+    for row_cells in cells:
+        lines.append("  ".join(
+            cell.ljust(width) if i == 0 else cell.rjust(width)
+            for (i, (cell, width)) in enumerate(zip(row_cells, widths))).rstrip())
+    lines.insert(1, "-" * len(lines[0]))
+    return "\n".join(lines)
+
+
+class BmCompare(Subcommand):
+    """Compare benchmark results."""
+
+    def __init__(self, options):
+        """Initialize BmCompare."""
+        self.baseline_file = options.reports[0]
+        self.candidate_files = options.reports[1:]
+        self.threshold = options.threshold
+        self.show_all = options.show_all
+        self.out_file = options.out_file
+        self.fail_on_regression = options.fail_on_regression
+
+    def execute(self):
+        """Compare each candidate against the baseline."""
+        baseline_results = load_results(self.baseline_file)
+
+        comparisons = []
+        num_regressions = 0
+        for candidate_file in self.candidate_files:
+            rows = compare(baseline_results, load_results(candidate_file), self.threshold)
+            comparisons.append(
+                {"baseline": self.baseline_file, "candidate": candidate_file, "results": rows})
+            num_regressions += sum(1 for row in rows if row["status"] == REGRESSION)
+
+            print("Comparing {} against {}:".format(candidate_file, self.baseline_file))
+            print(format_table(rows, self.show_all))
+            print()
+
+        if self.out_file is not None:
+            with open(self.out_file, "w") as fh:
+                json.dump({"threshold": self.threshold, "comparisons": comparisons}, fh, indent=2)
+
+        print("{} regression(s) found.".format(num_regressions))
+        if num_regressions and self.fail_on_regression:
+            sys.exit(1)
+
+
+class BmComparePlugin(PluginInterface):
+    """Integration point for bm-compare."""
+
+    def add_subcommand(self, subparsers):
+        """Create and add the parser for the subcommand."""
+        parser = subparsers.add_parser(SUBCOMMAND, help=__doc__)
+        parser.add_argument(
+            "reports", nargs="+", metavar="REPORT",
+            help="The baseline report followed by the reports to compare against it. Each is"
+            " either a perf plugin report or a Google Benchmark JSON report.")
+        parser.add_argument(
+            "--threshold", type=float, default=0.05,
+            help="The minimum relative change of a benchmark to report it as a regression or an"
+            " improvement, [default: %(default)s]. Changes within the interquartile range of the"
+            " repetitions relative to their median aren't reported either.")
+        parser.add_argument("--showAll", dest="show_all", action="store_true",
+                            help="List the unchanged benchmarks as well.")
+        parser.add_argument("--outFile", dest="out_file",
+                            help="Write the comparisons to this file as JSON.")
+        parser.add_argument("--failOnRegression", dest="fail_on_regression", action="store_true",
+                            help="Exit with a non-zero code if any benchmark regressed.")
+
+    def parse(self, subcommand, parser, parsed_args, **kwargs):
+        """Parse command-line options."""
+        if subcommand != SUBCOMMAND:
+            return None
+
+        if len(parsed_args.reports) < 2:
+            parser.error("bm-compare requires a baseline report and at least one other report")
+        return BmCompare(parsed_args)
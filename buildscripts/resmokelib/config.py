@@ -53,9 +53,12 @@ DEFAULTS = {
     "buildlogger_url": "https://logkeeper.mongodb.org",
     "continue_on_failure": False,
     "dbpath_prefix": None,
+    "dbpath_tmpfs": None,
     "dbtest_executable": None,
     "dry_run": None,
     "exclude_with_any_tags": None,
+    "executor_mode": "thread",
+    "fixture_log_analyzers": None,
     "flow_control": None,
     "flow_control_tickets": None,
     "fuzz_mongod_configs": False,
@@ -98,6 +101,9 @@ DEFAULTS = {
     "suite_files": "with_server",
     "tag_file": None,
     "test_files": [],
+    "test_order_file": None,
+    "tmpfs_budget_mb": None,
+    "trace_file": None,
     "transport_layer": None,
     "user_friendly_output": None,
     "mixed_bin_versions": None,
@@ -131,10 +137,13 @@ DEFAULTS = {
     "wt_index_config": None,
 
     # Benchmark options.
+    "benchmark_baseline_file": None,
+    "benchmark_cpu_affinity": None,
     "benchmark_filter": None,
     "benchmark_list_tests": None,
     "benchmark_min_time_secs": None,
     "benchmark_repetitions": None,
+    "benchmark_warmup_repetitions": 0,
 
     # Config Dir
     "config_dir": "buildscripts/resmokeconfig",
@@ -264,6 +273,10 @@ CEDAR_RPC_PORT = None
 # as well as those started by individual tests.
 DBPATH_PREFIX = None
 
+# If set, a directory on a RAM-backed filesystem, such as tmpfs, which the fixtures started by
+# resmoke.py have their dbpaths in as long as they fit within TMPFS_BUDGET_MB.
+DBPATH_TMPFS = None
+
 # The path to the dbtest executable used by resmoke.py.
 DBTEST_EXECUTABLE = None
 
@@ -310,12 +323,20 @@ EVERGREEN_VERSION_ID = None
 # If set, then any jstests that have any of the specified tags will be excluded from the suite(s).
 EXCLUDE_WITH_ANY_TAGS = None
 
+# Possible values are thread and process. If thread, each Job runs in a thread of the resmoke.py
+# process. If process, each Job runs in a process of its own forked from the resmoke.py process.
+EXECUTOR_MODE = None
+
 # A tag which is implicited excluded. This is useful for temporarily disabling a test.
 EXCLUDED_TAG = "__TEMPORARILY_DISABLED__"
 
 # If true, then a test failure or error will cause resmoke.py to exit and not run any more tests.
 FAIL_FAST = None
 
+# If set, the names of the log analyzers that aggregate the log output of the fixture processes for
+# each test. The aggregated statistics are recorded in the report.json file.
+FIXTURE_LOG_ANALYZERS = None
+
 FUZZ_MONGOD_CONFIGS = False
 CONFIG_FUZZ_SEED = None
 
@@ -464,6 +485,16 @@ TAG_FILE = None
 # The test files to execute.
 TEST_FILES = None
 
+# If set, a YAML or JSON file mapping test files to their historic failure rate. The tests of each
+# suite are run in order of decreasing failure rate so that a failing test is found early on.
+TEST_ORDER_FILE = None
+
+# The number of megabytes of DBPATH_TMPFS the fixtures may use. Defaults to half of its free space.
+TMPFS_BUDGET_MB = None
+
+# If set, then resmoke.py will write out a Chrome trace of where the time of each Job went.
+TRACE_FILE = None
+
 # If set, then mongod/mongos's started by resmoke.py will use the specified transport layer.
 TRANSPORT_LAYER = None
 
@@ -485,6 +516,17 @@ BENCHMARK_LIST_TESTS = None
 BENCHMARK_MIN_TIME = None
 BENCHMARK_REPETITIONS = None
 
+# If set, then the perf plugin report of the benchmarks is compared against this earlier perf plugin
+# report, and the statistically significant changes are flagged.
+BENCHMARK_BASELINE_FILE = None
+
+# If set, then the benchmark processes are pinned to this set of CPUs.
+BENCHMARK_CPU_AFFINITY = None
+
+# The number of repetitions of each benchmark run before the --benchmarkRepetitions repetitions
+# that are discarded from the perf plugin report.
+BENCHMARK_WARMUP_REPETITIONS = None
+
 # UndoDB options
 UNDO_RECORDER_PATH = None
 
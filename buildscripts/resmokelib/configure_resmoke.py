@@ -6,6 +6,7 @@ import datetime
 import os
 import os.path
 import distutils.spawn
+import multiprocessing
 import sys
 import platform
 import random
@@ -97,6 +98,20 @@ def _validate_config(parser):  # pylint: disable=too-many-branches
     if _config.REPEAT_TESTS > 1 and _config.REPEAT_TESTS_SECS:
         parser.error("Cannot specify --repeatTests and --repeatTestsSecs")
 
+    if _config.EXECUTOR_MODE == "process":
+        if "fork" not in multiprocessing.get_all_start_methods():
+            parser.error("--executorMode=process is only supported on platforms that can fork()")
+
+        if _config.SPAWN_USING == "jasper":
+            parser.error("Cannot use --executorMode=process with --spawnUsing=jasper")
+
+    if _config.BENCHMARK_CPU_AFFINITY is not None:
+        if not hasattr(os, "sched_setaffinity"):
+            parser.error("--benchmarkCpuAffinity is only supported on Linux")
+
+        if _config.SPAWN_USING == "jasper":
+            parser.error("Cannot use --benchmarkCpuAffinity with --spawnUsing=jasper")
+
     if _config.MIXED_BIN_VERSIONS is not None:
         for version in _config.MIXED_BIN_VERSIONS:
             if version not in set(['old', 'new']):
@@ -147,12 +162,17 @@ def _update_config_vars(values):  # pylint: disable=too-many-statements,too-many
     _config.BACKUP_ON_RESTART_DIR = config.pop("backup_on_restart_dir")
     _config.BUILDLOGGER_URL = config.pop("buildlogger_url")
     _config.DBPATH_PREFIX = _expand_user(config.pop("dbpath_prefix"))
+    _config.DBPATH_TMPFS = _expand_user(config.pop("dbpath_tmpfs"))
     _config.DRY_RUN = config.pop("dry_run")
     # EXCLUDE_WITH_ANY_TAGS will always contain the implicitly defined EXCLUDED_TAG.
     _config.EXCLUDE_WITH_ANY_TAGS = [_config.EXCLUDED_TAG]
     _config.EXCLUDE_WITH_ANY_TAGS.extend(
         utils.default_if_none(_tags_from_list(config.pop("exclude_with_any_tags")), []))
+    _config.EXECUTOR_MODE = config.pop("executor_mode")
     _config.FAIL_FAST = not config.pop("continue_on_failure")
+    _config.FIXTURE_LOG_ANALYZERS = config.pop("fixture_log_analyzers")
+    if _config.FIXTURE_LOG_ANALYZERS is not None:
+        _config.FIXTURE_LOG_ANALYZERS = _config.FIXTURE_LOG_ANALYZERS.split(",")
     _config.FLOW_CONTROL = config.pop("flow_control")
     _config.FLOW_CONTROL_TICKETS = config.pop("flow_control_tickets")
     _config.INCLUDE_WITH_ANY_TAGS = _tags_from_list(config.pop("include_with_any_tags"))
@@ -228,6 +248,11 @@ def _update_config_vars(values):  # pylint: disable=too-many-statements,too-many
     if _config.SUITE_FILES is not None:
         _config.SUITE_FILES = _config.SUITE_FILES.split(",")
     _config.TAG_FILE = config.pop("tag_file")
+    _config.TEST_ORDER_FILE = config.pop("test_order_file")
+    _config.TMPFS_BUDGET_MB = config.pop("tmpfs_budget_mb")
+    if _config.TMPFS_BUDGET_MB is not None:
+        _config.TMPFS_BUDGET_MB = int(_config.TMPFS_BUDGET_MB)
+    _config.TRACE_FILE = config.pop("trace_file")
     _config.TRANSPORT_LAYER = config.pop("transport_layer")
     _config.USER_FRIENDLY_OUTPUT = config.pop("user_friendly_output")
 
@@ -271,6 +296,9 @@ def _update_config_vars(values):  # pylint: disable=too-many-statements,too-many
     if benchmark_min_time is not None:
         _config.BENCHMARK_MIN_TIME = datetime.timedelta(seconds=benchmark_min_time)
     _config.BENCHMARK_REPETITIONS = config.pop("benchmark_repetitions")
+    _config.BENCHMARK_BASELINE_FILE = _expand_user(config.pop("benchmark_baseline_file"))
+    _config.BENCHMARK_CPU_AFFINITY = _cpus_from_list(config.pop("benchmark_cpu_affinity"))
+    _config.BENCHMARK_WARMUP_REPETITIONS = config.pop("benchmark_warmup_repetitions")
 
     # Config Dir options.
     _config.CONFIG_DIR = config.pop("config_dir")
@@ -374,6 +402,23 @@ def _expand_user(pathname):
     return os.path.expanduser(pathname)
 
 
+def _cpus_from_list(cpu_list):
+    """Return the set of CPUs from a comma separated list of CPUs and CPU ranges, e.g. "0-3,6"."""
+    if cpu_list is None:
+        return None
+
+    cpus = set()
+    for cpu_range in cpu_list.split(","):
+        (first, _, last) = cpu_range.partition("-")
+        try:
+            cpus.update(range(int(first), int(last or first) + 1))
+        except ValueError:
+            raise ValueError("Invalid CPU list '%s'" % cpu_list)
+    if not cpus:
+        raise ValueError("Invalid CPU list '%s'" % cpu_list)
+    return cpus
+
+
 def _tags_from_list(tags_list):
     """Return the list of tags from a list of tag parameter values.
 
@@ -5,6 +5,7 @@ processes are terminated.
 """
 
 import atexit
+import contextlib
 import logging
 import os
 import os.path
@@ -68,6 +69,25 @@ if sys.platform == "win32":
         atexit.register(win32api.CloseHandle, _JOB_OBJECT)
 
 
+@contextlib.contextmanager
+def _inherited_cpu_affinity(cpus):
+    """Set the CPU affinity that the processes started by the calling thread inherit.
+
+    Only the calling thread is pinned, and only until the context is exited, so the process is
+    pinned from the moment it starts without pinning the other threads of resmoke.py.
+    """
+    if cpus is None:
+        yield
+        return
+
+    previous_cpus = os.sched_getaffinity(0)
+    os.sched_setaffinity(0, cpus)
+    try:
+        yield
+    finally:
+        os.sched_setaffinity(0, previous_cpus)
+
+
 class Process(object):
     """Wrapper around subprocess.Popen class."""
 
@@ -75,8 +95,11 @@ class Process(object):
     # pylint: disable=too-many-arguments
     # pylint: disable=too-many-instance-attributes
 
-    def __init__(self, logger, args, env=None, env_vars=None, cwd=None):
-        """Initialize the process with the specified logger, arguments, and environment."""
+    def __init__(self, logger, args, env=None, env_vars=None, cwd=None, cpu_affinity=None):
+        """Initialize the process with the specified logger, arguments, and environment.
+
+        If 'cpu_affinity' is specified, then the process is pinned to that set of CPUs.
+        """
 
         # Ensure that executable files that don't already have an
         # extension on Windows have a ".exe" extension.
@@ -96,6 +119,7 @@ class Process(object):
         self._stdout_pipe = None
         self._stderr_pipe = None
         self._cwd = cwd
+        self._cpu_affinity = cpu_affinity
 
     def start(self):
         """Start the process and the logger pipes for its stdout and stderr."""
@@ -116,9 +140,10 @@ class Process(object):
         close_fds = (sys.platform != "win32")
 
         with _POPEN_LOCK:
-            self._process = subprocess.Popen(
-                self.args, bufsize=buffer_size, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                close_fds=close_fds, env=self.env, creationflags=creation_flags, cwd=self._cwd)
+            with _inherited_cpu_affinity(self._cpu_affinity):
+                self._process = subprocess.Popen(
+                    self.args, bufsize=buffer_size, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                    close_fds=close_fds, env=self.env, creationflags=creation_flags, cwd=self._cwd)
             self.pid = self._process.pid
 
             if _config.UNDO_RECORDER_PATH is not None and ("mongod" in self.args[0]
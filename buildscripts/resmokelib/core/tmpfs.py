@@ -0,0 +1,145 @@
+"""Class used to place the dbpaths of the fixtures on a RAM-backed filesystem, such as tmpfs.
+
+When --dbpathTmpfs is specified, the fixture of each job has its dbpath on that directory as long as
+the projected footprint of all of the fixtures placed there fits within the --tmpfsBudgetMB budget.
+The fixtures of the other jobs fall back to the disk-backed --dbpathPrefix directory.
+"""
+
+import os
+import shutil
+import threading
+
+from buildscripts.resmokelib import config
+
+# Where the dbpath of the fixture of a job was placed, as recorded for each test in report.json.
+TMPFS = "tmpfs"
+DISK = "disk"
+
+# The projected footprint of the dbpath of each mongod. It is dominated by the WiredTiger journal,
+# which is preallocated, rather than by the data the tests insert.
+NODE_FOOTPRINT_MB = 256
+
+_MB = 1024 * 1024
+
+
+def estimate_num_nodes(fixture_class, fixture_config):  # pylint: disable=too-many-return-statements
+    """Return the number of mongod processes the fixture described by 'fixture_config' starts."""
+    if fixture_class == "MongoDFixture":
+        return 1
+
+    if fixture_class == "ReplicaSetFixture":
+        num_nodes = fixture_config.get("num_nodes", 2)
+        if fixture_config.get("start_initial_sync_node", False):
+            num_nodes += 1
+        return num_nodes
+
+    if fixture_class == "ShardedClusterFixture":
+        num_shard_nodes = fixture_config.get("num_shards", 1) * fixture_config.get(
+            "num_rs_nodes_per_shard", 1)
+        # The config server is a single node replica set.
+        return num_shard_nodes + 1
+
+    if fixture_class == "TenantMigrationFixture":
+        return fixture_config.get("num_replica_sets", 1) * fixture_config.get(
+            "num_nodes_per_replica_set", 2)
+
+    # The other fixtures don't start any mongod processes.
+    return 0
+
+
+class TmpfsAllocator(object):
+    """Class responsible for deciding which fixtures have their dbpath on the tmpfs.
+
+    The decision is made for each job when its fixture is created, based on the number of mongod
+    processes the fixture starts.
+    """
+
+    _LOCK = threading.Lock()
+
+    # The bytes of the tmpfs reserved by the fixture of each job placed on it.
+    _RESERVED_BYTES = {}  # type: ignore
+
+    _budget_bytes = None
+
+    @classmethod
+    def _get_budget_bytes(cls):
+        """Return the number of bytes of the tmpfs the fixtures may use."""
+        if config.TMPFS_BUDGET_MB is not None:
+            return config.TMPFS_BUDGET_MB * _MB
+
+        # The mongod processes need memory of their own, so only half of what is free is used by
+        # default.
+        os.makedirs(config.DBPATH_TMPFS, exist_ok=True)
+        return shutil.disk_usage(config.DBPATH_TMPFS).free // 2
+
+    @classmethod
+    def place(cls, job_num, num_nodes):
+        """Return the dbpath prefix on the tmpfs for the fixture of 'job_num'.
+
+        Returns None if the fixture must use the disk instead because its projected footprint
+        doesn't fit within the budget.
+        """
+        if config.DBPATH_TMPFS is None:
+            return None
+
+        num_bytes = num_nodes * NODE_FOOTPRINT_MB * _MB
+        with cls._LOCK:
+            if cls._budget_bytes is None:
+                cls._budget_bytes = cls._get_budget_bytes()
+
+            cls._RESERVED_BYTES.pop(job_num, None)
+            if sum(cls._RESERVED_BYTES.values()) + num_bytes > cls._budget_bytes:
+                return None
+
+            cls._RESERVED_BYTES[job_num] = num_bytes
+            return config.DBPATH_TMPFS
+
+    @classmethod
+    def get_dbpath_prefix(cls, job_num):
+        """Return the dbpath prefix on the tmpfs for 'job_num', or None if it wasn't placed there."""
+        with cls._LOCK:
+            if job_num in cls._RESERVED_BYTES:
+                return config.DBPATH_TMPFS
+            return None
+
+    @classmethod
+    def get_reserved_mb(cls):
+        """Return the megabytes of the tmpfs reserved by the fixtures placed on it."""
+        with cls._LOCK:
+            return sum(cls._RESERVED_BYTES.values()) // _MB
+
+    @classmethod
+    def reset(cls):
+        """Release the tmpfs reserved by the fixtures of the previous test suite.
+
+        The dbpaths they left behind are removed as the memory they use is needed by the fixtures
+        of the next test suite, which may not place the same jobs on the tmpfs.
+        """
+        with cls._LOCK:
+            for job_num in cls._RESERVED_BYTES:
+                shutil.rmtree(
+                    os.path.join(config.DBPATH_TMPFS, "job{}".format(job_num)), ignore_errors=True)
+            cls._RESERVED_BYTES.clear()
+
+
+def summarize_runtimes(test_infos):
+    """Return the number and mean duration of the tests with their dbpath on the tmpfs and on disk.
+
+    The difference between the two means is included if tests ran in both places.
+    """
+    durations = {TMPFS: [], DISK: []}
+    for test_info in test_infos:
+        # Dynamic tests are run by hooks rather than being tests of the suite.
+        if test_info.dynamic or test_info.dbpath_storage not in durations:
+            continue
+        if test_info.start_time is None or test_info.end_time is None:
+            continue
+        durations[test_info.dbpath_storage].append(test_info.end_time - test_info.start_time)
+
+    summary = {
+        storage: {"num_tests": len(values), "mean_secs": sum(values) / len(values)}
+        for (storage, values) in durations.items() if values
+    }
+    if TMPFS in summary and DISK in summary:
+        summary["delta_secs"] = summary[DISK]["mean_secs"] - summary[TMPFS]["mean_secs"]
+    return summary
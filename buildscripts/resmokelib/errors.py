@@ -69,3 +69,8 @@ class UnsafeExitError(ResmokeError):
     """
 
     pass
+
+
+class JobProcessError(ResmokeError):  # noqa: D204
+    """Exception raised when a process running a Job exits unexpectedly."""
+    pass
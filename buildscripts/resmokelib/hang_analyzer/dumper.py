@@ -5,6 +5,7 @@ import logging
 import os
 import sys
 import tempfile
+import time
 from abc import ABCMeta, abstractmethod
 from collections import namedtuple
 from distutils import spawn  # pylint: disable=no-name-in-module
@@ -15,18 +16,19 @@ from buildscripts.resmokelib.hang_analyzer.process_list import Pinfo
 Dumpers = namedtuple('Dumpers', ['dbg', 'jstack'])
 
 
-def get_dumpers(root_logger: logging.Logger, dbg_output: str):
+def get_dumpers(root_logger: logging.Logger, dbg_output: str, compress_threads: int = 0):
     """
     Return OS-appropriate dumpers.
 
     :param root_logger: Top-level logger
     :param dbg_output: 'stdout' or 'file'
+    :param compress_threads: Number of threads compressing each core dump, 0 to not compress them
     """
 
     dbg = None
     jstack = None
     if sys.platform.startswith("linux"):
-        dbg = GDBDumper(root_logger, dbg_output)
+        dbg = GDBDumper(root_logger, dbg_output, compress_threads)
         jstack = JstackDumper()
     elif sys.platform == "win32" or sys.platform == "cygwin":
         dbg = WindowsDumper(root_logger, dbg_output)
@@ -250,7 +252,7 @@ class LLDBDumper(Dumper):
         """Dump info."""
         debugger = "lldb"
         dbg = self._find_debugger(debugger)
-        logger = _get_process_logger(self._dbg_output, pinfo.name)
+        logger = _get_pinfo_logger(self._dbg_output, pinfo)
 
         if dbg is None:
             self._root_logger.warning("Debugger %s not found, skipping dumping of %s", debugger,
@@ -320,6 +322,11 @@ class LLDBDumper(Dumper):
 class GDBDumper(Dumper):
     """GDBDumper class."""
 
+    def __init__(self, root_logger: logging.Logger, dbg_output: str, compress_threads: int = 0):
+        """Initialize GDBDumper, which compresses the core dumps if 'compress_threads' is set."""
+        super().__init__(root_logger, dbg_output)
+        self._compress_threads = compress_threads
+
     def _find_debugger(self, debugger):
         """Find the installed debugger."""
         return find_program(debugger, ['/opt/mongodbtoolchain/gdb/bin', '/usr/bin'])
@@ -362,8 +369,7 @@ class GDBDumper(Dumper):
             if not logger.mongo_process_filename:
                 raw_stacks_commands = []
             else:
-                base, ext = os.path.splitext(logger.mongo_process_filename)
-                raw_stacks_filename = "%s_%d_raw_stacks%s" % (base, pid, ext)
+                raw_stacks_filename = "debugger_%s_%d_raw_stacks.log" % (pinfo.name, pid)
                 raw_stacks_commands = [
                     'echo \\nWriting raw stacks to %s.\\n' % raw_stacks_filename,
                     # This sends output to log file rather than stdout until we turn logging off.
@@ -377,7 +383,7 @@ class GDBDumper(Dumper):
             dump_command = ""
             if take_dump:
                 # Dump to file, dump_<process name>.<pid>.core
-                dump_file = "dump_%s.%d.%s" % (pinfo.name, pid, self.get_dump_ext())
+                dump_file = self._dump_file(pinfo.name, pid)
                 dump_command = "gcore %s" % dump_file
                 self._root_logger.info("Dumping core to %s", dump_file)
 
@@ -415,7 +421,7 @@ class GDBDumper(Dumper):
         """Dump info."""
         debugger = "gdb"
         dbg = self._find_debugger(debugger)
-        logger = _get_process_logger(self._dbg_output, pinfo.name)
+        logger = _get_pinfo_logger(self._dbg_output, pinfo)
 
         if dbg is None:
             self._root_logger.warning("Debugger %s not found, skipping dumping of %s", debugger,
@@ -435,10 +441,48 @@ class GDBDumper(Dumper):
         self._root_logger.info("Done analyzing %s processes with PIDs %s", pinfo.name,
                                str(pinfo.pidv))
 
+        if take_dump and self._compress_threads:
+            for pid in pinfo.pidv:
+                self._compress_core(self._dump_file(pinfo.name, pid), logger)
+
     def get_dump_ext(self):
         """Return the dump file extension."""
         return "core"
 
+    def _dump_file(self, pname, pid):
+        """Return the name of the core dump file of a process, dump_<process name>.<pid>.core."""
+        return "dump_%s.%d.%s" % (pname, pid, self.get_dump_ext())
+
+    def _compress_core(self, dump_file, logger):
+        """Replace 'dump_file' with its gzip compressed version, dump_file.gz.
+
+        gcore has to seek back into the core dump as it writes it, so it can't be piped into the
+        compressor. The core dump is compressed as soon as the debugger detaches instead, using
+        several threads if pigz is installed, while the other processes are still being dumped.
+        """
+        if not os.path.exists(dump_file):
+            self._root_logger.warning("Core dump %s not found, skipping its compression", dump_file)
+            return
+
+        args = None
+        pigz = find_program("pigz", ["/usr/bin"])
+        if pigz is not None:
+            args = [pigz, "--processes", str(self._compress_threads)]
+        else:
+            gzip = find_program("gzip", ["/bin", "/usr/bin"])
+            if gzip is None:
+                self._root_logger.warning("Neither pigz nor gzip found, not compressing %s",
+                                          dump_file)
+                return
+            args = [gzip]
+
+        dump_size = os.path.getsize(dump_file)
+        start_time = time.time()
+        call(args + ["--fast", "--force", dump_file], logger)
+        self._root_logger.info("Compressed core dump %s from %d to %d bytes in %0.1f seconds",
+                               dump_file, dump_size, os.path.getsize(dump_file + ".gz"),
+                               time.time() - start_time)
+
     @staticmethod
     def _find_gcore():
         """Find the installed gcore."""
@@ -480,12 +524,21 @@ class JstackWindowsDumper(object):
     """JstackWindowsDumper class."""
 
     @staticmethod
-    def dump_info(root_logger, pid):
+    def dump_info(root_logger, dbg_output, pid, process_name):  # pylint: disable=unused-argument
         """Dump java thread stack traces to the logger."""
 
         root_logger.warning("Debugger jstack not supported, skipping dumping of %d", pid)
 
 
+def _get_pinfo_logger(dbg_output, pinfo: Pinfo):
+    """Return the logger of a debugger attaching to the processes of 'pinfo'.
+
+    The hang analyzer runs a debugger for each process, so each logs to its own file.
+    """
+    pid = pinfo.pidv[0] if len(pinfo.pidv) == 1 else None
+    return _get_process_logger(dbg_output, pinfo.name, pid=pid)
+
+
 def _get_process_logger(dbg_output, pname: str, pid: int = None):
     """Return the process logger from options specified."""
     process_logger = logging.Logger("process", level=logging.DEBUG)
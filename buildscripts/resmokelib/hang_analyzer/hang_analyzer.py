@@ -9,13 +9,16 @@ A prototype hang analyzer for Evergreen integration to help investigate test tim
 
 Supports Linux, MacOS X, and Windows.
 """
+import concurrent.futures
 import glob
+import json
 import logging
 import os
 import platform
-import re
 import signal
 import sys
+import threading
+import time
 import traceback
 
 import psutil
@@ -45,6 +48,7 @@ class HangAnalyzer(Subcommand):
         ]
         self.go_processes = []
         self.process_ids = []
+        self.dump_stats = []
 
         self._configure_processes()
         self._setup_logging(logger)
@@ -60,7 +64,12 @@ class HangAnalyzer(Subcommand):
         self._log_system_info()
 
         extractor.extract_debug_symbols(self.root_logger)
-        dumpers = dumper.get_dumpers(self.root_logger, self.options.debugger_output)
+        compress_threads = 0
+        if self.options.compress_cores:
+            # The cores of the processes dumped concurrently are compressed at the same time.
+            compress_threads = max(1, (os.cpu_count() or 1) // self.options.jobs)
+        dumpers = dumper.get_dumpers(self.root_logger, self.options.debugger_output,
+                                     compress_threads)
 
         processes = process_list.get_processes(self.process_ids, self.interesting_processes,
                                                self.options.process_match, self.root_logger)
@@ -82,25 +91,28 @@ class HangAnalyzer(Subcommand):
         trapped_exceptions = []
 
         dump_pids = {}
-        # Dump all processes, except python & java.
-        for pinfo in [pinfo for pinfo in processes if not re.match("^(java|python)", pinfo.name)]:
-            try:
-                dumpers.dbg.dump_info(
-                    pinfo, self.options.dump_core
-                    and _check_dump_quota(max_dump_size_bytes, dumpers.dbg.get_dump_ext()))
-            except dumper.DumpError as err:
-                self.root_logger.error(err.message)
-                dump_pids = {**err.dump_pids, **dump_pids}
-            except Exception as err:  # pylint: disable=broad-except
-                self.root_logger.info("Error encountered when invoking debugger %s", err)
-                trapped_exceptions.append(traceback.format_exc())
-
-        # Dump java processes using jstack.
-        for pinfo in [pinfo for pinfo in processes if pinfo.name.startswith("java")]:
-            for pid in pinfo.pidv:
+        quota = DumpQuota(max_dump_size_bytes, dumpers.dbg.get_dump_ext())
+        # Dump all processes, except python, with the debugger and java processes using jstack.
+        # Each process is attached to by its own debugger, several of which run at once.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.options.jobs) as executor:
+            futures = []
+            for pinfo in [pinfo for pinfo in processes if not pinfo.name.startswith("python")]:
+                for pid in pinfo.pidv:
+                    if pinfo.name.startswith("java"):
+                        futures.append(
+                            executor.submit(dumpers.jstack.dump_info, self.root_logger,
+                                            self.options.debugger_output, pid, pinfo.name))
+                    else:
+                        futures.append(
+                            executor.submit(self._dump_process, dumpers.dbg,
+                                            process_list.Pinfo(name=pinfo.name, pidv=[pid]), quota))
+
+            for future in concurrent.futures.as_completed(futures):
                 try:
-                    dumpers.jstack.dump_info(self.root_logger, self.options.debugger_output,
-                                             pinfo.name, pid)
+                    future.result()
+                except dumper.DumpError as err:
+                    self.root_logger.error(err.message)
+                    dump_pids = {**err.dump_pids, **dump_pids}
                 except Exception as err:  # pylint: disable=broad-except
                     self.root_logger.info("Error encountered when invoking debugger %s", err)
                     trapped_exceptions.append(traceback.format_exc())
@@ -115,6 +127,7 @@ class HangAnalyzer(Subcommand):
                                       pinfo.name, pid)
                 process.signal_process(self.root_logger, pid, signal.SIGABRT)
 
+        self._log_dump_stats(dumpers.dbg.get_dump_ext())
         self.root_logger.info("Done analyzing all processes for hangs")
 
         # Kill and abort processes if "-k" was specified.
@@ -132,6 +145,47 @@ class HangAnalyzer(Subcommand):
             raise RuntimeError(
                 "Exceptions were thrown while dumping. There may still be some valid dumps.")
 
+    def _dump_process(self, dbg, pinfo, quota):
+        """Dump the process described by 'pinfo', taking a core dump if the quota allows it."""
+        pid = pinfo.pidv[0]
+        take_dump = self.options.dump_core and quota.reserve(pid)
+        if self.options.dump_core and not take_dump:
+            self.root_logger.warning(
+                "Not dumping core of %s process with PID %d as it would exceed the %d byte quota",
+                pinfo.name, pid, quota.quota)
+        start_time = time.time()
+        try:
+            dbg.dump_info(pinfo, take_dump)
+        finally:
+            if take_dump:
+                quota.release(pid)
+            self.dump_stats.append({
+                "process": pinfo.name,
+                "pid": pid,
+                "dump_secs": time.time() - start_time,
+                "core_dump": take_dump,
+            })
+
+    def _log_dump_stats(self, ext):
+        """Log how long dumping each process took and how large its core dump is.
+
+        The stats are also written to debugger_dump_stats.json when the debuggers' output is
+        written to files.
+        """
+        for stats in sorted(self.dump_stats, key=lambda stats: stats["pid"]):
+            stats["core_files"] = {}
+            if stats["core_dump"]:
+                for file_name in glob.glob("dump_*.%d.%s*" % (stats["pid"], ext)):
+                    stats["core_files"][file_name] = os.path.getsize(file_name)
+            self.root_logger.info(
+                "Dumped %s process with PID %d in %0.1f seconds%s", stats["process"], stats["pid"],
+                stats["dump_secs"], "".join(", core dump %s is %d bytes" % (file_name, size)
+                                            for (file_name, size) in stats["core_files"].items()))
+
+        if self.dump_stats and "file" in self.options.debugger_output:
+            with open("debugger_dump_stats.json", "w") as fh:
+                json.dump(self.dump_stats, fh, indent=2)
+
     def _configure_processes(self):
         if self.options.debugger_output is None:
             self.options.debugger_output = ['stdout']
@@ -184,16 +238,56 @@ class HangAnalyzer(Subcommand):
                 "Cannot determine Unix Current Login, not supported on Windows")
 
 
-def _check_dump_quota(quota, ext):
-    """Check if sum of the files with ext is within the specified quota in megabytes."""
+class DumpQuota(object):
+    """The space left for core dumps, shared by the debuggers dumping processes concurrently.
 
-    files = glob.glob("*." + ext)
+    Before a core dump is taken, the space it is expected to need is reserved so that debuggers
+    running at the same time can't together exceed the quota. A core dump is expected to be about
+    as large as the resident memory of its process.
+    """
 
-    size_sum = 0
-    for file_name in files:
-        size_sum += os.path.getsize(file_name)
+    def __init__(self, quota, ext):
+        """Initialize DumpQuota with the 'quota' in bytes for the files with extension 'ext'."""
+        self.quota = quota
+        self._ext = ext
+        self._lock = threading.Lock()
+        self._reserved = {}
+        self._used = self._get_used()
 
-    return size_sum <= quota
+    def _get_used(self):
+        """Return the sum of the sizes of the existing dump files, compressed or not."""
+        file_names = glob.glob("*." + self._ext) + glob.glob("*.%s.gz" % self._ext)
+        return sum(os.path.getsize(file_name) for file_name in file_names)
+
+    @staticmethod
+    def _estimate_dump_size(pid):
+        """Return the expected size of a core dump of the process 'pid'."""
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except psutil.Error:
+            return 0
+
+    def reserve(self, pid):
+        """Return whether a core dump of the process 'pid' fits, reserving its space if so.
+
+        As before reservations existed, the first dump taken once the quota is reached is allowed
+        to exceed it.
+        """
+        estimate = self._estimate_dump_size(pid)
+        with self._lock:
+            reserved = sum(self._reserved.values())
+            if self._used > self.quota:
+                return False
+            if reserved and self._used + reserved + estimate > self.quota:
+                return False
+            self._reserved[pid] = estimate
+            return True
+
+    def release(self, pid):
+        """Replace the space reserved for the process 'pid' with the size of the dump files."""
+        with self._lock:
+            self._reserved.pop(pid, None)
+            self._used = self._get_used()
 
 
 class HangAnalyzerPlugin(PluginInterface):
@@ -226,6 +320,15 @@ class HangAnalyzerPlugin(PluginInterface):
             ' -g')
         parser.add_argument('-c', '--dump-core', dest='dump_core', action="store_true",
                             default=False, help='Dump core file for each analyzed process')
+        parser.add_argument(
+            '-j', '--jobs', dest='jobs', type=int, default=min(4,
+                                                               os.cpu_count() or 1),
+            help="Number of processes to dump concurrently. Default is %(default)s.")
+        parser.add_argument(
+            '-z', '--compress-cores', dest='compress_cores', action="store_true", default=False,
+            help="Compress each core dump with pigz, or gzip if pigz isn't installed, as soon as"
+            " it is taken. The core dumps are written as dump_<process>.<pid>.core.gz. Only"
+            " supported on Linux.")
         parser.add_argument('-s', '--max-core-dumps-size', dest='max_core_dumps_size',
                             default=10000,
                             help='Maximum total size of core dumps to keep in megabytes')
@@ -0,0 +1,181 @@
+"""Analyze the structured log output of the fixture processes as it is logged.
+
+The output of each process started by a fixture is sent line by line to a logger by a LoggerPipe.
+A LogAnalysisHandler attached to the fixture's logger parses the logv2 JSON lines and hands them to
+a set of LogAnalyzer instances, which aggregate what they are interested in for the test that is
+running. The aggregated statistics are recorded for each test in the report.json file.
+"""
+
+import json
+import logging
+from collections import defaultdict
+
+from buildscripts.resmokelib.utils import registry
+from buildscripts.resmokelib.utils.stats import percentile
+
+_ANALYZERS = {}  # type: ignore
+
+
+def make_analysis_handler(analyzer_names):
+    """Return a LogAnalysisHandler for the analyzers registered under 'analyzer_names'."""
+
+    analyzers = []
+    for analyzer_name in analyzer_names:
+        if analyzer_name not in _ANALYZERS:
+            raise ValueError("Unknown log analyzer class '%s'" % analyzer_name)
+        analyzers.append(_ANALYZERS[analyzer_name]())
+
+    return LogAnalysisHandler(analyzers)
+
+
+class LogAnalysisHandler(logging.Handler):
+    """Dispatch the log lines of the fixture processes to a set of LogAnalyzer instances."""
+
+    def __init__(self, analyzers):
+        """Initialize the LogAnalysisHandler."""
+        logging.Handler.__init__(self)
+        self.analyzers = analyzers
+
+    def emit(self, record):
+        """Parse the log line of 'record' if any of the analyzers is interested in it."""
+        line = record.getMessage()
+
+        # Parsing every line as JSON would slow down the LoggerPipe threads, so the analyzers first
+        # get a chance to reject a line based on its text.
+        analyzers = [analyzer for analyzer in self.analyzers if analyzer.accepts(line)]
+        if not analyzers:
+            return
+
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            # Not a logv2 line, e.g. the output of a hook or a process crashing.
+            return
+
+        if not isinstance(entry, dict):
+            return
+
+        for analyzer in analyzers:
+            analyzer.analyze(entry)
+
+    def reset(self):
+        """Discard what the analyzers have aggregated so far."""
+        self.acquire()
+        try:
+            for analyzer in self.analyzers:
+                analyzer.reset()
+        finally:
+            self.release()
+
+    def take_stats(self):
+        """Return what the analyzers have aggregated since the last reset and reset them.
+
+        Returns None if none of the analyzers found anything.
+        """
+        self.acquire()
+        try:
+            stats = {}
+            for analyzer in self.analyzers:
+                analyzer_stats = analyzer.get_stats()
+                if analyzer_stats:
+                    stats[analyzer.REGISTERED_NAME] = analyzer_stats
+                analyzer.reset()
+        finally:
+            self.release()
+
+        return stats or None
+
+
+class LogAnalyzer(object, metaclass=registry.make_registry_metaclass(_ANALYZERS)):
+    """Common interface all log analyzers will inherit from."""
+
+    REGISTERED_NAME = registry.LEAVE_UNREGISTERED
+
+    def __init__(self):
+        """Initialize the LogAnalyzer."""
+        self.reset()
+
+    def accepts(self, line):  # pylint: disable=unused-argument,no-self-use
+        """Return False if 'line' is of no interest to the analyzer without parsing it."""
+        return True
+
+    def analyze(self, entry):
+        """Aggregate the parsed logv2 'entry'."""
+        raise NotImplementedError("analyze must be implemented by LogAnalyzer subclasses")
+
+    def reset(self):
+        """Discard what has been aggregated so far."""
+        raise NotImplementedError("reset must be implemented by LogAnalyzer subclasses")
+
+    def get_stats(self):
+        """Return a dict of what has been aggregated so far, or None if there is nothing."""
+        raise NotImplementedError("get_stats must be implemented by LogAnalyzer subclasses")
+
+
+class SlowOperations(LogAnalyzer):
+    """Aggregate the "Slow query" entries logged by mongod and mongos.
+
+    The durations are aggregated by command, along with the time the operations spent waiting to
+    acquire locks and waiting for space in the WiredTiger cache, i.e. stalled on eviction.
+    """
+
+    _SLOW_QUERY_MSG = "Slow query"
+
+    def accepts(self, line):
+        """Return False for lines that can't be a "Slow query" entry."""
+        return self._SLOW_QUERY_MSG in line
+
+    def analyze(self, entry):
+        """Aggregate 'entry' if it is a "Slow query" entry."""
+        if entry.get("msg") != self._SLOW_QUERY_MSG:
+            return
+
+        attr = entry.get("attr", {})
+        self._durations[self._command_name(attr)].append(attr.get("durationMillis", 0))
+
+        for lock_stats in attr.get("locks", {}).values():
+            self._lock_wait_micros += sum(lock_stats.get("timeAcquiringMicros", {}).values())
+
+        cache_wait_micros = attr.get("storage", {}).get("timeWaitingMicros", {}).get("cache", 0)
+        if cache_wait_micros:
+            self._num_cache_waits += 1
+            self._cache_wait_micros += cache_wait_micros
+
+    @staticmethod
+    def _command_name(attr):
+        """Return the name of the command of a "Slow query" entry."""
+        command = attr.get("command")
+        if isinstance(command, dict) and command:
+            return next(iter(command))
+        # Operations that aren't commands, e.g. a getMore or a legacy write, only have a type.
+        return attr.get("type", "unknown")
+
+    def reset(self):  # pylint: disable=attribute-defined-outside-init
+        """Discard the slow operations seen so far."""
+        self._durations = defaultdict(list)
+        self._lock_wait_micros = 0
+        self._num_cache_waits = 0
+        self._cache_wait_micros = 0
+
+    def get_stats(self):
+        """Return the count and durations of the slow operations by command."""
+        if not self._durations:
+            return None
+
+        commands = {}
+        for (command_name, durations) in self._durations.items():
+            durations = sorted(durations)
+            commands[command_name] = {
+                "count": len(durations),
+                "p50_duration_millis": percentile(durations, 50),
+                "p99_duration_millis": percentile(durations, 99),
+                "max_duration_millis": durations[-1],
+            }
+
+        return {
+            "count": sum(command["count"] for command in commands.values()),
+            "commands": commands,
+            "lock_wait_micros": self._lock_wait_micros,
+            "cache_wait_count": self._num_cache_waits,
+            "cache_wait_micros": self._cache_wait_micros,
+        }
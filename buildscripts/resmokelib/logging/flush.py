@@ -25,6 +25,20 @@ def start_thread():
         _FLUSH_THREAD.start()
 
 
+def start_thread_after_fork():
+    """Start the flush thread in a process forked after it was started in the parent process.
+
+    Threads aren't carried over by fork(), so the child process needs a flush thread of its own.
+    """
+
+    global _FLUSH_THREAD, _FLUSH_THREAD_LOCK  # pylint: disable=global-statement
+
+    # The lock may have been held by another thread at the time of the fork().
+    _FLUSH_THREAD_LOCK = threading.Lock()
+    _FLUSH_THREAD = None
+    start_thread()
+
+
 def stop_thread():
     """Signal the flush thread to stop and wait until it does."""
 
@@ -4,6 +4,7 @@ import argparse
 import shlex
 
 from buildscripts.resmokelib import configure_resmoke
+from buildscripts.resmokelib.bm_compare import BmComparePlugin
 from buildscripts.resmokelib.hang_analyzer import HangAnalyzerPlugin
 from buildscripts.resmokelib.powercycle import PowercyclePlugin
 from buildscripts.resmokelib.run import RunPlugin
@@ -16,6 +17,7 @@ _PLUGINS = [
     UndoDbPlugin(),
     SetupMultiversionPlugin(),
     PowercyclePlugin(),
+    BmComparePlugin(),
 ]
 
 
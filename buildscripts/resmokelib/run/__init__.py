@@ -36,6 +36,7 @@ from buildscripts.resmokelib.core import process
 from buildscripts.resmokelib.core import jasper_process
 from buildscripts.resmokelib.core import redirect as redirect_lib
 from buildscripts.resmokelib.plugin import PluginInterface, Subcommand
+from buildscripts.resmokelib.utils import timeline
 
 _INTERNAL_OPTIONS_TITLE = "Internal Options"
 _BENCHMARK_ARGUMENT_TITLE = "Benchmark/Benchrun test options"
@@ -160,6 +161,7 @@ class TestRunner(Subcommand):  # pylint: disable=too-many-instance-attributes
         suites = self._get_suites()
         for suite in suites:
             self._shuffle_tests(suite)
+            self._order_tests(suite)
             sb = ["Tests that would be run in suite {}".format(suite.get_display_name())]
             sb.extend(suite.tests or ["(no tests)"])
             sb.append("Tests that would be excluded from suite {}".format(suite.get_display_name()))
@@ -188,6 +190,9 @@ class TestRunner(Subcommand):  # pylint: disable=too-many-instance-attributes
                                       os.path.join("buildscripts", "resmoke.py"),
                                       " ".join(local_args))
 
+        if config.TRACE_FILE:
+            timeline.enable()
+
         suites = None
         try:
             suites = self._get_suites()
@@ -211,6 +216,8 @@ class TestRunner(Subcommand):  # pylint: disable=too-many-instance-attributes
             self._exit_archival()
             if suites:
                 reportfile.write(suites)
+            if config.TRACE_FILE:
+                timeline.write(config.TRACE_FILE)
 
     def _run_suite(self, suite):
         """Run a test suite."""
@@ -236,6 +243,7 @@ class TestRunner(Subcommand):  # pylint: disable=too-many-instance-attributes
     def _execute_suite(self, suite):
         """Execute a suite and return True if interrupted, False otherwise."""
         self._shuffle_tests(suite)
+        self._order_tests(suite)
         if not suite.tests:
             self._exec_logger.info("Skipping %s, no tests to run", suite.test_kind)
             suite.return_code = 0
@@ -269,6 +277,29 @@ class TestRunner(Subcommand):  # pylint: disable=too-many-instance-attributes
                                suite.test_kind, suite.get_display_name(), config.RANDOM_SEED)
         random.shuffle(suite.tests)
 
+    def _order_tests(self, suite):
+        """Order the tests by decreasing failure rate if the test order cli option was set."""
+        if not config.TEST_ORDER_FILE:
+            return
+
+        test_order = utils.load_yaml_file(config.TEST_ORDER_FILE) or {}
+        failure_rates = {
+            test_name.replace("\\", "/"): failure_rate
+            for (test_name, failure_rate) in test_order.items()
+        }
+
+        def failure_rate(test):
+            # Tests of some kinds are a list of test files rather than a single test file.
+            if not isinstance(test, str):
+                return 0.0
+            return failure_rates.get(test.replace("\\", "/"), 0.0)
+
+        self._exec_logger.info(
+            "Ordering tests for %ss in suite %s by decreasing failure rate from %s.",
+            suite.test_kind, suite.get_display_name(), config.TEST_ORDER_FILE)
+        # The sort is stable, so tests with the same failure rate keep their shuffled order.
+        suite.tests.sort(key=failure_rate, reverse=True)
+
     def _get_suites(self):
         """Return the list of suites for this resmoke invocation."""
         try:
@@ -605,6 +636,12 @@ class RunPlugin(PluginInterface):
             help=("The directory which will contain the dbpaths of any mongod's started"
                   " by resmoke.py or the tests themselves."))
 
+        parser.add_argument(
+            "--dbpathTmpfs", dest="dbpath_tmpfs", metavar="PATH",
+            help=("A directory on a RAM-backed filesystem, e.g. /dev/shm/resmoke, to put the"
+                  " dbpaths of the fixtures started by resmoke.py in. The fixtures whose projected"
+                  " footprint doesn't fit within --tmpfsBudgetMB use --dbpathPrefix instead."))
+
         parser.add_argument("--dbtest", dest="dbtest_executable", metavar="PATH",
                             help="The path to the dbtest executable for resmoke to use.")
 
@@ -615,6 +652,18 @@ class RunPlugin(PluginInterface):
                   " specified tags will be excluded from any suites that are run."
                   " The tag '{}' is implicitly part of this list.".format(config.EXCLUDED_TAG)))
 
+        parser.add_argument(
+            "--executorMode", dest="executor_mode", choices=("thread", "process"),
+            help=("Controls whether each Job instance runs in a thread of the resmoke.py process"
+                  " or in a process of its own. Running Jobs in processes avoids contention on"
+                  " the GIL when there are many of them. Defaults to 'thread'."))
+
+        parser.add_argument(
+            "--fixtureLogAnalyzers", dest="fixture_log_analyzers", metavar="ANALYZER1,ANALYZER2",
+            help=("Comma separated list of log analyzers to run over the log output of the"
+                  " fixture processes, e.g. 'SlowOperations'. What they find is recorded for each"
+                  " test in the report.json file."))
+
         parser.add_argument("--genny", dest="genny_executable", metavar="PATH",
                             help="The path to the genny executable for resmoke to use.")
 
@@ -763,6 +812,19 @@ class RunPlugin(PluginInterface):
                   " Defaults to auto when not supplied. auto enables randomization in"
                   " all cases except when the number of jobs requested is 1."))
 
+        parser.add_argument(
+            "--testOrderFile", action="store", dest="test_order_file", metavar="FILE",
+            help=("A YAML or JSON file mapping test files to their historic failure rate. Tests"
+                  " are run in order of decreasing failure rate, which combined with"
+                  " --continueOnFailure=false makes a run fail as early as possible. Tests that"
+                  " aren't in the file are run last."))
+
+        parser.add_argument(
+            "--tmpfsBudgetMB", dest="tmpfs_budget_mb", metavar="MB",
+            help=("The number of megabytes of --dbpathTmpfs the fixtures may use. Each mongod a"
+                  " fixture starts is projected to use 256 MB. Defaults to half of the free space"
+                  " of --dbpathTmpfs."))
+
         parser.add_argument(
             "--majorityReadConcern", action="store", dest="majority_read_concern", choices=("on",
                                                                                             "off"),
@@ -890,6 +952,12 @@ class RunPlugin(PluginInterface):
             "--reportFile", dest="report_file", metavar="REPORT",
             help="Writes a JSON file with test status and timing information.")
 
+        internal_options.add_argument(
+            "--traceFile", dest="trace_file", metavar="TRACE",
+            help=("Writes a JSON file in the Chrome trace event format with the time spent by each"
+                  " Job setting up fixtures, running tests and hooks, archiving, and waiting on"
+                  " the queue of tests. It can be viewed in chrome://tracing or Perfetto."))
+
         internal_options.add_argument(
             "--staggerJobs", action="store", dest="stagger_jobs", choices=("on", "off"),
             metavar="ON|OFF", help=("Enables or disables the stagger of launching resmoke jobs."
@@ -1015,6 +1083,26 @@ class RunPlugin(PluginInterface):
             "--benchmarkRepetitions", type=int, dest="benchmark_repetitions",
             metavar="BENCHMARK_REPETITIONS", help=benchmark_repetitions_help)
 
+        benchmark_options.add_argument(
+            "--benchmarkWarmupRepetitions", type=int, dest="benchmark_warmup_repetitions",
+            metavar="BENCHMARK_WARMUP_REPETITIONS",
+            help=("The number of additional repetitions of each benchmark to run first and discard"
+                  " from the perf plugin report. They let the caches and the CPU frequency settle"
+                  " before the repetitions that are reported. Defaults to 0."))
+
+        benchmark_options.add_argument(
+            "--benchmarkCpuAffinity", dest="benchmark_cpu_affinity",
+            metavar="BENCHMARK_CPU_AFFINITY",
+            help=("Pins the benchmark processes to the specified CPUs, e.g. '0-3,6', so that the"
+                  " scheduler doesn't migrate them between CPUs. Only supported on Linux."))
+
+        benchmark_options.add_argument(
+            "--benchmarkBaselineFile", dest="benchmark_baseline_file",
+            metavar="BENCHMARK_BASELINE_FILE",
+            help=("A perf plugin report from an earlier run, e.g. the --perfReportFile of the"
+                  " merge base, to compare the benchmarks against. The statistically significant"
+                  " changes are logged and flagged in the --perfReportFile."))
+
     @classmethod
     def _add_list_suites(cls, subparsers):
         """Create and add the parser for the list-suites subcommand."""
@@ -2,17 +2,35 @@
 import contextlib
 import errno
 import glob
+import hashlib
+import json
 import os
+import re
 import shutil
 import tarfile
 import tempfile
+import threading
 import zipfile
+import zlib
+from collections import defaultdict
+from concurrent import futures
 
 import requests
 import structlog
 
+try:
+    import fcntl
+except ImportError:
+    # Windows, where only the threads of a process are kept from using a cache entry concurrently.
+    fcntl = None
+
 S3_BUCKET = "mciuploads"
 
+_CHUNK_SIZE = 1024 * 1024
+
+# S3 uses the MD5 of an object as its ETag unless it was uploaded in multiple parts.
+_MD5_ETAG_RE = re.compile(r'^"?([0-9a-f]{32})"?$')
+
 LOGGER = structlog.getLogger(__name__)
 
 
@@ -22,86 +40,391 @@ class DownloadError(Exception):
     pass
 
 
-def download_from_s3(url):
-    """Download file from S3 bucket by a given URL."""
+def _archive_name(url):
+    """Return the file name of the archive at 'url'."""
+    return url.split('/')[-1].split('?')[0]
 
-    if not url:
-        raise DownloadError("Download URL not found.")
 
-    LOGGER.info("Downloading.", url=url)
-    filename = os.path.join(tempfile.gettempdir(), url.split('/')[-1].split('?')[0])
+class ArtifactCache(object):
+    """Local cache of downloaded archives, keyed by their URL.
 
-    with requests.get(url, stream=True) as reader:
-        with open(filename, 'wb') as file_handle:
-            shutil.copyfileobj(reader.raw, file_handle)
+    The URL of an archive includes the version and revision it was built from, so a cached archive
+    never goes stale. The SHA-256 of each archive is recorded when it is downloaded and is checked
+    every time the archive is used again.
 
-    return filename
+    The cache directory may be shared by several processes. Each one holds a lock on the file next
+    to a cache entry while using it, so they don't write to the same partial archive.
+    """
 
+    def __init__(self, cache_dir):
+        """Initialize the ArtifactCache."""
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._url_locks = defaultdict(threading.Lock)
+
+    @contextlib.contextmanager
+    def lock(self, url):
+        """Hold the cache entry of 'url' against the other threads and processes using the cache."""
+        with self._lock:
+            url_lock = self._url_locks[url]
+
+        with url_lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # The lock file is outside of the cache entry so that discarding the entry doesn't
+            # remove the file locked by another process.
+            with open(self._entry_dir(url) + ".lock", "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                yield
+
+    def _entry_dir(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest())
+
+    def archive_path(self, url):
+        """Return the path of the cached archive for 'url'."""
+        return os.path.join(self._entry_dir(url), _archive_name(url))
+
+    def partial_path(self, url):
+        """Return the path the archive for 'url' is downloaded to before it is complete."""
+        return self.archive_path(url) + ".part"
+
+    def _metadata_path(self, url):
+        return os.path.join(self._entry_dir(url), "metadata.json")
+
+    def get_sha256(self, url):
+        """Return the recorded SHA-256 of the cached archive for 'url', or None if it isn't cached."""
+        if not os.path.isfile(self.archive_path(url)):
+            return None
 
-def _rsync_move_dir(source_dir, dest_dir):
-    """
-    Move dir.
+        try:
+            with open(self._metadata_path(url)) as file_handle:
+                return json.load(file_handle)["sha256"]
+        except (IOError, OSError, ValueError, KeyError):
+            return None
+
+    def prepare(self, url):
+        """Create the directory for the cache entry of 'url'."""
+        os.makedirs(self._entry_dir(url), exist_ok=True)
 
-    Move the contents of `source_dir` into `dest_dir` as a subdir while merging with
-    all existing dirs.
+    def commit(self, url, sha256, size):
+        """Record the downloaded partial archive for 'url' as complete."""
+        os.replace(self.partial_path(url), self.archive_path(url))
+        metadata = {"url": url, "sha256": sha256, "size": size}
+        with open(self._metadata_path(url), "w") as file_handle:
+            json.dump(metadata, file_handle)
 
-    This is similar to the behavior of `rsync` but different to `mv`.
+    def discard(self, url):
+        """Remove the cache entry for 'url'."""
+        shutil.rmtree(self._entry_dir(url), ignore_errors=True)
+
+
+class _ArchiveStream(object):
+    """File-like object reading an archive from a sequence of sources.
+
+    The bytes read are hashed and, for the sources marked to be saved, written to 'sink'. This
+    allows the archive to be extracted while it is being downloaded and saved.
     """
 
-    for cur_src_dir, _, files in os.walk(source_dir):
-        cur_dest_dir = cur_src_dir.replace(source_dir, dest_dir, 1)
-        if not os.path.exists(cur_dest_dir):
-            os.makedirs(cur_dest_dir)
-        for cur_file in files:
-            src_file = os.path.join(cur_src_dir, cur_file)
-            dst_file = os.path.join(cur_dest_dir, cur_file)
-            if os.path.exists(dst_file):
-                # in case of the src and dst are the same file
-                if os.path.samefile(src_file, dst_file):
-                    continue
-                os.remove(dst_file)
-            shutil.move(src_file, cur_dest_dir)
-
-
-def extract_archive(archive_file, install_dir):
-    """Uncompress file and return root of extracted directory."""
-
-    LOGGER.info("Extracting archive data.", archive=archive_file, install_dir=install_dir)
-    temp_dir = tempfile.mkdtemp()
-    archive_name = os.path.basename(archive_file)
-    _, file_suffix = os.path.splitext(archive_name)
+    def __init__(self, sources, sink=None):
+        """
+        Initialize the _ArchiveStream.
+
+        :param sources: List of (file object, whether to write what is read from it to 'sink').
+        :param sink: File object the archive is saved to, if any.
+        """
+        self._sources = list(sources)
+        self._sink = sink
+        self.size = 0
+        self.md5 = hashlib.md5()
+        self.sha256 = hashlib.sha256()
+
+    def read(self, size=-1):
+        """Return up to 'size' bytes of the archive, or an empty bytes object once it's all read."""
+        while self._sources:
+            (source, save) = self._sources[0]
+            data = source.read(size if size > 0 else _CHUNK_SIZE)
+            if not data:
+                self._sources.pop(0)
+                continue
+
+            self.size += len(data)
+            self.md5.update(data)
+            self.sha256.update(data)
+            if save and self._sink is not None:
+                self._sink.write(data)
+            return data
+
+        return b""
+
+    def drain(self):
+        """Read the rest of the archive, e.g. the padding after the end of a tar archive."""
+        while self.read(_CHUNK_SIZE):
+            pass
+        if self._sink is not None:
+            self._sink.flush()
 
-    if file_suffix == ".zip":
-        # Support .zip downloads, used for Windows binaries.
+
+def _extract_stream(stream, archive_name, archive_file, dest_dir):
+    """Extract the archive read from 'stream' into 'dest_dir'.
+
+    The .tgz archives are extracted as they are read. A .zip archive can only be extracted once it
+    has been saved in full to 'archive_file'.
+    """
+    _, file_suffix = os.path.splitext(archive_name)
+    if file_suffix == ".tgz":
+        with contextlib.closing(tarfile.open(fileobj=stream, mode="r|gz")) as tar_handle:
+            tar_handle.extractall(path=dest_dir)
+        stream.drain()
+    elif file_suffix == ".zip":
+        stream.drain()
         with zipfile.ZipFile(archive_file) as zip_handle:
-            zip_handle.extractall(temp_dir)
-    elif file_suffix == ".tgz":
-        # Support .tgz downloads, used for Linux binaries.
-        with contextlib.closing(tarfile.open(archive_file, "r:gz")) as tar_handle:
-            tar_handle.extractall(path=temp_dir)
+            zip_handle.extractall(dest_dir)
     else:
         raise DownloadError(f"Unsupported file extension {file_suffix}")
 
-    # Pre-hygienic tarballs have a unique top-level dir when untarred. We ignore
-    # that dir to ensure the untarred dir structure is uniform. symbols and artifacts
-    # are rarely used on pre-hygienic versions so we ignore them for simplicity.
-    bin_archive_root = glob.glob(os.path.join(temp_dir, "mongodb-*", "bin"))
-    if bin_archive_root:
-        temp_dir = bin_archive_root[0]
+
+def _open_download(url, offset):
+    """Return the response for downloading 'url' from 'offset' and the offset it starts at."""
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    response = requests.get(url, stream=True, headers=headers)
+
+    if offset and response.status_code == requests.codes.requested_range_not_satisfiable:
+        response.close()
+        return _open_download(url, 0)
+
+    if response.status_code == requests.codes.partial_content:
+        if response.headers.get("Content-Range", "").startswith(f"bytes {offset}-"):
+            return (response, offset)
+        response.close()
+        return _open_download(url, 0)
 
     try:
-        os.makedirs(install_dir)
-    except OSError as exc:
-        if exc.errno == errno.EEXIST and os.path.isdir(install_dir):
-            pass
-        else:
+        response.raise_for_status()
+    except requests.HTTPError as err:
+        response.close()
+        raise DownloadError(f"Failed to download {url}: {err}")
+
+    return (response, 0)
+
+
+def _check_download(url, response, offset, stream):
+    """Raise a DownloadError if the downloaded archive doesn't match what the server sent."""
+    content_length = response.headers.get("Content-Length")
+    if content_length is not None and offset + int(content_length) != stream.size:
+        raise DownloadError(f"Downloaded {stream.size} bytes of {url},"
+                            f" expected {offset + int(content_length)}")
+
+    etag_match = _MD5_ETAG_RE.match(response.headers.get("ETag", ""))
+    if etag_match and etag_match.group(1) != stream.md5.hexdigest():
+        raise DownloadError(f"The MD5 of the archive downloaded from {url} doesn't match its ETag")
+
+
+def _get_save_path(url, dest_dir, cache):
+    """Return the file to save the archive at 'url' to while it is downloaded, if any.
+
+    Also return how much of the archive the file already has, from an interrupted download.
+    """
+    if cache is not None:
+        cache.prepare(url)
+        save_path = cache.partial_path(url)
+        return (save_path, os.path.getsize(save_path) if os.path.isfile(save_path) else 0)
+
+    archive_name = _archive_name(url)
+    if archive_name.endswith(".zip"):
+        (fd, save_path) = tempfile.mkstemp(dir=os.path.dirname(dest_dir), suffix=archive_name)
+        os.close(fd)
+        return (save_path, 0)
+
+    return (None, 0)
+
+
+def _download_and_extract(url, dest_dir, cache):
+    """Download the archive at 'url', extracting it into 'dest_dir' as it is downloaded.
+
+    When there is a cache, the archive is saved to it as it is downloaded. An interrupted download
+    is resumed from where it stopped by the next one.
+    """
+    (save_path, offset) = _get_save_path(url, dest_dir, cache)
+    (response, offset) = _open_download(url, offset)
+    if offset:
+        LOGGER.info("Resuming download.", url=url, offset=offset)
+
+    try:
+        with response, contextlib.ExitStack() as stack:
+            sources = [(response.raw, True)]
+            sink = None
+            if save_path is not None:
+                sink = stack.enter_context(open(save_path, "r+b" if offset else "wb"))
+                if offset:
+                    # The bytes already downloaded are read back from the start of the file.
+                    sources.insert(0, (sink, False))
+
+            stream = _ArchiveStream(sources, sink)
+            _extract_stream(stream, _archive_name(url), save_path, dest_dir)
+            _check_download(url, response, offset, stream)
+    except (DownloadError, tarfile.TarError, zipfile.BadZipFile, zlib.error, EOFError) as err:
+        # The archive is corrupt rather than the download having been interrupted, so it can't be
+        # resumed.
+        if cache is not None:
+            cache.discard(url)
+        if isinstance(err, DownloadError):
             raise
+        raise DownloadError(f"Failed to extract the archive downloaded from {url}: {err}")
+    finally:
+        if cache is None and save_path is not None:
+            os.remove(save_path)
+
+    if cache is not None:
+        cache.commit(url, stream.sha256.hexdigest(), stream.size)
+
+
+def fetch_archive(url, dest_dir, cache=None):
+    """
+    Download the archive at 'url' and extract it into 'dest_dir'.
+
+    :param url: URL of the .tgz or .zip archive.
+    :param dest_dir: Empty directory to extract the archive into.
+    :param cache: ArtifactCache to reuse the archive from and to save it to, if any.
+    """
+    if not url:
+        raise DownloadError("Download URL not found.")
+
+    if cache is None:
+        LOGGER.info("Downloading.", url=url, dest_dir=dest_dir)
+        _download_and_extract(url, dest_dir, None)
+        return
+
+    with cache.lock(url):
+        sha256 = cache.get_sha256(url)
+        if sha256 is not None:
+            LOGGER.info("Extracting cached archive.", url=url, dest_dir=dest_dir)
+            archive_path = cache.archive_path(url)
+            try:
+                with open(archive_path, "rb") as file_handle:
+                    stream = _ArchiveStream([(file_handle, False)])
+                    _extract_stream(stream, _archive_name(url), archive_path, dest_dir)
+                if stream.sha256.hexdigest() == sha256:
+                    return
+            except (tarfile.TarError, zipfile.BadZipFile, zlib.error, EOFError):
+                pass
+
+            LOGGER.warning("The cached archive is corrupt, downloading it again.", url=url)
+            cache.discard(url)
+            shutil.rmtree(dest_dir)
+            os.makedirs(dest_dir)
+
+        LOGGER.info("Downloading.", url=url, dest_dir=dest_dir)
+        _download_and_extract(url, dest_dir, cache)
 
-    _rsync_move_dir(temp_dir, install_dir)
-    shutil.rmtree(temp_dir)
 
-    LOGGER.info("Extract archive completed.", installed_dir=install_dir)
+def _is_real_dir(path):
+    """Return True if 'path' is a directory rather than a file or a symlink."""
+    return os.path.isdir(path) and not os.path.islink(path)
 
+
+def _move_into(source_dir, dest_dir):
+    """Move the contents of 'source_dir' into 'dest_dir', which must be on the same filesystem.
+
+    The entries 'dest_dir' doesn't have are renamed into it whole. The directories both have are
+    merged, and the files of 'source_dir' replace those of 'dest_dir'.
+    """
+    for name in os.listdir(source_dir):
+        source = os.path.join(source_dir, name)
+        dest = os.path.join(dest_dir, name)
+        if _is_real_dir(source) and _is_real_dir(dest):
+            _move_into(source, dest)
+            continue
+        if _is_real_dir(dest):
+            shutil.rmtree(dest)
+        os.replace(source, dest)
+
+
+def _link_or_copy(source, dest):
+    """Hard link 'source' to 'dest', or copy it where hard links aren't supported."""
+    try:
+        os.link(source, dest)
+    except OSError:
+        shutil.copy2(source, dest)
+
+
+def _link_missing(source_dir, dest_dir):
+    """Hard link the files of 'source_dir' that 'dest_dir' doesn't have into it."""
+    for name in os.listdir(source_dir):
+        source = os.path.join(source_dir, name)
+        dest = os.path.join(dest_dir, name)
+        if _is_real_dir(source) and _is_real_dir(dest):
+            _link_missing(source, dest)
+        elif os.path.lexists(dest):
+            continue
+        elif _is_real_dir(source):
+            shutil.copytree(source, dest, symlinks=True, copy_function=_link_or_copy)
+        elif os.path.islink(source):
+            os.symlink(os.readlink(source), dest)
+        else:
+            _link_or_copy(source, dest)
+
+
+def _swap_dir(new_dir, dest_dir):
+    """Replace 'dest_dir' with 'new_dir', which must be on the same filesystem."""
+    if not os.path.isdir(dest_dir):
+        os.replace(new_dir, dest_dir)
+        return
+
+    # A directory can't be renamed over a non-empty one, so the old one is moved out of the way
+    # first. Either way 'dest_dir' is never seen partially extracted.
+    old_dir = tempfile.mkdtemp(
+        dir=os.path.dirname(dest_dir), prefix="." + os.path.basename(dest_dir) + ".old-")
+    os.replace(dest_dir, os.path.join(old_dir, "install"))
+    os.replace(new_dir, dest_dir)
+    shutil.rmtree(old_dir)
+
+
+def install_archives(urls, install_dir, cache=None):
+    """
+    Download and extract the archives at 'urls' into 'install_dir'.
+
+    The archives are downloaded concurrently, each into its own directory next to 'install_dir'.
+    Their directories are then moved into a staging directory in the order of 'urls', so a file in
+    several archives is that of the last one. The files already installed that aren't in any of
+    the archives, e.g. the symbols installed by an earlier run, are hard linked into the staging
+    directory too. The staging directory then replaces 'install_dir' as a whole.
+    """
+    for url in urls:
+        if not url:
+            raise DownloadError("Download URL not found.")
+
+    install_dir = os.path.abspath(install_dir)
+    parent_dir = os.path.dirname(install_dir)
+    os.makedirs(parent_dir, exist_ok=True)
+
+    prefix = "." + os.path.basename(install_dir)
+    staging_dir = tempfile.mkdtemp(dir=parent_dir, prefix=prefix + ".staging-")
+    archive_dirs = [tempfile.mkdtemp(dir=parent_dir, prefix=prefix + ".archive-") for _ in urls]
+
+    try:
+        with futures.ThreadPoolExecutor(max_workers=max(len(urls), 1)) as executor:
+            pending = [
+                executor.submit(fetch_archive, url, archive_dir, cache)
+                for (url, archive_dir) in zip(urls, archive_dirs)
+            ]
+            for future in pending:
+                future.result()
+
+        for archive_dir in archive_dirs:
+            # Pre-hygienic tarballs have a unique top-level dir when untarred. We ignore that dir to
+            # ensure the untarred dir structure is uniform. symbols and artifacts are rarely used on
+            # pre-hygienic versions so we ignore them for simplicity.
+            bin_archive_root = glob.glob(os.path.join(archive_dir, "mongodb-*", "bin"))
+            _move_into(bin_archive_root[0] if bin_archive_root else archive_dir, staging_dir)
+
+        if os.path.isdir(install_dir):
+            _link_missing(install_dir, staging_dir)
+        _swap_dir(staging_dir, install_dir)
+    finally:
+        for temp_dir in [staging_dir] + archive_dirs:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    LOGGER.info("Install archives completed.", installed_dir=install_dir)
     return install_dir
 
 
@@ -9,6 +9,7 @@ import logging
 import os
 import re
 import sys
+from concurrent import futures
 
 import structlog
 import yaml
@@ -58,6 +59,8 @@ class SetupMultiversion(Subcommand):
         self.download_binaries = options.download_binaries
         self.download_symbols = options.download_symbols
         self.download_artifacts = options.download_artifacts
+        self.parallel_downloads = options.parallel_downloads
+        self.cache = download.ArtifactCache(options.cache_dir) if options.cache_dir else None
 
         self.evg_api = evergreen_conn.get_evergreen_api(options.evergreen_config)
         # In evergreen github oauth token is stored as `token ******`, so we remove the leading part
@@ -84,6 +87,7 @@ class SetupMultiversion(Subcommand):
     def execute(self):
         """Execute setup multiversion mongodb."""
 
+        setup_args = {}
         for version in self.versions:
             LOGGER.info("Setting up version.", version=version)
             LOGGER.info("Fetching download URL from Evergreen.")
@@ -111,17 +115,29 @@ class SetupMultiversion(Subcommand):
                 # Give each version a unique install dir
                 install_dir = os.path.join(self.install_dir, version)
 
-                self.setup_mongodb(artifacts_url, binaries_url, download_symbols_url, install_dir,
-                                   bin_suffix)
+                setup_args[version] = (artifacts_url, binaries_url, download_symbols_url,
+                                       install_dir, bin_suffix)
 
             except (github_conn.GithubConnError, evergreen_conn.EvergreenConnError,
                     download.DownloadError) as ex:
                 LOGGER.error(ex)
                 exit(1)
 
-            else:
-                LOGGER.info("Setup version completed.", version=version)
-                LOGGER.info("-" * 50)
+        # The versions are downloaded concurrently, as are the archives of each version.
+        with futures.ThreadPoolExecutor(max_workers=self.parallel_downloads) as executor:
+            pending = {
+                executor.submit(self.setup_mongodb, *args): version
+                for (version, args) in setup_args.items()
+            }
+            for future in futures.as_completed(pending):
+                try:
+                    future.result()
+                except download.DownloadError as ex:
+                    LOGGER.error(ex)
+                    sys.exit(1)
+                else:
+                    LOGGER.info("Setup version completed.", version=pending[future])
+                    LOGGER.info("-" * 50)
 
     def get_latest_urls(self, version):
         """Return latest urls."""
@@ -182,11 +198,8 @@ class SetupMultiversion(Subcommand):
         # pylint: disable=too-many-arguments
         """Download, extract and symlink."""
 
-        for url in [artifacts_url, binaries_url, symbols_url]:
-            if url is not None:
-                tarball = download.download_from_s3(url)
-                download.extract_archive(tarball, install_dir)
-                os.remove(tarball)
+        urls = [url for url in [artifacts_url, binaries_url, symbols_url] if url is not None]
+        download.install_archives(urls, install_dir, self.cache)
 
         if binaries_url is not None:
             download.symlink_version(bin_suffix, install_dir, self.link_dir)
@@ -265,6 +278,13 @@ class SetupMultiversionPlugin(PluginInterface):
         parser.add_argument("-da", "--downloadArtifacts", dest="download_artifacts",
                             action="store_true", default=False,
                             help="whether to download artifacts.")
+        parser.add_argument(
+            "-cd", "--cacheDir", dest="cache_dir", default=None,
+            help="Directory to cache the downloaded archives in, keyed by their URL. Archives found"
+            " in the cache aren't downloaded again. By default nothing is cached.")
+        parser.add_argument(
+            "-pd", "--parallelDownloads", dest="parallel_downloads", type=int, default=4,
+            help="Maximum number of versions to download at the same time, [default: %(default)s].")
         parser.add_argument(
             "-ec", "--evergreenConfig", dest="evergreen_config",
             help="Location of evergreen configuration file. If not specified it will look "
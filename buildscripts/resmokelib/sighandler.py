@@ -103,6 +103,21 @@ def register(logger, suites, start_time):
         signal.signal(signal.SIGUSR1, _handle_sigusr1)
 
 
+def register_job_process(logger):
+    """Register a signal handler for SIGUSR1 in a process forked to run a Job.
+
+    The handler only dumps the stacks of all threads. The report file, suite summaries, and the
+    analysis of subprocesses are left to the signal handler of the resmoke.py process.
+    """
+
+    def _handle_sigusr1(signum, frame):  # pylint: disable=unused-argument
+        """Signal handler for SIGUSR1."""
+        _dump_stacks(logger, "Dumping stacks of job process due to SIGUSR1 signal")
+
+    if not _IS_WINDOWS:
+        signal.signal(signal.SIGUSR1, _handle_sigusr1)
+
+
 def _dump_stacks(logger, header_msg):
     """Signal handler that will dump the stacks of all threads."""
 
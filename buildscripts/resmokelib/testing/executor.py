@@ -8,13 +8,18 @@ from buildscripts.resmokelib import errors
 from buildscripts.resmokelib import logging
 from buildscripts.resmokelib import utils
 from buildscripts.resmokelib.core import network
+from buildscripts.resmokelib.core import tmpfs
+from buildscripts.resmokelib.logging import analysis as _log_analysis
 from buildscripts.resmokelib.testing import fixtures
 from buildscripts.resmokelib.testing import hook_test_archival as archival
 from buildscripts.resmokelib.testing import hooks as _hooks
 from buildscripts.resmokelib.testing import job as _job
+from buildscripts.resmokelib.testing import job_process as _job_process
 from buildscripts.resmokelib.testing import report as _report
 from buildscripts.resmokelib.testing import testcases
+from buildscripts.resmokelib.testing.fixtures import startup_telemetry
 from buildscripts.resmokelib.testing.queue_element import queue_elem_factory
+from buildscripts.resmokelib.utils import timeline
 from buildscripts.resmokelib.utils.queue import Queue
 
 
@@ -47,6 +52,7 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
         self.test_config = utils.default_if_none(config, {})
 
         self.archival = None
+        self._archive_instance = archive_instance
         if archive_instance:
             self.archival = archival.HookTestArchival(suite, self.hooks_config, archive_instance,
                                                       archive)
@@ -55,8 +61,11 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
         self.num_tests = len(suite.tests) * suite.options.num_repeat_tests
         self.test_queue_logger = logging.loggers.new_testqueue_logger(suite.test_kind)
 
+        # The fixtures of the previous test suite were torn down, so the tmpfs they used is free.
+        tmpfs.TmpfsAllocator.reset()
         # Must be done after getting buildlogger configuration.
         self._jobs = self._create_jobs(self.num_tests)
+        self._job_processes = None
 
     def _num_jobs_to_start(self, suite, num_tests):
         """
@@ -103,12 +112,11 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
         # We reset the internal state of the PortAllocator so that ports used by the fixture during
         # a test suite run earlier can be reused during this current test suite.
         network.PortAllocator.reset()
+        self._start_job_processes()
         teardown_flag = None
         try:
             num_repeat_suites = self._suite.options.num_repeat_suites
             while num_repeat_suites > 0:
-                test_queue = self._make_test_queue()
-
                 partial_reports = [job.report for job in self._jobs]
                 self._suite.record_test_start(partial_reports)
 
@@ -117,7 +125,7 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
                 # still running if an Evergreen task were to time out from a hang/deadlock being
                 # triggered.
                 teardown_flag = threading.Event() if num_repeat_suites == 1 else None
-                (report, interrupted) = self._run_tests(test_queue, setup_flag, teardown_flag)
+                (report, interrupted) = self._run_suite(setup_flag, teardown_flag)
 
                 self._suite.record_test_end(report)
 
@@ -135,9 +143,7 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
                 if teardown_flag and teardown_flag.is_set():
                     return_code = 2
 
-                sb = []  # String builder.
-                self._suite.summarize_latest(sb)
-                self.logger.info("Summary of latest execution: %s", "\n    ".join(sb))
+                self._log_latest_execution(report)
 
                 if not report.wasSuccessful():
                     return_code = 1
@@ -157,11 +163,54 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
                     job.report.reset()
                 num_repeat_suites -= 1
         finally:
-            if not teardown_flag:
-                if not self._teardown_fixtures():
-                    return_code = 2
+            if not self._finish_run(teardown_flag):
+                return_code = 2
             self._suite.return_code = return_code
 
+    def _start_job_processes(self):
+        """Fork a process for each Job instance if they are run in processes of their own."""
+        if _config.EXECUTOR_MODE != "process":
+            return
+        # Each Job is run in a process of its own, forked after the PortAllocator is reset so that
+        # it owns the range of ports for its job number.
+        self._job_processes = _job_process.JobProcessPool(self.logger, self._jobs,
+                                                          self._create_queue_elem_for_test_name,
+                                                          archive_instance=self._archive_instance)
+        self._job_processes.start()
+
+    def _finish_run(self, teardown_flag):
+        """Tear down the fixtures unless the jobs already did, then stop the job processes.
+
+        Returns false if any of the fixtures failed to be torn down, and
+        true otherwise.
+        """
+        try:
+            return bool(teardown_flag) or self._teardown_fixtures()
+        finally:
+            if self._job_processes is not None:
+                self._job_processes.stop()
+                self._job_processes = None
+
+    def _run_suite(self, setup_flag, teardown_flag):
+        """Run all of the tests of the suite once, in the job threads or the job processes.
+
+        Returns a (combined report, user interrupted) pair, the same as
+        _run_tests().
+        """
+        with timeline.span(self._suite.get_display_name(), "suite", num_jobs=len(self._jobs)):
+            if self._job_processes is None:
+                return self._run_tests(self._make_test_queue(), setup_flag, teardown_flag)
+            return self._run_tests_in_processes(setup_flag, teardown_flag)
+
+    def _log_latest_execution(self, report):
+        """Log the summary of the latest execution of the suite."""
+        sb = []  # String builder.
+        self._suite.summarize_latest(sb)
+        self.logger.info("Summary of latest execution: %s", "\n    ".join(sb))
+        if _config.DBPATH_TMPFS is not None:
+            self._log_dbpath_storage_runtimes(report)
+        self._log_fixture_startup_phases(report)
+
     def _run_tests(self, test_queue, setup_flag, teardown_flag):
         """Start a thread for each Job instance and block until all of the tests are run.
 
@@ -220,12 +269,30 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
         # StopExecution exception in TestSuiteExecutor.run() if the user triggered the interrupt.
         return (combined_report, user_interrupted)
 
+    def _run_tests_in_processes(self, setup_flag, teardown_flag):
+        """Run the tests in the process of each Job instance and block until all of them are run.
+
+        Returns a (combined report, user interrupted) pair, the same as
+        _run_tests().
+        """
+
+        user_interrupted = self._job_processes.run_tests(
+            self._make_test_names(), setup_flag, teardown_flag, stagger_jobs=_config.STAGGER_JOBS)
+        self.logger.debug("Job processes are completed!")
+
+        reports = [job.report for job in self._jobs]
+        combined_report = _report.TestReport.combine(*reports)
+        return (combined_report, user_interrupted)
+
     def _teardown_fixtures(self):
         """Tear down all of the fixtures.
 
         Returns true if all fixtures were torn down successfully, and
         false otherwise.
         """
+        if self._job_processes is not None:
+            return self._job_processes.teardown_fixtures()
+
         success = True
         for job in self._jobs:
             if not job.manager.teardown_fixture(self.logger):
@@ -234,6 +301,31 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
                 success = False
         return success
 
+    def _log_dbpath_storage_runtimes(self, report):
+        """Log how long the tests took with their dbpath on the tmpfs versus on disk."""
+        summary = tmpfs.summarize_runtimes(report.test_infos)
+        for storage in (tmpfs.TMPFS, tmpfs.DISK):
+            if storage in summary:
+                self.logger.info(
+                    "%d test(s) ran with their dbpath on %s, taking %0.2f seconds on"
+                    " average.", summary[storage]["num_tests"], storage,
+                    summary[storage]["mean_secs"])
+        if "delta_secs" in summary:
+            self.logger.info(
+                "Tests took %0.2f seconds longer on average with their dbpath on disk.",
+                summary["delta_secs"])
+
+    def _log_fixture_startup_phases(self, report):
+        """Log how long each phase of the startup of the fixture's nodes took across the run."""
+        summary = startup_telemetry.summarize(report.test_infos)
+        for (process_kind, phases) in sorted(summary.items()):
+            for (phase, phase_summary) in phases.items():
+                self.logger.info(
+                    "The %s %s phase took %0.3f seconds on average, %0.3f seconds at the median"
+                    " and %0.3f seconds at most over %d startup(s).", process_kind, phase,
+                    phase_summary["mean_secs"], phase_summary["p50_secs"],
+                    phase_summary["max_secs"], phase_summary["count"])
+
     def _make_fixture(self, job_num):
         """Create a fixture for a job."""
 
@@ -243,6 +335,14 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
             fixture_config = self.fixture_config.copy()
             fixture_class = fixture_config.pop("class")
 
+        if _config.DBPATH_TMPFS is not None:
+            num_nodes = tmpfs.estimate_num_nodes(fixture_class, fixture_config)
+            if tmpfs.TmpfsAllocator.place(job_num, num_nodes) is None:
+                self.logger.info(
+                    "The %d node(s) of the fixture of job %d don't fit within the tmpfs budget"
+                    " with %d MB already reserved, so their dbpaths are on disk.", num_nodes,
+                    job_num, tmpfs.TmpfsAllocator.get_reserved_mb())
+
         fixture_logger = logging.loggers.new_fixture_logger(fixture_class, job_num)
 
         return fixtures.make_fixture(fixture_class, fixture_logger, job_num, **fixture_config)
@@ -276,8 +376,20 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
 
         report = _report.TestReport(job_logger, self._suite.options, job_num)
 
+        log_analysis = None
+        if _config.FIXTURE_LOG_ANALYZERS:
+            # The output of the fixture's processes is logged to children of the fixture's logger.
+            log_analysis = _log_analysis.make_analysis_handler(_config.FIXTURE_LOG_ANALYZERS)
+            fixture.logger.addHandler(log_analysis)
+
+        dbpath_storage = None
+        if _config.DBPATH_TMPFS is not None:
+            on_tmpfs = tmpfs.TmpfsAllocator.get_dbpath_prefix(job_num) is not None
+            dbpath_storage = tmpfs.TMPFS if on_tmpfs else tmpfs.DISK
+
         return _job.Job(job_num, job_logger, fixture, hooks, report, self.archival,
-                        self._suite.options, self.test_queue_logger)
+                        self._suite.options, self.test_queue_logger, log_analysis=log_analysis,
+                        dbpath_storage=dbpath_storage)
 
     def _num_times_to_repeat_tests(self):
         """
@@ -318,13 +430,25 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
         queue = Queue()
 
         # Put all the test cases in a queue.
-        for _ in range(self._num_times_to_repeat_tests()):
-            for test_name in self._suite.tests:
-                queue_elem = self._create_queue_elem_for_test_name(test_name)
-                queue.put(queue_elem)
+        for test_name in self._make_test_names():
+            queue_elem = self._create_queue_elem_for_test_name(test_name)
+            queue.put(queue_elem)
 
         return queue
 
+    def _make_test_names(self):
+        """
+        Create the list of test names to run, in the order they are queued.
+
+        Each test is listed once for each time it is repeated.
+
+        :return: List of test names.
+        """
+        test_names = []
+        for _ in range(self._num_times_to_repeat_tests()):
+            test_names.extend(self._suite.tests)
+        return test_names
+
     def _log_timeout_warning(self, seconds):
         """Log a message if any thread fails to terminate after `seconds`."""
         self.logger.warning(
@@ -14,6 +14,7 @@ from buildscripts.resmokelib import errors
 from buildscripts.resmokelib import logging
 from buildscripts.resmokelib import multiversionconstants as multiversion
 from buildscripts.resmokelib import utils
+from buildscripts.resmokelib.core import tmpfs
 from buildscripts.resmokelib.utils import registry
 
 _FIXTURES = {}  # type: ignore
@@ -65,7 +66,9 @@ class Fixture(object, metaclass=registry.make_registry_metaclass(_FIXTURES)):
         self.logger = logger
         self.job_num = job_num
 
-        dbpath_prefix = utils.default_if_none(config.DBPATH_PREFIX, dbpath_prefix)
+        dbpath_prefix = utils.default_if_none(
+            tmpfs.TmpfsAllocator.get_dbpath_prefix(self.job_num), config.DBPATH_PREFIX,
+            dbpath_prefix)
         dbpath_prefix = utils.default_if_none(dbpath_prefix, config.DEFAULT_DBPATH_PREFIX)
         self._dbpath_prefix = os.path.join(dbpath_prefix, "job{}".format(self.job_num))
 
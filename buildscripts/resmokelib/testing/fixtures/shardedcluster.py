@@ -15,6 +15,7 @@ from buildscripts.resmokelib.multiversionconstants import LAST_LTS_MONGOS_BINARY
 from buildscripts.resmokelib.testing.fixtures import interface
 from buildscripts.resmokelib.testing.fixtures import replicaset
 from buildscripts.resmokelib.testing.fixtures import standalone
+from buildscripts.resmokelib.testing.fixtures import startup_telemetry
 from buildscripts.resmokelib.utils import registry
 
 
@@ -374,6 +375,7 @@ class _MongoSFixture(interface.Fixture):
         self.mongos = None
         self.port = None
         self._dbpath_prefix = dbpath_prefix
+        self._startup_telemetry = None
 
     def setup(self):
         """Set up the sharded cluster."""
@@ -388,6 +390,15 @@ class _MongoSFixture(interface.Fixture):
 
         mongos = core.programs.mongos_program(
             self.logger, self.job_num, executable=self.mongos_executable, **self.mongos_options)
+
+        if self._startup_telemetry is not None:
+            # The previous mongos never became ready.
+            self._startup_telemetry.stop()
+        self._startup_telemetry = None
+        if "logpath" not in self.mongos_options:
+            self._startup_telemetry = startup_telemetry.StartupTelemetry(
+                self.logger, self.job_num, "mongos", startup_telemetry.MONGOS_PHASES)
+
         try:
             self.logger.info("Starting mongos on port %d...\n%s", self.port, mongos.as_command())
             mongos.start()
@@ -439,6 +450,10 @@ class _MongoSFixture(interface.Fixture):
 
         self.logger.info("Successfully contacted the mongos on port %d.", self.port)
 
+        if self._startup_telemetry is not None:
+            self._startup_telemetry.finish(self.port)
+            self._startup_telemetry = None
+
     def _do_teardown(self, mode=None):
         if self.mongos is None:
             self.logger.warning("The mongos fixture has not been set up yet.")
@@ -12,6 +12,7 @@ from buildscripts.resmokelib import core
 from buildscripts.resmokelib import errors
 from buildscripts.resmokelib import utils
 from buildscripts.resmokelib.testing.fixtures import interface
+from buildscripts.resmokelib.testing.fixtures import startup_telemetry
 
 
 class MongoDFixture(interface.Fixture):
@@ -50,6 +51,7 @@ class MongoDFixture(interface.Fixture):
 
         self.mongod = None
         self.port = None
+        self._startup_telemetry = None
 
     def setup(self):
         """Set up the mongod."""
@@ -68,6 +70,15 @@ class MongoDFixture(interface.Fixture):
 
         mongod = core.programs.mongod_program(
             self.logger, self.job_num, executable=self.mongod_executable, **self.mongod_options)
+
+        if self._startup_telemetry is not None:
+            # The previous mongod never became ready.
+            self._startup_telemetry.stop()
+        self._startup_telemetry = None
+        if "logpath" not in self.mongod_options:
+            self._startup_telemetry = startup_telemetry.StartupTelemetry(
+                self.logger, self.job_num, "mongod", startup_telemetry.MONGOD_PHASES)
+
         try:
             self.logger.info("Starting mongod on port %d...\n%s", self.port, mongod.as_command())
             mongod.start()
@@ -118,6 +129,10 @@ class MongoDFixture(interface.Fixture):
 
         self.logger.info("Successfully contacted the mongod on port %d.", self.port)
 
+        if self._startup_telemetry is not None:
+            self._startup_telemetry.finish(self.port)
+            self._startup_telemetry = None
+
     def _do_teardown(self, mode=None):
         if self.mongod is None:
             self.logger.warning("The mongod fixture has not been set up yet.")
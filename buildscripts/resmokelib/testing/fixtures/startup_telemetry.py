@@ -0,0 +1,195 @@
+"""Measure how long each phase of the startup of the mongod and mongos processes of a fixture takes.
+
+A StartupTelemetry handler is attached to the logger of a node while it starts up. It picks the
+timestamps of a few milestones out of the logv2 lines the node logs, from which the duration of
+each phase of the startup is computed once the node is accepting connections. The phases of each
+node started during a test are recorded in the report.json file, and resmoke.py logs how long
+each phase took across the whole run at the end of the suite.
+"""
+
+import datetime
+import json
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+
+from buildscripts.resmokelib.utils import stats
+
+# The milestones of the startup of a mongod or mongos process, in the order they are logged.
+STARTING = "starting"
+STORAGE_ENGINE_OPENING = "storage_engine_opening"
+STORAGE_ENGINE_OPENED = "storage_engine_opened"
+DIAGNOSTICS_STARTED = "diagnostics_started"
+LISTENING = "listening"
+
+# The log ids of the lines marking each milestone.
+_MILESTONE_LOG_IDS = {
+    4615611: STARTING,  # "MongoDB starting", only logged by mongod.
+    23403: STARTING,  # "Build Info", the first line logged by mongos.
+    22315: STORAGE_ENGINE_OPENING,  # "Opening WiredTiger"
+    4795906: STORAGE_ENGINE_OPENED,  # "WiredTiger opened"
+    20625: DIAGNOSTICS_STARTED,  # "Initializing full-time diagnostic data capture"
+    23016: LISTENING,  # "Waiting for connections"
+}
+
+# The phases of the startup of a mongod, each of which is the time between two milestones. A phase
+# is left out when the node doesn't log either of its milestones, e.g. the storage engine phases
+# with the inMemory storage engine.
+#   - storage_engine_init: opening WiredTiger, which includes its own recovery from the journal.
+#   - recovery: the startup recovery of the databases, e.g. rebuilding missing indexes and
+#     truncating the oplog, up until the diagnostic data capture starts.
+#   - replication_startup: starting the replication coordinator and the sharding components, up
+#     until the node listens for connections.
+#   - listening: the whole time from the start of the process until it listens for connections.
+MONGOD_PHASES = [
+    ("storage_engine_init", STORAGE_ENGINE_OPENING, STORAGE_ENGINE_OPENED),
+    ("recovery", STORAGE_ENGINE_OPENED, DIAGNOSTICS_STARTED),
+    ("replication_startup", DIAGNOSTICS_STARTED, LISTENING),
+    ("listening", STARTING, LISTENING),
+]
+
+MONGOS_PHASES = [
+    ("listening", STARTING, LISTENING),
+]
+
+# How long to wait for the LoggerPipe to hand over the "Waiting for connections" line after the node
+# accepted a connection.
+_LISTENING_TIMEOUT_SECS = 1.0
+
+_LOG_ID_REGEX = re.compile(r'"id":(\d+),')
+
+
+def _parse_timestamp(entry):
+    """Return the time in seconds since the epoch at which the logv2 'entry' was logged."""
+    timestamp = entry["t"]["$date"]
+    if timestamp.endswith("Z"):
+        timestamp = timestamp[:-1] + "+00:00"
+    return datetime.datetime.fromisoformat(timestamp).timestamp()
+
+
+class StartupTelemetry(logging.Handler):
+    """Collect the timestamps of the startup milestones logged by a node."""
+
+    def __init__(self, logger, job_num, process_kind, phases):
+        """Initialize StartupTelemetry and attach it to 'logger', the logger of the node.
+
+        :param logger: the logger the output of the node is logged to.
+        :param job_num: the job running the fixture the node belongs to.
+        :param process_kind: either "mongod" or "mongos".
+        :param phases: a list of (phase, start milestone, end milestone) tuples.
+        """
+        logging.Handler.__init__(self)
+        self.logger = logger
+        self.job_num = job_num
+        self.process_kind = process_kind
+        self.phases = phases
+        self.start_time = time.time()
+        self.milestones = {}
+        self._listening = threading.Event()
+        self.logger.addHandler(self)
+
+    def emit(self, record):
+        """Record the timestamp of the milestone logged by 'record', if any."""
+        line = record.getMessage()
+        match = _LOG_ID_REGEX.search(line)
+        if match is None or int(match.group(1)) not in _MILESTONE_LOG_IDS:
+            return
+
+        try:
+            timestamp = _parse_timestamp(json.loads(line))
+        except (ValueError, KeyError, TypeError):
+            return
+
+        # The first of the lines marking a milestone, e.g. STARTING, is the one that counts.
+        milestone = _MILESTONE_LOG_IDS[int(match.group(1))]
+        self.milestones.setdefault(milestone, timestamp)
+        if milestone == LISTENING:
+            self._listening.set()
+
+    def get_phases(self):
+        """Return the duration in seconds of each phase whose milestones were both logged."""
+        phases = {}
+        for (phase, start_milestone, end_milestone) in self.phases:
+            if start_milestone in self.milestones and end_milestone in self.milestones:
+                phases[phase] = self.milestones[end_milestone] - self.milestones[start_milestone]
+        return phases
+
+    def stop(self):
+        """Detach from the logger of the node without recording anything."""
+        self.logger.removeHandler(self)
+
+    def finish(self, port):
+        """Detach from the logger of the node once it is ready and record how its startup went.
+
+        The phases are logged and kept as a startup record for the job's current test. Returns the
+        record, or None if the node didn't log any of the milestones, e.g. because it logs to a
+        file.
+        """
+        ready_secs = time.time() - self.start_time
+        # The node logs that it's listening before it accepts connections, but the line may still
+        # be on its way through the LoggerPipe.
+        if self.milestones:
+            self._listening.wait(_LISTENING_TIMEOUT_SECS)
+        self.stop()
+
+        phases = self.get_phases()
+        if not phases:
+            return None
+
+        self.logger.info(
+            "%s on port %d was ready after %0.2f seconds. Startup phases: %s.", self.process_kind,
+            port, ready_secs, ", ".join(
+                "{} {:0.3f}s".format(phase, secs) for (phase, secs) in phases.items()))
+        record = {
+            "node": self.logger.name,
+            "process": self.process_kind,
+            "port": port,
+            "ready_secs": ready_secs,
+            "phases": phases,
+        }
+        StartupRecords.add(self.job_num, record)
+        return record
+
+
+class StartupRecords(object):
+    """The startup records of the nodes started by the fixture of each job."""
+
+    _LOCK = threading.Lock()
+    _RECORDS = defaultdict(list)  # type: ignore
+
+    @classmethod
+    def add(cls, job_num, record):
+        """Keep the startup 'record' of a node of the fixture of 'job_num'."""
+        with cls._LOCK:
+            cls._RECORDS[job_num].append(record)
+
+    @classmethod
+    def take(cls, job_num):
+        """Return the records of the nodes started since the previous call, or None."""
+        with cls._LOCK:
+            return cls._RECORDS.pop(job_num, None)
+
+
+def summarize(test_infos):
+    """Return the count, mean, median and max duration of each startup phase by process kind."""
+    durations = defaultdict(lambda: defaultdict(list))
+    for test_info in test_infos:
+        for record in test_info.fixture_startup or []:
+            for (phase, secs) in record["phases"].items():
+                durations[record["process"]][phase].append(secs)
+            durations[record["process"]]["ready"].append(record["ready_secs"])
+
+    summary = {}
+    for (process_kind, phase_durations) in durations.items():
+        summary[process_kind] = {}
+        for (phase, secs) in phase_durations.items():
+            secs = sorted(secs)
+            summary[process_kind][phase] = {
+                "count": len(secs),
+                "mean_secs": sum(secs) / len(secs),
+                "p50_secs": stats.percentile(secs, 50),
+                "max_secs": secs[-1],
+            }
+    return summary
@@ -7,6 +7,7 @@ from buildscripts.resmokelib import config
 from buildscripts.resmokelib import errors
 from buildscripts.resmokelib import utils
 from buildscripts.resmokelib.utils import globstar
+from buildscripts.resmokelib.utils import timeline
 
 
 class HookTestArchival(object):
@@ -126,8 +127,9 @@ class HookTestArchival(object):
         display_name = "Data files {} - Execution {} Repetition {}".format(
             test_name, config.EVERGREEN_EXECUTION, self._tests_repeat[test_name])
         logger.info("Archiving data files for test %s from %s", test_name, input_files)
-        status, message = self.archive_instance.archive_files_to_s3(display_name, input_files,
-                                                                    s3_bucket, s3_path)
+        with timeline.span("archival", "archival", manager.job_num, test_file=test_name):
+            status, message = self.archive_instance.archive_files_to_s3(
+                display_name, input_files, s3_bucket, s3_path)
         if status:
             logger.warning("Archive failed for %s: %s", test_name, message)
         else:
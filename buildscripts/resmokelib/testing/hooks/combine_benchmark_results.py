@@ -6,6 +6,7 @@ import json
 
 from buildscripts.resmokelib import config as _config
 from buildscripts.resmokelib.testing.hooks import interface
+from buildscripts.resmokelib.utils import stats
 
 
 class CombineBenchmarkResults(interface.Hook):
@@ -43,7 +44,11 @@ class CombineBenchmarkResults(interface.Hook):
 
         with open(bm_report_path, "r") as report_file:
             report_dict = json.load(report_file)
-            self._parse_report(report_dict)
+
+        if _config.BENCHMARK_WARMUP_REPETITIONS:
+            report_dict["benchmarks"] = _discard_warmup_repetitions(
+                report_dict["benchmarks"], _config.BENCHMARK_WARMUP_REPETITIONS)
+        self._parse_report(report_dict)
 
     def before_suite(self, test_report):
         """Set suite start time."""
@@ -56,6 +61,8 @@ class CombineBenchmarkResults(interface.Hook):
 
         self.end_time = datetime.datetime.now()
         report = self._generate_perf_plugin_report()
+        if _config.BENCHMARK_BASELINE_FILE is not None:
+            self._compare_to_baseline(report, _config.BENCHMARK_BASELINE_FILE)
         with open(self.report_file, "w") as fh:
             json.dump(report, fh)
 
@@ -78,6 +85,57 @@ class CombineBenchmarkResults(interface.Hook):
 
         return perf_report
 
+    def _compare_to_baseline(self, report, baseline_file):
+        """Add how each result changed since the baseline report to 'report'.
+
+        Each thread count found in the baseline report gets a "baseline" entry with the
+        "ops_per_sec" of the baseline, the "change_percent" since then, positive if the benchmark
+        got faster, and whether the change is "significant".
+        """
+        try:
+            with open(baseline_file, "r") as fh:
+                baseline_report = json.load(fh)
+        except (IOError, ValueError) as err:
+            self.logger.error("Not comparing the benchmarks against the baseline file '%s': %s",
+                              baseline_file, err)
+            return
+
+        baseline_results = {
+            result["name"]: result["results"]
+            for result in baseline_report["results"]
+        }
+        for result in report["results"]:
+            baseline_threads = baseline_results.get(result["name"], {})
+            for (thread_count, thread_report) in result["results"].items():
+                baseline_thread_report = baseline_threads.get(str(thread_count))
+                if baseline_thread_report is None:
+                    continue
+
+                baseline = self._get_baseline_change(baseline_thread_report, thread_report)
+                thread_report["baseline"] = baseline
+                change_percent = baseline["change_percent"]
+                if baseline["significant"] and change_percent is not None:
+                    self.logger.warning("%s with %s thread(s) %s by %.2f%% since the baseline.",
+                                        result["name"], thread_count,
+                                        "improved" if change_percent > 0 else "regressed",
+                                        abs(change_percent))
+
+    @staticmethod
+    def _get_baseline_change(baseline_thread_report, thread_report):
+        """Return how the results of a thread count changed since the baseline report."""
+        baseline_ops_per_sec = baseline_thread_report["ops_per_sec"]
+        change_percent = None
+        if baseline_ops_per_sec != 0:
+            change_percent = 100.0 * (
+                thread_report["ops_per_sec"] - baseline_ops_per_sec) / abs(baseline_ops_per_sec)
+        significant = stats.is_significant_change(baseline_thread_report["ops_per_sec_values"],
+                                                  thread_report["ops_per_sec_values"])
+        return {
+            "ops_per_sec": baseline_ops_per_sec,
+            "change_percent": change_percent,
+            "significant": significant,
+        }
+
     def _parse_report(self, report_dict):
         context = report_dict["context"]
 
@@ -93,6 +151,25 @@ class CombineBenchmarkResults(interface.Hook):
             self.benchmark_reports[bm_name_obj.base_name].add_report(bm_name_obj, benchmark_res)
 
 
+def _discard_warmup_repetitions(benchmarks, num_warmup_repetitions):
+    """Return the Benchmark results other than the first repetitions of each benchmark."""
+    num_repetitions_seen = collections.Counter()
+    kept = []
+    for benchmark_res in benchmarks:
+        # Google Benchmark reports each repetition in turn before the statistics it computed over
+        # them, unless the repetitions are interleaved, in which case they are numbered.
+        if "repetition_index" in benchmark_res:
+            repetition_index = benchmark_res["repetition_index"]
+        else:
+            repetition_index = num_repetitions_seen[benchmark_res["name"]]
+            num_repetitions_seen[benchmark_res["name"]] += 1
+
+        if benchmark_res.get("run_type") == "aggregate" or \
+                repetition_index >= num_warmup_repetitions:
+            kept.append(benchmark_res)
+    return kept
+
+
 # Capture information from a Benchmark name in a logical format.
 _BenchmarkName = collections.namedtuple("_BenchmarkName",
                                         ["base_name", "thread_count", "statistic_type"])
@@ -178,6 +255,11 @@ class _BenchmarkThreadsReport(object):
                 thread_report["ops_per_sec_values"].append(-1 * report["cpu_time"])
             thread_report["ops_per_sec"] = sum(thread_report["ops_per_sec_values"]) / len(reports)
 
+            summary = stats.summarize(thread_report["ops_per_sec_values"])
+            thread_report["ops_per_sec_median"] = summary["median"]
+            thread_report["ops_per_sec_iqr"] = summary["iqr"]
+            thread_report["ops_per_sec_ci_95"] = summary["ci_95"]
+
             res[thread_count] = thread_report
 
         return res
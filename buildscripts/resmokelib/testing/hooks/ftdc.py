@@ -0,0 +1,217 @@
+"""Test hook for summarizing the FTDC metrics of the fixture's mongod processes for each test.
+
+The summary covers the samples mongod took while the test was running. mongod only writes the
+samples of the chunk it is collecting to the metrics.interim file every
+'diagnosticDataCollectionSamplesPerInterimUpdate' samples, so suites which have many short tests
+should lower that server parameter in order for the summary to cover the end of each test.
+"""
+
+import os
+import time
+import zlib
+
+import bson.errors
+
+from buildscripts.resmokelib.testing.hooks import interface
+from buildscripts.resmokelib.utils import ftdc
+
+# Metrics that are summarized by how much they changed over the course of the test.
+_DELTA_METRICS = [
+    ("opcounters.insert", "serverStatus.opcounters.insert"),
+    ("opcounters.query", "serverStatus.opcounters.query"),
+    ("opcounters.update", "serverStatus.opcounters.update"),
+    ("opcounters.delete", "serverStatus.opcounters.delete"),
+    ("opcounters.getmore", "serverStatus.opcounters.getmore"),
+    ("opcounters.command", "serverStatus.opcounters.command"),
+    ("wiredTiger.cache.bytes_read", "serverStatus.wiredTiger.cache.bytes read into cache"),
+    ("wiredTiger.cache.bytes_written", "serverStatus.wiredTiger.cache.bytes written from cache"),
+    ("wiredTiger.cache.pages_evicted_by_application",
+     "serverStatus.wiredTiger.cache.pages evicted by application threads"),
+]
+
+# Metrics that are summarized by their maximum value over the course of the test.
+_MAX_METRICS = [
+    ("wiredTiger.cache.max_dirty_bytes",
+     "serverStatus.wiredTiger.cache.tracked dirty bytes in the cache"),
+    ("tickets.max_read_out", "serverStatus.wiredTiger.concurrentTransactions.read.out"),
+    ("tickets.max_write_out", "serverStatus.wiredTiger.concurrentTransactions.write.out"),
+]
+
+_MEMBERS_PREFIX = "replSetGetStatus.members."
+_PRIMARY_STATE = 1
+_SECONDARY_STATE = 2
+
+_SUMMARIZED_METRICS = {metric for (_, metric) in _DELTA_METRICS + _MAX_METRICS}
+
+
+def _is_summarized_metric(metric):
+    """Return True if 'metric' contributes to the summary of a test."""
+    if metric in _SUMMARIZED_METRICS:
+        return True
+    return metric.startswith(_MEMBERS_PREFIX) and metric.endswith((".state", ".optimeDate"))
+
+
+def _now_millis():
+    return int(time.time() * 1000)
+
+
+class FTDCMetrics(interface.Hook):
+    """Record how the FTDC metrics of the fixture's mongod processes changed during each test.
+
+    The opcounters, WiredTiger cache activity, ticket usage, and replication lag of each mongod are
+    recorded for the test in the report.json file.
+    """
+
+    def __init__(self, hook_logger, fixture):
+        """Initialize FTDCMetrics."""
+        description = "Summarize the FTDC metrics of each mongod for each test"
+        interface.Hook.__init__(self, hook_logger, fixture, description)
+        self._nodes = {}
+        self._test_start_millis = None
+
+    def before_test(self, test, test_report):
+        """Record the time at which 'test' starts."""
+        self._test_start_millis = _now_millis()
+
+    def after_test(self, test, test_report):
+        """Record the summary of the FTDC metrics for 'test'."""
+        if self._test_start_millis is None:
+            return
+
+        test_end_millis = _now_millis()
+        dbpath_prefix = self.fixture.get_dbpath_prefix()
+
+        summaries = {}
+        for diagnostic_dir in ftdc.find_diagnostic_dirs(dbpath_prefix):
+            if diagnostic_dir not in self._nodes:
+                self._nodes[diagnostic_dir] = _NodeMetrics(diagnostic_dir)
+
+            node_name = os.path.relpath(os.path.dirname(diagnostic_dir), dbpath_prefix)
+            if node_name == os.curdir:
+                node_name = os.path.basename(dbpath_prefix)
+
+            try:
+                summary = self._nodes[diagnostic_dir].summarize(self._test_start_millis,
+                                                                test_end_millis)
+            except (IOError, OSError, ValueError, zlib.error, bson.errors.BSONError) as err:
+                # The metrics are informational, so they shouldn't cause the test to fail.
+                self.logger.warning("Failed to read the FTDC metrics of %s: %s", node_name, err)
+                continue
+
+            if summary is not None:
+                summaries[node_name] = summary
+
+        self._test_start_millis = None
+        if summaries:
+            self.logger.info("FTDC metrics of %s: %s", test.short_description(), summaries)
+            test_report.find_test_info(test).ftdc_metrics = summaries
+
+
+class _NodeMetrics(object):
+    """The samples read so far from the 'diagnostic.data' directory of a mongod."""
+
+    def __init__(self, diagnostic_dir):
+        """Initialize the _NodeMetrics."""
+        self._diagnostic_dir = diagnostic_dir
+        self._readers = {}
+        self._chunks = []
+
+    def _read_chunks(self):
+        """Return the chunks written so far, including the one being collected."""
+        for pathname in ftdc.list_metrics_files(self._diagnostic_dir):
+            if pathname not in self._readers:
+                self._readers[pathname] = ftdc.FileReader(pathname, _is_summarized_metric)
+            self._chunks.extend(self._readers[pathname].read_new_chunks())
+
+        # The interim file is rewritten rather than appended to, so it is always read in full.
+        interim_chunks = []
+        interim_pathname = os.path.join(self._diagnostic_dir, ftdc.INTERIM_FILENAME)
+        if os.path.exists(interim_pathname):
+            interim_chunks = ftdc.FileReader(interim_pathname,
+                                             _is_summarized_metric).read_new_chunks()
+
+        return self._chunks + interim_chunks
+
+    def _samples(self):
+        """Return the (time, chunk, index) of each sample in the order they were taken."""
+        samples = []
+        for chunk in self._read_chunks():
+            for (index, sample_time) in enumerate(chunk.sample_times()):
+                # The samples of a chunk may still be in the interim file after the chunk was
+                # written to the metrics file.
+                if samples and sample_time <= samples[-1][0]:
+                    continue
+                samples.append((sample_time, chunk, index))
+        return samples
+
+    def _discard_chunks_before(self, time_millis):
+        """Discard the chunks which are no longer needed to summarize tests after 'time_millis'."""
+        # The chunk holding the last sample before a test starts is kept for the test's baseline.
+        while len(self._chunks) > 1:
+            next_sample_times = self._chunks[1].sample_times()
+            if not next_sample_times or next_sample_times[0] > time_millis:
+                break
+            self._chunks.pop(0)
+
+    def summarize(self, start_millis, end_millis):
+        """Return the summary of the samples taken between 'start_millis' and 'end_millis'."""
+        samples = self._samples()
+        self._discard_chunks_before(end_millis)
+
+        # The baseline is the last sample taken before the test started.
+        before = [sample for sample in samples if sample[0] <= start_millis]
+        during = [sample for sample in samples if start_millis < sample[0] <= end_millis]
+        window = before[-1:] + during
+
+        if len(window) < 2:
+            return None
+        return _summarize_window(window)
+
+
+def _summarize_window(window):
+    """Return the summary of the (time, chunk, index) samples of 'window'."""
+    (first_time, first_chunk, first_index) = window[0]
+    (last_time, last_chunk, last_index) = window[-1]
+    summary = {"samples": len(window), "window_millis": last_time - first_time}
+
+    for (name, metric) in _DELTA_METRICS:
+        first_value = first_chunk.get(metric, first_index)
+        last_value = last_chunk.get(metric, last_index)
+        if first_value is not None and last_value is not None:
+            summary[name] = last_value - first_value
+
+    for (name, metric) in _MAX_METRICS:
+        values = [chunk.get(metric, index) for (_, chunk, index) in window]
+        values = [value for value in values if value is not None]
+        if values:
+            summary[name] = max(values)
+
+    lags = [_replication_lag(chunk, index) for (_, chunk, index) in window]
+    lags = [lag for lag in lags if lag is not None]
+    if lags:
+        summary["replication.max_lag_millis"] = max(lags)
+
+    return summary
+
+
+def _replication_lag(chunk, index):
+    """Return how far the slowest secondary was behind the primary in a sample, in milliseconds."""
+    primary_optime = None
+    secondary_optimes = []
+    for metric in chunk.metrics:
+        if not (metric.startswith(_MEMBERS_PREFIX) and metric.endswith(".state")):
+            continue
+
+        member_prefix = metric[:-len("state")]
+        state = chunk.get(metric, index)
+        optime = chunk.get(member_prefix + "optimeDate", index)
+        if optime is None:
+            continue
+        if state == _PRIMARY_STATE:
+            primary_optime = optime
+        elif state == _SECONDARY_STATE:
+            secondary_optimes.append(optime)
+
+    if primary_optime is None or not secondary_optimes:
+        return None
+    return max(primary_optime - min(secondary_optimes), 0)
@@ -0,0 +1,249 @@
+"""Module for measuring the overhead of resmoke.py itself and reporting it to the perf plugin.
+
+The ResmokeOverhead hook is meant to be used by suites whose tests don't do any work, such as
+sleep_test tests of 0 seconds against a NoOpFixture, so the time they take is the time resmoke.py
+spends dispatching tests, calling hooks, logging and updating the report.
+"""
+
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+
+from buildscripts.resmokelib import config as _config
+from buildscripts.resmokelib.testing.hooks import combine_benchmark_results as cbr
+from buildscripts.resmokelib.testing.hooks import interface
+
+# The names of the benchmarks reported to the perf plugin. The number of jobs is reported as their
+# thread count.
+TEST_BENCHMARK = "BM_ResmokeTest"
+LOG_LINE_BENCHMARK = "BM_ResmokeLogLine"
+DYNAMIC_TEST_BENCHMARK = "BM_ResmokeDynamicTest"
+
+_NANOS_PER_SEC = 1e9
+
+
+class _LineCounter(logging.Handler):
+    """Handler counting the log messages of a fixture, other than those of the hook itself."""
+
+    def __init__(self, hook_logger_name):
+        """Initialize _LineCounter."""
+        logging.Handler.__init__(self)
+        self._hook_logger_name = hook_logger_name
+        self.num_lines = 0
+
+    def emit(self, record):
+        """Count the log message."""
+        # The dynamic tests log through children of the hook logger.
+        if not record.name.startswith(self._hook_logger_name):
+            self.num_lines += 1
+
+
+class _JobMeasurements(object):  # pylint: disable=too-few-public-methods
+    """The overhead measured by the ResmokeOverhead hook of a single job."""
+
+    def __init__(self):
+        """Initialize _JobMeasurements."""
+        self.start_time = None
+        self.elapsed_secs = None
+        self.num_tests = 0
+        self.num_log_lines = 0
+        self.num_dynamic_tests = 0
+        self.dynamic_test_secs = 0.0
+
+
+class ResmokeOverhead(cbr.CombineBenchmarkResults):  # pylint: disable=too-many-instance-attributes
+    """Measure the overhead of resmoke.py and write it to the --perfReportFile.
+
+    The following benchmarks are reported, with the number of jobs as their thread count:
+      - BM_ResmokeTest: the time resmoke.py takes to run a test, including the hooks.
+      - BM_ResmokeLogLine: the time the logging stack takes to handle a line logged by the
+        fixture. It is only meaningful with fixtures which log as fast as they can, like the
+        YesFixture.
+      - BM_ResmokeDynamicTest: the time a hook takes to create and run a dynamic test.
+
+    Like the other benchmarks, the latency of each operation is reported rather than the
+    throughput. Results already in the --perfReportFile for other numbers of jobs are kept so that
+    running the suite with --jobs=1, 8 and 64 in turn yields a single report.
+    """
+
+    DESCRIPTION = "Measure the overhead of resmoke.py"
+
+    _LOCK = threading.Lock()
+
+    # The measurements of each job running the current execution of the suite. The jobs share
+    # them as the report must cover all of the jobs.
+    _JOB_MEASUREMENTS = {}  # type: ignore
+
+    # The number of jobs running the suite. The executor creates the hooks of all of its jobs, as
+    # many as there are tests to run at most, before any of them starts running the suite.
+    _num_jobs = 0
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self, hook_logger, fixture, measure_tests=True, measure_log_lines=False,
+            num_dynamic_tests=0):
+        """Initialize ResmokeOverhead.
+
+        :param hook_logger: the logger instance for this hook.
+        :param fixture: the target fixture.
+        :param measure_tests: whether to report BM_ResmokeTest.
+        :param measure_log_lines: whether to report BM_ResmokeLogLine.
+        :param num_dynamic_tests: the number of dynamic tests to run after each test. Reports
+            BM_ResmokeDynamicTest if it isn't 0.
+        """
+        cbr.CombineBenchmarkResults.__init__(self, hook_logger, fixture)
+        self.description = ResmokeOverhead.DESCRIPTION
+
+        if _config.EXECUTOR_MODE == "process":
+            raise ValueError("The ResmokeOverhead hook requires the jobs to run in threads of the"
+                             " resmoke.py process to combine their measurements")
+
+        self._measure_tests = measure_tests
+        self._measure_log_lines = measure_log_lines
+        self._num_dynamic_tests = num_dynamic_tests
+
+        self._measurements = None
+        self._line_counter = None
+
+        with ResmokeOverhead._LOCK:
+            # The jobs of a new executor are created starting from job 0.
+            if fixture.job_num == 0:
+                ResmokeOverhead._JOB_MEASUREMENTS.clear()
+                ResmokeOverhead._num_jobs = 0
+            ResmokeOverhead._num_jobs += 1
+
+    def before_suite(self, test_report):
+        """Start measuring the overhead of the job."""
+        cbr.CombineBenchmarkResults.before_suite(self, test_report)
+
+        self._measurements = _JobMeasurements()
+        with ResmokeOverhead._LOCK:
+            # Running the suite again starts over.
+            if self.fixture.job_num in ResmokeOverhead._JOB_MEASUREMENTS:
+                ResmokeOverhead._JOB_MEASUREMENTS.clear()
+            ResmokeOverhead._JOB_MEASUREMENTS[self.fixture.job_num] = self._measurements
+
+        if self._measure_log_lines:
+            self._line_counter = _LineCounter(self.logger.name)
+            self.fixture.logger.addHandler(self._line_counter)
+
+        self._measurements.start_time = time.time()
+
+    def after_test(self, test, test_report):
+        """Count the test and run the dynamic tests."""
+        self._measurements.num_tests += 1
+
+        start_time = time.perf_counter()
+        for _ in range(self._num_dynamic_tests):
+            hook_test_case = _NoOpTestCase.create_after_test(self.logger, test, self)
+            hook_test_case.configure(self.fixture)
+            hook_test_case.run_dynamic_test(test_report)
+        self._measurements.num_dynamic_tests += self._num_dynamic_tests
+        self._measurements.dynamic_test_secs += time.perf_counter() - start_time
+
+    def after_suite(self, test_report):
+        """Write the overhead measured by all of the jobs once the last of them finishes.
+
+        Jobs may finish before others start when the tests don't take any time, so the report is
+        written once every job created has finished, not once those started so far have.
+        """
+        measurements = self._measurements
+        measurements.elapsed_secs = time.time() - measurements.start_time
+
+        if self._line_counter is not None:
+            self.fixture.logger.removeHandler(self._line_counter)
+            measurements.num_log_lines = self._line_counter.num_lines
+            self._line_counter = None
+
+        with ResmokeOverhead._LOCK:
+            all_measurements = [
+                job for job in ResmokeOverhead._JOB_MEASUREMENTS.values()
+                if job.elapsed_secs is not None
+            ]
+            if len(all_measurements) < ResmokeOverhead._num_jobs:
+                return
+        self.create_time = datetime.datetime.fromtimestamp(
+            min(job.start_time for job in all_measurements))
+
+        self.benchmark_reports = {}
+        self._parse_report(self._make_benchmark_report(all_measurements))
+        cbr.CombineBenchmarkResults.after_suite(self, test_report)
+
+    def _make_benchmark_report(self, all_measurements):
+        """Return the measurements of the jobs in the format of a Benchmark report."""
+        num_jobs = len(all_measurements)
+        benchmarks = []
+        for job in all_measurements:
+            # The time spent running the dynamic tests is reported separately.
+            test_secs = job.elapsed_secs - job.dynamic_test_secs
+            if self._measure_tests and job.num_tests:
+                benchmarks.append(
+                    _make_benchmark(TEST_BENCHMARK, num_jobs, job.num_tests, test_secs))
+            if self._measure_log_lines and job.num_log_lines:
+                benchmarks.append(
+                    _make_benchmark(LOG_LINE_BENCHMARK, num_jobs, job.num_log_lines,
+                                    job.elapsed_secs))
+            if job.num_dynamic_tests:
+                benchmarks.append(
+                    _make_benchmark(DYNAMIC_TEST_BENCHMARK, num_jobs, job.num_dynamic_tests,
+                                    job.dynamic_test_secs))
+
+        context = {
+            "date": datetime.datetime.now().strftime("%Y/%m/%d-%H:%M:%S"),
+            "cpu_scaling_enabled": None,
+            "num_cpus": os.cpu_count(),
+            "mhz_per_cpu": None,
+            "library_build_type": None,
+            "executable": "resmoke.py",
+            "caches": [],
+        }
+        return {"context": context, "benchmarks": benchmarks}
+
+    def _generate_perf_plugin_report(self):
+        """Format the data to look like a perf plugin report.
+
+        The results for the numbers of jobs the suite didn't run with this time are taken from the
+        existing --perfReportFile.
+        """
+        perf_report = cbr.CombineBenchmarkResults._generate_perf_plugin_report(self)
+
+        try:
+            with open(self.report_file, "r") as fh:
+                previous_report = json.load(fh)
+        except (IOError, ValueError):
+            return perf_report
+
+        results = {result["name"]: result for result in perf_report["results"]}
+        for previous_result in previous_report.get("results", []):
+            result = results.get(previous_result["name"])
+            if result is None:
+                perf_report["results"].append(previous_result)
+                continue
+            for (thread_count, thread_result) in previous_result["results"].items():
+                result["results"].setdefault(thread_count, thread_result)
+
+        perf_report["start"] = min(perf_report["start"],
+                                   previous_report.get("start", perf_report["start"]))
+        return perf_report
+
+
+def _make_benchmark(base_name, num_jobs, iterations, secs):
+    """Return the Benchmark report of a benchmark which ran 'iterations' times in 'secs'."""
+    nanos_per_iteration = secs * _NANOS_PER_SEC / iterations
+    return {
+        "name": "{}/threads:{:d}".format(base_name, num_jobs),
+        "iterations": iterations,
+        "real_time": nanos_per_iteration,
+        "cpu_time": nanos_per_iteration,
+        "time_unit": "ns",
+    }
+
+
+class _NoOpTestCase(interface.DynamicTestCase):  # pylint: disable=too-many-ancestors
+    """Dynamic test which doesn't do anything, so all of the time it takes is overhead."""
+
+    def run_test(self):
+        """Do nothing."""
+        pass
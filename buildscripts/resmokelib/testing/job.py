@@ -11,7 +11,9 @@ from buildscripts.resmokelib.testing import testcases
 from buildscripts.resmokelib.testing.hooks import stepdown
 from buildscripts.resmokelib.testing.testcases import fixture as _fixture
 from buildscripts.resmokelib.testing.fixtures.interface import create_fixture_table
+from buildscripts.resmokelib.testing.fixtures.startup_telemetry import StartupRecords
 from buildscripts.resmokelib.utils import queue as _queue
+from buildscripts.resmokelib.utils import timeline
 
 
 class Job(object):  # pylint: disable=too-many-instance-attributes
@@ -19,7 +21,7 @@ class Job(object):  # pylint: disable=too-many-instance-attributes
 
     def __init__(  # pylint: disable=too-many-arguments
             self, job_num, logger, fixture, hooks, report, archival, suite_options,
-            test_queue_logger):
+            test_queue_logger, log_analysis=None, dbpath_storage=None):
         """Initialize the job with the specified fixture and hooks."""
 
         self.logger = logger
@@ -27,6 +29,8 @@ class Job(object):  # pylint: disable=too-many-instance-attributes
         self.hooks = hooks
         self.report = report
         self.archival = archival
+        self.log_analysis = log_analysis
+        self.dbpath_storage = dbpath_storage
         self.suite_options = suite_options
         self.manager = FixtureTestCaseManager(test_queue_logger, self.fixture, job_num, self.report)
 
@@ -122,10 +126,15 @@ class Job(object):  # pylint: disable=too-many-instance-attributes
         """Call the before/after suite hooks and continuously execute tests from 'queue'."""
 
         for hook in self.hooks:
-            hook.before_suite(self.report)
+            with timeline.span(hook.REGISTERED_NAME + ".before_suite", "hook", self.job_num):
+                hook.before_suite(self.report)
 
-        while not queue.empty() and not interrupt_flag.is_set():
+        while True:
+            wait_time_start = time.time()
+            if queue.empty() or interrupt_flag.is_set():
+                break
             queue_elem = queue.get_nowait()
+            timeline.record("queue_wait", "queue", wait_time_start, time.time(), self.job_num)
             test_time_start = self._get_time()
             try:
                 test = queue_elem.testcase
@@ -137,7 +146,8 @@ class Job(object):  # pylint: disable=too-many-instance-attributes
             self._requeue_test(queue, queue_elem, interrupt_flag)
 
         for hook in self.hooks:
-            hook.after_suite(self.report)
+            with timeline.span(hook.REGISTERED_NAME + ".after_suite", "hook", self.job_num):
+                hook.after_suite(self.report)
 
     def _log_requeue_test(self, queue_elem):
         """Log the requeue of a test."""
@@ -170,10 +180,17 @@ class Job(object):  # pylint: disable=too-many-instance-attributes
         """Call the before/after test hooks and execute 'test'."""
 
         test.configure(self.fixture, config.NUM_CLIENTS_PER_FIXTURE)
+        if self.log_analysis is not None:
+            # Output of the fixture logged since the previous test belongs to its after_test hooks.
+            self.log_analysis.reset()
         self._run_hooks_before_tests(test)
         self.report.logging_prefix = create_fixture_table(self.fixture)
 
-        test(self.report)
+        with timeline.span(test.basename(), "test", self.job_num,
+                           test_file=test.test_name) as event_args:
+            test(self.report)
+            if timeline.is_enabled():
+                event_args["status"] = self.report.find_test_info(test).status
         try:
             if test.propagate_error is not None:
                 raise test.propagate_error
@@ -196,6 +213,11 @@ class Job(object):  # pylint: disable=too-many-instance-attributes
                 raise errors.StopExecution(
                     "%s not running after %s" % (self.fixture, test.short_description()))
         finally:
+            if self.log_analysis is not None:
+                self.report.find_test_info(test).log_analysis = self.log_analysis.take_stats()
+            self.report.find_test_info(test).dbpath_storage = self.dbpath_storage
+            # The nodes restarted by the test, and by the after_test hooks of the previous test.
+            self.report.find_test_info(test).fixture_startup = StartupRecords.take(self.job_num)
             success = self.report.find_test_info(test).status == "pass"
             if self.archival:
                 result = TestResult(test=test, hook=None, success=success)
@@ -207,7 +229,9 @@ class Job(object):  # pylint: disable=too-many-instance-attributes
         """Provide helper to run hook and archival."""
         try:
             success = False
-            hook_function(test, self.report)
+            with timeline.span("{}.{}".format(hook.REGISTERED_NAME, hook_function.__name__), "hook",
+                               self.job_num, test_file=test.test_name):
+                hook_function(test, self.report)
             success = True
         finally:
             if self.archival:
@@ -335,7 +359,9 @@ class FixtureTestCaseManager:
         """
         test_case = _fixture.FixtureSetupTestCase(self.test_queue_logger, self.fixture,
                                                   "job{}".format(self.job_num), self.times_set_up)
-        test_case(self.report)
+        with timeline.span("fixture_setup", "fixture", self.job_num, fixture=str(self.fixture)):
+            test_case(self.report)
+        self.report.find_test_info(test_case).fixture_startup = StartupRecords.take(self.job_num)
         if self.report.find_test_info(test_case).status != "pass":
             logger.error("The setup of %s failed.", self.fixture)
             return False
@@ -353,11 +379,14 @@ class FixtureTestCaseManager:
                                                       "job{}".format(self.job_num),
                                                       self.times_set_up)
             self.times_set_up += 1
+            event_name = "fixture_abort"
         else:
             test_case = _fixture.FixtureTeardownTestCase(self.test_queue_logger, self.fixture,
                                                          "job{}".format(self.job_num))
+            event_name = "fixture_teardown"
 
-        test_case(self.report)
+        with timeline.span(event_name, "fixture", self.job_num, fixture=str(self.fixture)):
+            test_case(self.report)
         if self.report.find_test_info(test_case).status != "pass":
             logger.error("The teardown of %s failed.", self.fixture)
             return False
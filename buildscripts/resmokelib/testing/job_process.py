@@ -0,0 +1,414 @@
+"""Run a Job in its own forked process so that jobs don't contend on the GIL of the main process.
+
+Each JobProcess owns a single Job, and therefore its fixture, hooks, and PortAllocator range. Test
+names are dispatched through a queue shared by all of the job processes and the status of the
+tests that ran is streamed back to the executor over a pipe, where it is merged into the Job's
+TestReport.
+"""
+
+import collections
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import sys
+import threading
+import traceback
+
+from buildscripts.resmokelib import errors
+from buildscripts.resmokelib.logging import flush
+from buildscripts.resmokelib.utils import queue as _queue
+from buildscripts.resmokelib.utils import timeline
+
+# Messages sent from the executor to a job process.
+_RUN = "run"
+_TEARDOWN = "teardown"
+_EXIT = "exit"
+
+# Messages sent from a job process to the executor.
+_REPORT = "report"
+_ARCHIVE = "archive"
+_DONE = "done"
+_TEARDOWN_DONE = "teardown_done"
+_ERROR = "error"
+
+# The executor waits on the job processes in increments of _POLL_SECS so that KeyboardInterrupt
+# exceptions are propagated.
+_POLL_SECS = 1.0
+
+
+class JobProcessPool(object):
+    """Dispatch tests to a set of JobProcess instances and merge their results."""
+
+    def __init__(self, logger, jobs, make_queue_elem, archive_instance=None):
+        """
+        Initialize the JobProcessPool.
+
+        :param logger: The executor's logger.
+        :param jobs: The Job instances to run, one per process.
+        :param make_queue_elem: Function to create a queue element from a test name. It is called
+            within the job processes.
+        :param archive_instance: The Archival instance used on behalf of the job processes.
+        """
+        self.logger = logger
+        self._archive_instance = archive_instance
+
+        context = multiprocessing.get_context("fork")
+        self._test_queue = context.Queue()
+        self._interrupt_flag = context.Event()
+        self._generation = 0
+        self._processes = [
+            JobProcess(context, job, self._test_queue, self._interrupt_flag, make_queue_elem)
+            for job in jobs
+        ]
+
+    def start(self):
+        """Fork a process for each Job."""
+        for job_process in self._processes:
+            job_process.start()
+
+    def run_tests(self, test_names, setup_flag, teardown_flag, stagger_jobs=False):
+        """
+        Run 'test_names' across the job processes and block until all of them are run.
+
+        Return True if the run was interrupted by the user and False otherwise. The setup and
+        teardown flags are set if any of the job processes failed to set up or tear down its
+        fixture, respectively.
+        """
+        self._generation += 1
+        self._interrupt_flag.clear()
+
+        for test_name in test_names:
+            self._test_queue.put((self._generation, test_name))
+        # Each job process stops fetching tests once it has seen a sentinel.
+        for _ in self._processes:
+            self._test_queue.put((self._generation, None))
+
+        user_interrupted = False
+        try:
+            for (i, job_process) in enumerate(self._processes):
+                # A job process that exited is reported as failed by _wait_for().
+                job_process.try_send(_RUN, setup_flag is not None, teardown_flag is not None)
+                # Match the staggering done by the TestSuiteExecutor for job threads.
+                if stagger_jobs and i >= 4:
+                    self._interrupt_flag.wait(10)
+
+            (results, failures) = self._wait_for(_DONE, self._processes)
+        except (KeyboardInterrupt, SystemExit):
+            self._interrupt_flag.set()
+            user_interrupted = True
+            (results, failures) = self._wait_for(_DONE, self._processes)
+
+        if failures:
+            raise errors.JobProcessError("\n".join(failures))
+
+        for (setup_failed, teardown_failed) in results:
+            if setup_failed and setup_flag is not None:
+                setup_flag.set()
+            if teardown_failed and teardown_flag is not None:
+                teardown_flag.set()
+
+        return user_interrupted
+
+    def teardown_fixtures(self):
+        """Tear down the fixture of each job process and return True if all were successful.
+
+        The job processes that exited are skipped, so the fixtures of the others are still torn
+        down when one of them died during the tests.
+        """
+        tearing_down = []
+        for job_process in self._processes:
+            if job_process.is_alive() and job_process.try_send(_TEARDOWN):
+                tearing_down.append(job_process)
+            else:
+                self.logger.error("The process for job %d exited before its fixture was torn down",
+                                  job_process.job.job_num)
+
+        (results, failures) = self._wait_for(_TEARDOWN_DONE, tearing_down)
+        for failure in failures:
+            self.logger.error("%s", failure)
+
+        success = len(tearing_down) == len(self._processes) and not failures
+        for (job_process, result) in zip(tearing_down, results):
+            if result is not None and not result[0]:
+                self.logger.warning("Teardown of %s of job %s was not successful",
+                                    job_process.job.fixture, job_process.job.job_num)
+                success = False
+        return success
+
+    def stop(self):
+        """Ask the job processes to exit and wait for them to do so."""
+        for job_process in self._processes:
+            if job_process.is_alive():
+                job_process.try_send(_EXIT)
+
+        for job_process in self._processes:
+            job_process.join()
+
+        self._processes = []
+
+    def _wait_for(self, expected_message, job_processes):
+        """Service messages from 'job_processes' until each of them sent 'expected_message' or failed.
+
+        Return the arguments of 'expected_message' from each of the job processes, None for those
+        that failed, along with a description of each failure. The other job processes are
+        interrupted when one of them fails, but they are still waited for.
+        """
+        results = {}
+        failures = []
+        pending = {job_process.conn: job_process for job_process in job_processes}
+
+        while pending:
+            for conn in multiprocessing.connection.wait(list(pending), timeout=_POLL_SECS):
+                job_process = pending[conn]
+                try:
+                    (message, args) = conn.recv()
+                except (EOFError, OSError):
+                    (message, args) = (_ERROR, ("It exited unexpectedly", ))
+
+                if message == _REPORT:
+                    (test_infos, num_dynamic, events) = args
+                    job_process.job.report.update_from(test_infos, num_dynamic)
+                    timeline.add_events(events)
+                elif message == _ARCHIVE:
+                    conn.send(self._archive(*args))
+                elif message == _ERROR:
+                    self._interrupt_flag.set()
+                    failures.append("The process for job {} failed:\n{}".format(
+                        job_process.job.job_num, args[0]))
+                    # The job process exits after an error, so nothing more is sent to it.
+                    conn.close()
+                    del pending[conn]
+                elif message == expected_message:
+                    results[job_process] = args
+                    del pending[conn]
+
+        return ([results.get(job_process) for job_process in job_processes], failures)
+
+    def _archive(self, display_name, input_files, s3_bucket, s3_path):
+        """Archive files on behalf of a job process."""
+        if self._archive_instance is None:
+            return (1, "Archival is not enabled")
+        return self._archive_instance.archive_files_to_s3(display_name, input_files, s3_bucket,
+                                                          s3_path)
+
+
+class JobProcess(object):
+    """Handle to a forked process running a single Job."""
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self, context, job, test_queue, interrupt_flag, make_queue_elem):
+        """Initialize the JobProcess."""
+        self.job = job
+        (self.conn, self._child_conn) = context.Pipe()
+        self._process = context.Process(
+            target=_job_process_main, args=(job, self._child_conn, test_queue, interrupt_flag,
+                                            make_queue_elem),
+            name="JobProcess-{}".format(job.job_num))
+
+    def start(self):
+        """Start the process."""
+        self._process.start()
+        # Only the child process writes to its end of the pipe.
+        self._child_conn.close()
+
+    def send(self, message, *args):
+        """Send a message to the process."""
+        self.conn.send((message, args))
+
+    def try_send(self, message, *args):
+        """Send a message to the process and return False if it exited since it was checked."""
+        try:
+            self.send(message, *args)
+        except (BrokenPipeError, EOFError, OSError):
+            return False
+        return True
+
+    def is_alive(self):
+        """Return True if the process is still running and can be sent messages."""
+        return not self.conn.closed and self._process.is_alive()
+
+    def join(self):
+        """Wait for the process to exit."""
+        self._process.join()
+        self.conn.close()
+
+
+class _ParentConnection(object):
+    """The job process's end of the pipe to the executor."""
+
+    def __init__(self, conn):
+        """Initialize the _ParentConnection."""
+        self._conn = conn
+        self._lock = threading.Lock()
+
+    def send(self, message, *args):
+        """Send a message to the executor."""
+        with self._lock:
+            self._conn.send((message, args))
+
+    def request(self, message, *args):
+        """Send a message to the executor and wait for its reply."""
+        with self._lock:
+            self._conn.send((message, args))
+            return self._conn.recv()
+
+    def recv(self):
+        """Receive a message from the executor."""
+        return self._conn.recv()
+
+
+class _ArchivalProxy(object):
+    """Forward archival requests to the executor, which owns the Archival instance.
+
+    Archival is synchronous so the data files aren't removed before they have been archived.
+    """
+
+    def __init__(self, parent_conn):
+        """Initialize the _ArchivalProxy."""
+        self._parent_conn = parent_conn
+
+    def archive_files_to_s3(self, display_name, input_files, s3_bucket, s3_path):
+        """Archive 'input_files' to 's3_bucket' and 's3_path' through the executor."""
+        return self._parent_conn.request(_ARCHIVE, display_name, input_files, s3_bucket, s3_path)
+
+
+class _ProcessTestQueue(object):
+    """Adapt the queue of test names shared by the job processes to the Queue interface of a Job.
+
+    Tests requeued by the Job are kept local to its process since the state of their queue element
+    only exists there.
+    """
+
+    def __init__(self, test_queue, generation, make_queue_elem, on_task_done):
+        """Initialize the _ProcessTestQueue."""
+        self._test_queue = test_queue
+        self._generation = generation
+        self._make_queue_elem = make_queue_elem
+        self._on_task_done = on_task_done
+        self._local = collections.deque()
+        self._exhausted = False
+
+    def _fetch(self):
+        """Move the next test from the shared queue to the local queue, if there is one."""
+        while not self._exhausted:
+            (generation, test_name) = self._test_queue.get()
+            if generation != self._generation:
+                # Left over from an interrupted execution.
+                continue
+            if test_name is None:
+                self._exhausted = True
+                return
+            self._local.append(self._make_queue_elem(test_name))
+            return
+
+    def empty(self):
+        """Return True if there are no more tests for this job process to run."""
+        if not self._local:
+            self._fetch()
+        return not self._local
+
+    def get_nowait(self):
+        """Return the next test to run."""
+        if self.empty():
+            raise _queue.Empty()
+        return self._local.popleft()
+
+    def put(self, queue_elem):
+        """Requeue a test."""
+        self._local.append(queue_elem)
+
+    def task_done(self):
+        """Indicate that a test has finished running."""
+        self._on_task_done()
+
+
+def _init_job_process(job, conn):
+    """Set up the forked process of 'job' and return its end of the pipe to the executor."""
+    # Only the parent handles interrupts from the user; it uses 'interrupt_flag' to stop the jobs.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Imported here to avoid a circular import with the testing package.
+    from buildscripts.resmokelib import sighandler
+    sighandler.register_job_process(job.logger)
+
+    # The flush thread isn't carried over by fork().
+    flush.start_thread_after_fork()
+    # The events recorded before the fork() belong to the executor.
+    timeline.take_events()
+
+    parent_conn = _ParentConnection(conn)
+    if job.archival is not None:
+        job.archival.archive_instance = _ArchivalProxy(parent_conn)
+    return parent_conn
+
+
+class _ReportSender(object):
+    """Send the tests a job ran to the executor as they finish, each of them only once."""
+
+    def __init__(self, parent_conn, job):
+        """Initialize the _ReportSender."""
+        self._parent_conn = parent_conn
+        self._job = job
+        self._num_sent = 0
+
+    def reset(self):
+        """Start sending the tests of the job from the beginning of its report again."""
+        self._num_sent = 0
+
+    def send(self):
+        """Send the tests the job ran since the last report to the executor."""
+        test_infos = self._job.report.test_infos[self._num_sent:]
+        self._num_sent += len(test_infos)
+        self._parent_conn.send(_REPORT, test_infos, self._job.report.num_dynamic,
+                               timeline.take_events())
+
+
+def _run_job(job, queue, interrupt_flag, run_setup, run_teardown):
+    """Run the tests of 'queue' with 'job' and return whether its setup and teardown failed."""
+    setup_flag = threading.Event() if run_setup else None
+    teardown_flag = threading.Event() if run_teardown else None
+    job(queue, interrupt_flag, setup_flag=setup_flag, teardown_flag=teardown_flag)
+    setup_failed = setup_flag is not None and setup_flag.is_set()
+    teardown_failed = teardown_flag is not None and teardown_flag.is_set()
+    return (setup_failed, teardown_failed)
+
+
+def _job_process_main(  # pylint: disable=too-many-arguments
+        job, conn, test_queue, interrupt_flag, make_queue_elem):
+    """Run commands from the executor against 'job' until asked to exit."""
+    parent_conn = _init_job_process(job, conn)
+    report_sender = _ReportSender(parent_conn, job)
+    generation = 0
+    exit_code = 0
+    try:
+        while True:
+            (message, args) = parent_conn.recv()
+            if message == _RUN:
+                generation += 1
+                job.report.reset()
+                report_sender.reset()
+                queue = _ProcessTestQueue(test_queue, generation, make_queue_elem,
+                                          report_sender.send)
+                # The arguments of _RUN are whether to run the setup and teardown of the fixture.
+                failed_flags = _run_job(job, queue, interrupt_flag, *args)
+                report_sender.send()
+                parent_conn.send(_DONE, *failed_flags)
+            elif message == _TEARDOWN:
+                teardown_succeeded = job.manager.teardown_fixture(job.logger)
+                report_sender.send()
+                parent_conn.send(_TEARDOWN_DONE, teardown_succeeded)
+            elif message == _EXIT:
+                break
+    except:  # pylint: disable=bare-except
+        exit_code = 1
+        try:
+            parent_conn.send(_ERROR, traceback.format_exc())
+        except (IOError, OSError):
+            pass
+    finally:
+        flush.stop_thread()
+        conn.close()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        # Skip the atexit handlers inherited from the executor process.
+        os._exit(exit_code)  # pylint: disable=protected-access
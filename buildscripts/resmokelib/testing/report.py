@@ -281,23 +281,8 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
         Used to create the report.json file.
         """
 
-        results = []
         with self._lock:
-            for test_info in self.test_infos:
-                result = {
-                    "test_file": test_info.test_file,
-                    "status": test_info.evergreen_status,
-                    "exit_code": test_info.return_code,
-                    "start": test_info.start_time,
-                    "end": test_info.end_time,
-                    "elapsed": test_info.end_time - test_info.start_time,
-                }
-
-                if test_info.url_endpoint is not None:
-                    result["url"] = test_info.url_endpoint
-                    result["url_raw"] = test_info.url_endpoint + "?raw=1"
-
-                results.append(result)
+            results = [test_info.as_dict() for test_info in self.test_infos]
 
             return {
                 "results": results,
@@ -313,21 +298,10 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
 
         report = cls(logging.loggers.EXECUTOR_LOGGER, _config.SuiteOptions.ALL_INHERITED.resolve())
         for result in report_dict["results"]:
-            # By convention, dynamic tests are named "<basename>:<hook name>".
-            is_dynamic = ":" in result["test_file"]
-            test_file = result["test_file"]
-            # Using test_file as the test id is ok here since the test id only needs to be unique
-            # during suite execution.
-            test_info = _TestInfo(test_file, test_file, is_dynamic)
-            test_info.url_endpoint = result.get("url")
-            test_info.status = result["status"]
-            test_info.evergreen_status = test_info.status
-            test_info.return_code = result["exit_code"]
-            test_info.start_time = result["start"]
-            test_info.end_time = result["end"]
+            test_info = _TestInfo.from_dict(result)
             report.test_infos.append(test_info)
 
-            if is_dynamic:
+            if test_info.dynamic:
                 report.num_dynamic += 1
 
         # Update cached values for number of successful and failed tests.
@@ -338,6 +312,22 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
 
         return report
 
+    def update_from(self, test_infos, num_dynamic):
+        """Add the status and timing information of the tests a job process ran since its last report.
+
+        The tests of a report have finished running, so their status doesn't change afterwards.
+        """
+
+        statuses = [test_info.status for test_info in test_infos]
+        with self._lock:
+            self.test_infos.extend(test_infos)
+            self.num_dynamic = num_dynamic
+
+            self.num_succeeded += statuses.count("pass")
+            self.num_failed += statuses.count("fail")
+            self.num_errored += statuses.count("error")
+            self.num_interrupted += statuses.count("timeout")
+
     def reset(self):
         """Reset the test report back to its initial state."""
 
@@ -380,6 +370,65 @@ class _TestInfo(object):  # pylint: disable=too-many-instance-attributes
         self.evergreen_status = None
         self.return_code = None
         self.url_endpoint = None
+        self.log_analysis = None
+        self.ftdc_metrics = None
+        self.dbpath_storage = None
+        self.fsm_metrics = None
+        self.fixture_startup = None
+
+    def as_dict(self):
+        """Return the status and timing information as a dictionary of the report.json file."""
+        result = {
+            "test_file": self.test_file,
+            "status": self.evergreen_status,
+            "exit_code": self.return_code,
+            "start": self.start_time,
+            "end": self.end_time,
+            "elapsed": self.end_time - self.start_time,
+        }
+
+        if self.url_endpoint is not None:
+            result["url"] = self.url_endpoint
+            result["url_raw"] = self.url_endpoint + "?raw=1"
+
+        if self.log_analysis is not None:
+            result["log_analysis"] = self.log_analysis
+
+        if self.ftdc_metrics is not None:
+            result["ftdc_metrics"] = self.ftdc_metrics
+
+        if self.dbpath_storage is not None:
+            result["dbpath_storage"] = self.dbpath_storage
+
+        if self.fsm_metrics is not None:
+            result["fsm_metrics"] = self.fsm_metrics
+
+        if self.fixture_startup is not None:
+            result["fixture_startup"] = self.fixture_startup
+
+        return result
+
+    @classmethod
+    def from_dict(cls, result):
+        """Return the status and timing information copied from a dict (generated in as_dict)."""
+        # By convention, dynamic tests are named "<basename>:<hook name>".
+        is_dynamic = ":" in result["test_file"]
+        test_file = result["test_file"]
+        # Using test_file as the test id is ok here since the test id only needs to be unique
+        # during suite execution.
+        test_info = cls(test_file, test_file, is_dynamic)
+        test_info.url_endpoint = result.get("url")
+        test_info.status = result["status"]
+        test_info.evergreen_status = test_info.status
+        test_info.return_code = result["exit_code"]
+        test_info.start_time = result["start"]
+        test_info.end_time = result["end"]
+        test_info.log_analysis = result.get("log_analysis")
+        test_info.ftdc_metrics = result.get("ftdc_metrics")
+        test_info.dbpath_storage = result.get("dbpath_storage")
+        test_info.fsm_metrics = result.get("fsm_metrics")
+        test_info.fixture_startup = result.get("fixture_startup")
+        return test_info
 
 
 def test_order(test_name):
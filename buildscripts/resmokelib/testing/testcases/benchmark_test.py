@@ -74,6 +74,10 @@ class BenchmarkTestCase(interface.ProcessTestCase):
                     value = value.total_seconds()
                 bm_options[key] = value
 
+        # 5. Run the warmup repetitions on top of the repetitions that are reported.
+        if _config.BENCHMARK_WARMUP_REPETITIONS:
+            bm_options["benchmark_repetitions"] += _config.BENCHMARK_WARMUP_REPETITIONS
+
         self.bm_options = bm_options
 
     def report_name(self):
@@ -81,6 +85,10 @@ class BenchmarkTestCase(interface.ProcessTestCase):
         return self.bm_executable + ".json"
 
     def _make_process(self):
+        process_kwargs = None
+        if _config.BENCHMARK_CPU_AFFINITY is not None:
+            process_kwargs = {"cpu_affinity": _config.BENCHMARK_CPU_AFFINITY}
+
         return core.programs.generic_program(self.logger, [self.bm_executable],
                                              self.fixture.job_num, test_id=self._id,
-                                             **self.bm_options)
+                                             process_kwargs=process_kwargs, **self.bm_options)
@@ -1,10 +1,17 @@
 """The unittest.TestCase for FSM workloads."""
 
 import hashlib
+import json
+import os
+import tempfile
 import threading
 
 from buildscripts.resmokelib.testing.testcases import interface
 from buildscripts.resmokelib.testing.testcases import jsrunnerfile
+from buildscripts.resmokelib.utils import stats
+
+# The percentiles of the durations of each state reported in the FSM metrics.
+_DURATION_PERCENTILES = (50, 90, 99)
 
 
 class FSMWorkloadTestCase(jsrunnerfile.JSRunnerFileTestCase):
@@ -33,6 +40,11 @@ class FSMWorkloadTestCase(jsrunnerfile.JSRunnerFileTestCase):
             test_runner_file="jstests/concurrency/fsm_libs/resmoke_runner.js",
             shell_executable=shell_executable, shell_options=shell_options)
 
+        # The file the FSM runner writes the time taken by the worker threads to. The mongo shell
+        # only writes files which don't exist yet.
+        self.fsm_metrics_file = os.path.join(tempfile.gettempdir(),
+                                             "fsm_metrics_{}.json".format(self._id.hex))
+
     def configure(self, fixture, *args, **kwargs):
         """Configure the FSMWorkloadTestCase runner."""
         interface.ProcessTestCase.configure(self, fixture, *args, **kwargs)
@@ -47,9 +59,44 @@ class FSMWorkloadTestCase(jsrunnerfile.JSRunnerFileTestCase):
         global_vars["TestData"] = test_data
         self.shell_options["global_vars"] = global_vars
 
+    def run(self, result=None):
+        """Run the FSM workloads and add the metrics written by the FSM runner to 'result'."""
+        try:
+            return jsrunnerfile.JSRunnerFileTestCase.run(self, result)
+        finally:
+            fsm_metrics = self._take_fsm_metrics()
+            if fsm_metrics is not None and result is not None:
+                result.find_test_info(self).fsm_metrics = fsm_metrics
+
+    def _take_fsm_metrics(self):
+        """Return the summarized FSM metrics and remove their file, or None if there aren't any.
+
+        The FSM runner doesn't write the file if it fails before the worker threads finish.
+        """
+        try:
+            with open(self.fsm_metrics_file, "r") as fh:
+                raw_metrics = json.load(fh)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            self.logger.warning("Ignoring the malformed FSM metrics in %s", self.fsm_metrics_file)
+            raw_metrics = None
+
+        os.remove(self.fsm_metrics_file)
+        if raw_metrics is None:
+            return None
+
+        fsm_metrics = summarize_fsm_metrics(raw_metrics)
+        for (workload, workload_metrics) in fsm_metrics.items():
+            self.logger.info("%s ran %d transitions in %0.2f seconds across %d threads.", workload,
+                             workload_metrics["transitions"], workload_metrics["elapsed_secs"],
+                             workload_metrics["num_threads"])
+        return fsm_metrics
+
     def _populate_test_data(self, test_data):
         test_data["fsmWorkloads"] = self.fsm_workload_group
         test_data["resmokeDbPathPrefix"] = self.dbpath_prefix
+        test_data["fsmMetricsFile"] = self.fsm_metrics_file
 
         with FSMWorkloadTestCase._COUNTER_LOCK:
             count = FSMWorkloadTestCase._COUNTER
@@ -98,3 +145,41 @@ class ParallelFSMWorkloadTestCase(FSMWorkloadTestCase):
         for workload_name in sorted(selected_tests):
             uid.update(workload_name.encode("utf-8"))
         return uid.hexdigest()
+
+
+def _per_sec(count, elapsed_secs):
+    """Return the rate of 'count' events over 'elapsed_secs', or None if no time elapsed."""
+    return count / elapsed_secs if elapsed_secs > 0 else None
+
+
+def summarize_fsm_metrics(raw_metrics):
+    """Return the throughput and latency of each workload from the metrics of the FSM runner.
+
+    The FSM runner reports the number of threads, how long the slowest of them took, the number of
+    transitions they made and the duration of each state function call, in milliseconds.
+    """
+    summaries = {}
+    for (workload, metrics) in raw_metrics.items():
+        elapsed_secs = metrics["elapsedMs"] / 1000.0
+
+        states = {}
+        for (state, durations) in metrics["stateDurationsMs"].items():
+            durations = sorted(durations)
+            state_summary = {
+                "ops": len(durations),
+                "ops_per_sec": _per_sec(len(durations), elapsed_secs),
+                "duration_ms_max": durations[-1],
+            }
+            for percent in _DURATION_PERCENTILES:
+                state_summary["duration_ms_p{:d}".format(percent)] = stats.percentile(
+                    durations, percent)
+            states[state] = state_summary
+
+        summaries[workload] = {
+            "num_threads": metrics["numThreads"],
+            "elapsed_secs": elapsed_secs,
+            "transitions": metrics["transitions"],
+            "transitions_per_sec": _per_sec(metrics["transitions"], elapsed_secs),
+            "states": states,
+        }
+    return summaries
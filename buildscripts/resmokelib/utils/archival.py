@@ -13,6 +13,7 @@ import time
 import math
 
 from buildscripts.resmokelib import config
+from buildscripts.resmokelib.utils import timeline
 
 _IS_WINDOWS = sys.platform == "win32" or sys.platform == "cygwin"
 
@@ -197,8 +198,9 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
                          upload_args.s3_bucket, upload_args.s3_path)
             upload_completed = False
             try:
-                s3_client.upload_file(upload_args.local_file, upload_args.s3_bucket,
-                                      upload_args.s3_path, ExtraArgs=extra_args)
+                with timeline.span("upload", "archival", s3_path=upload_args.s3_path):
+                    s3_client.upload_file(upload_args.local_file, upload_args.s3_bucket,
+                                          upload_args.s3_path, ExtraArgs=extra_args)
                 upload_completed = True
                 logger.debug("Upload to S3 completed for %s to bucket %s path %s",
                              upload_args.local_file, upload_args.s3_bucket, upload_args.s3_path)
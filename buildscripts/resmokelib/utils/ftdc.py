@@ -0,0 +1,250 @@
+"""Decode the full-time diagnostic data capture (FTDC) files written by mongod.
+
+mongod periodically samples serverStatus, replSetGetStatus, and other diagnostic commands and
+writes them to the 'diagnostic.data' directory of its dbpath. Each file is a sequence of BSON
+documents. Those of type 1 hold a chunk of samples: a zlib-compressed reference document followed
+by, for each numeric field of the reference document, the run-length and varint encoded deltas of
+that field in each of the later samples.
+
+Samples are represented by the values of their metrics rather than as documents. A metric is named
+after the dotted path of its field in the reference document, e.g.
+'serverStatus.opcounters.insert'. Dates are converted to milliseconds since the epoch and
+Timestamps are split into a '.t' and an '.i' metric.
+"""
+
+import calendar
+import datetime
+import math
+import os
+import struct
+import zlib
+
+import bson
+from bson.decimal128 import Decimal128
+from bson.timestamp import Timestamp
+
+DIAGNOSTIC_DATA_DIRNAME = "diagnostic.data"
+INTERIM_FILENAME = "metrics.interim"
+
+# Values of the 'type' field of the documents in an FTDC file.
+TYPE_METADATA = 0
+TYPE_METRIC_CHUNK = 1
+
+# The metric holding the time at which each sample started.
+START_METRIC = "start"
+
+_UINT64_MASK = (1 << 64) - 1
+_INT64_MAX = (1 << 63) - 1
+
+
+class MetricChunk(object):
+    """The samples of a single metric chunk."""
+
+    def __init__(self, metrics, num_samples):
+        """
+        Initialize the MetricChunk.
+
+        :param metrics: Dict of metric name to the list of its value in each sample.
+        :param num_samples: The number of samples in the chunk.
+        """
+        self.metrics = metrics
+        self.num_samples = num_samples
+
+    def sample_times(self):
+        """Return the start time of each sample, in milliseconds since the epoch."""
+        return self.metrics.get(START_METRIC, [])
+
+    def get(self, metric, sample_index):
+        """Return the value of 'metric' in a sample, or None if the chunk doesn't have it."""
+        values = self.metrics.get(metric)
+        if values is None:
+            return None
+        return values[sample_index]
+
+
+def _datetime_to_millis(value):
+    """Convert a naive UTC datetime to milliseconds since the epoch."""
+    return calendar.timegm(value.timetuple()) * 1000 + value.microsecond // 1000
+
+
+def _extract_metrics(document, prefix, names, values):
+    """Append the name and value of each metric of 'document' to 'names' and 'values'.
+
+    The fields are visited in the same order mongod visits them when encoding the chunk.
+    """
+    if isinstance(document, dict):
+        items = document.items()
+    else:
+        items = ((str(i), element) for (i, element) in enumerate(document))
+
+    for (key, value) in items:
+        name = prefix + key
+        # bool is a subclass of int so it must be checked for first.
+        if isinstance(value, bool):
+            names.append(name)
+            values.append(int(value))
+        elif isinstance(value, int):
+            names.append(name)
+            values.append(value)
+        elif isinstance(value, float):
+            names.append(name)
+            values.append(int(value) if math.isfinite(value) else 0)
+        elif isinstance(value, Decimal128):
+            names.append(name)
+            decimal = value.to_decimal()
+            values.append(int(decimal) if decimal.is_finite() else 0)
+        elif isinstance(value, datetime.datetime):
+            names.append(name)
+            values.append(_datetime_to_millis(value))
+        elif isinstance(value, Timestamp):
+            names.extend([name + ".t", name + ".i"])
+            values.extend([value.time, value.inc])
+        elif isinstance(value, (dict, list)):
+            _extract_metrics(value, name + ".", names, values)
+
+
+def _read_varint(buf, pos):
+    """Return the unsigned LEB128 integer at 'pos' in 'buf' and the position after it."""
+    result = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return (result, pos)
+        shift += 7
+
+
+def _to_int64(value):
+    """Interpret the unsigned 64-bit 'value' as a signed one."""
+    if value > _INT64_MAX:
+        return value - (1 << 64)
+    return value
+
+
+def decode_chunk(data, metric_filter=None):  # pylint: disable=too-many-locals
+    """
+    Decode the compressed 'data' of a metric chunk document.
+
+    :param data: The 'data' field of a document of type TYPE_METRIC_CHUNK.
+    :param metric_filter: If set, a function of a metric name returning whether to keep the values
+        of that metric. The START_METRIC metric is always kept.
+    :return: MetricChunk with the samples of the chunk.
+    """
+    # The compressed data is prefixed with its uncompressed length.
+    payload = zlib.decompress(bytes(data[4:]))
+
+    (reference_len, ) = struct.unpack_from("<i", payload, 0)
+    reference = bson.decode(payload[:reference_len])
+    (num_metrics, num_deltas) = struct.unpack_from("<II", payload, reference_len)
+    pos = reference_len + 8
+
+    names = []
+    reference_values = []
+    _extract_metrics(reference, "", names, reference_values)
+    if len(names) != num_metrics:
+        raise ValueError(
+            "The reference document of the FTDC chunk has {} metrics, expected {}".format(
+                len(names), num_metrics))
+
+    metrics = {}
+    zeroes = 0
+    for (name, value) in zip(names, reference_values):
+        keep = metric_filter is None or name == START_METRIC or metric_filter(name)
+        values = [value] if keep else None
+        value &= _UINT64_MASK
+
+        sample = 0
+        while sample < num_deltas:
+            if zeroes:
+                # A run of zero deltas, which may continue into the next metric.
+                num_zeroes = min(zeroes, num_deltas - sample)
+                if keep:
+                    values.extend([_to_int64(value)] * num_zeroes)
+                zeroes -= num_zeroes
+                sample += num_zeroes
+                continue
+
+            (delta, pos) = _read_varint(payload, pos)
+            if delta == 0:
+                (zeroes, pos) = _read_varint(payload, pos)
+            value = (value + delta) & _UINT64_MASK
+            if keep:
+                values.append(_to_int64(value))
+            sample += 1
+
+        if keep:
+            metrics[name] = values
+
+    return MetricChunk(metrics, num_deltas + 1)
+
+
+class FileReader(object):
+    """Read the metric chunks of an FTDC file, which may still be written to by mongod."""
+
+    def __init__(self, pathname, metric_filter=None):
+        """Initialize the FileReader."""
+        self.pathname = pathname
+        self.offset = 0
+        self._metric_filter = metric_filter
+
+    def read_new_chunks(self):
+        """Return the metric chunks written since the last call.
+
+        A document that is only partially written is left to be read by the next call.
+        """
+        with open(self.pathname, "rb") as fp:
+            fp.seek(self.offset)
+            buf = fp.read()
+
+        chunks = []
+        pos = 0
+        while pos + 4 <= len(buf):
+            (doc_len, ) = struct.unpack_from("<i", buf, pos)
+            if doc_len < 5 or pos + doc_len > len(buf):
+                break
+
+            document = bson.decode(buf[pos:pos + doc_len])
+            pos += doc_len
+            if document.get("type") == TYPE_METRIC_CHUNK:
+                chunks.append(decode_chunk(document["data"], self._metric_filter))
+
+        self.offset += pos
+        return chunks
+
+
+def list_metrics_files(diagnostic_dir):
+    """Return the FTDC files of 'diagnostic_dir' in the order they were written.
+
+    The interim file, which holds the samples of the chunk being collected, isn't included.
+    """
+    # The files are named after the time they were created, e.g.
+    # metrics.2020-01-01T00-00-00Z-00000, so they sort in the order they were written.
+    return sorted(
+        os.path.join(diagnostic_dir, filename) for filename in os.listdir(diagnostic_dir)
+        if filename.startswith("metrics.") and filename != INTERIM_FILENAME)
+
+
+def read_directory(diagnostic_dir, metric_filter=None):
+    """Return all of the metric chunks of 'diagnostic_dir', including those of the interim file."""
+    pathnames = list_metrics_files(diagnostic_dir)
+    interim_pathname = os.path.join(diagnostic_dir, INTERIM_FILENAME)
+    if os.path.exists(interim_pathname):
+        pathnames.append(interim_pathname)
+
+    chunks = []
+    for pathname in pathnames:
+        chunks.extend(FileReader(pathname, metric_filter).read_new_chunks())
+    return chunks
+
+
+def find_diagnostic_dirs(root):
+    """Return the 'diagnostic.data' directories under 'root', e.g. the dbpath of a fixture."""
+    diagnostic_dirs = []
+    for (dirpath, dirnames, _) in os.walk(root):
+        if DIAGNOSTIC_DATA_DIRNAME in dirnames:
+            diagnostic_dirs.append(os.path.join(dirpath, DIAGNOSTIC_DATA_DIRNAME))
+            # There is nothing else of interest under a dbpath.
+            dirnames[:] = []
+    return sorted(diagnostic_dirs)
@@ -0,0 +1,103 @@
+"""Statistics for telling the run-to-run noise of benchmarks apart from real changes.
+
+The repetitions of a benchmark are few and aren't normally distributed, so they are summarized by
+their median and interquartile range, along with the 95% confidence interval of their mean.
+Whether two sets of repetitions differ significantly is decided by Welch's t-test, which doesn't
+assume they have the same variance.
+"""
+
+import math
+import statistics
+
+# The critical values of the two-sided Student's t-distribution at the 95% confidence level, by
+# degrees of freedom. The degrees of freedom between two entries are rounded down to the lower
+# entry, which errs on the side of not flagging a change.
+_T_CRITICAL_95 = [
+    (1, 12.706),
+    (2, 4.303),
+    (3, 3.182),
+    (4, 2.776),
+    (5, 2.571),
+    (6, 2.447),
+    (7, 2.365),
+    (8, 2.306),
+    (9, 2.262),
+    (10, 2.228),
+    (12, 2.179),
+    (15, 2.131),
+    (20, 2.086),
+    (25, 2.060),
+    (30, 2.042),
+    (40, 2.021),
+    (60, 2.000),
+    (120, 1.980),
+    (math.inf, 1.960),
+]
+
+
+def t_critical_95(degrees_of_freedom):
+    """Return the critical value of the t-distribution at the 95% confidence level."""
+    critical_value = _T_CRITICAL_95[0][1]
+    for (table_degrees_of_freedom, table_critical_value) in _T_CRITICAL_95:
+        if table_degrees_of_freedom > degrees_of_freedom:
+            break
+        critical_value = table_critical_value
+    return critical_value
+
+
+def percentile(values, percent):
+    """Return the nearest-rank 'percent' percentile of 'values', which must be sorted."""
+    rank = max(1, math.ceil(percent / 100.0 * len(values)))
+    return values[rank - 1]
+
+
+def _interpolated_quantile(sorted_values, fraction):
+    """Return the 'fraction' quantile of 'sorted_values', interpolating between the nearest two.
+
+    This is the "inclusive" method of statistics.quantiles(), which is only available from Python
+    3.8 on.
+    """
+    position = fraction * (len(sorted_values) - 1)
+    lower = int(math.floor(position))
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(values):
+    """Return the median, the interquartile range and the 95% confidence interval of the mean."""
+    if not values:
+        return {"median": None, "iqr": None, "ci_95": None}
+    if len(values) < 2:
+        return {"median": values[0], "iqr": 0, "ci_95": [values[0], values[0]]}
+
+    sorted_values = sorted(values)
+    first_quartile = _interpolated_quantile(sorted_values, 0.25)
+    third_quartile = _interpolated_quantile(sorted_values, 0.75)
+    mean = statistics.mean(values)
+    margin = t_critical_95(len(values) - 1) * statistics.stdev(values) / math.sqrt(len(values))
+    return {
+        "median": statistics.median(values),
+        "iqr": third_quartile - first_quartile,
+        "ci_95": [mean - margin, mean + margin],
+    }
+
+
+def is_significant_change(baseline_values, values):
+    """Return whether the mean of 'values' differs from the one of 'baseline_values'.
+
+    Welch's t-test is used at the 95% confidence level. A change is never significant when either
+    side has fewer than two values as their variance can't be estimated.
+    """
+    if len(baseline_values) < 2 or len(values) < 2:
+        return False
+
+    baseline_error = statistics.variance(baseline_values) / len(baseline_values)
+    error = statistics.variance(values) / len(values)
+    difference = statistics.mean(values) - statistics.mean(baseline_values)
+    if baseline_error + error == 0:
+        return difference != 0
+
+    t_statistic = difference / math.sqrt(baseline_error + error)
+    degrees_of_freedom = (baseline_error + error)**2 / (
+        baseline_error**2 / (len(baseline_values) - 1) + error**2 / (len(values) - 1))
+    return abs(t_statistic) > t_critical_95(degrees_of_freedom)
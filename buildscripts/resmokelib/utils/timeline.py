@@ -0,0 +1,148 @@
+"""Record a timeline of where the wall clock time of a resmoke.py invocation goes.
+
+The timeline is written in the Chrome trace event format so it can be viewed in chrome://tracing
+or https://ui.perfetto.dev. Each Job gets a lane of its own and any other thread which records an
+event gets a lane named after the thread.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+
+_LOCK = threading.Lock()
+_ENABLED = False
+_EVENTS = []  # type: ignore
+
+# Lanes that aren't for a Job are numbered after the lanes of the Jobs.
+_FIRST_THREAD_LANE = 10000
+_THREAD_LANES = {}  # type: ignore
+
+# All events are recorded under the resmoke.py process, including those recorded by a Job running
+# in a process of its own, so that the Jobs are shown side by side.
+_PID = os.getpid()
+
+
+def enable():
+    """Start recording events."""
+
+    global _ENABLED, _PID  # pylint: disable=global-statement
+    with _LOCK:
+        _ENABLED = True
+        _PID = os.getpid()
+        del _EVENTS[:]
+
+
+def is_enabled():
+    """Return True if events are being recorded."""
+    return _ENABLED
+
+
+def _lane(job_num):
+    """Return the thread id of the lane to record an event for 'job_num' in."""
+    if job_num is not None:
+        return job_num
+
+    thread_name = threading.current_thread().name
+    with _LOCK:
+        if thread_name not in _THREAD_LANES:
+            _THREAD_LANES[thread_name] = _FIRST_THREAD_LANE + len(_THREAD_LANES)
+        return _THREAD_LANES[thread_name]
+
+
+def record(  # pylint: disable=too-many-arguments
+        name, category, start_time, end_time, job_num=None, args=None):
+    """Record an event for something that ran from 'start_time' to 'end_time' (in seconds)."""
+    if not _ENABLED:
+        return
+
+    start_micros = int(start_time * 1000000)
+    event = {
+        "name": name,
+        "cat": category,
+        "ph": "X",
+        "ts": start_micros,
+        "dur": max(int(end_time * 1000000) - start_micros, 0),
+        "pid": _PID,
+        "tid": _lane(job_num),
+    }
+    if args:
+        event["args"] = args
+
+    with _LOCK:
+        _EVENTS.append(event)
+
+
+@contextlib.contextmanager
+def span(name, category, job_num=None, **args):
+    """Record an event for the duration of the 'with' block.
+
+    The yielded dict may be updated with additional arguments to attach to the event.
+    """
+    if not _ENABLED:
+        yield args
+        return
+
+    start_time = time.time()
+    try:
+        yield args
+    finally:
+        record(name, category, start_time, time.time(), job_num=job_num, args=args)
+
+
+def take_events():
+    """Remove and return the events recorded so far."""
+    with _LOCK:
+        events = list(_EVENTS)
+        del _EVENTS[:]
+    return events
+
+
+def add_events(events):
+    """Add events that were recorded elsewhere, e.g. by a Job running in a process of its own."""
+    with _LOCK:
+        _EVENTS.extend(events)
+
+
+def _metadata_events(events):
+    """Return the events that name the process and the lanes used by 'events'."""
+    lanes = {event["tid"] for event in events}
+    thread_names = {lane: name for (name, lane) in _THREAD_LANES.items()}
+
+    metadata = [{
+        "name": "process_name",
+        "ph": "M",
+        "pid": _PID,
+        "args": {"name": "resmoke.py"},
+    }]
+    for lane in sorted(lanes):
+        metadata.append({
+            "name": "thread_name",
+            "ph": "M",
+            "pid": _PID,
+            "tid": lane,
+            "args": {"name": thread_names.get(lane, "job{}".format(lane))},
+        })
+        # Keep the lanes of the Jobs in order.
+        metadata.append({
+            "name": "thread_sort_index",
+            "ph": "M",
+            "pid": _PID,
+            "tid": lane,
+            "args": {"sort_index": lane},
+        })
+    return metadata
+
+
+def write(pathname):
+    """Write the events recorded so far to 'pathname' as a Chrome trace."""
+    with _LOCK:
+        events = list(_EVENTS)
+        trace = {
+            "traceEvents": _metadata_events(events) + events,
+            "displayTimeUnit": "ms",
+        }
+
+    with open(pathname, "w") as fp:
+        json.dump(trace, fp)
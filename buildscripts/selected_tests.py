@@ -4,7 +4,7 @@ import logging
 import os
 import re
 import sys
-from typing import Any, Dict, List, Set
+from typing import Any, Dict, List, Optional, Set
 
 import click
 import structlog
@@ -16,7 +16,7 @@ from shrub.v2 import ShrubProject, BuildVariant
 
 # Get relative imports to work when the package is not installed on the PYTHONPATH.
 from buildscripts.patch_builds.change_data import find_changed_files_in_repos, \
-    generate_revision_map_from_manifest
+    find_changed_lines_in_repos, generate_revision_map_from_manifest
 
 if __name__ == "__main__" and __package__ is None:
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -43,6 +43,8 @@ from buildscripts.evergreen_generate_resmoke_tasks import (
     write_file_dict,
     Suite,
 )
+from buildscripts.patch_builds.co_change_index import CoChangeIndex
+from buildscripts.patch_builds.coverage_index import CoverageIndex
 from buildscripts.patch_builds.selected_tests_service import SelectedTestsService
 
 structlog.configure(logger_factory=LoggerFactory())
@@ -355,10 +357,10 @@ def _remove_repo_path_prefix(file_path: str) -> str:
     return file_path
 
 
-def _get_task_configs(evg_conf: EvergreenProjectConfig,
-                      selected_tests_service: SelectedTestsService,
-                      selected_tests_variant_expansions: Dict[str, str],
-                      build_variant_config: Variant, changed_files: Set[str]) -> Dict[str, Dict]:
+def _get_task_configs(  # pylint: disable=too-many-arguments
+        evg_conf: EvergreenProjectConfig, selected_tests_service: SelectedTestsService,
+        selected_tests_variant_expansions: Dict[str, str], build_variant_config: Variant,
+        changed_files: Set[str], covering_test_files: Optional[Set[str]] = None) -> Dict[str, Dict]:
     """
     Get task configurations for the tasks to be generated.
 
@@ -367,11 +369,14 @@ def _get_task_configs(evg_conf: EvergreenProjectConfig,
     :param selected_tests_variant_expansions: Expansions of the selected-tests variant.
     :param build_variant_config: Config of build variant to collect task info from.
     :param changed_files: Set of changed_files.
+    :param covering_test_files: Tests covering the changed lines, from the coverage index.
     :return: Task configurations.
     """
     task_configs = {}
 
     related_test_files = _find_selected_test_files(selected_tests_service, changed_files)
+    if covering_test_files:
+        related_test_files |= covering_test_files
     LOGGER.info("related test files found", related_test_files=related_test_files,
                 variant=build_variant_config.name)
 
@@ -427,9 +432,32 @@ def remove_task_configs_already_in_build(task_configs: Dict[str, Dict], evg_api:
                 del task_configs[task.display_name]
 
 
-def run(evg_api: EvergreenApi, evg_conf: EvergreenProjectConfig,
+def _find_covering_test_files(coverage_index: CoverageIndex, repos: List[Repo],
+                              revision_map: Dict[str, str]) -> Set[str]:
+    """
+    Find a small set of tests that covers the changed lines, from the coverage index.
+
+    :param coverage_index: Index of the tests covering each function of the source files.
+    :param repos: List of repos containing changed files.
+    :param revision_map: Map of revisions to compare against for repos.
+    :return: Set of test files covering the changed lines that are valid test files.
+    """
+    changed_lines = {
+        _remove_repo_path_prefix(file_path): lines
+        for (file_path, lines) in find_changed_lines_in_repos(repos, revision_map).items()
+    }
+    return {
+        test_file
+        for test_file in coverage_index.select_tests(changed_lines)
+        if is_file_a_test_file(test_file)
+    }
+
+
+def run(  # pylint: disable=too-many-arguments
+        evg_api: EvergreenApi, evg_conf: EvergreenProjectConfig,
         selected_tests_service: SelectedTestsService,
-        selected_tests_variant_expansions: Dict[str, str], repos: List[Repo]) -> Dict[str, str]:
+        selected_tests_variant_expansions: Dict[str, str], repos: List[Repo],
+        coverage_index: Optional[CoverageIndex] = None) -> Dict[str, str]:
     # pylint: disable=too-many-locals
     """
     Run code to select tasks to run based on test and task mappings for each of the build variants.
@@ -439,6 +467,7 @@ def run(evg_api: EvergreenApi, evg_conf: EvergreenProjectConfig,
     :param selected_tests_service: Selected-tests service.
     :param selected_tests_variant_expansions: Expansions of the selected-tests variant.
     :param repos: List of repos containing changed files.
+    :param coverage_index: Index of the tests covering each function of the source files.
     :return: Dict of files and file contents for generated tasks.
     """
     config_dict_of_suites_and_tasks = {}
@@ -449,6 +478,11 @@ def run(evg_api: EvergreenApi, evg_conf: EvergreenProjectConfig,
     changed_files = {_remove_repo_path_prefix(file_path) for file_path in changed_files}
     LOGGER.info("Found changed files", files=changed_files)
 
+    covering_test_files = None
+    if coverage_index:
+        covering_test_files = _find_covering_test_files(coverage_index, repos, revision_map)
+        LOGGER.info("Found tests covering the changed lines", tests=covering_test_files)
+
     shrub_project = ShrubProject()
     for build_variant_config in evg_conf.get_required_variants():
         shrub_build_variant = BuildVariant(build_variant_config.name)
@@ -456,7 +490,7 @@ def run(evg_api: EvergreenApi, evg_conf: EvergreenProjectConfig,
 
         task_configs = _get_task_configs(evg_conf, selected_tests_service,
                                          selected_tests_variant_expansions, build_variant_config,
-                                         changed_files)
+                                         changed_files, covering_test_files)
 
         remove_task_configs_already_in_build(task_configs, evg_api, build_variant_config,
                                              selected_tests_variant_expansions["version_id"])
@@ -499,15 +533,28 @@ def run(evg_api: EvergreenApi, evg_conf: EvergreenProjectConfig,
 @click.option(
     "--selected-tests-config",
     "selected_tests_config",
-    required=True,
     metavar="FILE",
     help="Configuration file with connection info for selected tests service.",
 )
-def main(
+@click.option(
+    "--co-change-index",
+    "co_change_index",
+    metavar="FILE",
+    help="Co-change index to select tests from, instead of the selected tests service.",
+)
+@click.option(
+    "--coverage-index",
+    "coverage_index",
+    metavar="FILE",
+    help="Coverage index to also select the tests covering the changed lines from.",
+)
+def main(  # pylint: disable=too-many-arguments
         verbose: bool,
         expansion_file: str,
         evg_api_config: str,
         selected_tests_config: str,
+        co_change_index: str,
+        coverage_index: str,
 ):
     """
     Select tasks to be run based on changed files in a patch build.
@@ -516,20 +563,29 @@ def main(
     :param expansion_file: Configuration file.
     :param evg_api_config: Location of configuration file to connect to evergreen.
     :param selected_tests_config: Location of config file to connect to elected-tests service.
+    :param co_change_index: Location of the co-change index built by update_co_change_index.py.
+    :param coverage_index: Location of the coverage index built by record_test_coverage.py.
     """
     _configure_logging(verbose)
 
+    if co_change_index:
+        selected_tests_service = CoChangeIndex.from_file(co_change_index)
+    elif selected_tests_config:
+        selected_tests_service = SelectedTestsService.from_file(selected_tests_config)
+    else:
+        raise click.UsageError("One of --selected-tests-config or --co-change-index is required")
+
     evg_api = RetryingEvergreenApi.get_api(config_file=evg_api_config)
     evg_conf = parse_evergreen_file(EVERGREEN_FILE)
-    selected_tests_service = SelectedTestsService.from_file(selected_tests_config)
     repos = [Repo(x) for x in DEFAULT_REPO_LOCATIONS if os.path.isdir(x)]
 
     buildscripts.resmokelib.parser.set_run_options()
 
     task_expansions = read_config.read_config_file(expansion_file)
 
-    config_dict_of_suites_and_tasks = run(evg_api, evg_conf, selected_tests_service,
-                                          task_expansions, repos)
+    config_dict_of_suites_and_tasks = run(
+        evg_api, evg_conf, selected_tests_service, task_expansions, repos,
+        CoverageIndex.from_file(coverage_index) if coverage_index else None)
     write_file_dict(SELECTED_TESTS_CONFIG_DIR, config_dict_of_suites_and_tasks)
 
 
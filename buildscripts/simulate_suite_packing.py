@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Simulate how the tests of a task would be split into generated sub-tasks.
+
+Packs the tests of a task into sub-suites with each packing strategy of
+evergreen_generate_resmoke_tasks.py, using the test history of the task, and reports the expected
+runtime of the longest sub-suite (the makespan) and how much longer it is than the average one
+(the imbalance). This allows picking the target runtime, the maximum number of sub-suites and the
+packing strategy of a task offline.
+"""
+import datetime
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+import click
+from evergreen import TestStats
+from evergreen.api import RetryingEvergreenApi
+
+# Get relative imports to work when the package is not installed on the PYTHONPATH.
+if __name__ == "__main__" and __package__ is None:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+import buildscripts.evergreen_generate_resmoke_tasks as generate_resmoke
+import buildscripts.util.suite_packing as suite_packing
+from buildscripts.util.teststats import HistoricTaskData, TestRuntime
+# pylint: enable=wrong-import-position
+
+DEFAULT_PROJECT = "mongodb-mongo-master"
+
+# LPT packing followed by its improvement pass.
+LPT_IMPROVED = generate_resmoke.LPT_PACKING + "+improve"
+STRATEGIES = [generate_resmoke.SEQUENTIAL_PACKING, generate_resmoke.LPT_PACKING, LPT_IMPROVED]
+
+
+def simulate_strategy(  # pylint: disable=too-many-arguments
+        strategy: str, tests_runtimes: List[TestRuntime], max_time_seconds: int,
+        max_suites: Optional[int], max_tests_per_suite: Optional[int],
+        per_test_overhead: float) -> suite_packing.PackingResult:
+    """
+    Pack the given tests into sub-suites with the given strategy.
+
+    :param strategy: Packing strategy to use.
+    :param tests_runtimes: Tests to pack along with their runtimes.
+    :param max_time_seconds: Target runtime of each sub-suite.
+    :param max_suites: Maximum number of sub-suites to create.
+    :param max_tests_per_suite: Maximum number of tests in a sub-suite.
+    :param per_test_overhead: Runtime of the task-level hooks expected to run for each test.
+    :return: Tests of each sub-suite and their expected runtimes.
+    """
+    if strategy == generate_resmoke.SEQUENTIAL_PACKING:
+        runtimes = dict(tests_runtimes)
+        suites = generate_resmoke.divide_tests_into_suites(
+            "simulation", tests_runtimes, max_time_seconds, max_suites, max_tests_per_suite)
+        return suite_packing.simulate([[TestRuntime(test, runtimes[test]) for test in suite.tests]
+                                       for suite in suites], per_test_overhead)
+
+    return suite_packing.pack_tests(tests_runtimes, max_time_seconds, max_suites,
+                                    max_tests_per_suite, per_test_overhead,
+                                    improve=strategy == LPT_IMPROVED)
+
+
+def simulate(test_stats: HistoricTaskData, target_minutes: List[int], max_suites: Optional[int],
+             max_tests_per_suite: Optional[int], clean_every_n: int) -> List[Dict]:
+    """
+    Simulate each packing strategy for each of the given target runtimes.
+
+    :param test_stats: Historic test results of the task.
+    :param target_minutes: Target runtimes of the sub-suites to simulate.
+    :param max_suites: Maximum number of sub-suites to create.
+    :param max_tests_per_suite: Maximum number of tests in a sub-suite.
+    :param clean_every_n: How often the CleanEveryN hook of the suite runs.
+    :return: The number of sub-suites, makespan and imbalance of each simulation.
+    """
+    tests_runtimes = test_stats.get_tests_runtimes()
+    per_test_overhead = test_stats.get_avg_hook_runtime(
+        generate_resmoke.CLEAN_EVERY_N_HOOK) / clean_every_n
+
+    results = []
+    for minutes in target_minutes:
+        for strategy in STRATEGIES:
+            packing = simulate_strategy(strategy, tests_runtimes, minutes * 60, max_suites,
+                                        max_tests_per_suite, per_test_overhead)
+            results.append({
+                "target_minutes": minutes,
+                "strategy": strategy,
+                "num_suites": len(packing.bins),
+                "makespan_secs": packing.makespan,
+                "imbalance": packing.imbalance,
+            })
+    return results
+
+
+def load_test_stats(history_file: str) -> List[TestStats]:
+    """Load the test stats saved by a previous simulation."""
+    with open(history_file) as fh:
+        return [TestStats(stats, None) for stats in json.load(fh)]
+
+
+def format_results(results: List[Dict]) -> str:
+    """Format the results of the simulations as a table."""
+    lines = ["target  strategy     suites  makespan  imbalance"]
+    for result in results:
+        lines.append("{:>4}m   {:<12} {:>6}  {:>7.1f}m  {:>8.1%}".format(
+            result["target_minutes"], result["strategy"], result["num_suites"],
+            result["makespan_secs"] / 60, result["imbalance"]))
+    return "\n".join(lines)
+
+
+@click.command()
+@click.option("--project", type=str, default=DEFAULT_PROJECT, help="Evergreen project.")
+@click.option("--build-variant", type=str, help="Build variant of the task to simulate.")
+@click.option("--task", type=str, help="Task to simulate, without its _gen suffix.")
+@click.option("--history-file", type=str,
+              help="Read the test history from this file instead of from Evergreen.")
+@click.option("--save-history", type=str,
+              help="Save the test history fetched from Evergreen to this file.")
+@click.option("--lookback-days", type=int, default=generate_resmoke.LOOKBACK_DURATION_DAYS,
+              help="Number of days of test history to use.")
+@click.option("--target-minutes", type=int, multiple=True, default=[60],
+              help="Target runtime of the sub-suites, can be given several times.")
+@click.option("--max-sub-suites", type=int,
+              default=generate_resmoke.DEFAULT_CONFIG_VALUES["max_sub_suites"],
+              help="Maximum number of sub-suites.")
+@click.option("--max-tests-per-suite", type=int,
+              default=generate_resmoke.DEFAULT_CONFIG_VALUES["max_tests_per_suite"],
+              help="Maximum number of tests in a sub-suite.")
+@click.option("--clean-every-n", type=int, default=1,
+              help="N of the CleanEveryN hook of the suite.")
+@click.option("--json-output", is_flag=True, default=False, help="Output the results as JSON.")
+@click.option("--evergreen-config", type=str, default=generate_resmoke.EVG_CONFIG_FILE,
+              help="Location of evergreen configuration file.")
+def main(  # pylint: disable=too-many-arguments,too-many-locals
+        project, build_variant, task, history_file, save_history, lookback_days, target_minutes,
+        max_sub_suites, max_tests_per_suite, clean_every_n, json_output, evergreen_config):
+    """
+    Simulate how the tests of a task would be split into generated sub-tasks.
+
+    The test history of the task is read from Evergreen, unless `--history-file` is given.
+    """
+    if history_file:
+        historic_stats = load_test_stats(history_file)
+    else:
+        if not build_variant or not task:
+            raise click.UsageError("--build-variant and --task are required without --history-file")
+        evg_api = RetryingEvergreenApi.get_api(config_file=evergreen_config)
+        end_date = datetime.datetime.utcnow().replace(microsecond=0)
+        start_date = end_date - datetime.timedelta(days=lookback_days)
+        historic_stats = evg_api.test_stats_by_project(
+            project, after_date=start_date, before_date=end_date, tasks=[task],
+            variants=[build_variant], group_by="test", group_num_days=lookback_days)
+        if save_history:
+            with open(save_history, "w") as fh:
+                json.dump([stats.json for stats in historic_stats], fh)
+
+    results = simulate(
+        HistoricTaskData.from_stats_list(historic_stats), target_minutes, max_sub_suites,
+        max_tests_per_suite, clean_every_n)
+    if json_output:
+        print(json.dumps(results, indent=4))
+    else:
+        print(format_results(results))
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -2,8 +2,12 @@
 
 import datetime
 import os
+import shutil
+import tempfile
 import unittest
 
+from mock import patch
+
 import buildscripts.ciconfig.evergreen as _evergreen
 
 # pylint: disable=missing-docstring,protected-access
@@ -65,6 +69,139 @@ class TestEvergreenProjectConfig(unittest.TestCase):
         self.assertIn("debian-stretch", self.conf.distro_names)
         self.assertIn("amazon", self.conf.distro_names)
 
+    def test_get_variants_by_task(self):
+        self.assertEqual(
+            ["ubuntu", "debian"],
+            [variant.name for variant in self.conf.get_variants_by_task("resmoke_task")])
+        # Tasks of a task group are run by the variants running the task group.
+        self.assertEqual(["osx-108", "ubuntu", "amazon"],
+                         [variant.name for variant in self.conf.get_variants_by_task("compile")])
+        self.assertEqual([], self.conf.get_variants_by_task("no_such_task"))
+
+    def test_get_task_names_by_tag(self):
+        conf = _evergreen.EvergreenProjectConfig({
+            "tasks": [{"name": "task1", "tags": ["a", "b"]}, {"name": "task2", "tags": ["b"]},
+                      {"name": "task3"}],
+            "buildvariants": [],
+        })  # yapf: disable
+        self.assertEqual(["task1"], conf.get_task_names_by_tag("a"))
+        self.assertEqual(["task1", "task2"], conf.get_task_names_by_tag("b"))
+        self.assertEqual([], conf.get_task_names_by_tag("c"))
+
+
+class TestParseEvergreenFileCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        cwd = os.getcwd()
+        os.chdir(self.tmp_dir)
+        self.addCleanup(os.chdir, cwd)
+
+        self.cache_dir = os.path.join(self.tmp_dir, "cache")
+        with open(TEST_FILE_PATH) as fh:
+            self.contents = fh.read()
+        self.write_file("included.yml", "functions: {}\n")
+        self.write_file("evergreen.yml", "include:\n- filename: included.yml\n" + self.contents)
+
+        patcher = patch.object(_evergreen, "_load_evergreen_file",
+                               wraps=_evergreen._load_evergreen_file)
+        self.load_mock = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def write_file(name, contents):
+        with open(name, "w") as fh:
+            fh.write(contents)
+
+    def parse(self):
+        return _evergreen.parse_evergreen_file("evergreen.yml", evergreen_binary=None,
+                                               cache_dir=self.cache_dir)
+
+    def test_get_included_files(self):
+        contents = ("include:\n  - filename: etc/a.yml\n  - module: enterprise\n"
+                    "    filename: 'etc/b.yml'  # comment\n\nfunctions:\n  filename: c.yml\n")
+        self.assertEqual(["etc/a.yml", "etc/b.yml"], _evergreen._get_included_files(contents))
+
+    def test_cached(self):
+        self.assertEqual(6, len(self.parse().tasks))
+        conf = self.parse()
+
+        self.assertEqual(1, self.load_mock.call_count)
+        self.assertEqual(6, len(conf.tasks))
+        self.assertEqual(1, len(os.listdir(self.cache_dir)))
+
+    def test_included_file_changes(self):
+        self.parse()
+        self.write_file("included.yml", "functions: {'a': []}\n")
+        self.parse()
+        self.assertEqual(2, self.load_mock.call_count)
+
+    def test_corrupt_cache(self):
+        self.parse()
+        (cache_file, ) = os.listdir(self.cache_dir)
+        self.write_file(os.path.join(self.cache_dir, cache_file), "corrupt")
+
+        self.assertEqual(6, len(self.parse().tasks))
+        self.assertEqual(2, self.load_mock.call_count)
+        self.assertEqual(6, len(self.parse().tasks))
+        self.assertEqual(2, self.load_mock.call_count)
+
+    @patch.object(_evergreen, "MAX_CACHED_CONFIGS", 2)
+    def test_least_recently_used_pruned(self):
+        for i in range(3):
+            self.write_file("included.yml", "functions: {{'{}': []}}\n".format(i))
+            self.parse()
+            # Make the configuration cached last the most recently used one.
+            for (age, name) in enumerate(
+                    sorted(
+                        os.listdir(self.cache_dir),
+                        key=lambda name: os.path.getmtime(os.path.join(self.cache_dir, name)))):
+                os.utime(os.path.join(self.cache_dir, name), (age, age))
+
+        self.assertEqual(2, len(os.listdir(self.cache_dir)))
+        self.parse()
+        self.assertEqual(3, self.load_mock.call_count)
+
+    def test_missing_included_file_not_cached(self):
+        os.remove("included.yml")
+        self.parse()
+        self.parse()
+        self.assertEqual(2, self.load_mock.call_count)
+        self.assertFalse(os.path.exists(self.cache_dir))
+
+    def test_included_files_relative_to_project_root(self):
+        os.mkdir(".git")
+        os.mkdir("etc")
+        os.mkdir("other")
+        os.rename("evergreen.yml", os.path.join("etc", "evergreen.yml"))
+        os.chdir("other")
+
+        def parse():
+            return _evergreen.parse_evergreen_file(
+                os.path.join("..", "etc", "evergreen.yml"), evergreen_binary=None,
+                cache_dir=self.cache_dir)
+
+        parse()
+        self.write_file(os.path.join("..", "included.yml"), "functions: {'a': []}\n")
+        parse()
+        parse()
+        self.assertEqual(2, self.load_mock.call_count)
+
+    @patch.object(_evergreen, "MAX_CACHED_CONFIGS", 1)
+    def test_cache_pruned_concurrently(self):
+        self.parse()
+        self.write_file("included.yml", "functions: {'a': []}\n")
+        with patch.object(_evergreen.os, "remove", side_effect=FileNotFoundError):
+            self.parse()
+        with patch.object(_evergreen.os, "utime", side_effect=FileNotFoundError):
+            self.assertEqual(6, len(self.parse().tasks))
+        self.assertEqual(2, self.load_mock.call_count)
+
+    def test_cache_dir_from_env(self):
+        with patch.dict(os.environ, {_evergreen.CACHE_DIR_ENV: self.cache_dir}):
+            _evergreen.parse_evergreen_file("evergreen.yml", evergreen_binary=None)
+        self.assertEqual(1, len(os.listdir(self.cache_dir)))
+
 
 class TestTask(unittest.TestCase):  # pylint: disable=too-many-public-methods
     """Unit tests for the Task class."""
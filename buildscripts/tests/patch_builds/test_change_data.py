@@ -89,3 +89,43 @@ class TestGenerateRevisionMapFromManifest(unittest.TestCase):
 
         self.assertEqual(revision_map[mock_repo_list[0].git_dir], mongo_revision)
         self.assertEqual(revision_map[mock_repo_list[1].git_dir], enterprise_revision)
+
+
+class TestParseChangedLines(unittest.TestCase):
+    def test_changed_lines(self):
+        diff_output = "\n".join([
+            "diff --git a/src/mongo/foo.cpp b/src/mongo/foo.cpp",
+            "index 1111111..2222222 100644",
+            "--- a/src/mongo/foo.cpp",
+            "+++ b/src/mongo/foo.cpp",
+            "@@ -10 +10 @@ void foo() {",
+            "-    return 1;",
+            "+    return 2;",
+            "@@ -20,0 +21,2 @@ void bar() {",
+            "+    int a;",
+            "+    int b;",
+            "@@ -30,2 +31,0 @@ void baz() {",
+            "-    int c;",
+            "-    int d;",
+            "diff --git a/src/mongo/new.cpp b/src/mongo/new.cpp",
+            "new file mode 100644",
+            "--- /dev/null",
+            "+++ b/src/mongo/new.cpp",
+            "@@ -0,0 +1,2 @@",
+            "+int x;",
+            "+int y;",
+            "diff --git a/src/mongo/old.cpp b/src/mongo/old.cpp",
+            "deleted file mode 100644",
+            "--- a/src/mongo/old.cpp",
+            "+++ /dev/null",
+            "@@ -1 +0,0 @@",
+            "-int z;",
+        ])
+
+        changed_lines = under_test._parse_changed_lines(diff_output)  # pylint: disable=protected-access
+
+        self.assertEqual({
+            "src/mongo/foo.cpp": {10, 21, 22, 31, 32},
+            "src/mongo/new.cpp": {1, 2},
+            "src/mongo/old.cpp": None,
+        }, changed_lines)
@@ -0,0 +1,167 @@
+"""Unit tests for buildscripts.patch_builds.co_change_index.py."""
+import os
+import shutil
+import tempfile
+import unittest
+
+from git import Actor, Repo
+
+import buildscripts.patch_builds.co_change_index as under_test
+
+# pylint: disable=missing-docstring
+
+
+class TestCoChangeIndex(unittest.TestCase):
+    def test_scores_are_the_share_of_changes_to_the_source(self):
+        index = under_test.CoChangeIndex()
+        index.add_commit(["src/a.cpp", "jstests/core/a.js"])
+        index.add_commit(["src/a.cpp", "jstests/core/a.js", "jstests/core/b.js"])
+        index.add_commit(["src/a.cpp", "src/b.cpp"])
+        index.add_commit(["src/a.cpp"])
+
+        mappings = index.get_test_mappings(0, {"src/a.cpp", "src/b.cpp", "src/unknown.cpp"})
+
+        expected_tests = [
+            {"name": "jstests/core/a.js", "score": 0.5},
+            {"name": "jstests/core/b.js", "score": 0.25},
+        ]
+        self.assertEqual([{"source_file": "src/a.cpp", "test_files": expected_tests}], mappings)
+
+    def test_threshold(self):
+        index = under_test.CoChangeIndex()
+        index.add_commit(["src/a.cpp", "jstests/core/a.js"])
+        index.add_commit(["src/a.cpp", "jstests/core/b.js"])
+        index.add_commit(["src/a.cpp", "jstests/core/b.js"])
+
+        mappings = index.get_test_mappings(0.5, {"src/a.cpp"})
+
+        self.assertEqual(["jstests/core/b.js"],
+                         [test["name"] for test in mappings[0]["test_files"]])
+
+    def test_failures_are_weighted(self):
+        index = under_test.CoChangeIndex()
+        index.add_commit(["src/a.cpp"], failed_tests=["jstests/core/a.js"], failed_tasks=["jsCore"])
+        index.add_commit(["src/a.cpp", "jstests/core/b.js"])
+        index.add_commit(["src/a.cpp"])
+        index.add_commit(["src/a.cpp"])
+
+        test_mappings = index.get_test_mappings(0, {"src/a.cpp"})
+        task_mappings = index.get_task_mappings(0, {"src/a.cpp"})
+
+        self.assertEqual([{"name": "jstests/core/a.js", "score": 0.5},
+                          {"name": "jstests/core/b.js", "score": 0.25}],
+                         test_mappings[0]["test_files"])
+        self.assertEqual(
+            [{"source_file": "src/a.cpp", "tasks": [{"name": "jsCore", "score": 0.5}]}],
+            task_mappings)
+
+    def test_changed_tests_are_related_to_each_other(self):
+        index = under_test.CoChangeIndex()
+        index.add_commit(["jstests/libs/helper.js", "jstests/core/a.js"])
+
+        mappings = index.get_test_mappings(0, {"jstests/libs/helper.js", "jstests/core/a.js"})
+
+        self.assertEqual({
+            "jstests/core/a.js": ["jstests/libs/helper.js"],
+            "jstests/libs/helper.js": ["jstests/core/a.js"],
+        }, {
+            mapping["source_file"]: [test["name"] for test in mapping["test_files"]]
+            for mapping in mappings
+        })
+
+    def test_mass_changes_are_not_indexed(self):
+        index = under_test.CoChangeIndex()
+        changed_files = [f"jstests/core/{idx}.js" for idx in range(under_test.MAX_FILES_PER_COMMIT)]
+
+        self.assertFalse(index.add_commit(changed_files + ["src/a.cpp"]))
+        self.assertEqual([], index.get_test_mappings(0, {"src/a.cpp"}))
+
+    def test_round_trip(self):
+        index = under_test.CoChangeIndex()
+        index.add_commit(["src/a.cpp", "jstests/core/a.js"], failed_tasks=["jsCore"])
+        index.add_commit(["src/a.cpp", "src/b.cpp"])
+        index.last_revision = "abc123"
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        filename = os.path.join(tmp_dir, "index.json.gz")
+
+        index.write(filename)
+        loaded = under_test.CoChangeIndex.from_file(filename)
+
+        self.assertEqual("abc123", loaded.last_revision)
+        self.assertEqual(index.to_json(), loaded.to_json())
+        changed_files = {"src/a.cpp", "src/b.cpp"}
+        self.assertEqual(
+            index.get_test_mappings(0, changed_files), loaded.get_test_mappings(0, changed_files))
+        self.assertEqual(
+            index.get_task_mappings(0, changed_files), loaded.get_task_mappings(0, changed_files))
+        self.assertEqual(["index.json.gz"], os.listdir(tmp_dir))
+
+    def test_unsupported_version(self):
+        with self.assertRaises(ValueError):
+            under_test.CoChangeIndex.from_json({"version": under_test.INDEX_VERSION + 1})
+
+
+class TestUpdate(unittest.TestCase):
+    def setUp(self):
+        self.repo_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.repo_dir)
+        cwd = os.getcwd()
+        os.chdir(self.repo_dir)
+        self.addCleanup(os.chdir, cwd)
+        self.repo = Repo.init(self.repo_dir)
+
+    def commit(self, *paths):
+        for path in paths:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "a") as fh:
+                fh.write("change\n")
+        self.repo.index.add(list(paths))
+        actor = Actor("author", "author@example.com")
+        return self.repo.index.commit("commit", author=actor, committer=actor).hexsha
+
+    def test_incremental_update(self):
+        self.commit("src/a.cpp", "jstests/core/a.js")
+        second = self.commit("src/a.cpp")
+        index = under_test.CoChangeIndex()
+
+        self.assertEqual(2, index.update(self.repo))
+        self.assertEqual(second, index.last_revision)
+
+        third = self.commit("src/a.cpp", "jstests/core/b.js")
+        failures = {third: (["jstests/core/c.js"], ["jsCore"])}
+        self.assertEqual(1, index.update(self.repo, get_failures=failures.get))
+        self.assertEqual(third, index.last_revision)
+        self.assertEqual(0, index.update(self.repo))
+
+        mappings = index.get_test_mappings(0, {"src/a.cpp"})
+        self.assertEqual({
+            "jstests/core/a.js": 1 / 3,
+            "jstests/core/b.js": 1 / 3,
+            "jstests/core/c.js": 2 / 3,
+        }, {test["name"]: test["score"]
+            for test in mappings[0]["test_files"]})
+        self.assertEqual(
+            ["jsCore"],
+            [task["name"] for task in index.get_task_mappings(0, {"src/a.cpp"})[0]["tasks"]])
+
+    def test_max_commits(self):
+        self.commit("src/a.cpp", "jstests/core/a.js")
+        self.commit("src/a.cpp", "jstests/core/b.js")
+        index = under_test.CoChangeIndex()
+
+        self.assertEqual(1, index.update(self.repo, max_commits=1))
+
+        mappings = index.get_test_mappings(0, {"src/a.cpp"})
+        self.assertEqual(["jstests/core/b.js"],
+                         [test["name"] for test in mappings[0]["test_files"]])
+
+    def test_rewritten_history(self):
+        index = under_test.CoChangeIndex()
+        self.commit("src/a.cpp")
+        index.update(self.repo)
+        self.repo.git.checkout("--orphan", "other")
+        self.commit("src/b.cpp")
+
+        with self.assertRaises(ValueError):
+            index.update(self.repo)
@@ -0,0 +1,114 @@
+"""Unit tests for buildscripts.patch_builds.coverage_index.py."""
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import buildscripts.patch_builds.coverage_index as under_test
+
+# pylint: disable=missing-docstring
+
+SOURCE_ROOT = "/data/mongo"
+
+
+def tracefile(records):
+    lines = []
+    for (path, functions, covered_lines) in records:
+        lines.append(f"SF:{SOURCE_ROOT}/{path}")
+        for (name, start, _) in functions:
+            lines.append(f"FN:{start},{name}")
+        for (name, _, count) in functions:
+            lines.append(f"FNDA:{count},{name}")
+        for (line, count) in covered_lines:
+            lines.append(f"DA:{line},{count}")
+        lines.append("end_of_record")
+    return io.StringIO("\n".join(lines) + "\n")
+
+
+FUNCTIONS = [("_ZN5mongo3fooEv", 10, 0), ("_ZN5mongo3barEv", 20, 0), ("_ZN5mongo3bazEv", 30, 0)]
+
+
+def coverage(covered_functions, covered_lines=()):
+    functions = [(name, start, 1 if name in covered_functions else 0)
+                 for (name, start, _) in FUNCTIONS]
+    return under_test.parse_tracefile(
+        tracefile([("src/mongo/foo.cpp", functions, [(line, 1) for line in covered_lines])]),
+        SOURCE_ROOT)
+
+
+class TestParseTracefile(unittest.TestCase):
+    def test_parse(self):
+        fh = tracefile([
+            ("src/mongo/foo.cpp", [("foo", 10, 3), ("bar", 20, 0)], [(5, 1), (11, 3), (21, 0)]),
+            ("../usr/include/c++/vector", [("push_back", 100, 1)], [(101, 1)]),
+        ])
+
+        parsed = under_test.parse_tracefile(fh, SOURCE_ROOT)
+
+        self.assertEqual({
+            "src/mongo/foo.cpp": ({"foo": (10, True), "bar": (20, False)}, {5, 11}),
+        }, parsed)
+
+
+class TestCoverageIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = under_test.CoverageIndex()
+        self.index.add_test("jstests/core/all.js",
+                            coverage({"_ZN5mongo3fooEv", "_ZN5mongo3barEv", "_ZN5mongo3bazEv"}))
+        self.index.add_test("jstests/core/foo.js", coverage({"_ZN5mongo3fooEv"}))
+        self.index.add_test("jstests/core/bar.js", coverage({"_ZN5mongo3barEv"}, [1]))
+        self.index.add_test("jstests/core/none.js", coverage(set()))
+
+    def test_covering_tests(self):
+        self.assertEqual(["jstests/core/all.js", "jstests/core/foo.js"],
+                         self.index.get_covering_tests("src/mongo/foo.cpp", 10))
+        # Lines after the start of a function belong to it until the next function.
+        self.assertEqual(["jstests/core/all.js", "jstests/core/bar.js"],
+                         self.index.get_covering_tests("src/mongo/foo.cpp", 25))
+        self.assertEqual(["jstests/core/bar.js"],
+                         self.index.get_covering_tests("src/mongo/foo.cpp", 2))
+        self.assertEqual(["jstests/core/all.js", "jstests/core/bar.js", "jstests/core/foo.js"],
+                         self.index.get_covering_tests("src/mongo/foo.cpp"))
+        self.assertEqual([], self.index.get_covering_tests("src/mongo/other.cpp", 1))
+
+    def test_select_tests(self):
+        self.assertEqual(["jstests/core/bar.js"],
+                         self.index.select_tests({"src/mongo/foo.cpp": {2}}))
+        # A test covering all the changed functions is preferred to several tests covering some.
+        self.assertEqual(["jstests/core/all.js"],
+                         self.index.select_tests({"src/mongo/foo.cpp": {12, 22, 32}}))
+        self.assertEqual(["jstests/core/all.js", "jstests/core/bar.js"],
+                         self.index.select_tests({"src/mongo/foo.cpp": None}))
+        self.assertEqual([], self.index.select_tests({"src/mongo/other.cpp": None}))
+
+    def test_select_tests_by_cost(self):
+        test_costs = {
+            "jstests/core/all.js": 100, "jstests/core/foo.js": 1, "jstests/core/bar.js": 1
+        }
+        self.assertEqual(["jstests/core/bar.js", "jstests/core/foo.js"],
+                         self.index.select_tests({"src/mongo/foo.cpp": {12, 22}}, test_costs))
+
+    def test_round_trip(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        filename = os.path.join(tmp_dir, "coverage.json.gz")
+
+        self.index.write(filename)
+        loaded = under_test.CoverageIndex.from_file(filename)
+
+        self.assertEqual(self.index.to_json(), loaded.to_json())
+        changed_lines = {"src/mongo/foo.cpp": {1, 12, 22, 32}}
+        self.assertEqual(self.index.select_tests(changed_lines), loaded.select_tests(changed_lines))
+
+    def test_from_tracefiles(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        tracefile_path = os.path.join(tmp_dir, "0.info")
+        with open(tracefile_path, "w") as fh:
+            fh.write(tracefile([("src/mongo/foo.cpp", [("foo", 10, 1)], [(11, 1)])]).getvalue())
+
+        index = under_test.CoverageIndex.from_tracefiles([("jstests/core/foo.js", tracefile_path)],
+                                                         SOURCE_ROOT)
+
+        self.assertEqual(["jstests/core/foo.js"], index.get_covering_tests("src/mongo/foo.cpp", 11))
@@ -0,0 +1,107 @@
+"""Unit tests for buildscripts/resmokelib/bm_compare/bm_compare.py."""
+# pylint: disable=missing-docstring
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from buildscripts.resmokelib import parser
+from buildscripts.resmokelib.bm_compare import bm_compare
+
+_BM_CONTEXT = {
+    "date": "2018/01/30-18:40:25", "executable": "./path/to/exe", "num_cpus": 40,
+    "mhz_per_cpu": 4999, "cpu_scaling_enabled": False, "library_build_type": "debug", "caches": []
+}
+
+
+class TestLoadResults(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def write_report(self, report):
+        path = os.path.join(self.tmp_dir, "report.json")
+        with open(path, "w") as fh:
+            json.dump(report, fh)
+        return path
+
+    def test_benchmark_report(self):
+        path = self.write_report({
+            "context":
+                _BM_CONTEXT, "benchmarks": [
+                    {"name": "BM_Insert/threads:1", "cpu_time": 100},
+                    {"name": "BM_Insert/threads:1", "cpu_time": 110},
+                    {"name": "BM_Insert/threads:1_mean", "cpu_time": 105},
+                    {"name": "BM_Insert/threads:8", "cpu_time": 300},
+                ]
+        })
+        self.assertEqual({("BM_Insert", "1"): [-100, -110], ("BM_Insert", "8"): [-300]},
+                         bm_compare.load_results(path))
+
+    def test_perf_plugin_report(self):
+        path = self.write_report({
+            "results": [{
+                "name": "BM_Insert", "context": _BM_CONTEXT,
+                "results": {"8": {"ops_per_sec": -300, "ops_per_sec_values": [-300]}}
+            }]
+        })
+        self.assertEqual({("BM_Insert", "8"): [-300]}, bm_compare.load_results(path))
+
+
+class TestCompare(unittest.TestCase):
+    def compare(self, baseline_values, values, threshold=0.05):
+        rows = bm_compare.compare({("BM_Insert", "1"): baseline_values},
+                                  {("BM_Insert", "1"): values}, threshold)
+        self.assertEqual(1, len(rows))
+        return rows[0]
+
+    def test_regression(self):
+        row = self.compare([-100, -101, -99], [-120, -121, -119])
+        self.assertEqual(bm_compare.REGRESSION, row["status"])
+        self.assertAlmostEqual(100 / 120, row["speedup"])
+
+    def test_improvement(self):
+        row = self.compare([1000, 1010, 990], [1200, 1210, 1190])
+        self.assertEqual(bm_compare.IMPROVEMENT, row["status"])
+        self.assertAlmostEqual(1.2, row["speedup"])
+
+    def test_below_threshold(self):
+        self.assertEqual(bm_compare.UNCHANGED,
+                         self.compare([-100, -101, -99], [-103, -104, -102])["status"])
+        self.assertEqual(bm_compare.REGRESSION,
+                         self.compare([-100, -101, -99], [-103, -104, -102], 0.01)["status"])
+
+    def test_within_noise(self):
+        row = self.compare([-100, -150, -50, -120, -80], [-120, -170, -70, -140, -100])
+        self.assertEqual(bm_compare.UNCHANGED, row["status"])
+        self.assertGreater(row["noise"], 0.2)
+
+    def test_single_repetition(self):
+        self.assertEqual(bm_compare.REGRESSION, self.compare([-100], [-120])["status"])
+
+    def test_added_and_removed(self):
+        rows = bm_compare.compare({("BM_Old", "1"): [-1]}, {("BM_New", "1"): [-1]}, 0.05)
+        self.assertEqual([("BM_New", bm_compare.ADDED), ("BM_Old", bm_compare.REMOVED)],
+                         [(row["benchmark"], row["status"]) for row in rows])
+
+
+class TestFormatTable(unittest.TestCase):
+    def test_only_changes(self):
+        rows = bm_compare.compare({("BM_A", "1"): [-100], ("BM_B", "1"): [-100]},
+                                  {("BM_A", "1"): [-200], ("BM_B", "1"): [-100]}, 0.05)
+        lines = bm_compare.format_table(rows).splitlines()
+        self.assertEqual(3, len(lines))
+        self.assertEqual(["BM_A", "1", "-100", "-200", "0.500x", "0.0%", "regression"],
+                         lines[2].split())
+        self.assertEqual(4, len(bm_compare.format_table(rows, show_all=True).splitlines()))
+
+
+class TestParse(unittest.TestCase):
+    def test_requires_two_reports(self):
+        subcommand = parser.parse_command_line(["bm-compare", "base.json", "new.json"])
+        self.assertIsInstance(subcommand, bm_compare.BmCompare)
+        self.assertEqual(["new.json"], subcommand.candidate_files)
+
+        with self.assertRaises(SystemExit):
+            parser.parse_command_line(["bm-compare", "base.json"])
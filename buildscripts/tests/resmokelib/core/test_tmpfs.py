@@ -0,0 +1,103 @@
+"""Unit tests for the resmokelib.core.tmpfs module."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from buildscripts.resmokelib import config
+from buildscripts.resmokelib.core import tmpfs
+from buildscripts.resmokelib.testing import report as _report
+
+# pylint: disable=missing-docstring,protected-access
+
+
+class TestEstimateNumNodes(unittest.TestCase):
+    def test_fixtures(self):
+        self.assertEqual(1, tmpfs.estimate_num_nodes("MongoDFixture", {}))
+        self.assertEqual(2, tmpfs.estimate_num_nodes("ReplicaSetFixture", {}))
+        self.assertEqual(
+            4,
+            tmpfs.estimate_num_nodes("ReplicaSetFixture",
+                                     {"num_nodes": 3, "start_initial_sync_node": True}))
+        self.assertEqual(
+            7,
+            tmpfs.estimate_num_nodes("ShardedClusterFixture",
+                                     {"num_shards": 2, "num_rs_nodes_per_shard": 3}))
+        self.assertEqual(2, tmpfs.estimate_num_nodes("TenantMigrationFixture", {}))
+        self.assertEqual(0, tmpfs.estimate_num_nodes("ExternalFixture", {}))
+
+
+class TestTmpfsAllocator(unittest.TestCase):
+    def setUp(self):
+        self.tmpfs_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpfs_dir)
+
+        patchers = [
+            mock.patch.object(config, "DBPATH_TMPFS", self.tmpfs_dir),
+            mock.patch.object(config, "TMPFS_BUDGET_MB", 3 * tmpfs.NODE_FOOTPRINT_MB),
+            mock.patch.object(tmpfs.TmpfsAllocator, "_budget_bytes", None),
+            mock.patch.dict(tmpfs.TmpfsAllocator._RESERVED_BYTES, clear=True),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_disabled(self):
+        with mock.patch.object(config, "DBPATH_TMPFS", None):
+            self.assertIsNone(tmpfs.TmpfsAllocator.place(0, 1))
+        self.assertIsNone(tmpfs.TmpfsAllocator.get_dbpath_prefix(0))
+
+    def test_falls_back_to_disk(self):
+        self.assertEqual(self.tmpfs_dir, tmpfs.TmpfsAllocator.place(0, 2))
+        self.assertIsNone(tmpfs.TmpfsAllocator.place(1, 2))
+        self.assertEqual(self.tmpfs_dir, tmpfs.TmpfsAllocator.place(2, 1))
+        self.assertIsNone(tmpfs.TmpfsAllocator.place(3, 1))
+
+        self.assertEqual(self.tmpfs_dir, tmpfs.TmpfsAllocator.get_dbpath_prefix(0))
+        self.assertIsNone(tmpfs.TmpfsAllocator.get_dbpath_prefix(1))
+        self.assertEqual(3 * tmpfs.NODE_FOOTPRINT_MB, tmpfs.TmpfsAllocator.get_reserved_mb())
+
+    def test_default_budget(self):
+        with mock.patch.object(config, "TMPFS_BUDGET_MB", None), \
+                mock.patch.object(tmpfs.shutil, "disk_usage") as mock_disk_usage:
+            mock_disk_usage.return_value.free = 4 * tmpfs.NODE_FOOTPRINT_MB * tmpfs._MB
+            self.assertEqual(self.tmpfs_dir, tmpfs.TmpfsAllocator.place(0, 2))
+            self.assertIsNone(tmpfs.TmpfsAllocator.place(1, 1))
+
+    def test_reset(self):
+        job_dir = os.path.join(self.tmpfs_dir, "job0")
+        os.makedirs(os.path.join(job_dir, "node0"))
+        tmpfs.TmpfsAllocator.place(0, 3)
+
+        tmpfs.TmpfsAllocator.reset()
+        self.assertFalse(os.path.exists(job_dir))
+        self.assertIsNone(tmpfs.TmpfsAllocator.get_dbpath_prefix(0))
+        self.assertEqual(self.tmpfs_dir, tmpfs.TmpfsAllocator.place(1, 3))
+
+
+class TestSummarizeRuntimes(unittest.TestCase):
+    @staticmethod
+    def make_test_info(duration, dbpath_storage, dynamic=False):
+        test_info = _report._TestInfo("test", "test.js", dynamic)
+        test_info.start_time = 100
+        test_info.end_time = 100 + duration
+        test_info.dbpath_storage = dbpath_storage
+        return test_info
+
+    def test_both(self):
+        summary = tmpfs.summarize_runtimes([
+            self.make_test_info(2, tmpfs.TMPFS),
+            self.make_test_info(4, tmpfs.TMPFS),
+            self.make_test_info(9, tmpfs.DISK),
+            self.make_test_info(100, tmpfs.DISK, dynamic=True),
+        ])
+        self.assertEqual({"num_tests": 2, "mean_secs": 3}, summary[tmpfs.TMPFS])
+        self.assertEqual({"num_tests": 1, "mean_secs": 9}, summary[tmpfs.DISK])
+        self.assertEqual(6, summary["delta_secs"])
+
+    def test_only_tmpfs(self):
+        summary = tmpfs.summarize_runtimes([self.make_test_info(2, tmpfs.TMPFS)])
+        self.assertEqual({tmpfs.TMPFS: {"num_tests": 1, "mean_secs": 2}}, summary)
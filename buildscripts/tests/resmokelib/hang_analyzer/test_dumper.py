@@ -0,0 +1,77 @@
+"""Unit tests for the buildscripts.resmokelib.hang_analyzer.dumper module."""
+
+import gzip
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import ANY, Mock, patch
+
+from buildscripts.resmokelib.hang_analyzer import dumper
+from buildscripts.resmokelib.hang_analyzer.process_list import Pinfo
+
+# pylint: disable=missing-docstring,protected-access
+
+NS = "buildscripts.resmokelib.hang_analyzer.dumper"
+
+
+def ns(relative_name):  # pylint: disable=invalid-name
+    """Return a full name from a name relative to the test module"s name space."""
+    return NS + "." + relative_name
+
+
+class TestGDBDumperCompression(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        cwd = os.getcwd()
+        os.chdir(self.tmp_dir)
+        self.addCleanup(os.chdir, cwd)
+
+        self.logger = logging.Logger("process")
+        self.dbg = dumper.GDBDumper(Mock(), ["stdout"], compress_threads=2)
+
+    @unittest.skipIf(shutil.which("gzip") is None, "gzip isn't installed")
+    def test_compress_core(self):
+        with open("dump_mongod.1.core", "wb") as fh:
+            fh.write(b"core" * 1000)
+
+        with patch(ns("find_program"), side_effect=[None, shutil.which("gzip")]):
+            self.dbg._compress_core("dump_mongod.1.core", self.logger)
+
+        self.assertEqual(["dump_mongod.1.core.gz"], os.listdir(self.tmp_dir))
+        with gzip.open("dump_mongod.1.core.gz", "rb") as fh:
+            self.assertEqual(b"core" * 1000, fh.read())
+
+    @patch(ns("call"))
+    def test_compress_core_with_pigz(self, call_mock):
+        with open("dump_mongod.1.core", "wb") as fh:
+            fh.write(b"core")
+
+        def compress(args, logger):  # pylint: disable=unused-argument
+            os.rename(args[-1], args[-1] + ".gz")
+
+        call_mock.side_effect = compress
+        with patch(ns("find_program"), return_value="/usr/bin/pigz"):
+            self.dbg._compress_core("dump_mongod.1.core", self.logger)
+
+        self.assertEqual(
+            ["/usr/bin/pigz", "--processes", "2", "--fast", "--force", "dump_mongod.1.core"],
+            call_mock.call_args[0][0])
+
+    @patch(ns("call"))
+    def test_missing_core_not_compressed(self, call_mock):
+        self.dbg._compress_core("dump_mongod.1.core", self.logger)
+        call_mock.assert_not_called()
+
+    @patch(ns("call"))
+    @patch(ns("GDBDumper._find_debugger"), Mock(return_value="/usr/bin/gdb"))
+    def test_dump_info_compresses_cores(self, call_mock):
+        with patch.object(self.dbg, "_compress_core") as compress_mock:
+            self.dbg.dump_info(Pinfo(name="mongod", pidv=[1]), take_dump=True)
+            self.dbg.dump_info(Pinfo(name="mongod", pidv=[2]), take_dump=False)
+
+        compress_mock.assert_called_once_with("dump_mongod.1.core", ANY)
+        self.assertIn("gcore dump_mongod.1.core", call_mock.call_args_list[1][0][0])
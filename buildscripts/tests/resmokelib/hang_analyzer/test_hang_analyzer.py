@@ -0,0 +1,175 @@
+"""Unit tests for the buildscripts.resmokelib.hang_analyzer.hang_analyzer module."""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from mock import Mock, patch
+
+from buildscripts.resmokelib.hang_analyzer import dumper
+from buildscripts.resmokelib.hang_analyzer import hang_analyzer
+from buildscripts.resmokelib.hang_analyzer.process_list import Pinfo
+
+# pylint: disable=missing-docstring,protected-access
+
+NS = "buildscripts.resmokelib.hang_analyzer.hang_analyzer"
+
+
+def ns(relative_name):  # pylint: disable=invalid-name
+    """Return a full name from a name relative to the test module"s name space."""
+    return NS + "." + relative_name
+
+
+class TestDumpQuota(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        cwd = os.getcwd()
+        os.chdir(self.tmp_dir)
+        self.addCleanup(os.chdir, cwd)
+
+    @staticmethod
+    def write_dump(name, size):
+        with open(name, "wb") as fh:
+            fh.write(b"\0" * size)
+
+    @patch(ns("DumpQuota._estimate_dump_size"), Mock(return_value=40))
+    def test_reservations(self):
+        self.write_dump("dump_mongod.1.core", 10)
+        quota = hang_analyzer.DumpQuota(120, "core")
+
+        self.assertTrue(quota.reserve(2))
+        self.assertTrue(quota.reserve(3))
+        # 10 bytes of existing dumps and 80 reserved bytes leave no room for another 40 bytes.
+        # Once the dump of process 2 turns out to only take 20 bytes, there is.
+        self.assertFalse(quota.reserve(4))
+
+        self.write_dump("dump_mongod.2.core", 20)
+        quota.release(2)
+        self.assertTrue(quota.reserve(4))
+
+    @patch(ns("DumpQuota._estimate_dump_size"), Mock(return_value=1000))
+    def test_first_dump_may_exceed_quota(self):
+        quota = hang_analyzer.DumpQuota(100, "core")
+        self.assertTrue(quota.reserve(1))
+        self.assertFalse(quota.reserve(2))
+
+        self.write_dump("dump_mongod.1.core", 1000)
+        quota.release(1)
+        self.assertFalse(quota.reserve(2))
+
+    def test_ignores_other_files(self):
+        self.write_dump("dump_mongod.1.mdmp", 1000)
+        self.write_dump("debugger_mongod_1.log", 1000)
+        quota = hang_analyzer.DumpQuota(100, "core")
+        self.assertEqual(0, quota._used)
+
+
+class TestExecute(unittest.TestCase):
+    PROCESSES = [
+        Pinfo(name="mongod", pidv=[1, 2, 3]),
+        Pinfo(name="mongos", pidv=[4]),
+        Pinfo(name="java", pidv=[5]),
+        Pinfo(name="python", pidv=[6]),
+    ]
+
+    def setUp(self):
+        self.dbg = Mock()
+        self.dbg.get_dump_ext.return_value = "core"
+        self.jstack = Mock()
+
+        for (target, kwargs) in [
+            ("extractor.extract_debug_symbols", {}),
+            ("dumper.get_dumpers", dict(return_value=dumper.Dumpers(self.dbg, self.jstack))),
+            ("process_list.get_processes", dict(return_value=self.PROCESSES)),
+            ("DumpQuota", {}),
+        ]:
+            patcher = patch(ns(target), **kwargs)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.process = Mock()
+        patcher = patch(ns("process"), self.process)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def execute(*args):
+        parser = argparse.ArgumentParser()
+        hang_analyzer.HangAnalyzerPlugin().add_subcommand(parser.add_subparsers())
+        options = parser.parse_args(["hang-analyzer"] + list(args))
+        analyzer = hang_analyzer.HangAnalyzer(options, logger=Mock())
+        analyzer.execute()
+
+    def test_dumps_each_process_concurrently(self):
+        # Each debugger waits for the others to attach, which only works if they run concurrently.
+        barrier = threading.Barrier(4, timeout=10)
+        self.dbg.dump_info.side_effect = lambda pinfo, take_dump: barrier.wait()
+
+        self.execute("-c", "-j", "4")
+
+        dumped = sorted(
+            (call[0][0].name, call[0][0].pidv) for call in self.dbg.dump_info.call_args_list)
+        self.assertEqual([("mongod", [1]), ("mongod", [2]), ("mongod", [3]), ("mongos", [4])],
+                         dumped)
+        self.jstack.dump_info.assert_called_once()
+        self.assertEqual((5, "java"), self.jstack.dump_info.call_args[0][2:])
+
+        # The processes are paused before they are dumped and resumed afterwards.
+        self.assertEqual([1, 2, 3, 4, 5],
+                         [call[0][2] for call in self.process.pause_process.call_args_list])
+        self.assertEqual([1, 2, 3, 4, 5],
+                         [call[0][2] for call in self.process.resume_process.call_args_list])
+        self.process.signal_python.assert_called_once()
+
+    def test_errors_are_collected(self):
+        def dump_info(pinfo, take_dump):  # pylint: disable=unused-argument
+            if pinfo.pidv == [1]:
+                raise dumper.DumpError({1: "dump_mongod.1.core"})
+            if pinfo.pidv == [2]:
+                raise OSError("gdb crashed")
+
+        self.dbg.dump_info.side_effect = dump_info
+
+        with self.assertRaises(RuntimeError):
+            self.execute("-c", "-k")
+
+        self.assertEqual(4, self.dbg.dump_info.call_count)
+        self.process.teardown_processes.assert_called_once()
+        self.assertEqual({1: "dump_mongod.1.core"}, self.process.teardown_processes.call_args[0][2])
+
+    def test_quota_exhausted(self):
+        hang_analyzer.DumpQuota.return_value.reserve.return_value = False
+        self.execute("-c", "-j", "1")
+        self.assertEqual([False] * 4, [call[0][1] for call in self.dbg.dump_info.call_args_list])
+        hang_analyzer.DumpQuota.return_value.release.assert_not_called()
+
+    def test_dump_stats(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        cwd = os.getcwd()
+        os.chdir(tmp_dir)
+        self.addCleanup(os.chdir, cwd)
+
+        def dump_info(pinfo, take_dump):
+            if take_dump:
+                with open("dump_%s.%d.core.gz" % (pinfo.name, pinfo.pidv[0]), "wb") as fh:
+                    fh.write(b"\0" * pinfo.pidv[0])
+
+        self.dbg.dump_info.side_effect = dump_info
+        hang_analyzer.DumpQuota.return_value.reserve.side_effect = lambda pid: pid != 3
+
+        self.execute("-c", "-z", "-o", "file")
+
+        with open("debugger_dump_stats.json") as fh:
+            dump_stats = json.load(fh)
+        self.assertEqual([1, 2, 3, 4], [stats["pid"] for stats in dump_stats])
+        self.assertEqual({"dump_mongod.2.core.gz": 2}, dump_stats[1]["core_files"])
+        self.assertEqual({}, dump_stats[2]["core_files"])
+        self.assertFalse(dump_stats[2]["core_dump"])
+        self.assertEqual({"process", "pid", "dump_secs", "core_dump", "core_files"},
+                         set(dump_stats[0]))
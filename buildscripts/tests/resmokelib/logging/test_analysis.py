@@ -0,0 +1,131 @@
+"""Unit tests for the resmokelib.logging.analysis module."""
+
+import json
+import logging
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.logging import analysis
+from buildscripts.resmokelib.testing import report as _report
+
+# pylint: disable=missing-docstring,protected-access
+
+
+def slow_query(command, duration_millis, locks=None, storage=None):
+    attr = {"type": "command", "ns": "test.coll", "durationMillis": duration_millis}
+    if command is not None:
+        attr["command"] = {command: "coll", "lsid": {"id": 1}}
+    if locks is not None:
+        attr["locks"] = locks
+    if storage is not None:
+        attr["storage"] = storage
+    return json.dumps({
+        "t": {"$date": "2020-01-01T00:00:00.000Z"}, "s": "I", "c": "COMMAND", "id": 51803,
+        "ctx": "conn1", "msg": "Slow query", "attr": attr
+    })
+
+
+class TestMakeAnalysisHandler(unittest.TestCase):
+    def test_unknown_analyzer(self):
+        with self.assertRaises(ValueError):
+            analysis.make_analysis_handler(["NoSuchAnalyzer"])
+
+    def test_slow_operations(self):
+        handler = analysis.make_analysis_handler(["SlowOperations"])
+        self.assertEqual(1, len(handler.analyzers))
+        self.assertIsInstance(handler.analyzers[0], analysis.SlowOperations)
+
+
+class TestSlowOperations(unittest.TestCase):
+    def setUp(self):
+        self.handler = analysis.make_analysis_handler(["SlowOperations"])
+        # Mirror the fixture node loggers, which are children of the fixture logger.
+        self.fixture_logger = logging.Logger("MongoDFixture:job0")
+        self.fixture_logger.addHandler(self.handler)
+        self.node_logger = logging.Logger("MongoDFixture:job0:primary")
+        self.node_logger.parent = self.fixture_logger
+
+    def log(self, line):
+        self.node_logger.info(line)
+
+    def take_slow_operations(self):
+        stats = self.handler.take_stats() or {}
+        self.assertIn("SlowOperations", stats)
+        return stats["SlowOperations"]
+
+    def test_nothing_logged(self):
+        self.log("not a slow query")
+        self.log(json.dumps({"msg": "Connection accepted"}))
+        self.assertIsNone(self.handler.take_stats())
+
+    def test_durations_by_command(self):
+        for duration in range(1, 101):
+            self.log(slow_query("find", duration))
+        self.log(slow_query("insert", 250))
+
+        stats = self.take_slow_operations()
+        self.assertEqual(101, stats["count"])
+        self.assertEqual({
+            "count": 100,
+            "p50_duration_millis": 50,
+            "p99_duration_millis": 99,
+            "max_duration_millis": 100,
+        }, stats["commands"]["find"])
+        self.assertEqual(250, stats["commands"]["insert"]["p99_duration_millis"])
+
+    def test_operations_without_command(self):
+        self.log(slow_query(None, 10))
+        stats = self.take_slow_operations()
+        self.assertEqual(1, stats["commands"]["command"]["count"])
+
+    def test_lock_and_cache_waits(self):
+        locks = {
+            "Global": {"acquireCount": {"w": 1}, "timeAcquiringMicros": {"w": 100}},
+            "Collection": {"acquireCount": {"w": 1}, "timeAcquiringMicros": {"r": 5, "w": 20}},
+            "Mutex": {"acquireCount": {"r": 1}},
+        }
+        self.log(slow_query("update", 10, locks=locks))
+        self.log(slow_query("update", 10, storage={"timeWaitingMicros": {"cache": 700}}))
+        self.log(slow_query("update", 10, storage={"data": {"bytesRead": 10}}))
+
+        stats = self.take_slow_operations()
+        self.assertEqual(125, stats["lock_wait_micros"])
+        self.assertEqual(1, stats["cache_wait_count"])
+        self.assertEqual(700, stats["cache_wait_micros"])
+
+    def test_malformed_lines_ignored(self):
+        self.log('{"msg": "Slow query", "attr": ')
+        self.log('"Slow query"')
+        self.assertIsNone(self.handler.take_stats())
+
+    def test_take_stats_resets(self):
+        self.log(slow_query("find", 10))
+        self.assertIsNotNone(self.handler.take_stats())
+        self.assertIsNone(self.handler.take_stats())
+
+    def test_reset(self):
+        self.log(slow_query("find", 10))
+        self.handler.reset()
+        self.assertIsNone(self.handler.take_stats())
+
+
+class TestReportLogAnalysis(unittest.TestCase):
+    def test_round_trip(self):
+        log_analysis = {"SlowOperations": {"count": 1}}
+        report = _report.TestReport(mock.Mock(), mock.Mock())
+        test_info = _report._TestInfo("test.js", "test.js", False)
+        test_info.start_time = 0
+        test_info.end_time = 1
+        test_info.evergreen_status = "pass"
+        test_info.return_code = 0
+        test_info.log_analysis = log_analysis
+        report.test_infos.append(test_info)
+
+        report_dict = report.as_dict()
+        self.assertEqual(log_analysis, report_dict["results"][0]["log_analysis"])
+
+        with mock.patch.object(_report, "logging"), \
+                mock.patch.object(_report._config.SuiteOptions.ALL_INHERITED, "resolve"):
+            copied = _report.TestReport.from_dict(report_dict)
+        self.assertEqual(log_analysis, copied.test_infos[0].log_analysis)
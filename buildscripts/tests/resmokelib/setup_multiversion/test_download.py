@@ -0,0 +1,231 @@
+"""Unit tests for buildscripts/resmokelib/setup_multiversion/download.py."""
+# pylint: disable=missing-docstring,protected-access
+import hashlib
+import http.server
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+import unittest
+import zipfile
+
+from buildscripts.resmokelib.setup_multiversion import download
+
+
+def make_tgz(files):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as tar_handle:
+        for (name, content) in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar_handle.addfile(info, io.BytesIO(content))
+    return buf.getvalue()
+
+
+def make_zip(files):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zip_handle:
+        for (name, content) in files.items():
+            zip_handle.writestr(name, content)
+    return buf.getvalue()
+
+
+class _ArchiveHandler(http.server.BaseHTTPRequestHandler):
+    """Serve the archives of the server, honoring Range requests like S3 does."""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self.server.requests.append((self.path, self.headers.get("Range")))
+        content = self.server.archives.get(self.path.split("?")[0])
+        if content is None:
+            self.send_error(404)
+            return
+
+        etag = self.server.etags.get(self.path.split("?")[0], hashlib.md5(content).hexdigest())
+        start = 0
+        range_header = self.headers.get("Range")
+        if range_header:
+            start = int(range_header[len("bytes="):-1])
+            if start >= len(content):
+                self.send_error(416)
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(content) - 1}/{len(content)}")
+        else:
+            self.send_response(200)
+
+        self.send_header("Content-Length", str(len(content) - start))
+        self.send_header("ETag", f'"{etag}"')
+        self.end_headers()
+        self.wfile.write(content[start:])
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class TestDownloadBase(unittest.TestCase):
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(("localhost", 0), _ArchiveHandler)
+        self.server.archives = {}
+        self.server.etags = {}
+        self.server.requests = []
+        thread = threading.Thread(target=self.server.serve_forever, args=(0.05, ))
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.cache = download.ArtifactCache(os.path.join(self.tmp_dir, "cache"))
+        self.install_dir = os.path.join(self.tmp_dir, "install", "4.4")
+
+    def serve(self, path, content):
+        self.server.archives[path] = content
+        return f"http://localhost:{self.server.server_port}{path}?x=1"
+
+    def read_installed(self, *path):
+        with open(os.path.join(self.install_dir, *path), "rb") as file_handle:
+            return file_handle.read()
+
+
+class TestInstallArchives(TestDownloadBase):
+    def test_merges_archives(self):
+        binaries_url = self.serve("/binaries.tgz", make_tgz({"dist-test/bin/mongod": b"mongod"}))
+        symbols_url = self.serve("/symbols.zip",
+                                 make_zip({"dist-test/bin/mongod.debug": b"symbols"}))
+
+        download.install_archives([binaries_url, symbols_url], self.install_dir)
+        self.assertEqual(b"mongod", self.read_installed("dist-test", "bin", "mongod"))
+        self.assertEqual(b"symbols", self.read_installed("dist-test", "bin", "mongod.debug"))
+        # Only the install dir is left behind.
+        self.assertEqual(["4.4"], os.listdir(os.path.dirname(self.install_dir)))
+
+    def test_pre_hygienic_archive(self):
+        url = self.serve(
+            "/old.tgz",
+            make_tgz({
+                "mongodb-linux-x86_64-3.6.0/bin/mongod": b"mongod",
+                "mongodb-linux-x86_64-3.6.0/README": b"readme",
+            }))
+        download.install_archives([url], self.install_dir)
+        self.assertEqual(["mongod"], os.listdir(self.install_dir))
+
+    def test_merges_existing_install(self):
+        os.makedirs(os.path.join(self.install_dir, "dist-test", "bin"))
+        for (name, content) in (("mongod", b"old"), ("mongod.debug", b"symbols")):
+            with open(os.path.join(self.install_dir, "dist-test", "bin", name), "wb") as fh:
+                fh.write(content)
+
+        url = self.serve("/binaries.tgz", make_tgz({"dist-test/bin/mongod": b"mongod"}))
+        download.install_archives([url], self.install_dir)
+        self.assertEqual(b"mongod", self.read_installed("dist-test", "bin", "mongod"))
+        self.assertEqual(b"symbols", self.read_installed("dist-test", "bin", "mongod.debug"))
+        self.assertEqual(["4.4"], os.listdir(os.path.dirname(self.install_dir)))
+
+    def test_last_archive_wins(self):
+        first_url = self.serve("/first.tgz", make_tgz({"bin/mongod": b"first"}))
+        last_url = self.serve("/last.tgz", make_tgz({"bin/mongod": b"last"}))
+
+        download.install_archives([first_url, last_url], self.install_dir)
+        self.assertEqual(b"last", self.read_installed("bin", "mongod"))
+
+    def test_failure_leaves_install_dir(self):
+        os.makedirs(self.install_dir)
+        good_url = self.serve("/binaries.tgz", make_tgz({"mongod": b"mongod"}))
+        missing_url = good_url.replace("binaries", "missing")
+
+        with self.assertRaises(download.DownloadError):
+            download.install_archives([good_url, missing_url], self.install_dir)
+        self.assertEqual([], os.listdir(self.install_dir))
+        self.assertEqual(["4.4"], os.listdir(os.path.dirname(self.install_dir)))
+
+    def test_missing_url(self):
+        with self.assertRaises(download.DownloadError):
+            download.install_archives([""], self.install_dir)
+
+    def test_unsupported_extension(self):
+        url = self.serve("/binaries.rpm", b"rpm")
+        with self.assertRaises(download.DownloadError):
+            download.install_archives([url], self.install_dir)
+
+
+class TestFetchArchive(TestDownloadBase):
+    def setUp(self):
+        super().setUp()
+        self.dest_dir = os.path.join(self.tmp_dir, "dest")
+        os.makedirs(self.dest_dir)
+        self.content = make_tgz({"mongod": b"mongod" * 1000})
+        self.url = self.serve("/binaries.tgz", self.content)
+
+    def test_cached(self):
+        download.fetch_archive(self.url, self.dest_dir, self.cache)
+        self.assertEqual(1, len(self.server.requests))
+
+        shutil.rmtree(self.dest_dir)
+        os.makedirs(self.dest_dir)
+        download.fetch_archive(self.url, self.dest_dir, self.cache)
+        self.assertEqual(1, len(self.server.requests))
+        self.assertEqual(["mongod"], os.listdir(self.dest_dir))
+        self.assertEqual(hashlib.sha256(self.content).hexdigest(), self.cache.get_sha256(self.url))
+
+    def test_corrupt_cache_entry(self):
+        download.fetch_archive(self.url, self.dest_dir, self.cache)
+        with open(self.cache.archive_path(self.url), "r+b") as file_handle:
+            file_handle.seek(len(self.content) // 2)
+            file_handle.write(b"corrupt")
+
+        shutil.rmtree(self.dest_dir)
+        os.makedirs(self.dest_dir)
+        download.fetch_archive(self.url, self.dest_dir, self.cache)
+        self.assertEqual(2, len(self.server.requests))
+        self.assertEqual(["mongod"], os.listdir(self.dest_dir))
+
+    def test_resumes_partial_download(self):
+        self.cache.prepare(self.url)
+        with open(self.cache.partial_path(self.url), "wb") as file_handle:
+            file_handle.write(self.content[:100])
+
+        download.fetch_archive(self.url, self.dest_dir, self.cache)
+        self.assertEqual([("/binaries.tgz?x=1", "bytes=100-")], self.server.requests)
+        self.assertEqual(["mongod"], os.listdir(self.dest_dir))
+        self.assertEqual(hashlib.sha256(self.content).hexdigest(), self.cache.get_sha256(self.url))
+
+    def test_restarts_complete_partial_download(self):
+        self.cache.prepare(self.url)
+        with open(self.cache.partial_path(self.url), "wb") as file_handle:
+            file_handle.write(self.content)
+
+        download.fetch_archive(self.url, self.dest_dir, self.cache)
+        self.assertEqual(2, len(self.server.requests))
+        self.assertIsNone(self.server.requests[-1][1])
+        self.assertEqual(["mongod"], os.listdir(self.dest_dir))
+
+    def test_etag_mismatch(self):
+        self.server.etags["/binaries.tgz"] = "0" * 32
+        with self.assertRaises(download.DownloadError):
+            download.fetch_archive(self.url, self.dest_dir, self.cache)
+        self.assertIsNone(self.cache.get_sha256(self.url))
+        self.assertFalse(os.path.exists(self.cache.partial_path(self.url)))
+
+    @unittest.skipIf(download.fcntl is None, "fcntl is not available on Windows")
+    def test_waits_for_lock_of_other_process(self):
+        os.makedirs(self.cache.cache_dir)
+        # A lock on a file opened separately conflicts like one held by another process.
+        with open(self.cache._entry_dir(self.url) + ".lock", "a") as lock_file:
+            download.fcntl.flock(lock_file.fileno(), download.fcntl.LOCK_EX)
+            thread = threading.Thread(target=download.fetch_archive, args=(self.url, self.dest_dir,
+                                                                           self.cache))
+            thread.start()
+            thread.join(0.2)
+            self.assertTrue(thread.is_alive())
+            self.assertEqual([], self.server.requests)
+
+        thread.join()
+        self.assertEqual(["mongod"], os.listdir(self.dest_dir))
+
+    def test_multipart_etag_not_checked(self):
+        self.server.etags["/binaries.tgz"] = "0" * 32 + "-2"
+        download.fetch_archive(self.url, self.dest_dir)
+        self.assertEqual(["mongod"], os.listdir(self.dest_dir))
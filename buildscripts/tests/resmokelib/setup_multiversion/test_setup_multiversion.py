@@ -47,6 +47,8 @@ class TestSetupMultiversionBase(unittest.TestCase):
             download_symbols=False,
             download_binaries=True,
             download_artifacts=False,
+            parallel_downloads=4,
+            cache_dir=None,
             evergreen_config=None,
             github_oauth_token=None,
             debug=False,
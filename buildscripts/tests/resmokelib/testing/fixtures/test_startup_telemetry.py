@@ -0,0 +1,108 @@
+"""Unit tests for the resmokelib.testing.fixtures.startup_telemetry module."""
+
+import json
+import logging
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.testing import report as _report
+from buildscripts.resmokelib.testing.fixtures import startup_telemetry
+
+# pylint: disable=missing-docstring,protected-access
+
+
+def make_line(log_id, msg, seconds):
+    return json.dumps({
+        "t": {"$date": "2021-01-05T12:00:{:06.3f}+00:00".format(seconds)},
+        "s": "I",
+        "c": "CONTROL",
+        "id": log_id,
+        "ctx": "initandlisten",
+        "msg": msg,
+    }, separators=(",", ":"))
+
+
+class TestStartupTelemetry(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.Logger("MongoDFixture:job0")
+        self.addCleanup(startup_telemetry.StartupRecords.take, 0)
+
+    def make_telemetry(self, phases=None):
+        if phases is None:
+            phases = startup_telemetry.MONGOD_PHASES
+        return startup_telemetry.StartupTelemetry(self.logger, 0, "mongod", phases)
+
+    def log_startup(self):
+        self.logger.info(make_line(4615611, "MongoDB starting", 1.0))
+        self.logger.info(make_line(23403, "Build Info", 1.1))
+        self.logger.info("not a logv2 line")
+        self.logger.info(make_line(22315, "Opening WiredTiger", 1.5))
+        self.logger.info(make_line(4795906, "WiredTiger opened", 3.5))
+        self.logger.info(make_line(20625, "Initializing full-time diagnostic data capture", 4.0))
+        self.logger.info(make_line(23016, "Waiting for connections", 4.25))
+
+    def test_mongod_phases(self):
+        telemetry = self.make_telemetry()
+        self.log_startup()
+        phases = telemetry.get_phases()
+        self.assertAlmostEqual(2.0, phases["storage_engine_init"])
+        self.assertAlmostEqual(0.5, phases["recovery"])
+        self.assertAlmostEqual(0.25, phases["replication_startup"])
+        self.assertAlmostEqual(3.25, phases["listening"])
+
+    def test_mongos_phases(self):
+        telemetry = self.make_telemetry(startup_telemetry.MONGOS_PHASES)
+        self.logger.info(make_line(23403, "Build Info", 1.0))
+        self.logger.info(make_line(23016, "Waiting for connections", 1.5))
+        self.assertEqual({"listening": 0.5}, telemetry.get_phases())
+
+    def test_missing_milestones(self):
+        telemetry = self.make_telemetry()
+        self.logger.info(make_line(4615611, "MongoDB starting", 1.0))
+        self.logger.info(make_line(20625, "Initializing full-time diagnostic data capture", 4.0))
+        self.logger.info(make_line(23016, "Waiting for connections", 4.25))
+        self.assertEqual({"replication_startup", "listening"}, set(telemetry.get_phases()))
+
+    def test_finish_records(self):
+        telemetry = self.make_telemetry()
+        self.log_startup()
+        record = telemetry.finish(20000)
+        self.assertEqual([], self.logger.handlers)
+        self.assertEqual("MongoDFixture:job0", record["node"])
+        self.assertEqual(20000, record["port"])
+        self.assertEqual([record], startup_telemetry.StartupRecords.take(0))
+        self.assertIsNone(startup_telemetry.StartupRecords.take(0))
+
+    def test_finish_without_milestones(self):
+        telemetry = self.make_telemetry()
+        self.logger.info("mongod logs to a file")
+        with mock.patch.object(telemetry._listening, "wait") as mock_wait:
+            self.assertIsNone(telemetry.finish(20000))
+        mock_wait.assert_not_called()
+        self.assertEqual([], self.logger.handlers)
+        self.assertIsNone(startup_telemetry.StartupRecords.take(0))
+
+
+class TestSummarize(unittest.TestCase):
+    @staticmethod
+    def make_test_info(fixture_startup):
+        test_info = _report._TestInfo("test", "test.js", False)
+        test_info.fixture_startup = fixture_startup
+        return test_info
+
+    def test_summarize(self):
+        summary = startup_telemetry.summarize([
+            self.make_test_info([
+                {"process": "mongod", "ready_secs": 2.0, "phases": {"recovery": 1.0}},
+                {"process": "mongos", "ready_secs": 1.0, "phases": {"listening": 0.5}},
+            ]),
+            self.make_test_info(None),
+            self.make_test_info([
+                {"process": "mongod", "ready_secs": 6.0, "phases": {"recovery": 3.0}},
+            ]),
+        ])
+        self.assertEqual({"count": 2, "mean_secs": 2.0, "p50_secs": 1.0, "max_secs": 3.0},
+                         summary["mongod"]["recovery"])
+        self.assertEqual(4.0, summary["mongod"]["ready"]["mean_secs"])
+        self.assertEqual({"listening", "ready"}, set(summary["mongos"]))
@@ -2,6 +2,7 @@
 """Unit tests for the resmokelib.testing.hooks.combine_benchmark_results module."""
 
 import datetime
+import json
 import unittest
 
 import mock
@@ -148,3 +149,61 @@ class TestBenchmarkThreadsReport(CombineBenchmarkResultsFixture):
         self.assertEqual(len(list(report.keys())), 1)
         self.assertIn("1", list(report.keys()))
         self.assertNotIn("1_mean", list(report.keys()))
+
+        self.assertEqual(report["1"]["ops_per_sec_median"], -1304.0)
+        self.assertEqual(report["1"]["ops_per_sec_iqr"], 1.0)
+        (ci_low, ci_high) = report["1"]["ops_per_sec_ci_95"]
+        self.assertLess(ci_low, -1304.0)
+        self.assertGreater(ci_high, -1304.0)
+
+
+class TestDiscardWarmupRepetitions(unittest.TestCase):
+    def test_in_order(self):
+        benchmarks = [_BM_REPORT_1, _BM_REPORT_2, _BM_MULTITHREAD_REPORT]
+        self.assertEqual([_BM_REPORT_2], cbr._discard_warmup_repetitions(benchmarks, 1))
+
+    def test_interleaved(self):
+        benchmarks = [
+            dict(_BM_REPORT_1, repetition_index=1),
+            dict(_BM_REPORT_2, repetition_index=0),
+            dict(_BM_MEAN_REPORT, run_type="aggregate"),
+        ]
+        self.assertEqual([benchmarks[0], benchmarks[2]],
+                         cbr._discard_warmup_repetitions(benchmarks, 1))
+
+
+class TestCompareToBaseline(CombineBenchmarkResultsFixture):
+    def setUp(self):  # pylint: disable=arguments-differ
+        super().setUp()
+        self.cbr_hook.logger = mock.Mock()
+        self.report = self.cbr_hook._generate_perf_plugin_report()
+
+    def compare(self, baseline_values):
+        baseline_report = {
+            "results": [{
+                "name": "BM_Name1/arg1/arg with space", "results": {
+                    "1": {
+                        "ops_per_sec": sum(baseline_values) / len(baseline_values),
+                        "ops_per_sec_values": baseline_values
+                    }
+                }
+            }]
+        }
+        with mock.patch("builtins.open", mock.mock_open(read_data=json.dumps(baseline_report))):
+            self.cbr_hook._compare_to_baseline(self.report, "baseline.json")
+        return self.report["results"][0]["results"]["1"]["baseline"]
+
+    def test_regression(self):
+        baseline = self.compare([-1000.0, -1001.0])
+        self.assertTrue(baseline["significant"])
+        self.assertAlmostEqual(-30.3, baseline["change_percent"], places=1)
+        self.cbr_hook.logger.warning.assert_called_once()
+
+    def test_noise(self):
+        baseline = self.compare([-1200.0, -1400.0])
+        self.assertFalse(baseline["significant"])
+        self.cbr_hook.logger.warning.assert_not_called()
+
+    def test_not_in_baseline(self):
+        self.compare([-1000.0, -1001.0])
+        self.assertNotIn("baseline", self.report["results"][1]["results"]["10"])
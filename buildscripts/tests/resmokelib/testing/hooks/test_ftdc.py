@@ -0,0 +1,87 @@
+"""Unit tests for the resmokelib.testing.hooks.ftdc module."""
+
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.testing.hooks import ftdc as _ftdc_hook
+from buildscripts.resmokelib.utils import ftdc
+
+# pylint: disable=missing-docstring,protected-access
+
+_INSERTS = "serverStatus.opcounters.insert"
+_DIRTY_BYTES = "serverStatus.wiredTiger.cache.tracked dirty bytes in the cache"
+
+
+class TestNodeMetrics(unittest.TestCase):
+    def setUp(self):
+        self.node = _ftdc_hook._NodeMetrics("diagnostic.data")
+        self.chunks = []
+        patcher = mock.patch.object(self.node, "_read_chunks", side_effect=lambda: self.chunks)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_too_few_samples(self):
+        self.chunks = [ftdc.MetricChunk({ftdc.START_METRIC: [1000], _INSERTS: [0]}, 1)]
+        self.assertIsNone(self.node.summarize(500, 2000))
+
+    def test_summary(self):
+        self.chunks = [
+            ftdc.MetricChunk({
+                ftdc.START_METRIC: [1000, 2000, 3000],
+                _INSERTS: [10, 12, 20],
+                _DIRTY_BYTES: [5, 50, 7],
+            }, 3),
+            # The interim file may repeat the samples which were already written.
+            ftdc.MetricChunk({
+                ftdc.START_METRIC: [3000, 4000, 5000],
+                _INSERTS: [20, 25, 100],
+                _DIRTY_BYTES: [7, 9, 500],
+            }, 3),
+        ]
+
+        summary = self.node.summarize(1500, 4500)
+        self.assertEqual(4, summary["samples"])
+        self.assertEqual(3000, summary["window_millis"])
+        self.assertEqual(15, summary["opcounters.insert"])
+        self.assertEqual(50, summary["wiredTiger.cache.max_dirty_bytes"])
+        self.assertNotIn("opcounters.query", summary)
+        self.assertNotIn("replication.max_lag_millis", summary)
+
+    def test_replication_lag(self):
+        members = "replSetGetStatus.members."
+        self.chunks = [
+            ftdc.MetricChunk({
+                ftdc.START_METRIC: [1000, 2000],
+                members + "0.state": [1, 1],
+                members + "0.optimeDate": [10000, 12000],
+                members + "1.state": [2, 2],
+                members + "1.optimeDate": [9500, 11000],
+                members + "2.state": [2, 2],
+                members + "2.optimeDate": [10000, 11800],
+                members + "3.state": [7, 7],
+                members + "3.optimeDate": [0, 0],
+            }, 2),
+        ]
+
+        summary = self.node.summarize(500, 2500)
+        self.assertEqual(1000, summary["replication.max_lag_millis"])
+
+    def test_discard_chunks(self):
+        self.node._chunks = [
+            ftdc.MetricChunk({ftdc.START_METRIC: [1000, 2000]}, 2),
+            ftdc.MetricChunk({ftdc.START_METRIC: [3000, 4000]}, 2),
+            ftdc.MetricChunk({ftdc.START_METRIC: [5000, 6000]}, 2),
+        ]
+        self.node._discard_chunks_before(4500)
+        self.assertEqual([3000, 4000], self.node._chunks[0].sample_times())
+        self.assertEqual(2, len(self.node._chunks))
+
+
+class TestIsSummarizedMetric(unittest.TestCase):
+    def test_metrics(self):
+        self.assertTrue(_ftdc_hook._is_summarized_metric(_INSERTS))
+        self.assertTrue(_ftdc_hook._is_summarized_metric("replSetGetStatus.members.1.state"))
+        self.assertTrue(_ftdc_hook._is_summarized_metric("replSetGetStatus.members.1.optimeDate"))
+        self.assertFalse(_ftdc_hook._is_summarized_metric("replSetGetStatus.members.1.health"))
+        self.assertFalse(_ftdc_hook._is_summarized_metric("serverStatus.uptime"))
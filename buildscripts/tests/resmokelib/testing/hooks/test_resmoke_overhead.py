@@ -0,0 +1,123 @@
+"""Unit tests for the resmokelib.testing.hooks.resmoke_overhead module."""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from buildscripts.resmokelib import config
+from buildscripts.resmokelib.testing.hooks import resmoke_overhead
+
+# pylint: disable=missing-docstring,protected-access
+
+
+class TestResmokeOverhead(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.report_file = os.path.join(tmp_dir, "perf.json")
+
+        patchers = [
+            mock.patch.object(config, "PERF_REPORT_FILE", self.report_file),
+            mock.patch.object(config, "EXECUTOR_MODE", "thread"),
+            mock.patch.dict(resmoke_overhead.ResmokeOverhead._JOB_MEASUREMENTS, clear=True),
+            mock.patch.object(resmoke_overhead.ResmokeOverhead, "_num_jobs", 0),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def make_hook(job_num, **kwargs):
+        fixture = mock.Mock(job_num=job_num, logger=logging.Logger("YesFixture:job%d" % job_num))
+        hook_logger = logging.Logger("ResmokeOverhead:job%d" % job_num)
+        hook_logger.parent = fixture.logger
+        return resmoke_overhead.ResmokeOverhead(hook_logger, fixture, **kwargs)
+
+    def read_results(self):
+        with open(self.report_file) as fh:
+            report = json.load(fh)
+        return {result["name"]: result["results"] for result in report["results"]}
+
+    def test_jobs_combined(self):
+        hooks = [self.make_hook(job_num, num_dynamic_tests=2) for job_num in range(2)]
+        for hook in hooks:
+            hook.before_suite(mock.Mock())
+
+        test_report = mock.Mock()
+        hooks[0].after_test(mock.Mock(), test_report)
+        hooks[1].after_test(mock.Mock(), test_report)
+        hooks[1].after_test(mock.Mock(), test_report)
+        self.assertEqual(6, test_report.startTest.call_count)
+
+        hooks[0].after_suite(mock.Mock())
+        self.assertFalse(os.path.exists(self.report_file))
+        hooks[1].after_suite(mock.Mock())
+
+        results = self.read_results()
+        self.assertEqual({resmoke_overhead.TEST_BENCHMARK, resmoke_overhead.DYNAMIC_TEST_BENCHMARK},
+                         set(results))
+        self.assertEqual(["2"], list(results[resmoke_overhead.TEST_BENCHMARK]))
+        self.assertEqual(2,
+                         len(results[resmoke_overhead.TEST_BENCHMARK]["2"]["ops_per_sec_values"]))
+
+    def test_job_finishes_before_another_starts(self):
+        hooks = [self.make_hook(job_num) for job_num in range(2)]
+        hooks[0].before_suite(mock.Mock())
+        hooks[0].after_test(mock.Mock(), mock.Mock())
+        hooks[0].after_suite(mock.Mock())
+        self.assertFalse(os.path.exists(self.report_file))
+
+        hooks[1].before_suite(mock.Mock())
+        hooks[1].after_suite(mock.Mock())
+
+        self.assertEqual(["2"], list(self.read_results()[resmoke_overhead.TEST_BENCHMARK]))
+
+    def test_log_lines(self):
+        hook = self.make_hook(0, measure_tests=False, measure_log_lines=True)
+        hook.before_suite(mock.Mock())
+        node_logger = logging.Logger("YesFixture:job0:yes0")
+        node_logger.parent = hook.fixture.logger
+        for _ in range(3):
+            node_logger.info("y")
+        # The messages of the hook aren't counted.
+        hook.logger.info("hook message")
+        self.assertEqual(3, hook._line_counter.num_lines)
+
+        hook.after_suite(mock.Mock())
+        self.assertEqual([], hook.fixture.logger.handlers)
+        self.assertEqual([resmoke_overhead.LOG_LINE_BENCHMARK], list(self.read_results()))
+
+    def test_keeps_other_job_counts(self):
+        for num_jobs in (1, 2):
+            hooks = [self.make_hook(job_num) for job_num in range(num_jobs)]
+            for hook in hooks:
+                hook.before_suite(mock.Mock())
+                hook.after_test(mock.Mock(), mock.Mock())
+            for hook in hooks:
+                hook.after_suite(mock.Mock())
+            resmoke_overhead.ResmokeOverhead._JOB_MEASUREMENTS.clear()
+
+        self.assertEqual({"1", "2"}, set(self.read_results()[resmoke_overhead.TEST_BENCHMARK]))
+
+    def test_rerun_starts_over(self):
+        hook = self.make_hook(0)
+        hook.before_suite(mock.Mock())
+        other_hook = self.make_hook(1)
+        other_hook.before_suite(mock.Mock())
+        other_hook.after_suite(mock.Mock())
+
+        # The first job running the suite again means the previous execution is over.
+        hook.before_suite(mock.Mock())
+        self.assertEqual([0], list(resmoke_overhead.ResmokeOverhead._JOB_MEASUREMENTS))
+        hook.after_suite(mock.Mock())
+        self.assertFalse(os.path.exists(self.report_file))
+
+    def test_process_executor(self):
+        with mock.patch.object(config, "EXECUTOR_MODE", "process"):
+            with self.assertRaises(ValueError):
+                self.make_hook(0)
@@ -0,0 +1,238 @@
+"""Unit tests for the resmokelib.testing.job_process module."""
+
+import os
+import queue as _stdlib_queue
+import shutil
+import signal
+import sys
+import tempfile
+import threading
+import unittest
+
+import mock
+
+from buildscripts.resmokelib import errors
+from buildscripts.resmokelib.testing import job_process
+from buildscripts.resmokelib.testing import report as _report
+
+# pylint: disable=missing-docstring,protected-access
+
+
+def make_report():
+    suite_options = mock.Mock()
+    suite_options.report_failure_status = "fail"
+    return _report.TestReport(mock.Mock(), suite_options)
+
+
+def make_test_info(test_name, status="pass"):
+    test_info = _report._TestInfo(test_name, test_name, False)
+    test_info.start_time = 0
+    test_info.end_time = 1
+    test_info.status = status
+    test_info.evergreen_status = status
+    test_info.return_code = 0 if status == "pass" else 1
+    return test_info
+
+
+class TestProcessTestQueue(unittest.TestCase):
+    def setUp(self):
+        self.shared_queue = _stdlib_queue.Queue()
+        self.task_done = mock.Mock()
+        self.queue = job_process._ProcessTestQueue(self.shared_queue, 2, lambda name: name,
+                                                   self.task_done)
+
+    def test_skips_tests_from_earlier_generations(self):
+        self.shared_queue.put((1, "stale.js"))
+        self.shared_queue.put((2, "test.js"))
+        self.shared_queue.put((2, None))
+
+        self.assertFalse(self.queue.empty())
+        self.assertEqual("test.js", self.queue.get_nowait())
+        self.assertTrue(self.queue.empty())
+
+    def test_stops_fetching_after_sentinel(self):
+        self.shared_queue.put((2, None))
+        self.shared_queue.put((2, "for_another_job.js"))
+
+        self.assertTrue(self.queue.empty())
+        self.assertTrue(self.queue.empty())
+        self.assertEqual(1, self.shared_queue.qsize())
+
+    def test_get_nowait_raises_when_empty(self):
+        self.shared_queue.put((2, None))
+
+        with self.assertRaises(job_process._queue.Empty):
+            self.queue.get_nowait()
+
+    def test_requeued_tests_stay_local(self):
+        self.shared_queue.put((2, None))
+        self.queue.put("requeued.js")
+
+        self.assertEqual("requeued.js", self.queue.get_nowait())
+        self.assertTrue(self.queue.empty())
+        self.assertEqual(0, self.shared_queue.qsize())
+
+    def test_task_done_calls_callback(self):
+        self.queue.task_done()
+        self.task_done.assert_called_once_with()
+
+
+class TestUpdateFrom(unittest.TestCase):
+    def test_counts_updated(self):
+        report = make_report()
+        report.update_from([make_test_info("a.js"), make_test_info("b.js", status="fail")], 1)
+        report.update_from([make_test_info("c.js")], 2)
+
+        self.assertEqual(["a.js", "b.js", "c.js"],
+                         [test_info.test_file for test_info in report.test_infos])
+        self.assertEqual(2, report.num_dynamic)
+        self.assertEqual(2, report.num_succeeded)
+        self.assertEqual(1, report.num_failed)
+        self.assertFalse(report.wasSuccessful())
+
+
+class TestReportSender(unittest.TestCase):
+    def test_sends_new_tests_only(self):
+        parent_conn = mock.Mock()
+        job = mock.Mock(report=make_report())
+        sender = job_process._ReportSender(parent_conn, job)
+
+        job.report.test_infos.append(make_test_info("a.js"))
+        sender.send()
+        job.report.test_infos.append(make_test_info("b.js"))
+        sender.send()
+        sender.send()
+        job.report.reset()
+        sender.reset()
+        job.report.test_infos.append(make_test_info("c.js"))
+        sender.send()
+
+        sent = [[test_info.test_file for test_info in call[0][1]]
+                for call in parent_conn.send.call_args_list]
+        self.assertEqual([["a.js"], ["b.js"], [], ["c.js"]], sent)
+
+
+class FakeJob(object):
+    """Job that records a result for each test it takes from the queue."""
+
+    def __init__(self, job_num, fail_tests=()):
+        self.job_num = job_num
+        self.logger = mock.Mock()
+        self.report = make_report()
+        self.archival = None
+        self.fixture = "FakeFixture"
+        self.manager = mock.Mock()
+        self.manager.teardown_fixture.return_value = True
+        self._fail_tests = fail_tests
+
+    def __call__(self, queue, interrupt_flag, setup_flag=None, teardown_flag=None):
+        while not queue.empty() and not interrupt_flag.is_set():
+            test_name = queue.get_nowait()
+            status = "fail" if test_name in self._fail_tests else "pass"
+            self.report.test_infos.append(make_test_info(test_name, status))
+            queue.task_done()
+
+        if teardown_flag is not None:
+            teardown_flag.set()
+
+
+@unittest.skipIf(sys.platform == "win32", "fork() is not available on Windows")
+class TestJobProcessPool(unittest.TestCase):
+    TESTS = ["jstests/core/test{}.js".format(i) for i in range(10)]
+
+    def setUp(self):
+        self.jobs = [FakeJob(job_num, fail_tests=["jstests/core/test3.js"]) for job_num in (0, 1)]
+        self.pool = job_process.JobProcessPool(mock.Mock(), self.jobs, lambda name: name)
+        self.pool.start()
+
+    def tearDown(self):
+        self.pool.stop()
+
+    def _test_names_run(self):
+        return sorted(
+            test_info.test_file for job in self.jobs for test_info in job.report.test_infos)
+
+    def test_all_tests_run_once(self):
+        interrupted = self.pool.run_tests(self.TESTS, None, None)
+
+        self.assertFalse(interrupted)
+        self.assertEqual(sorted(self.TESTS), self._test_names_run())
+
+    def test_results_merged(self):
+        self.pool.run_tests(self.TESTS, None, None)
+
+        combined = _report.TestReport.combine(*[job.report for job in self.jobs])
+        self.assertEqual(len(self.TESTS) - 1, combined.num_succeeded)
+        self.assertEqual(1, combined.num_failed)
+
+    def test_repeated_runs(self):
+        self.pool.run_tests(self.TESTS, None, None)
+        for job in self.jobs:
+            job.report.reset()
+        self.pool.run_tests(self.TESTS[:3], None, None)
+
+        self.assertEqual(sorted(self.TESTS[:3]), self._test_names_run())
+
+    def test_teardown_flag_propagated(self):
+        teardown_flag = threading.Event()
+        self.pool.run_tests(self.TESTS, None, teardown_flag)
+
+        self.assertTrue(teardown_flag.is_set())
+
+    def test_teardown_fixtures(self):
+        self.assertTrue(self.pool.teardown_fixtures())
+
+
+class KilledJob(FakeJob):
+    """Job whose process is killed when it takes a particular test from the queue."""
+
+    def __init__(self, job_num, kill_test, teardown_dir):
+        FakeJob.__init__(self, job_num)
+        self._kill_test = kill_test
+        # The fixture teardowns happen in the job processes, so they are recorded as files.
+        self._teardown_file = os.path.join(teardown_dir, str(job_num))
+        self.manager.teardown_fixture.side_effect = self._teardown_fixture
+
+    def _teardown_fixture(self, _logger):
+        with open(self._teardown_file, "w"):
+            pass
+        return True
+
+    def __call__(self, queue, interrupt_flag, setup_flag=None, teardown_flag=None):
+        while not queue.empty() and not interrupt_flag.is_set():
+            test_name = queue.get_nowait()
+            if test_name == self._kill_test:
+                os.kill(os.getpid(), signal.SIGKILL)
+            self.report.test_infos.append(make_test_info(test_name))
+            queue.task_done()
+
+
+@unittest.skipIf(sys.platform == "win32", "fork() is not available on Windows")
+class TestJobProcessFailure(unittest.TestCase):
+    def test_job_process_error(self):
+        job = FakeJob(0)
+        job.manager.teardown_fixture.side_effect = RuntimeError("teardown exploded")
+        logger = mock.Mock()
+        pool = job_process.JobProcessPool(logger, [job], lambda name: name)
+        pool.start()
+        try:
+            self.assertFalse(pool.teardown_fixtures())
+        finally:
+            pool.stop()
+        self.assertIn("teardown exploded", logger.error.call_args[0][1])
+
+    def test_job_process_killed_mid_suite(self):
+        teardown_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, teardown_dir)
+        jobs = [KilledJob(job_num, "kill.js", teardown_dir) for job_num in (0, 1)]
+        pool = job_process.JobProcessPool(mock.Mock(), jobs, lambda name: name)
+        pool.start()
+        try:
+            with self.assertRaisesRegex(errors.JobProcessError, "exited unexpectedly"):
+                pool.run_tests(["kill.js"] + TestJobProcessPool.TESTS, None, None)
+
+            # The fixture of the surviving job process is still torn down.
+            self.assertFalse(pool.teardown_fixtures())
+            self.assertEqual(1, len(os.listdir(teardown_dir)))
+        finally:
+            pool.stop()
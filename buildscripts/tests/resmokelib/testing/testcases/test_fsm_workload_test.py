@@ -0,0 +1,92 @@
+"""Unit tests for the buildscripts.resmokelib.testing.testcases.fsm_workload_test module."""
+
+import json
+import logging
+import os
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.testing.testcases import fsm_workload_test
+
+# pylint: disable=missing-docstring,protected-access
+
+_WORKLOAD = "jstests/concurrency/fsm_workloads/indexed_insert_base.js"
+
+_RAW_METRICS = {
+    _WORKLOAD: {
+        "numThreads": 2,
+        "elapsedMs": 500,
+        "transitions": 10,
+        "stateDurationsMs": {"init": [3, 1], "insert": [5, 4, 2, 9, 8, 7, 6, 1]},
+    },
+}
+
+
+class TestSummarizeFsmMetrics(unittest.TestCase):
+    def test_summary(self):
+        summary = fsm_workload_test.summarize_fsm_metrics(_RAW_METRICS)
+        workload_summary = summary[_WORKLOAD]
+        self.assertEqual(2, workload_summary["num_threads"])
+        self.assertEqual(0.5, workload_summary["elapsed_secs"])
+        self.assertEqual(20, workload_summary["transitions_per_sec"])
+        self.assertEqual({
+            "ops": 8,
+            "ops_per_sec": 16,
+            "duration_ms_max": 9,
+            "duration_ms_p50": 5,
+            "duration_ms_p90": 9,
+            "duration_ms_p99": 9,
+        }, workload_summary["states"]["insert"])
+        self.assertEqual(2, workload_summary["states"]["init"]["ops"])
+
+    def test_no_elapsed_time(self):
+        raw_metrics = {_WORKLOAD: dict(_RAW_METRICS[_WORKLOAD], elapsedMs=0)}
+        summary = fsm_workload_test.summarize_fsm_metrics(raw_metrics)[_WORKLOAD]
+        self.assertIsNone(summary["transitions_per_sec"])
+        self.assertIsNone(summary["states"]["init"]["ops_per_sec"])
+
+
+class TestTakeFsmMetrics(unittest.TestCase):
+    def setUp(self):
+        self.test_case = fsm_workload_test.FSMWorkloadTestCase(
+            logging.getLogger("fsm_workload_test"), "jstests/concurrency/fsm_workloads/w.js")
+        self.addCleanup(self._remove_metrics_file)
+
+    def _remove_metrics_file(self):
+        if os.path.exists(self.test_case.fsm_metrics_file):
+            os.remove(self.test_case.fsm_metrics_file)
+
+    def test_metrics_file_is_unique(self):
+        other_test_case = fsm_workload_test.FSMWorkloadTestCase(
+            logging.getLogger("fsm_workload_test"), "jstests/concurrency/fsm_workloads/w.js")
+        self.assertNotEqual(self.test_case.fsm_metrics_file, other_test_case.fsm_metrics_file)
+
+    def test_no_metrics(self):
+        self.assertIsNone(self.test_case._take_fsm_metrics())
+
+    def test_take_metrics(self):
+        with open(self.test_case.fsm_metrics_file, "w") as fh:
+            json.dump(_RAW_METRICS, fh)
+        self.assertEqual(
+            fsm_workload_test.summarize_fsm_metrics(_RAW_METRICS),
+            self.test_case._take_fsm_metrics())
+        self.assertFalse(os.path.exists(self.test_case.fsm_metrics_file))
+
+    def test_malformed_metrics(self):
+        with open(self.test_case.fsm_metrics_file, "w") as fh:
+            fh.write("{")
+        self.assertIsNone(self.test_case._take_fsm_metrics())
+        self.assertFalse(os.path.exists(self.test_case.fsm_metrics_file))
+
+    def test_run_adds_metrics_to_report(self):
+        with open(self.test_case.fsm_metrics_file, "w") as fh:
+            json.dump(_RAW_METRICS, fh)
+
+        result = mock.Mock()
+        with mock.patch.object(fsm_workload_test.jsrunnerfile.JSRunnerFileTestCase, "run"):
+            self.test_case.run(result)
+        result.find_test_info.assert_called_once_with(self.test_case)
+        self.assertEqual(
+            fsm_workload_test.summarize_fsm_metrics(_RAW_METRICS),
+            result.find_test_info.return_value.fsm_metrics)
@@ -0,0 +1,176 @@
+"""Unit tests for the resmokelib.utils.ftdc module."""
+
+import datetime
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+import zlib
+
+import bson
+from bson.timestamp import Timestamp
+
+from buildscripts.resmokelib.utils import ftdc
+
+# pylint: disable=missing-docstring,protected-access
+
+
+def write_varint(value):
+    buf = bytearray()
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            buf.append(byte | 0x80)
+        else:
+            buf.append(byte)
+            return bytes(buf)
+
+
+def encode_chunk(reference, samples):
+    """Encode a metric chunk the way mongod does.
+
+    'samples' has the values of the metrics of 'reference' in each of the later samples.
+    """
+    names = []
+    values = []
+    ftdc._extract_metrics(reference, "", names, values)
+
+    deltas = bytearray()
+    zeroes = 0
+    for (i, previous) in enumerate(values):
+        for sample in samples:
+            delta = (sample[i] - previous) & ((1 << 64) - 1)
+            previous = sample[i]
+            if delta == 0:
+                zeroes += 1
+                continue
+            if zeroes:
+                deltas += write_varint(0) + write_varint(zeroes - 1)
+                zeroes = 0
+            deltas += write_varint(delta)
+    if zeroes:
+        deltas += write_varint(0) + write_varint(zeroes - 1)
+
+    payload = bson.encode(reference) + struct.pack("<II", len(values), len(samples)) + deltas
+    return struct.pack("<I", len(payload)) + zlib.compress(payload)
+
+
+def chunk_document(data):
+    return bson.encode({"_id": datetime.datetime(2020, 1, 1), "type": 1, "data": bson.Binary(data)})
+
+
+class TestDecodeChunk(unittest.TestCase):
+    def test_reference_only(self):
+        reference = {"start": datetime.datetime(2020, 1, 1, 0, 0, 1, 500000), "count": 5}
+        chunk = ftdc.decode_chunk(encode_chunk(reference, []))
+        self.assertEqual(1, chunk.num_samples)
+        self.assertEqual([1577836801500], chunk.sample_times())
+        self.assertEqual(5, chunk.get("count", 0))
+        self.assertIsNone(chunk.get("missing", 0))
+
+    def test_deltas(self):
+        reference = {
+            "start": datetime.datetime(2020, 1, 1),
+            "serverStatus": {"opcounters": {"insert": 10, "query": 3}, "ok": 1.0},
+        }
+        start = 1577836800000
+        # The query and ok metrics don't change, so their zero deltas are encoded as one run.
+        chunk = ftdc.decode_chunk(
+            encode_chunk(reference, [
+                (start + 1000, 15, 3, 1),
+                (start + 2000, 15, 3, 1),
+                (start + 3000, 12, 3, 1),
+            ]))
+        self.assertEqual(4, chunk.num_samples)
+        self.assertEqual([start, start + 1000, start + 2000, start + 3000], chunk.sample_times())
+        self.assertEqual([10, 15, 15, 12], chunk.metrics["serverStatus.opcounters.insert"])
+        self.assertEqual([3, 3, 3, 3], chunk.metrics["serverStatus.opcounters.query"])
+        self.assertEqual([1, 1, 1, 1], chunk.metrics["serverStatus.ok"])
+
+    def test_metric_types(self):
+        reference = {
+            "start": datetime.datetime(2020, 1, 1),
+            "flag": True,
+            "ignored": "a string",
+            "ts": Timestamp(100, 2),
+            "members": [{"state": 1}, {"state": 2}],
+            "negative": -5,
+        }
+        chunk = ftdc.decode_chunk(encode_chunk(reference, []))
+        self.assertEqual(
+            ["start", "flag", "ts.t", "ts.i", "members.0.state", "members.1.state", "negative"],
+            list(chunk.metrics))
+        self.assertEqual(1, chunk.get("flag", 0))
+        self.assertEqual(100, chunk.get("ts.t", 0))
+        self.assertEqual(2, chunk.get("ts.i", 0))
+        self.assertEqual(-5, chunk.get("negative", 0))
+
+    def test_metric_filter(self):
+        reference = {"start": datetime.datetime(2020, 1, 1), "a": 1, "b": 2}
+        data = encode_chunk(reference, [(1, 2, 3), (4, 5, 6)])
+        chunk = ftdc.decode_chunk(data, lambda metric: metric == "b")
+        self.assertEqual(["start", "b"], list(chunk.metrics))
+        self.assertEqual([2, 3, 6], chunk.metrics["b"])
+
+    def test_metric_count_mismatch(self):
+        reference = {"start": datetime.datetime(2020, 1, 1), "a": 1}
+        payload = bson.encode(reference) + struct.pack("<II", 3, 0)
+        with self.assertRaises(ValueError):
+            ftdc.decode_chunk(struct.pack("<I", len(payload)) + zlib.compress(payload))
+
+
+class TestFileReader(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.diagnostic_dir = os.path.join(self.tmpdir, "node0", ftdc.DIAGNOSTIC_DATA_DIRNAME)
+        os.makedirs(self.diagnostic_dir)
+        self.reference = {"start": datetime.datetime(2020, 1, 1), "a": 1}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_partial_document(self):
+        pathname = os.path.join(self.diagnostic_dir, "metrics.2020-01-01T00-00-00Z-00000")
+        metadata = bson.encode({"_id": datetime.datetime(2020, 1, 1), "type": 0, "doc": {}})
+        first = chunk_document(encode_chunk(self.reference, [(1, 2)]))
+        second = chunk_document(encode_chunk(self.reference, [(3, 4)]))
+
+        with open(pathname, "wb") as fp:
+            fp.write(metadata + first + second[:10])
+
+        reader = ftdc.FileReader(pathname)
+        chunks = reader.read_new_chunks()
+        self.assertEqual(1, len(chunks))
+        self.assertEqual([1, 2], chunks[0].metrics["a"])
+        self.assertEqual(len(metadata) + len(first), reader.offset)
+
+        with open(pathname, "ab") as fp:
+            fp.write(second[10:])
+
+        chunks = reader.read_new_chunks()
+        self.assertEqual(1, len(chunks))
+        self.assertEqual([1, 4], chunks[0].metrics["a"])
+        self.assertEqual([], reader.read_new_chunks())
+
+    def test_read_directory(self):
+        for (filename, value) in [("metrics.2020-01-01T00-00-01Z-00000", 3),
+                                  (ftdc.INTERIM_FILENAME, 5),
+                                  ("metrics.2020-01-01T00-00-00Z-00000", 2)]:
+            with open(os.path.join(self.diagnostic_dir, filename), "wb") as fp:
+                fp.write(chunk_document(encode_chunk(self.reference, [(0, value)])))
+
+        self.assertEqual([
+            os.path.join(self.diagnostic_dir, "metrics.2020-01-01T00-00-00Z-00000"),
+            os.path.join(self.diagnostic_dir, "metrics.2020-01-01T00-00-01Z-00000"),
+        ], ftdc.list_metrics_files(self.diagnostic_dir))
+
+        chunks = ftdc.read_directory(self.diagnostic_dir)
+        self.assertEqual([2, 3, 5], [chunk.get("a", 1) for chunk in chunks])
+
+    def test_find_diagnostic_dirs(self):
+        other_dir = os.path.join(self.tmpdir, "node1", ftdc.DIAGNOSTIC_DATA_DIRNAME)
+        os.makedirs(os.path.join(other_dir, "nested", ftdc.DIAGNOSTIC_DATA_DIRNAME))
+        os.makedirs(os.path.join(self.tmpdir, "node2"))
+        self.assertEqual([self.diagnostic_dir, other_dir], ftdc.find_diagnostic_dirs(self.tmpdir))
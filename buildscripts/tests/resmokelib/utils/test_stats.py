@@ -0,0 +1,60 @@
+"""Unit tests for the resmokelib.utils.stats module."""
+
+import unittest
+
+from buildscripts.resmokelib.utils import stats
+
+# pylint: disable=missing-docstring
+
+
+class TestTCritical(unittest.TestCase):
+    def test_rounds_down(self):
+        self.assertEqual(12.706, stats.t_critical_95(1))
+        self.assertEqual(12.706, stats.t_critical_95(1.9))
+        self.assertEqual(2.228, stats.t_critical_95(11))
+        self.assertEqual(1.980, stats.t_critical_95(1000))
+        self.assertEqual(1.960, stats.t_critical_95(float("inf")))
+
+
+class TestPercentile(unittest.TestCase):
+    def test_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(50, stats.percentile(values, 50))
+        self.assertEqual(99, stats.percentile(values, 99))
+        self.assertEqual(1, stats.percentile(values, 0))
+        self.assertEqual(7, stats.percentile([7], 90))
+
+
+class TestSummarize(unittest.TestCase):
+    def test_no_values(self):
+        self.assertEqual({"median": None, "iqr": None, "ci_95": None}, stats.summarize([]))
+
+    def test_single_value(self):
+        self.assertEqual({"median": 5, "iqr": 0, "ci_95": [5, 5]}, stats.summarize([5]))
+
+    def test_values(self):
+        summary = stats.summarize([1, 2, 3, 4, 100])
+        self.assertEqual(3, summary["median"])
+        self.assertEqual(2, summary["iqr"])
+        (ci_low, ci_high) = summary["ci_95"]
+        self.assertAlmostEqual(22 - 2.776 * 1902.5**0.5 / 5**0.5, ci_low, places=2)
+        self.assertAlmostEqual(22 + 2.776 * 1902.5**0.5 / 5**0.5, ci_high, places=2)
+
+    def test_interpolated_quartiles(self):
+        # The quartiles fall between values: 1.75 and 3.25.
+        self.assertEqual(1.5, stats.summarize([4, 1, 3, 2])["iqr"])
+
+
+class TestIsSignificantChange(unittest.TestCase):
+    def test_too_few_values(self):
+        self.assertFalse(stats.is_significant_change([1], [100, 101]))
+
+    def test_no_variance(self):
+        self.assertTrue(stats.is_significant_change([1, 1], [2, 2]))
+        self.assertFalse(stats.is_significant_change([1, 1], [1, 1]))
+
+    def test_significant(self):
+        self.assertTrue(stats.is_significant_change([100, 101, 99], [90, 91, 89]))
+
+    def test_noise(self):
+        self.assertFalse(stats.is_significant_change([100, 120, 80], [95, 115, 85]))
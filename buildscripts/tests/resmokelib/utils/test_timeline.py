@@ -0,0 +1,97 @@
+"""Unit tests for buildscripts/resmokelib/utils/timeline.py."""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from buildscripts.resmokelib.utils import timeline
+
+# pylint: disable=missing-docstring,protected-access
+
+
+class TestTimeline(unittest.TestCase):
+    def setUp(self):
+        timeline.enable()
+
+    def tearDown(self):
+        timeline.take_events()
+        timeline._ENABLED = False
+
+    def test_nothing_recorded_when_disabled(self):
+        timeline._ENABLED = False
+        with timeline.span("test.js", "test", 0):
+            pass
+        timeline.record("queue_wait", "queue", 1, 2, 0)
+        self.assertEqual([], timeline.take_events())
+
+    def test_span_records_complete_event(self):
+        with timeline.span("test.js", "test", 3, test_file="jstests/core/test.js") as args:
+            args["status"] = "pass"
+
+        events = timeline.take_events()
+        self.assertEqual(1, len(events))
+        event = events[0]
+        self.assertEqual("test.js", event["name"])
+        self.assertEqual("test", event["cat"])
+        self.assertEqual("X", event["ph"])
+        self.assertEqual(3, event["tid"])
+        self.assertGreaterEqual(event["dur"], 0)
+        self.assertEqual({"test_file": "jstests/core/test.js", "status": "pass"}, event["args"])
+
+    def test_span_records_event_on_exception(self):
+        with self.assertRaises(ValueError):
+            with timeline.span("fixture_setup", "fixture", 0):
+                raise ValueError("setup failed")
+
+        self.assertEqual(1, len(timeline.take_events()))
+
+    def test_record_converts_to_microseconds(self):
+        timeline.record("queue_wait", "queue", 1.5, 2.25, 1)
+
+        events = timeline.take_events()
+        self.assertEqual(1, len(events))
+        event = events[0]
+        self.assertEqual(1500000, event["ts"])
+        self.assertEqual(750000, event["dur"])
+
+    def test_threads_without_job_get_their_own_lane(self):
+        timeline.record("upload", "archival", 1, 2)
+        thread = threading.Thread(target=timeline.record, args=("upload", "archival", 1, 2),
+                                  name="upload_worker")
+        thread.start()
+        thread.join()
+
+        events = timeline.take_events()
+        self.assertEqual(2, len(events))
+        main_event = events[0]
+        worker_event = events[1]
+        self.assertGreaterEqual(main_event["tid"], timeline._FIRST_THREAD_LANE)
+        self.assertGreaterEqual(worker_event["tid"], timeline._FIRST_THREAD_LANE)
+        self.assertNotEqual(main_event["tid"], worker_event["tid"])
+
+    def test_add_events(self):
+        timeline.add_events([{"name": "test.js", "ph": "X", "tid": 2}])
+        self.assertEqual(1, len(timeline.take_events()))
+
+    def test_write(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        pathname = os.path.join(tmpdir, "trace.json")
+
+        timeline.record("test.js", "test", 1, 2, 0)
+        timeline.record("test.js", "test", 1, 2, 1)
+        timeline.write(pathname)
+
+        with open(pathname) as fp:
+            trace = json.load(fp)
+
+        events = trace["traceEvents"]
+        lane_names = {
+            event["tid"]: event["args"]["name"]
+            for event in events if event["name"] == "thread_name"
+        }
+        self.assertEqual({0: "job0", 1: "job1"}, lane_names)
+        self.assertEqual(2, len([event for event in events if event["ph"] == "X"]))
@@ -0,0 +1,92 @@
+"""Unit tests for the backtest_timeouts script."""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from click.testing import CliRunner
+
+import buildscripts.backtest_timeouts as under_test
+from buildscripts.util.teststats import HistoricTaskData
+
+# pylint: disable=missing-docstring
+
+# 4 tests taking about 10 minutes each, over 3 days of training and 2 days to replay. On the last
+# day, test0 takes twice as long as usual.
+RUNTIMES = {
+    "2020-03-01": [600, 620, 580, 600],
+    "2020-03-02": [640, 600, 600, 560],
+    "2020-03-03": [560, 580, 620, 640],
+    "2020-03-04": [600, 600, 600, 600],
+    "2020-03-05": [1200, 600, 600, 600],
+}
+
+HISTORY = [{
+    "test_file": f"jstests/core/test{i}.js", "num_pass": 1, "num_fail": 0,
+    "avg_duration_pass": runtime, "date": day
+} for (day, runtimes) in RUNTIMES.items() for (i, runtime) in enumerate(runtimes)]
+
+
+def get_daily_stats():
+    return [under_test.TestStats(stats, None) for stats in HISTORY]
+
+
+class TestSplitHistory(unittest.TestCase):
+    def test_split_history(self):
+        (train_stats, replay_stats) = under_test.split_history(get_daily_stats(), 2)
+
+        self.assertEqual(12, len(train_stats))
+        self.assertEqual(["2020-03-04", "2020-03-05"], sorted(replay_stats))
+        self.assertEqual(4, len(replay_stats["2020-03-05"]))
+
+
+class TestBacktest(unittest.TestCase):
+    def test_backtest(self):
+        (train_stats, replay_stats) = under_test.split_history(get_daily_stats(), 2)
+        train_data = HistoricTaskData.from_stats_list(train_stats)
+        suites = under_test.create_suites(train_data, 20, max_suites=None, max_tests_per_suite=None,
+                                          per_test_overhead=0)
+
+        results = under_test.backtest(train_data, replay_stats, suites, 0, 1)
+
+        self.assertEqual(under_test.MODELS, [result["model"] for result in results])
+        scaling = results[0]
+        percentile = results[1]
+        self.assertEqual(2, scaling["num_suites"])
+        self.assertEqual(4, scaling["num_runs"])
+        self.assertEqual(0, scaling["num_killed"])
+        self.assertEqual(0, scaling["reclaimed_secs_per_hang"])
+        self.assertLess(percentile["avg_exec_timeout_secs"], scaling["avg_exec_timeout_secs"])
+        self.assertEqual(scaling["avg_exec_timeout_secs"] - percentile["avg_exec_timeout_secs"],
+                         percentile["reclaimed_secs_per_hang"])
+        # Only the sub-suite of test0 on the last day runs longer than its percentile timeout.
+        self.assertEqual(1, percentile["num_killed"])
+
+    def test_main_with_history_file(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        history_file = os.path.join(tmp_dir, "history.json")
+        with open(history_file, "w") as fh:
+            json.dump(HISTORY, fh)
+
+        result = CliRunner().invoke(
+            under_test.main,
+            ["--history-file", history_file, "--replay-days", "2", "--target-minutes", "20"])
+
+        self.assertEqual(0, result.exit_code, result.output)
+        self.assertEqual(3, len(result.output.splitlines()))
+
+    def test_main_without_enough_history(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        history_file = os.path.join(tmp_dir, "history.json")
+        with open(history_file, "w") as fh:
+            json.dump(HISTORY, fh)
+
+        result = CliRunner().invoke(under_test.main,
+                                    ["--history-file", history_file, "--replay-days", "5"])
+
+        self.assertNotEqual(0, result.exit_code)
+        self.assertIn("Not enough days of test history", result.output)
@@ -7,6 +7,7 @@ import datetime
 import json
 import os
 import sys
+import threading
 import subprocess
 import unittest
 
@@ -381,6 +382,33 @@ class TestGetTaskRuntimeHistory(unittest.TestCase):
         self.assertEqual(result, [])
 
 
+class TestGetTasksRuntimeHistory(unittest.TestCase):
+    @patch(ns("_get_task_runtime_history"))
+    def test_each_task_is_fetched_once(self, get_task_runtime_history_mock):
+        get_task_runtime_history_mock.side_effect = \
+            lambda evg_api, project, task, variant: [(f"{task}.js", 10)]
+        evergreen_api = Mock()
+
+        result = under_test._get_tasks_runtime_history(evergreen_api, "project1",
+                                                       ["task1", "task2", "task1"], "variant1")
+
+        self.assertEqual({"task1": [("task1.js", 10)], "task2": [("task2.js", 10)]}, result)
+        self.assertEqual(2, get_task_runtime_history_mock.call_count)
+        get_task_runtime_history_mock.assert_any_call(evergreen_api, "project1", "task2",
+                                                      "variant1")
+
+    @patch(ns("_get_task_runtime_history"))
+    def test_tasks_are_fetched_concurrently(self, get_task_runtime_history_mock):
+        # Each fetch waits for the others to start, which only works if they run concurrently.
+        barrier = threading.Barrier(3, timeout=10)
+        get_task_runtime_history_mock.side_effect = lambda *args: barrier.wait() and []
+
+        result = under_test._get_tasks_runtime_history(Mock(), "project1",
+                                                       ["task1", "task2", "task3"], "variant1")
+
+        self.assertEqual({"task1", "task2", "task3"}, set(result))
+
+
 class TestGetTaskName(unittest.TestCase):
     def test__get_task_name(self):
         name = "mytask"
@@ -1,5 +1,13 @@
 """Unit tests for buildscripts/bypass_compile_and_fetch_binaries.py."""
 
+import functools
+import http.server
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
 import unittest
 
 from mock import mock_open, patch, MagicMock
@@ -246,3 +254,164 @@ class TestUpdateArtifactPermissions(unittest.TestCase):
         under_test.update_artifact_permissions(perm_dict)
 
         self.assertEqual(len(perm_dict), chmod_mock.call_count)
+
+
+def write_tgz(path, files):
+    with tarfile.open(path, "w:gz") as tar:
+        for (name, contents) in files.items():
+            tarinfo = tarfile.TarInfo(name)
+            tarinfo.size = len(contents)
+            tar.addfile(tarinfo, io.BytesIO(contents))
+
+
+class _ArtifactHandler(http.server.SimpleHTTPRequestHandler):
+    def do_GET(self):  # pylint: disable=invalid-name
+        if self.path == "/truncated.tgz":
+            self.send_response(200)
+            self.send_header("Content-Length", "1000")
+            self.end_headers()
+            self.wfile.write(b"truncated")
+            return
+        if self.path.startswith("/half/"):
+            # Send the first half of the file, as if the connection was closed during the download.
+            with open(os.path.join(self.directory, self.path[len("/half/"):]), "rb") as fh:
+                contents = fh.read()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(contents)))
+            self.end_headers()
+            self.wfile.write(contents[:len(contents) // 2])
+            return
+        super().do_GET()
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class TestFetchArtifactsFromServer(unittest.TestCase):
+    build_id = "mongodb_mongo_master_linux_64_a22"
+    revision = "a22"
+
+    def setUp(self):
+        self.serve_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.serve_dir)
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir)
+        self.cache_dir = os.path.join(self.work_dir, "cache")
+        cwd = os.getcwd()
+        os.chdir(self.work_dir)
+        self.addCleanup(os.chdir, cwd)
+
+        handler = functools.partial(_ArtifactHandler, directory=self.serve_dir)
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        write_tgz(
+            os.path.join(self.serve_dir, f"{self.build_id}.tgz"),
+            {"repo/file": b"repo", "mongobridge": b"bridge", "mongod.debug": b"not extracted"})
+        write_tgz(os.path.join(self.serve_dir, "debugsymbols-a22.tgz"), {"mongod.debug": b""})
+        write_tgz(os.path.join(self.serve_dir, "mongo-src-a22.tgz"), {"src/file": b""})
+        write_tgz(os.path.join(self.serve_dir, "jstests-a22.tgz"), {"jstests/test.js": b""})
+
+    def url(self, filename):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/{filename}"
+
+    def build(self, *filenames):
+        artifacts = []
+        for filename in filenames:
+            artifact = MagicMock(url=self.url(filename))
+            artifact.name = filename
+            artifacts.append(artifact)
+        task = MagicMock(display_name="archive_dist_test_debug", artifacts=artifacts)
+        build = MagicMock(id=self.build_id)
+        build.get_tasks.return_value = [task]
+        return build
+
+    def fetch(self, cache=None):
+        build = self.build(f"{self.build_id}.tgz", "debugsymbols-a22.tgz", "mongo-src-a22.tgz",
+                           "jstests-a22.tgz")
+        return under_test.fetch_artifacts(build, self.revision, cache)
+
+    def test_fetch_artifacts(self):
+        artifacts = self.fetch()
+
+        self.assertEqual([self.url("jstests-a22.tgz")],
+                         [artifact["link"] for artifact in artifacts])
+        with open(os.path.join("repo", "file")) as fh:
+            self.assertEqual("repo", fh.read())
+        self.assertTrue(os.path.isfile("mongobridge"))
+        self.assertFalse(os.path.exists("mongod.debug"))
+        self.assertTrue(os.path.isfile("mongo-debugsymbols.tgz"))
+        self.assertTrue(os.path.isfile("distsrc.tgz"))
+        self.assertTrue(os.path.isfile(f"{self.build_id}.tgz"))
+
+    def test_fetch_artifacts_from_cache(self):
+        cache = under_test.ArtifactCache(self.cache_dir)
+        self.fetch(cache)
+        os.remove(os.path.join(self.serve_dir, f"{self.build_id}.tgz"))
+        os.remove(os.path.join(self.serve_dir, "debugsymbols-a22.tgz"))
+        os.remove(os.path.join(self.serve_dir, "mongo-src-a22.tgz"))
+        shutil.rmtree("repo")
+        os.remove("mongobridge")
+
+        self.fetch(cache)
+
+        self.assertTrue(os.path.isfile(os.path.join("repo", "file")))
+        self.assertTrue(os.path.isfile("mongobridge"))
+        self.assertTrue(os.path.isfile("mongo-debugsymbols.tgz"))
+        self.assertTrue(cache.get(self.revision, "debugsymbols-a22.tgz"))
+
+    def test_cache_keeps_the_most_recent_revisions(self):
+        cache = under_test.ArtifactCache(self.cache_dir)
+        for idx in range(under_test.CACHED_REVISIONS + 1):
+            cache.prune(f"revision{idx}")
+            os.utime(os.path.join(self.cache_dir, f"revision{idx}"), (idx, idx))
+
+        cache.prune("revision0")
+
+        expected_revisions = ["revision0"] + [
+            f"revision{idx}" for idx in range(2, under_test.CACHED_REVISIONS + 1)
+        ]
+        self.assertEqual(sorted(expected_revisions), sorted(self.cached_revisions()))
+
+    @unittest.skipIf(under_test.fcntl is None, "Revisions are only locked with fcntl")
+    def test_cache_keeps_revisions_in_use(self):
+        cache = under_test.ArtifactCache(self.cache_dir)
+        for idx in range(under_test.CACHED_REVISIONS + 1):
+            os.makedirs(os.path.join(self.cache_dir, f"revision{idx}"))
+            os.utime(os.path.join(self.cache_dir, f"revision{idx}"), (idx, idx))
+
+        with cache.lock("revision0"):
+            cache.prune("revision1")
+
+        self.assertIn("revision0", self.cached_revisions())
+
+    def cached_revisions(self):
+        return [
+            name for name in os.listdir(self.cache_dir)
+            if os.path.isdir(os.path.join(self.cache_dir, name))
+        ]
+
+    def test_truncated_download(self):
+        with self.assertRaises(ValueError):
+            under_test.download_file(self.url("truncated.tgz"), "truncated.tgz")
+        self.assertEqual([], os.listdir(self.work_dir))
+
+    def test_truncated_artifacts_download(self):
+        write_tgz(
+            os.path.join(self.serve_dir, "large.tgz"),
+            {"repo/file": b"repo", "mongobridge": os.urandom(500000)})
+
+        with self.assertRaises(ValueError):
+            under_test.download_file(
+                self.url("half/large.tgz"), "large.tgz", under_test.extract_artifacts_from_stream)
+        self.assertEqual([], os.listdir(self.work_dir))
+
+    def test_missing_artifact(self):
+        cache = under_test.ArtifactCache(self.cache_dir)
+        with self.assertRaises(ValueError):
+            under_test.retrieve_artifact(
+                self.url("missing.tgz"), "missing.tgz", self.revision, cache)
+        self.assertIsNone(cache.get(self.revision, "missing.tgz"))
@@ -0,0 +1,106 @@
+"""Unit tests for the combine_reports script."""
+
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import mock
+
+from buildscripts import combine_reports
+from buildscripts.resmokelib.logging import loggers
+from buildscripts.resmokelib.testing import report as _report
+
+# pylint: disable=missing-docstring
+
+
+def make_result(test_file, status, **kwargs):
+    result = {"test_file": test_file, "status": status, "exit_code": 0, "start": 1, "end": 3}
+    result.update(kwargs)
+    return result
+
+
+REPORTS = [
+    {
+        "results": [
+            make_result("jstests/core/a.js", "pass", url="http://logs/a"),
+            make_result("jstests/core/b.js", "fail", exit_code=1, ftdc_metrics={"cpu": 1}),
+        ],
+        "failures": 1,
+    },
+    {
+        "results": [
+            make_result("jstests/core/a.js", "pass"),
+            make_result("a:CheckReplDBHash", "timeout", exit_code=-2),
+        ],
+        "failures": 1,
+    },
+]
+
+
+class TestStreamingReportCombiner(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def write_file(self, name, contents):
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, "w") as fh:
+            fh.write(contents)
+        return path
+
+    @staticmethod
+    def combine(report_files):
+        fh = io.StringIO()
+        combiner = combine_reports.StreamingReportCombiner(fh)
+        for report_file in report_files:
+            combiner.add_report_file(report_file)
+        combiner.finish()
+        return (fh.getvalue(), combiner)
+
+    def test_same_as_combine(self):
+        report_files = [
+            self.write_file("report{}.json".format(i), json.dumps(report))
+            for (i, report) in enumerate(REPORTS)
+        ]
+        (output, combiner) = self.combine(report_files)
+
+        with mock.patch.object(loggers, "EXECUTOR_LOGGER", mock.Mock(), create=True), \
+                mock.patch.object(loggers, "ROOT_EXECUTOR_LOGGER", mock.Mock(), create=True):
+            combined = _report.TestReport.combine(
+                *[_report.TestReport.from_dict(report) for report in REPORTS])
+        self.assertEqual(json.dumps(combined.as_dict()), output)
+        self.assertEqual(combine_reports.report_exit(combined), combiner.exit_code)
+        self.assertEqual(2, combiner.num_failures)
+
+    def test_json_lines(self):
+        lines = [json.dumps(REPORTS[0]), "", json.dumps(REPORTS[1]["results"][0])]
+        report_file = self.write_file("report.jsonl", "\n".join(lines))
+        (output, combiner) = self.combine([report_file])
+
+        combined = json.loads(output)
+        self.assertEqual(["jstests/core/a.js", "jstests/core/b.js", "jstests/core/a.js"],
+                         [result["test_file"] for result in combined["results"]])
+        self.assertEqual(1, combined["failures"])
+        self.assertEqual(31, combiner.exit_code)
+
+    def test_no_results(self):
+        (output, combiner) = self.combine([])
+        self.assertEqual({"results": [], "failures": 0}, json.loads(output))
+        self.assertEqual(0, combiner.exit_code)
+
+    def test_main(self):
+        report_file = self.write_file("report.json", json.dumps(REPORTS[0]))
+        outfile = os.path.join(self.tmp_dir, "combined.json")
+        missing_file = os.path.join(self.tmp_dir, "missing.json")
+        argv = ["combine_reports.py", "-o", outfile, report_file, missing_file]
+        with mock.patch.object(sys, "argv", argv), self.assertRaises(SystemExit) as context:
+            combine_reports.main()
+
+        self.assertEqual(31, context.exception.code)
+        self.assertEqual(["combined.json", "report.json"], sorted(os.listdir(self.tmp_dir)))
+        with open(outfile) as fh:
+            self.assertEqual(2, len(json.load(fh)["results"]))
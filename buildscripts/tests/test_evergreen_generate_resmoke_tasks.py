@@ -14,6 +14,7 @@ from shrub.v2 import BuildVariant, ShrubProject
 from shrub.variant import DisplayTaskDefinition
 
 from buildscripts.util.teststats import TestRuntime
+from buildscripts.util import teststats
 
 from buildscripts import evergreen_generate_resmoke_tasks as under_test
 
@@ -340,6 +341,30 @@ class TestConfigOptions(unittest.TestCase):
 
         self.assertTrue(config_options.create_misc_suite)
 
+    def test_order_tests_by_failure_rate_defaults_to_false(self):
+        config = {}
+
+        config_options = under_test.ConfigOptions(config)
+
+        self.assertFalse(config_options.order_tests_by_failure_rate)
+        self.assertFalse(config_options.use_burn_in_failure_rates)
+        self.assertFalse(config_options.weight_changed_area_failures)
+
+    def test_order_tests_by_failure_rate_from_expansion(self):
+        config = {"order_tests_by_failure_rate": "true", "task_name": "task_value_gen"}
+
+        config_options = under_test.ConfigOptions(config)
+
+        self.assertTrue(config_options.order_tests_by_failure_rate)
+        self.assertEqual("task_value_failure_rates.json", config_options.failure_rates_filename)
+
+    def test_weight_changed_area_failures_in_patches_with_index(self):
+        config = {"co_change_index": "co_change_index.json.gz", "is_patch": "true"}
+
+        self.assertTrue(under_test.ConfigOptions(config).weight_changed_area_failures)
+        config["is_patch"] = "false"
+        self.assertFalse(under_test.ConfigOptions(config).weight_changed_area_failures)
+
     def test_item_with_format_function_works(self):
         config = {"number": "1"}
         formats = {"number": int}
@@ -473,6 +498,77 @@ class DivideTestsIntoSuitesByMaxtimeTest(unittest.TestCase):
         self.assertEqual(len(suites), max_suites)
 
 
+class PackTestsIntoSuitesTest(unittest.TestCase):
+    def test_suites_are_balanced(self):
+        tests_runtimes = [("test1", 30), ("test2", 30), ("test3", 20), ("test4", 20), ("test5", 20),
+                          ("test6", 10), ("test7", 10)]
+
+        suites = under_test.pack_tests_into_suites("suite_name", tests_runtimes, 70, max_suites=2)
+
+        self.assertEqual([70, 70], [suite.get_runtime() for suite in suites])
+        self.assertEqual([0, 1], [suite.index for suite in suites])
+        self.assertEqual(7, sum(suite.get_test_count() for suite in suites))
+
+    def test_per_test_overhead_adds_suites(self):
+        tests_runtimes = [(f"test{i}", 10) for i in range(6)]
+
+        suites = under_test.pack_tests_into_suites("suite_name", tests_runtimes, 60)
+        self.assertEqual(1, len(suites))
+
+        suites = under_test.pack_tests_into_suites("suite_name", tests_runtimes, 60,
+                                                   per_test_overhead=10)
+        self.assertEqual(2, len(suites))
+        # The overhead is accounted for separately by add_task_hook_overhead().
+        self.assertEqual([30, 30], [suite.get_runtime() for suite in suites])
+
+
+class WeightFailureRatesByRelationTest(unittest.TestCase):
+    def test_related_tests_are_moved_up(self):
+        failure_rates = [
+            teststats.TestFailureRate("test0.js", 0.5, 10),
+            teststats.TestFailureRate("test1.js", 0.2, 10),
+            teststats.TestFailureRate("test2.js", 0.0, 10),
+        ]
+        test_mappings = [
+            {"source_file": "src/a.cpp", "test_files": [{"name": "test2.js", "score": 0.5}]},
+            {"source_file": "src/b.cpp", "test_files": [{"name": "test1.js", "score": 0.5},
+                                                        {"name": "test2.js", "score": 0.8}]},
+        ]  # yapf: disable
+
+        weighted = under_test.weight_failure_rates_by_relation(failure_rates, test_mappings)
+
+        self.assertEqual(["test2.js", "test1.js", "test0.js"],
+                         [info.test_name for info in weighted])
+        self.assertAlmostEqual(0.8, weighted[0].failure_rate)
+        self.assertAlmostEqual(0.6, weighted[1].failure_rate)
+        self.assertAlmostEqual(0.5, weighted[2].failure_rate)
+
+    def test_related_tests_without_history_are_added(self):
+        failure_rates = [teststats.TestFailureRate("test0.js", 0.1, 10)]
+        test_mappings = [{
+            "source_file": "src/a.cpp",
+            "test_files": [{"name": "jstests\\new.js", "score": 0.3}],
+        }]
+
+        weighted = under_test.weight_failure_rates_by_relation(failure_rates, test_mappings)
+
+        self.assertEqual(["jstests/new.js", "test0.js"], [info.test_name for info in weighted])
+        self.assertEqual(0, weighted[0].num_runs)
+
+    @patch(ns("CoChangeIndex"))
+    def test_missing_index_has_no_mappings(self, index_mock):
+        with TemporaryDirectory() as tmpdir:
+            index_file = os.path.join(tmpdir, "co_change_index.json.gz")
+            self.assertEqual([], under_test.get_changed_test_mappings(index_file))
+        index_mock.from_file.assert_not_called()
+
+    def test_no_mappings_keeps_rates(self):
+        failure_rates = [teststats.TestFailureRate("test0.js", 0.1, 10)]
+
+        self.assertEqual(failure_rates,
+                         under_test.weight_failure_rates_by_relation(failure_rates, []))
+
+
 class SuiteTest(unittest.TestCase):
     def test_adding_tests_increases_count_and_runtime(self):
         suite = under_test.Suite("suite name")
@@ -570,6 +666,41 @@ class TimeoutEstimateTest(unittest.TestCase):
         with self.assertRaises(ValueError):
             timeout_est.generate_timeout_cmd(is_patch=True, repeat_factor=1)
 
+    @staticmethod
+    def make_percentile_estimate(stddev, p99):
+        tests_runtime_stats = [
+            teststats.TestRuntimeStats(test_name=f"test{i}.js", runtime=100, stddev=stddev, p50=100,
+                                       p90=p99, p99=p99, num_runs=10, num_samples=7)
+            for i in range(4)
+        ]
+        return under_test.TimeoutEstimate(max_test_runtime=100, expected_task_runtime=400,
+                                          tests_runtime_stats=tests_runtime_stats)
+
+    def test_percentile_timeouts_below_scaling(self):
+        timeout_est = self.make_percentile_estimate(20, 150)
+        scaling_est = timeout_est._replace(tests_runtime_stats=None)
+
+        # The longest test is expected to take up to 150 + 3 * 20 seconds, whatever the repeats.
+        self.assertEqual(
+            under_test.calculate_timeout(210, 1), timeout_est.calculate_test_timeout(3))
+        self.assertLess(
+            timeout_est.calculate_test_timeout(3), scaling_est.calculate_test_timeout(3))
+        # The 4 tests are expected to take up to 400 + 3 * sqrt(4 * 20^2) seconds.
+        self.assertEqual(
+            under_test.calculate_timeout(520, 1), timeout_est.calculate_task_timeout(1))
+        self.assertLess(
+            timeout_est.calculate_task_timeout(1), scaling_est.calculate_task_timeout(1))
+
+    def test_percentile_timeouts_above_scaling(self):
+        timeout_est = self.make_percentile_estimate(200, 700)
+
+        # The longest test is expected to take up to 700 + 3 * 200 seconds, whatever the repeats.
+        self.assertEqual(
+            under_test.calculate_timeout(1300, 1), timeout_est.calculate_test_timeout(1))
+        # The 4 tests are expected to take up to 400 + 3 * sqrt(4 * 200^2) seconds.
+        self.assertEqual(
+            under_test.calculate_timeout(1600, 1), timeout_est.calculate_task_timeout(1))
+
 
 class EvergreenConfigGeneratorTest(unittest.TestCase):
     @staticmethod
@@ -602,6 +733,7 @@ class EvergreenConfigGeneratorTest(unittest.TestCase):
         options.generated_config_dir = "config_dir"
         options.generate_display_task.return_value = DisplayTaskDefinition("task")
         options.create_misc_suite = True
+        options.order_tests_by_failure_rate = False
 
         return options
 
@@ -741,6 +873,25 @@ class EvergreenConfigGeneratorTest(unittest.TestCase):
         dependencies = cfg_generator._get_dependencies()
         self.assertEqual(4, len(dependencies))
 
+    def test_evg_config_orders_tests_by_failure_rate(self):
+        options = self.generate_mock_options()
+        options.order_tests_by_failure_rate = True
+        options.failure_rates_filename = "suite_failure_rates.json"
+        suites = self.generate_mock_suites(3)
+        build_variant = BuildVariant("variant")
+
+        generator = under_test.EvergreenConfigGenerator(suites, options, MagicMock())
+        generator.generate_config(build_variant)
+
+        shrub_project = ShrubProject.empty().add_build_variant(build_variant)
+        config = shrub_project.as_dict()
+        for task in config["tasks"]:
+            (command, ) = [
+                cmd for cmd in task["commands"] if cmd.get("func") == "run generated tests"
+            ]
+            self.assertIn(" --testOrderFile=config_dir/suite_failure_rates.json ",
+                          command["vars"]["resmoke_args"])
+
     def test_evg_config_has_timeouts_for_repeated_suites(self):
         options = self.generate_mock_options()
         options.repeat_suites = 5
@@ -842,7 +993,7 @@ class EvergreenConfigGeneratorTest(unittest.TestCase):
         self.assertEqual("do setup", timeout_cmd["func"])
 
 
-class GenerateSubSuitesTest(unittest.TestCase):
+class GenerateSubSuitesTest(unittest.TestCase):  # pylint: disable=too-many-public-methods
     @staticmethod
     def get_mock_options(n_fallback=2, max_sub_suites=100):
         options = MagicMock()
@@ -850,6 +1001,8 @@ class GenerateSubSuitesTest(unittest.TestCase):
         options.fallback_num_sub_suites = n_fallback
         options.max_tests_per_suite = None
         options.max_sub_suites = max_sub_suites
+        options.order_tests_by_failure_rate = False
+        options.weight_changed_area_failures = False
         return options
 
     @staticmethod
@@ -880,6 +1033,250 @@ class GenerateSubSuitesTest(unittest.TestCase):
             for suite in suites:
                 self.assertEqual(10, len(suite.tests))
 
+    @patch(ns("read_suite_config"))
+    def test_calculate_suites_with_lpt_packing(self, mock_read_suite_config):
+        mock_read_suite_config.return_value = {}
+        evg = MagicMock()
+        evg.test_stats_by_project.return_value = [
+            tst_stat_mock(f"test{i}.js", runtime, 1)
+            for (i, runtime) in enumerate([300, 240, 180, 120, 60, 60])
+        ]
+        config_options = self.get_mock_options(max_sub_suites=2)
+        config_options.selected_tests_to_run = None
+        config_options.suite_packing = under_test.LPT_PACKING
+        config_options.improve_suite_packing = False
+
+        gen_sub_suites = under_test.GenerateSubSuites(evg, config_options)
+
+        with patch("os.path.exists") as exists_mock, patch(ns("suitesconfig")) as suitesconfig_mock:
+            exists_mock.return_value = True
+            suitesconfig_mock.get_suite.return_value.tests = \
+                [stat.test_file for stat in evg.test_stats_by_project.return_value]
+            suites = gen_sub_suites.calculate_suites(_DATE, _DATE)
+
+            # Packing the tests in order of decreasing runtime would leave suites of 540 and 420
+            # seconds.
+            self.assertEqual([480, 480], [suite.get_runtime() for suite in suites])
+
+    @patch(ns("read_suite_config"))
+    @patch("buildscripts.util.teststats.TestStatsCache.from_env")
+    def test_calculate_suites_with_percentile_timeouts(self, from_env_mock, mock_read_suite_config):
+        mock_read_suite_config.return_value = {}
+        # Two days of history give each test a runtime distribution.
+        daily_stats = [
+            MagicMock(test_file=f"test{i}.js", avg_duration_pass=duration, num_pass=1, num_fail=0)
+            for i in range(4) for duration in (240, 360)
+        ]
+        from_env_mock.return_value.get_daily_test_stats.return_value = daily_stats
+        config_options = self.get_mock_options()
+        config_options.selected_tests_to_run = None
+        config_options.timeout_model = under_test.PERCENTILE_TIMEOUT_MODEL
+
+        gen_sub_suites = under_test.GenerateSubSuites(MagicMock(), config_options)
+
+        with patch("os.path.exists") as exists_mock, patch(ns("suitesconfig")) as suitesconfig_mock:
+            exists_mock.return_value = True
+            suitesconfig_mock.get_suite.return_value.tests = [f"test{i}.js" for i in range(4)]
+            suites = gen_sub_suites.calculate_suites(_DATE, _DATE)
+
+            self.assertEqual(2, len(suites))
+            for suite in suites:
+                timeout_est = suite.get_timeout_estimate()
+                self.assertEqual(suite.tests,
+                                 [test.test_name for test in timeout_est.tests_runtime_stats])
+                self.assertEqual([360, 360], [test.p99 for test in timeout_est.tests_runtime_stats])
+
+    @patch(ns("read_suite_config"))
+    @patch("buildscripts.util.teststats.TestStatsCache.from_env", MagicMock(return_value=None))
+    def test_calculate_suites_with_percentile_timeouts_without_distributions(
+            self, mock_read_suite_config):
+        mock_read_suite_config.return_value = {}
+        evg = MagicMock()
+        # Without the test stats cache, the stats of the whole period give a single average runtime for each test.
+        evg.test_stats_by_project.return_value = [
+            tst_stat_mock(f"test{i}.js", 300, 1) for i in range(4)
+        ]
+        config_options = self.get_mock_options()
+        config_options.selected_tests_to_run = None
+        config_options.timeout_model = under_test.PERCENTILE_TIMEOUT_MODEL
+
+        gen_sub_suites = under_test.GenerateSubSuites(evg, config_options)
+
+        with patch("os.path.exists") as exists_mock, patch(ns("suitesconfig")) as suitesconfig_mock:
+            exists_mock.return_value = True
+            suitesconfig_mock.get_suite.return_value.tests = \
+                [stat.test_file for stat in evg.test_stats_by_project.return_value]
+            suites = gen_sub_suites.calculate_suites(_DATE, _DATE)
+
+            self.assertEqual(2, len(suites))
+            for suite in suites:
+                self.assertIsNone(suite.get_timeout_estimate().tests_runtime_stats)
+
+    @patch(ns("read_suite_config"))
+    def test_calculate_suites_with_failure_rates(self, mock_read_suite_config):
+        mock_read_suite_config.return_value = {}
+        task_stats = [tst_stat_mock(f"test{i}.js", 60, 9) for i in range(4)]
+        task_stats[2].num_fail = 1
+        burn_in_stats = [tst_stat_mock("test3.js", 60, 1)]
+        burn_in_stats[0].num_fail = 3
+        for stat in task_stats[:2] + task_stats[3:]:
+            stat.num_fail = 0
+        evg = MagicMock()
+        evg.test_stats_by_project.side_effect = [task_stats, burn_in_stats]
+        config_options = self.get_mock_options()
+        config_options.selected_tests_to_run = None
+        config_options.order_tests_by_failure_rate = True
+        config_options.use_burn_in_failure_rates = True
+
+        gen_sub_suites = under_test.GenerateSubSuites(evg, config_options)
+
+        with patch("os.path.exists") as exists_mock, patch(ns("suitesconfig")) as suitesconfig_mock:
+            exists_mock.return_value = True
+            suitesconfig_mock.get_suite.return_value.tests = [stat.test_file for stat in task_stats]
+            gen_sub_suites.calculate_suites(_DATE, _DATE)
+
+        self.assertEqual(["burn_in_tests"], evg.test_stats_by_project.call_args_list[1][1]["tasks"])
+        failure_rates = gen_sub_suites.failure_rates
+        self.assertEqual(["test3.js", "test2.js"], [info.test_name for info in failure_rates[:2]])
+        self.assertAlmostEqual(3 / 13, failure_rates[0].failure_rate)
+        self.assertAlmostEqual(1 / 10, failure_rates[1].failure_rate)
+        self.assertEqual(0, failure_rates[-1].failure_rate)
+
+    @patch(ns("find_changed_files_in_repos"))
+    @patch(ns("CoChangeIndex"))
+    @patch(ns("read_suite_config"))
+    def test_calculate_suites_with_changed_area_failure_rates(self, mock_read_suite_config,
+                                                              index_mock, changed_files_mock):
+        mock_read_suite_config.return_value = {}
+        task_stats = [tst_stat_mock(f"test{i}.js", 60, 9) for i in range(3)]
+        task_stats[0].num_fail = 1
+        for stat in task_stats[1:]:
+            stat.num_fail = 0
+        evg = MagicMock()
+        evg.test_stats_by_project.return_value = task_stats
+        changed_files_mock.return_value = {"src/a.cpp"}
+        index_mock.from_file.return_value.get_test_mappings.return_value = [{
+            "source_file": "src/a.cpp",
+            "test_files": [{"name": "test2.js", "score": 0.5}],
+        }]
+        config_options = self.get_mock_options()
+        config_options.selected_tests_to_run = None
+        config_options.order_tests_by_failure_rate = True
+        config_options.use_burn_in_failure_rates = False
+        config_options.weight_changed_area_failures = True
+        config_options.co_change_index = "co_change_index.json.gz"
+
+        gen_sub_suites = under_test.GenerateSubSuites(evg, config_options)
+
+        with patch("os.path.exists") as exists_mock, patch(ns("suitesconfig")) as suitesconfig_mock:
+            exists_mock.return_value = True
+            suitesconfig_mock.get_suite.return_value.tests = [stat.test_file for stat in task_stats]
+            gen_sub_suites.calculate_suites(_DATE, _DATE)
+
+        index_mock.from_file.assert_called_once_with("co_change_index.json.gz")
+        index_mock.from_file.return_value.get_test_mappings.assert_called_once_with(
+            0, {"src/a.cpp"})
+        failure_rates = gen_sub_suites.failure_rates
+        self.assertEqual(["test2.js", "test0.js", "test1.js"],
+                         [info.test_name for info in failure_rates])
+        self.assertAlmostEqual(0.5, failure_rates[0].failure_rate)
+
+    @staticmethod
+    def get_cost_model_options():
+        config_options = GenerateSubSuitesTest.get_mock_options()
+        config_options.task = "jsCore"
+        config_options.variant = "linux-64"
+        config_options.selected_tests_to_run = None
+        config_options.suite_packing = under_test.COST_MODEL_PACKING
+        config_options.improve_suite_packing = False
+        config_options.repeat_suites = 1
+        config_options.resmoke_jobs = 1
+        config_options.sub_task_overhead_secs = None
+        config_options.machine_time_budget_minutes = None
+        return config_options
+
+    @patch(ns("read_suite_config"))
+    def test_calculate_suites_with_cost_model(self, mock_read_suite_config):
+        mock_read_suite_config.return_value = {}
+        evg = MagicMock()
+        evg.test_stats_by_project.return_value = [
+            tst_stat_mock(f"test{i}.js", 600, 1) for i in range(4)
+        ]
+        evg.task_stats_by_project.return_value = [
+            MagicMock(json={"num_success": 3, "avg_duration_success": 300})
+        ]
+        config_options = self.get_cost_model_options()
+
+        gen_sub_suites = under_test.GenerateSubSuites(evg, config_options)
+
+        with patch("os.path.exists") as exists_mock, patch(ns("suitesconfig")) as suitesconfig_mock:
+            exists_mock.return_value = True
+            suitesconfig_mock.get_suite.return_value.tests = \
+                [stat.test_file for stat in evg.test_stats_by_project.return_value]
+            suites = gen_sub_suites.calculate_suites(_DATE, _DATE)
+
+        self.assertEqual(["jsCore_misc_linux-64"], evg.task_stats_by_project.call_args[1]["tasks"])
+        self.assertEqual(300, gen_sub_suites.cost_model_result.task_overhead)
+        # A sub-task per test would finish sooner, but spend too much machine time on overhead.
+        self.assertEqual(2, gen_sub_suites.cost_model_result.chosen.num_sub_tasks)
+        self.assertEqual([1200, 1200], [suite.get_runtime() for suite in suites])
+
+    def test_sub_task_overhead_without_history(self):
+        evg = MagicMock()
+        evg.task_stats_by_project.return_value = [MagicMock(json={"num_success": 0})]
+        config_options = self.get_cost_model_options()
+
+        gen_sub_suites = under_test.GenerateSubSuites(evg, config_options)
+
+        self.assertEqual(under_test.AVG_SETUP_TIME,
+                         gen_sub_suites.get_sub_task_overhead(_DATE, _DATE))
+
+    def test_sub_task_overhead_from_config(self):
+        evg = MagicMock()
+        config_options = self.get_cost_model_options()
+        config_options.sub_task_overhead_secs = 120.0
+
+        gen_sub_suites = under_test.GenerateSubSuites(evg, config_options)
+
+        self.assertEqual(120.0, gen_sub_suites.get_sub_task_overhead(_DATE, _DATE))
+        evg.task_stats_by_project.assert_not_called()
+
+    @patch(ns("job_count.determine_jobs"))
+    def test_resmoke_jobs(self, determine_jobs_mock):
+        determine_jobs_mock.return_value = 8
+        config_options = self.get_cost_model_options()
+        config_options.resmoke_jobs = None
+        config_options.run_multiple_jobs = "false"
+        config_options.resmoke_jobs_max = "4"
+        config_options.resmoke_jobs_factor = 0.5
+        config_options.distro_id = "rhel62-large"
+        gen_sub_suites = under_test.GenerateSubSuites(MagicMock(), config_options)
+
+        self.assertEqual(1, gen_sub_suites.get_resmoke_jobs())
+
+        config_options.run_multiple_jobs = "true"
+        self.assertEqual(8, gen_sub_suites.get_resmoke_jobs())
+        determine_jobs_mock.assert_called_with("jsCore", "linux-64", "rhel62-large", 4, 0.5)
+
+    @patch(ns("should_tasks_be_generated"))
+    @patch(ns("write_file_dict"))
+    def test_dry_run_does_not_write_config(self, write_file_dict_mock, should_generate_mock):
+        config_options = self.get_mock_options()
+        config_options.suite_packing = under_test.LPT_PACKING
+        gen_sub_suites = under_test.GenerateSubSuites(MagicMock(), config_options)
+        suite = under_test.Suite("suite")
+        suite.add_test("test0.js", 120)
+        gen_sub_suites.get_suites = MagicMock(return_value=[suite])
+
+        with patch("builtins.print") as print_mock:
+            gen_sub_suites.run(dry_run=True)
+
+        report = print_mock.call_args[0][0]
+        self.assertIn("1 sub-suites (lpt packing)", report)
+        self.assertIn(f"{suite.name}: 1 tests, 2.0m of tests", report)
+        should_generate_mock.assert_not_called()
+        write_file_dict_mock.assert_not_called()
+
     def test_calculate_suites_fallback(self):
         n_tests = 100
         n_fallback = 2
@@ -597,6 +597,39 @@ class TestGetTaskConfigs(unittest.TestCase):
 
         self.assertEqual(task_configs["task_config_key"], "task_config_value_2")
 
+    @patch(ns("_find_selected_test_files"))
+    @patch(ns("create_task_list_for_tests"))
+    @patch(ns("_get_task_configs_for_test_mappings"))
+    @patch(ns("_find_selected_tasks"))
+    def test_covering_tests_are_added_to_related_tests(
+            self, find_selected_tasks_mock, get_task_configs_for_test_mappings_mock,
+            create_task_list_for_tests_mock, find_selected_test_files_mock):
+        find_selected_test_files_mock.return_value = {"jstests/file-1.js"}
+        find_selected_tasks_mock.return_value = set()
+        changed_files = {"src/file1.cpp"}
+
+        under_test._get_task_configs(MagicMock(), MagicMock(), {}, MagicMock(), changed_files,
+                                     {"jstests/file-2.js"})
+
+        self.assertEqual({"jstests/file-1.js", "jstests/file-2.js"},
+                         create_task_list_for_tests_mock.call_args[0][0])
+
+
+class TestFindCoveringTestFiles(unittest.TestCase):
+    @patch(ns("is_file_a_test_file"))
+    @patch(ns("find_changed_lines_in_repos"))
+    def test_tests_covering_changed_lines(self, find_changed_lines_mock, is_file_a_test_file_mock):
+        find_changed_lines_mock.return_value = {"src/mongo/db/foo.cpp": {10}}
+        is_file_a_test_file_mock.side_effect = lambda test_file: test_file != "jstests/deleted.js"
+        coverage_index = MagicMock()
+        coverage_index.select_tests.return_value = ["jstests/file-1.js", "jstests/deleted.js"]
+
+        covering_test_files = under_test._find_covering_test_files(coverage_index, [MagicMock()],
+                                                                   {})
+
+        self.assertEqual({"jstests/file-1.js"}, covering_test_files)
+        coverage_index.select_tests.assert_called_once_with({"src/mongo/db/foo.cpp": {10}})
+
 
 class TestRemoveRepoPathPrefix(unittest.TestCase):
     def test_file_is_in_enterprise_modules(self):
@@ -0,0 +1,55 @@
+"""Unit tests for the simulate_suite_packing script."""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from click.testing import CliRunner
+
+import buildscripts.simulate_suite_packing as under_test
+from buildscripts.util.teststats import HistoricTaskData
+
+# pylint: disable=missing-docstring
+
+HISTORY = [{
+    "test_file": f"jstests/core/test{i}.js", "num_pass": 1, "num_fail": 0,
+    "avg_duration_pass": runtime
+} for (i, runtime) in enumerate([300, 240, 180, 120, 60, 60])] + [{
+    "test_file": "test0:CleanEveryN", "num_pass": 1, "num_fail": 0, "avg_duration_pass": 10
+}]
+
+
+class TestSimulate(unittest.TestCase):
+    def test_simulate(self):
+        test_stats = HistoricTaskData.from_stats_list(
+            [under_test.TestStats(stats, None) for stats in HISTORY])
+
+        results = under_test.simulate(test_stats, [10], max_suites=2, max_tests_per_suite=None,
+                                      clean_every_n=2)
+
+        self.assertEqual(under_test.STRATEGIES, [result["strategy"] for result in results])
+        sequential = results[0]
+        lpt = results[1]
+        # Each test adds 5 seconds of CleanEveryN to the runtime of its suite.
+        self.assertEqual(550, sequential["makespan_secs"])
+        self.assertEqual(495, lpt["makespan_secs"])
+        self.assertEqual(0, lpt["imbalance"])
+        self.assertEqual(2, lpt["num_suites"])
+
+    def test_main_with_history_file(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        history_file = os.path.join(tmp_dir, "history.json")
+        with open(history_file, "w") as fh:
+            json.dump(HISTORY, fh)
+
+        result = CliRunner().invoke(under_test.main, [
+            "--history-file", history_file, "--target-minutes", "10", "--target-minutes", "20",
+            "--json-output"
+        ])
+
+        self.assertEqual(0, result.exit_code, result.output)
+        results = json.loads(result.output)
+        self.assertEqual([10, 10, 10, 20, 20, 20], [result["target_minutes"] for result in results])
@@ -0,0 +1,41 @@
+"""Unit tests for the update_co_change_index script."""
+import unittest
+
+from mock import MagicMock
+
+from buildscripts import update_co_change_index as under_test
+
+# pylint: disable=missing-docstring
+
+
+class TestGetParentTaskName(unittest.TestCase):
+    def test_generated_sub_tasks(self):
+        self.assertEqual("auth", under_test.get_parent_task_name("auth_03_linux-64", "linux-64"))
+        self.assertEqual("auth", under_test.get_parent_task_name("auth_misc_linux-64", "linux-64"))
+
+    def test_other_tasks(self):
+        self.assertEqual("jsCore", under_test.get_parent_task_name("jsCore", "linux-64"))
+        self.assertEqual("auth_1", under_test.get_parent_task_name("auth_1", "linux-64"))
+
+
+class TestGetFailures(unittest.TestCase):
+    def test_failed_tests_and_tasks(self):
+        evg_api = MagicMock()
+        evg_api.tasks_by_project_and_commit.return_value = [
+            MagicMock(status="failed", display_name="auth_1_linux-64", build_variant="linux-64",
+                      task_id="t1"),
+            MagicMock(status="success", display_name="jsCore", build_variant="linux-64",
+                      task_id="t2"),
+            MagicMock(status="failed", display_name="unittests", build_variant="windows",
+                      task_id="t3"),
+        ]
+        evg_api.tests_by_task.side_effect = lambda task_id, status: {
+            "t1": [MagicMock(test_file="jstests\\auth\\a.js")],
+            "t3": [MagicMock(test_file="mongo_unittest")],
+        }[task_id]
+
+        (failed_tests, failed_tasks) = under_test.get_failures(evg_api, "project", "abc123")
+
+        self.assertEqual(["jstests/auth/a.js"], failed_tests)
+        self.assertEqual(["auth", "unittests"], failed_tasks)
+        evg_api.tasks_by_project_and_commit.assert_called_once_with("project", "abc123")
@@ -0,0 +1,88 @@
+"""Unit tests for the util.sub_task_cost_model module."""
+
+import unittest
+
+import buildscripts.util.sub_task_cost_model as under_test
+from buildscripts.util import teststats
+
+# pylint: disable=missing-docstring
+
+
+def make_tests(*runtimes):
+    return [
+        teststats.TestRuntime(f"test{idx}.js", runtime) for (idx, runtime) in enumerate(runtimes)
+    ]
+
+
+class TestGetSubTaskRuntime(unittest.TestCase):
+    def test_tests_are_divided_among_jobs(self):
+        tests = make_tests(600, 600, 100)
+        self.assertEqual(1600, under_test.get_sub_task_runtime(tests, 0, 300, 1))
+        self.assertEqual(950, under_test.get_sub_task_runtime(tests, 0, 300, 2))
+
+    def test_longest_test_bounds_the_runtime(self):
+        tests = make_tests(600, 600, 100)
+        self.assertEqual(900, under_test.get_sub_task_runtime(tests, 0, 300, 4))
+
+    def test_overheads_and_repeat_factor(self):
+        tests = make_tests(100, 100)
+        self.assertEqual(300 + (220 * 2),
+                         under_test.get_sub_task_runtime(tests, 10, 300, 1, repeat_factor=2))
+
+    def test_no_tests(self):
+        self.assertEqual(300, under_test.get_sub_task_runtime([], 10, 300, 2))
+
+
+class TestChooseSubTasks(unittest.TestCase):
+    def test_shortest_makespan_within_default_budget(self):
+        result = under_test.choose_sub_tasks(make_tests(600, 600, 600, 600), 300)
+
+        self.assertEqual([1, 2, 3, 4], [plan.num_sub_tasks for plan in result.plans])
+        self.assertEqual([2700, 1500, 1500, 900], [plan.makespan for plan in result.plans])
+        self.assertEqual([2700, 3000, 3300, 3600], [plan.machine_time for plan in result.plans])
+        self.assertEqual(2700 * (1 + under_test.DEFAULT_MACHINE_TIME_SLACK),
+                         result.machine_time_budget)
+        # 2 and 3 sub-tasks take as long, the one using less machine time is chosen.
+        self.assertEqual(2, result.chosen.num_sub_tasks)
+        self.assertEqual(2, len(result.packing.bins))
+        self.assertTrue(result.within_budget)
+
+    def test_machine_time_budget(self):
+        result = under_test.choose_sub_tasks(
+            make_tests(600, 600, 600, 600), 300, machine_time_budget=3600)
+        self.assertEqual(4, result.chosen.num_sub_tasks)
+
+    def test_nothing_within_budget(self):
+        result = under_test.choose_sub_tasks(
+            make_tests(600, 600, 600, 600), 300, machine_time_budget=1000)
+        self.assertEqual(1, result.chosen.num_sub_tasks)
+        self.assertFalse(result.within_budget)
+
+    def test_more_jobs_need_fewer_sub_tasks(self):
+        result = under_test.choose_sub_tasks(make_tests(600, 600, 600, 600), 300, jobs=4)
+        self.assertEqual(1, result.chosen.num_sub_tasks)
+        self.assertEqual(900, result.chosen.makespan)
+
+    def test_max_sub_tasks(self):
+        result = under_test.choose_sub_tasks(
+            make_tests(600, 600, 600, 600), 300, max_sub_tasks=2, machine_time_budget=3600)
+        self.assertEqual([1, 2], [plan.num_sub_tasks for plan in result.plans])
+        self.assertEqual(2, result.chosen.num_sub_tasks)
+
+    def test_no_tests(self):
+        result = under_test.choose_sub_tasks([], 300)
+        self.assertEqual(0, result.chosen.num_sub_tasks)
+        self.assertEqual([], result.packing.bins)
+
+
+class TestFormatReport(unittest.TestCase):
+    def test_report(self):
+        result = under_test.choose_sub_tasks(make_tests(600, 600, 600, 600), 300)
+
+        report = result.format_report().splitlines()
+
+        self.assertIn("resmoke jobs: 1", report[0])
+        self.assertEqual(2 + len(result.plans), len(report))
+        self.assertTrue(report[3].endswith("<- chosen"))
+        self.assertTrue(report[5].endswith("over budget"))
+        self.assertEqual(1, sum(line.endswith("chosen") for line in report))
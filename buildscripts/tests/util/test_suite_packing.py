@@ -0,0 +1,111 @@
+"""Unit tests for the util.suite_packing module."""
+
+import unittest
+
+import buildscripts.util.suite_packing as under_test
+from buildscripts.util import teststats
+
+# pylint: disable=missing-docstring,protected-access
+
+
+def make_tests(*runtimes):
+    return [
+        teststats.TestRuntime(f"test{idx}.js", runtime) for (idx, runtime) in enumerate(runtimes)
+    ]
+
+
+class TestPackTests(unittest.TestCase):
+    def test_no_tests(self):
+        packing = under_test.pack_tests([], 100)
+        self.assertEqual([], packing.bins)
+        self.assertEqual(0, packing.makespan)
+        self.assertEqual(0, packing.imbalance)
+
+    def test_fewest_suites_under_max_time(self):
+        packing = under_test.pack_tests(make_tests(50, 40, 30, 20, 10), 60)
+        self.assertEqual(3, len(packing.bins))
+        self.assertEqual(50, packing.makespan)
+
+    def test_balances_suites(self):
+        tests = make_tests(30, 30, 20, 20, 20, 10, 10)
+        packing = under_test.pack_tests(tests, 100, max_suites=2)
+        self.assertEqual([70, 70], sorted(packing.runtimes))
+        self.assertEqual(0, packing.imbalance)
+        self.assertCountEqual(tests, [test for tests in packing.bins for test in tests])
+
+    def test_tests_keep_their_order(self):
+        packing = under_test.pack_tests(
+            make_tests(1, 5, 2, 4, 3), 100, max_suites=2, max_tests_per_suite=3)
+        for tests in packing.bins:
+            self.assertEqual(sorted(tests), tests)
+
+    def test_test_longer_than_max_time_goes_alone(self):
+        packing = under_test.pack_tests(make_tests(150, 40, 30), 100)
+        self.assertEqual(2, len(packing.bins))
+        self.assertIn([teststats.TestRuntime("test0.js", 150)], packing.bins)
+
+    def test_more_suites_if_lpt_exceeds_max_time(self):
+        # The total of 150 would fit in 2 suites of 75 but there is no such split.
+        packing = under_test.pack_tests(make_tests(60, 60, 30), 75)
+        self.assertEqual(3, len(packing.bins))
+
+    def test_max_suites(self):
+        packing = under_test.pack_tests(make_tests(*[10] * 20), 10, max_suites=4)
+        self.assertEqual(4, len(packing.bins))
+        self.assertEqual(50, packing.makespan)
+
+    def test_max_tests_per_suite(self):
+        packing = under_test.pack_tests(make_tests(100, 1, 1, 1, 1), 1000, max_tests_per_suite=2)
+        self.assertEqual(3, len(packing.bins))
+        self.assertTrue(all(len(tests) <= 2 for tests in packing.bins))
+
+    def test_max_suites_overrides_max_tests_per_suite(self):
+        packing = under_test.pack_tests(
+            make_tests(*[1] * 10), 100, max_suites=2, max_tests_per_suite=2)
+        self.assertEqual([5, 5], [len(tests) for tests in packing.bins])
+
+    def test_per_test_overhead(self):
+        # The short tests cost more than their runtime once CleanEveryN is accounted for.
+        packing = under_test.pack_tests(
+            make_tests(40, 10, 10, 10, 10), 65, max_suites=2, per_test_overhead=10)
+        self.assertEqual([60, 70], sorted(packing.runtimes))
+
+    def test_improvement_pass(self):
+        tests = make_tests(8, 7, 6, 5, 4)
+        lpt = under_test.pack_tests(tests, 15, max_suites=2)
+        improved = under_test.pack_tests(tests, 15, max_suites=2, improve=True)
+        self.assertEqual(17, lpt.makespan)
+        self.assertEqual(15, improved.makespan)
+
+
+class TestPackTestsInto(unittest.TestCase):
+    def test_number_of_suites(self):
+        tests = make_tests(30, 30, 20, 20, 20, 10, 10)
+        packing = under_test.pack_tests_into(tests, 2)
+        self.assertEqual([70, 70], sorted(packing.runtimes))
+        self.assertCountEqual(tests, [test for tests in packing.bins for test in tests])
+
+    def test_fewer_suites_than_tests(self):
+        packing = under_test.pack_tests_into(make_tests(10, 20), 5)
+        self.assertEqual(2, len(packing.bins))
+
+    def test_improvement_pass(self):
+        packing = under_test.pack_tests_into(make_tests(8, 7, 6, 5, 4), 2, improve=True)
+        self.assertEqual(15, packing.makespan)
+
+
+class TestImprove(unittest.TestCase):
+    def test_honors_max_tests_per_suite(self):
+        costs = [8, 7, 6, 5, 4]
+        bins = [[0, 3, 4], [1, 2]]
+        under_test._improve(costs, bins, max_tests_per_suite=3)
+        self.assertEqual([3, 2], [len(items) for items in bins])
+        self.assertEqual(15, max(sum(costs[item] for item in items) for items in bins))
+
+
+class TestSimulate(unittest.TestCase):
+    def test_makespan_and_imbalance(self):
+        packing = under_test.simulate([make_tests(30, 20), make_tests(10)], per_test_overhead=5)
+        self.assertEqual([60, 15], packing.runtimes)
+        self.assertEqual(60, packing.makespan)
+        self.assertAlmostEqual(60 / 37.5 - 1, packing.imbalance)
@@ -1,13 +1,16 @@
 """Unit tests for the util.teststats module."""
 
 import datetime
+import os
+import shutil
+import tempfile
 import unittest
 
-from mock import Mock
+from mock import Mock, patch
 
 import buildscripts.util.teststats as under_test
 
-# pylint: disable=missing-docstring
+# pylint: disable=missing-docstring,protected-access
 
 _DATE = datetime.datetime(2018, 7, 15)
 
@@ -21,6 +24,17 @@ class NormalizeTestNameTest(unittest.TestCase):
                          under_test.normalize_test_name("\\home\\user\\test.js"))
 
 
+class GetStatsDayTest(unittest.TestCase):
+    def test_parsed_dates(self):
+        self.assertEqual("2018-07-15", under_test.get_stats_day(Mock(date=_DATE)))
+        self.assertEqual("2018-07-15", under_test.get_stats_day(Mock(date=_DATE.date())))
+
+    def test_unparsed_dates(self):
+        self.assertEqual("2018-07-15",
+                         under_test.get_stats_day(Mock(date="2018-07-15T00:00:00.000Z")))
+        self.assertIsNone(under_test.get_stats_day(Mock(date=None)))
+
+
 class TestHistoricTaskData(unittest.TestCase):
     def test_no_hooks(self):
         evg_results = [
@@ -76,8 +90,34 @@ class TestHistoricTaskData(unittest.TestCase):
         ]
         self.assertEqual(expected_runtimes, test_stats.get_tests_runtimes())
 
+    def test_failure_rates(self):
+        evg_results = [
+            self._make_evg_result("dir/test1.js", 9, 20, num_fail=1),
+            self._make_evg_result("dir/test2.js", 5, 20, num_fail=5),
+            self._make_evg_result("dir/test3.js", 4, 20),
+            self._make_evg_result("dir\\test1.js", 8, 20, num_fail=2),
+            self._make_evg_result("test2:Validate", 10, 30),
+        ]
+        test_stats = under_test.HistoricTaskData.from_stats_list(evg_results)
+        expected_failure_rates = [
+            under_test.TestFailureRate(test_name="dir/test2.js", failure_rate=0.5, num_runs=10),
+            under_test.TestFailureRate(test_name="dir/test1.js", failure_rate=0.15, num_runs=20),
+            under_test.TestFailureRate(test_name="dir/test3.js", failure_rate=0, num_runs=4),
+        ]
+        self.assertEqual(expected_failure_rates, test_stats.get_tests_failure_rates())
+
+    def test_failure_rates_zero_runs(self):
+        evg_results = [
+            self._make_evg_result("dir/test1.js", 0, 0),
+        ]
+        test_stats = under_test.HistoricTaskData.from_stats_list(evg_results)
+        expected_failure_rates = [
+            under_test.TestFailureRate(test_name="dir/test1.js", failure_rate=0, num_runs=0),
+        ]
+        self.assertEqual(expected_failure_rates, test_stats.get_tests_failure_rates())
+
     @staticmethod
-    def _make_evg_result(test_file="dir/test1.js", num_pass=0, duration=0):
+    def _make_evg_result(test_file="dir/test1.js", num_pass=0, duration=0, num_fail=0):
         return Mock(
             test_file=test_file,
             task_name="task1",
@@ -85,6 +125,216 @@ class TestHistoricTaskData(unittest.TestCase):
             distro="distro1",
             date=_DATE,
             num_pass=num_pass,
-            num_fail=0,
+            num_fail=num_fail,
             avg_duration_pass=duration,
         )
+
+
+class TestRuntimeColumns(unittest.TestCase):
+    STATS = [
+        ("dir/test1.js", 1, 10),
+        ("test1:Validate", 1, 4),
+        ("dir\\test1.js", 3, 30),
+        ("test1:CleanEveryN", 1, 100),
+        ("dir/test1.js", 1, 50),
+        ("test1:Validate", 1, 6),
+        ("dir/test2.js", 0, 0),
+        ("test2:CleanEveryN", 2, 50),
+        ("test2:CleanEveryN", 2, 70),
+    ]
+
+    def get_columns(self):
+        columns = under_test.RuntimeColumns()
+        for (test_file, num_pass, duration) in self.STATS:
+            columns.add(test_file, num_pass, duration)
+        return columns
+
+    def assert_runtime_stats(self, columns):
+        (test1, test2) = columns.get_tests_runtime_stats()
+
+        # The average runtime of the Validate hook, but not of CleanEveryN, is added to test1.
+        self.assertEqual(
+            ("dir/test1.js", 35, 35, 55, 55, 5),
+            (test1.test_name, test1.runtime, test1.p50, test1.p90, test1.p99, test1.num_runs))
+        self.assertEqual(3, test1.num_samples)
+        self.assertAlmostEqual(160**0.5, test1.stddev)
+        self.assertEqual(
+            under_test.TestRuntimeStats(test_name="dir/test2.js", runtime=0, stddev=0, p50=0, p90=0,
+                                        p99=0, num_runs=0, num_samples=1), test2)
+        self.assertEqual(80, columns.get_avg_hook_runtime("CleanEveryN"))
+        self.assertEqual(0, columns.get_avg_hook_runtime("CheckReplDBHash"))
+
+    def test_runtime_stats(self):
+        with patch(under_test.__name__ + ".np", None):
+            self.assert_runtime_stats(self.get_columns())
+
+    @unittest.skipIf(under_test.np is None, "NumPy isn't installed")
+    def test_runtime_stats_with_numpy(self):
+        self.assert_runtime_stats(self.get_columns())
+
+    @unittest.skipIf(under_test.np is None, "NumPy isn't installed")
+    def test_numpy_matches_python(self):
+        columns = under_test.RuntimeColumns()
+        for i in range(1000):
+            columns.add("test{}.js".format(i % 37), (i * 7) % 5, (i * 13) % 101)
+        with patch(under_test.__name__ + ".np", None):
+            expected = columns.get_tests_runtime_stats()
+
+        for (expected_stats, stats) in zip(expected, columns.get_tests_runtime_stats()):
+            self.assertEqual(expected_stats[:1] + expected_stats[3:], stats[:1] + stats[3:])
+            self.assertAlmostEqual(expected_stats.runtime, stats.runtime)
+            self.assertAlmostEqual(expected_stats.stddev, stats.stddev)
+
+    def test_same_as_historic_test_results(self):
+        evg_results = [
+            Mock(test_file=test_file, num_pass=num_pass, num_fail=0, avg_duration_pass=duration)
+            for (test_file, num_pass, duration) in self.STATS
+        ]
+        test_stats = under_test.HistoricTaskData.from_stats_list(evg_results)
+        from_results = under_test.HistoricTaskData(test_stats.historic_test_results)
+
+        self.assertEqual(test_stats.get_tests_runtime_stats(),
+                         from_results.get_tests_runtime_stats())
+        self.assertEqual(80, from_results.get_avg_hook_runtime("CleanEveryN"))
+
+
+class StubEvergreenApi(object):
+    """Serve the daily test stats of a single task, recording each query."""
+
+    def __init__(self, daily_stats):
+        self.daily_stats = daily_stats
+        self.queries = []
+        self.last_grouping = None
+
+    def test_stats_by_project(self, project, after_date, before_date, tasks, variants, group_by,
+                              group_num_days):
+        # pylint: disable=too-many-arguments,unused-argument
+        self.last_grouping = (group_by, group_num_days)
+        self.queries.append((after_date.date(), before_date.date()))
+        return [
+            Mock(test_file=test_file, date=day, num_pass=num_pass, num_fail=num_fail,
+                 avg_duration_pass=duration)
+            for (day, test_file, num_pass, num_fail, duration) in self.daily_stats
+            if after_date.date() <= day < before_date.date()
+        ]
+
+
+class TestTestStatsCache(unittest.TestCase):
+    DAILY_STATS = [
+        (datetime.date(2018, 7, 10), "dir/test1.js", 1, 0, 10),
+        (datetime.date(2018, 7, 11), "dir/test1.js", 3, 1, 30),
+        (datetime.date(2018, 7, 11), "dir/test2.js", 1, 0, 5),
+        (datetime.date(2018, 7, 13), "dir/test2.js", 1, 0, 15),
+    ]
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        self.evg_api = StubEvergreenApi(self.DAILY_STATS)
+        # The cached days are all settled.
+        patcher = patch(under_test.__name__ + ".time.time", return_value=datetime.datetime(
+            2018, 8, 1).timestamp())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_test_stats(self, cache, start_day, end_day):
+        test_stats = under_test.HistoricTaskData.from_evg(self.evg_api, "project",
+                                                          datetime.datetime(2018, 7, start_day),
+                                                          datetime.datetime(2018, 7, end_day),
+                                                          "task", "variant", cache=cache)
+        return {info.test_name: info for info in test_stats.historic_test_results}
+
+    def test_combines_days(self):
+        cache = under_test.TestStatsCache(self.cache_dir)
+        test_stats = self.get_test_stats(cache, 10, 15)
+
+        self.assertEqual([(datetime.date(2018, 7, 10), datetime.date(2018, 7, 15))],
+                         self.evg_api.queries)
+        self.assertEqual(("test", 1), self.evg_api.last_grouping)
+        self.assertEqual(4, test_stats["dir/test1.js"].num_pass)
+        self.assertEqual(1, test_stats["dir/test1.js"].num_fail)
+        self.assertEqual(25, test_stats["dir/test1.js"].avg_duration)
+        self.assertEqual(10, test_stats["dir/test2.js"].avg_duration)
+
+    def test_runtime_distribution_across_days(self):
+        cache = under_test.TestStatsCache(self.cache_dir)
+        test_stats = under_test.HistoricTaskData.from_evg(self.evg_api, "project",
+                                                          datetime.datetime(2018, 7, 10),
+                                                          datetime.datetime(2018, 7, 15), "task",
+                                                          "variant", cache=cache)
+
+        (test1, test2) = test_stats.get_tests_runtime_stats()
+        self.assertEqual(
+            ("dir/test1.js", 25, 30, 4, 2),
+            (test1.test_name, test1.runtime, test1.p90, test1.num_runs, test1.num_samples))
+        self.assertEqual(("dir/test2.js", 10, 5, 15),
+                         (test2.test_name, test2.runtime, test2.p50, test2.p99))
+
+    def test_only_fetches_missing_days(self):
+        cache = under_test.TestStatsCache(self.cache_dir)
+        self.get_test_stats(cache, 11, 12)
+        self.get_test_stats(cache, 13, 14)
+        test_stats = self.get_test_stats(cache, 10, 15)
+
+        self.assertEqual([
+            (datetime.date(2018, 7, 11), datetime.date(2018, 7, 12)),
+            (datetime.date(2018, 7, 13), datetime.date(2018, 7, 14)),
+            (datetime.date(2018, 7, 10), datetime.date(2018, 7, 11)),
+            (datetime.date(2018, 7, 12), datetime.date(2018, 7, 13)),
+            (datetime.date(2018, 7, 14), datetime.date(2018, 7, 15)),
+        ], self.evg_api.queries)
+        self.assertEqual(4, test_stats["dir/test1.js"].num_pass)
+
+        self.get_test_stats(cache, 10, 15)
+        self.assertEqual(5, len(self.evg_api.queries))
+
+    def test_recent_days_expire(self):
+        cache = under_test.TestStatsCache(self.cache_dir, ttl_secs=60)
+        now = datetime.datetime(2018, 7, 13, 12).timestamp()
+        with patch(under_test.__name__ + ".time.time", return_value=now):
+            self.get_test_stats(cache, 10, 14)
+        with patch(under_test.__name__ + ".time.time", return_value=now + 30):
+            self.get_test_stats(cache, 10, 14)
+        self.assertEqual(1, len(self.evg_api.queries))
+
+        with patch(under_test.__name__ + ".time.time", return_value=now + 90):
+            self.get_test_stats(cache, 10, 14)
+        # The stats of the 12th and 13th were fetched before Evergreen was done updating them.
+        self.assertEqual((datetime.date(2018, 7, 12), datetime.date(2018, 7, 14)),
+                         self.evg_api.queries[-1])
+
+    def test_days_settle_by_utc_time(self):
+        cache = under_test.TestStatsCache(self.cache_dir, ttl_secs=0)
+        settled_at = datetime.datetime(2018, 7, 12, tzinfo=datetime.timezone.utc).timestamp()
+        day = datetime.date(2018, 7, 10)
+
+        self.assertTrue(cache._is_fresh(day, {"fetched_at": settled_at}, settled_at + 60))
+        self.assertFalse(cache._is_fresh(day, {"fetched_at": settled_at - 1}, settled_at + 60))
+
+    def test_offline(self):
+        under_test.TestStatsCache(self.cache_dir).get_test_stats(self.evg_api, "project",
+                                                                 datetime.datetime(2018, 7, 11),
+                                                                 datetime.datetime(2018, 7, 12),
+                                                                 "task", "variant")
+        test_stats = self.get_test_stats(
+            under_test.TestStatsCache(self.cache_dir, offline=True), 10, 15)
+
+        self.assertEqual(1, len(self.evg_api.queries))
+        self.assertEqual(3, test_stats["dir/test1.js"].num_pass)
+
+    def test_from_env(self):
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertIsNone(under_test.TestStatsCache.from_env())
+
+        env = {
+            under_test.CACHE_DIR_ENV: self.cache_dir,
+            under_test.CACHE_TTL_ENV: "5",
+            under_test.CACHE_OFFLINE_ENV: "true",
+        }
+        with patch.dict(os.environ, env, clear=True):
+            cache = under_test.TestStatsCache.from_env()
+            self.assertEqual((self.cache_dir, 5, True),
+                             (cache.cache_dir, cache.ttl_secs, cache.offline))
+
+            self.get_test_stats(None, 10, 15)
+            self.assertEqual([], self.evg_api.queries)
@@ -0,0 +1,57 @@
+"""Unit tests for the util.timeout_model module."""
+
+import unittest
+
+import buildscripts.util.timeout_model as under_test
+from buildscripts.util import teststats
+
+# pylint: disable=missing-docstring
+
+
+def make_stats(runtime, stddev=0, p99=None, num_samples=7):
+    p99 = runtime if p99 is None else p99
+    return teststats.TestRuntimeStats(test_name="test.js", runtime=runtime, stddev=stddev,
+                                      p50=runtime, p90=p99, p99=p99, num_runs=10,
+                                      num_samples=num_samples)
+
+
+class TestHasRuntimeDistributions(unittest.TestCase):
+    def test_enough_samples(self):
+        self.assertTrue(under_test.has_runtime_distributions([make_stats(100), make_stats(50)]))
+        self.assertTrue(under_test.has_runtime_distributions([]))
+
+    def test_single_average(self):
+        tests = [make_stats(100), make_stats(50, num_samples=1)]
+        self.assertFalse(under_test.has_runtime_distributions(tests))
+
+
+class TestEstimateTestTimeout(unittest.TestCase):
+    def test_percentile_plus_stddev_margin(self):
+        self.assertEqual(160, under_test.get_test_runtime_limit(make_stats(100, 10, 130)))
+
+    def test_min_margin(self):
+        self.assertEqual(125, under_test.get_test_runtime_limit(make_stats(100)))
+
+    def test_longest_test(self):
+        tests = [make_stats(100), make_stats(50, 10, 120)]
+        self.assertEqual(150, under_test.estimate_test_timeout(tests))
+        self.assertEqual(0, under_test.estimate_test_timeout([]))
+
+
+class TestEstimateTaskTimeout(unittest.TestCase):
+    def test_stddev_margin(self):
+        tests = [make_stats(100, 20, 150) for _ in range(4)]
+        # 3 standard deviations of the sum of 4 tests with a standard deviation of 20.
+        self.assertEqual(400 + 120, under_test.estimate_task_timeout(tests, 400))
+
+    def test_stddev_margin_grows_slower_than_repeats(self):
+        tests = [make_stats(100, 20, 150) for _ in range(4)]
+        # The margin of 3 * 80 is now below the minimum margin of a quarter of the runtime.
+        self.assertEqual(1600 + 400, under_test.estimate_task_timeout(tests, 400, 4))
+
+    def test_tail_margin(self):
+        tests = [make_stats(100), make_stats(100, 1, 300)]
+        self.assertEqual(200 + 200, under_test.estimate_task_timeout(tests, 200))
+
+    def test_min_margin(self):
+        self.assertEqual(250, under_test.estimate_task_timeout([make_stats(100)], 200))
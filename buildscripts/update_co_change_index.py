@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Build or update the co-change index that selected_tests.py can select tests from.
+
+Reads the commits made since the last update of the index from the git history and, optionally,
+the tests and tasks that failed on each of them in Evergreen.
+"""
+import logging
+import os
+import re
+import sys
+from functools import partial
+from typing import List, Tuple
+
+import click
+import structlog
+from structlog.stdlib import LoggerFactory
+from evergreen.api import EvergreenApi, RetryingEvergreenApi
+from git import Repo
+
+# Get relative imports to work when the package is not installed on the PYTHONPATH.
+if __name__ == "__main__" and __package__ is None:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from buildscripts.patch_builds.co_change_index import CoChangeIndex, is_test_file
+# pylint: enable=wrong-import-position
+
+structlog.configure(logger_factory=LoggerFactory())
+LOGGER = structlog.getLogger(__name__)
+
+DEFAULT_PROJECT = "mongodb-mongo-master"
+EVG_CONFIG_FILE = ".evergreen.yml"
+DEFAULT_MAX_COMMITS = 10000
+FAILED_STATUS = "failed"
+GENERATED_SUB_TASK_SUFFIX = re.compile(r"_(\d+|misc)$")
+
+
+def get_parent_task_name(task_name: str, build_variant: str) -> str:
+    """
+    Get the name of the task that generated the given sub-task, if it is one.
+
+    :param task_name: Display name of the task.
+    :param build_variant: Build variant the task ran on.
+    :return: Name of the task the sub-task was generated from, or the name of the task.
+    """
+    variant_suffix = f"_{build_variant}"
+    if not task_name.endswith(variant_suffix):
+        return task_name
+    return GENERATED_SUB_TASK_SUFFIX.sub("", task_name[:-len(variant_suffix)])
+
+
+def get_failures(evg_api: EvergreenApi, project: str, revision: str) -> Tuple[List[str], List[str]]:
+    """
+    Get the jstests and tasks that failed on the given commit.
+
+    :param evg_api: Evergreen API client.
+    :param project: Evergreen project.
+    :param revision: Commit to get the failures of.
+    :return: Failed tests and failed tasks.
+    """
+    failed_tests = set()
+    failed_tasks = set()
+    for task in evg_api.tasks_by_project_and_commit(project, revision):
+        if task.status != FAILED_STATUS:
+            continue
+        failed_tasks.add(get_parent_task_name(task.display_name, task.build_variant))
+        for test in evg_api.tests_by_task(task.task_id, status="fail"):
+            test_file = test.test_file.replace("\\", "/")
+            if is_test_file(test_file):
+                failed_tests.add(test_file)
+    return (sorted(failed_tests), sorted(failed_tasks))
+
+
+@click.command()
+@click.option("--index-file", type=str, required=True, metavar="FILE",
+              help="Co-change index to update, created if it doesn't exist.")
+@click.option("--repo", "repo_dir", type=str, default=".", help="Git repository to index.")
+@click.option("--until", type=str, default="HEAD", help="Revision to index up to.")
+@click.option("--max-commits", type=int, default=DEFAULT_MAX_COMMITS,
+              help="Maximum number of commits to index.")
+@click.option("--with-failures", is_flag=True, default=False,
+              help="Index the tests and tasks that failed on each commit in Evergreen.")
+@click.option("--project", type=str, default=DEFAULT_PROJECT, help="Evergreen project.")
+@click.option("--evg-api-config", type=str, default=EVG_CONFIG_FILE, metavar="FILE",
+              help="Configuration file with connection info for Evergreen API.")
+@click.option("--verbose", is_flag=True, default=False, help="Enable extra logging.")
+def main(  # pylint: disable=too-many-arguments
+        index_file, repo_dir, until, max_commits, with_failures, project, evg_api_config, verbose):
+    """
+    Build or update the co-change index that selected_tests.py can select tests from.
+
+    Only the commits made since the last update are read, so the index can be updated after
+    each commit.
+    """
+    logging.basicConfig(format="[%(asctime)s - %(name)s - %(levelname)s] %(message)s",
+                        level=logging.DEBUG if verbose else logging.INFO, stream=sys.stdout)
+
+    index = CoChangeIndex.from_file(index_file) if os.path.exists(index_file) else CoChangeIndex()
+    failures_fn = None
+    if with_failures:
+        evg_api = RetryingEvergreenApi.get_api(config_file=evg_api_config)
+        failures_fn = partial(get_failures, evg_api, project)
+
+    last_revision = index.last_revision
+    index.update(Repo(repo_dir), until, max_commits, failures_fn)
+    if index.last_revision != last_revision:
+        index.write(index_file)
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
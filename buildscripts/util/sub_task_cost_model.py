@@ -0,0 +1,148 @@
+"""Choose how many sub-tasks to split a task into from the cost of running them.
+
+Each sub-task pays a fixed overhead before running any test: getting a host, downloading and
+extracting the compile artifacts, and setting up the task. Its tests then run on the resmoke jobs
+of the host in parallel, so the tests of a sub-task take their total runtime divided by the number
+of jobs, but no less than their longest test.
+
+More sub-tasks shorten the longest one, which is how long the task takes (the makespan), but each
+one adds its fixed overhead to the machine time spent on the task. The sub-task count chosen is
+the one with the shortest makespan among those whose machine time is within the budget. Without a
+budget, the machine time may exceed that of the cheapest sub-task count by a fixed fraction.
+"""
+from typing import List, NamedTuple, Optional
+
+import buildscripts.util.suite_packing as suite_packing
+from buildscripts.util.teststats import TestRuntime
+
+# Fraction of the lowest machine time the default budget allows on top of it.
+DEFAULT_MACHINE_TIME_SLACK = 0.25
+
+
+class SubTaskPlan(NamedTuple):
+    """
+    Expected cost of splitting a task into a number of sub-tasks.
+
+    num_sub_tasks: Number of sub-tasks.
+    makespan: Expected runtime of the longest sub-task, including its overhead.
+    machine_time: Expected runtime of all the sub-tasks, including their overhead.
+    """
+
+    num_sub_tasks: int
+    makespan: float
+    machine_time: float
+
+
+class CostModelResult(NamedTuple):
+    """
+    Sub-task count chosen by the cost model, along with the alternatives it was chosen from.
+
+    chosen: Plan of the sub-task count chosen.
+    packing: Tests of each sub-task of the chosen plan.
+    plans: Plans of each sub-task count considered.
+    machine_time_budget: Machine time the chosen plan had to fit in.
+    task_overhead: Fixed overhead of each sub-task.
+    jobs: Number of resmoke jobs running the tests of each sub-task.
+    """
+
+    chosen: SubTaskPlan
+    packing: suite_packing.PackingResult
+    plans: List[SubTaskPlan]
+    machine_time_budget: float
+    task_overhead: float
+    jobs: int
+
+    @property
+    def within_budget(self) -> bool:
+        """Whether the chosen plan fits in the machine time budget."""
+        return self.chosen.machine_time <= self.machine_time_budget
+
+    def format_report(self) -> str:
+        """Format the plans considered and the reason for the choice as a table."""
+        lines = [
+            f"sub-task overhead: {self.task_overhead / 60:.1f}m, resmoke jobs: {self.jobs}, "
+            f"machine time budget: {self.machine_time_budget / 60:.1f}m",
+            "sub-tasks  makespan  machine time",
+        ]
+        for plan in self.plans:
+            note = ""
+            if plan == self.chosen:
+                note = "  <- chosen" if self.within_budget else "  <- chosen, over budget"
+            elif plan.machine_time > self.machine_time_budget:
+                note = "  over budget"
+            lines.append(f"{plan.num_sub_tasks:>9}  {plan.makespan / 60:>7.1f}m  "
+                         f"{plan.machine_time / 60:>11.1f}m{note}")
+        return "\n".join(lines)
+
+
+def get_sub_task_runtime(tests: List[TestRuntime], per_test_overhead: float, task_overhead: float,
+                         jobs: int, repeat_factor: int = 1) -> float:
+    """
+    Get the expected runtime of a sub-task running the given tests.
+
+    :param tests: Tests of the sub-task along with their runtimes.
+    :param per_test_overhead: Runtime of the task-level hooks expected to run for each test.
+    :param task_overhead: Fixed overhead of the sub-task.
+    :param jobs: Number of resmoke jobs running the tests.
+    :param repeat_factor: How many times the suite will be repeated.
+    :return: Expected runtime of the sub-task (in seconds).
+    """
+    costs = [runtime + per_test_overhead for (_, runtime) in tests]
+    tests_runtime = max(sum(costs) / max(jobs, 1), max(costs, default=0.0))
+    return task_overhead + tests_runtime * repeat_factor
+
+
+def choose_sub_tasks(  # pylint: disable=too-many-arguments,too-many-locals
+        tests_runtimes: List[TestRuntime], task_overhead: float, jobs: int = 1,
+        max_sub_tasks: Optional[int] = None, max_tests_per_suite: Optional[int] = None,
+        per_test_overhead: float = 0.0, repeat_factor: int = 1,
+        machine_time_budget: Optional[float] = None, improve: bool = False) -> CostModelResult:
+    """
+    Choose the sub-task count with the shortest makespan within the machine time budget.
+
+    If no sub-task count fits in the budget, the one with the lowest machine time is chosen.
+
+    :param tests_runtimes: Tests to split along with their runtimes.
+    :param task_overhead: Fixed overhead of each sub-task (in seconds).
+    :param jobs: Number of resmoke jobs running the tests of each sub-task.
+    :param max_sub_tasks: Maximum number of sub-tasks to create.
+    :param max_tests_per_suite: Maximum number of tests in a sub-task.
+    :param per_test_overhead: Runtime of the task-level hooks expected to run for each test.
+    :param repeat_factor: How many times the suite will be repeated.
+    :param machine_time_budget: Machine time all the sub-tasks may take (in seconds).
+    :param improve: Whether to run the improvement pass of the packing.
+    :return: The chosen plan, its packing and the plans it was chosen from.
+    """
+    max_count = max(1, len(tests_runtimes))
+    if max_sub_tasks:
+        max_count = min(max_count, max_sub_tasks)
+
+    plans = []
+    packings = []
+    for num_sub_tasks in range(1, max_count + 1):
+        packing = suite_packing.pack_tests_into(tests_runtimes, num_sub_tasks, max_tests_per_suite,
+                                                per_test_overhead, improve)
+        runtimes = [
+            get_sub_task_runtime(tests, per_test_overhead, task_overhead, jobs, repeat_factor)
+            for tests in packing.bins
+        ]
+        plans.append(
+            SubTaskPlan(
+                num_sub_tasks=len(packing.bins), makespan=max(runtimes, default=0.0),
+                machine_time=sum(runtimes)))
+        packings.append(packing)
+
+    if machine_time_budget is None:
+        machine_time_budget = min(plan.machine_time
+                                  for plan in plans) * (1 + DEFAULT_MACHINE_TIME_SLACK)
+    within_budget = [
+        idx for (idx, plan) in enumerate(plans) if plan.machine_time <= machine_time_budget
+    ]
+    if within_budget:
+        chosen = min(within_budget, key=lambda idx: (plans[idx].makespan, idx))
+    else:
+        chosen = min(range(len(plans)), key=lambda idx: (plans[idx].machine_time, idx))
+
+    return CostModelResult(chosen=plans[chosen], packing=packings[chosen], plans=plans,
+                           machine_time_budget=machine_time_budget, task_overhead=task_overhead,
+                           jobs=jobs)
@@ -0,0 +1,241 @@
+"""Pack tests into sub-suites that take about the same time to run.
+
+The tests are packed by the longest-processing-time-first (LPT) rule: they are taken in order of
+decreasing runtime and each one goes into the sub-suite that is expected to finish first, which is
+the first-fit-decreasing packing into the least loaded bin. The number of sub-suites is the lowest
+one that keeps each of them under the target runtime, within the maximum number of sub-suites. An
+optional improvement pass then moves and swaps tests between the longest and the other sub-suites
+for as long as that shortens the longest one.
+
+Besides the runtime of its test, each test is charged the share of the task-level hooks, such as
+CleanEveryN restarting the fixture every N tests, that is expected to run along with it.
+"""
+import bisect
+import heapq
+import math
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from buildscripts.util.teststats import TestRuntime
+
+# The maximum number of moves or swaps made by the improvement pass.
+MAX_IMPROVEMENT_STEPS = 100
+
+
+class PackingResult(NamedTuple):
+    """
+    Tests packed into sub-suites, along with how balanced the sub-suites are expected to be.
+
+    bins: Tests of each sub-suite, in the order they were given.
+    runtimes: Expected runtime of each sub-suite, including the task-level hook overhead.
+    """
+
+    bins: List[List[TestRuntime]]
+    runtimes: List[float]
+
+    @property
+    def makespan(self) -> float:
+        """Expected runtime of the longest sub-suite, which is the runtime of the whole task."""
+        return max(self.runtimes, default=0.0)
+
+    @property
+    def imbalance(self) -> float:
+        """How much longer the longest sub-suite is expected to be than the average one."""
+        if not self.runtimes or sum(self.runtimes) == 0:
+            return 0.0
+        return self.makespan / (sum(self.runtimes) / len(self.runtimes)) - 1
+
+
+def _bins_needed(costs: List[float], max_time_seconds: float,
+                 max_tests_per_suite: Optional[int]) -> int:
+    """Get the lowest number of bins that could possibly fit the given costs."""
+    num_bins = max(1, math.ceil(sum(costs) / max_time_seconds))
+    if max_tests_per_suite:
+        num_bins = max(num_bins, math.ceil(len(costs) / max_tests_per_suite))
+    return num_bins
+
+
+def _pack_lpt(costs: List[float], num_bins: int,
+              max_tests_per_suite: Optional[int]) -> List[List[int]]:
+    """
+    Pack the items of the given costs into bins by the longest-processing-time-first rule.
+
+    The items are added to the least loaded bin that isn't full yet, or to the least loaded one
+    if all bins are full.
+
+    :param costs: Cost of each item.
+    :param num_bins: Number of bins to pack the items into.
+    :param max_tests_per_suite: Maximum number of items in a bin.
+    :return: Indexes of the items in each bin.
+    """
+    bins = [[] for _ in range(num_bins)]
+    heap = [(0.0, idx) for idx in range(num_bins)]
+    full = []
+    for item in sorted(range(len(costs)), key=lambda item: costs[item], reverse=True):
+        if not heap:
+            # Every bin is full, the maximum number of items per bin can't be honored.
+            heap = full
+            heapq.heapify(heap)
+            full = []
+            max_tests_per_suite = None
+
+        (load, bin_idx) = heapq.heappop(heap)
+        bins[bin_idx].append(item)
+        load += costs[item]
+        if max_tests_per_suite and len(bins[bin_idx]) >= max_tests_per_suite:
+            full.append((load, bin_idx))
+        else:
+            heapq.heappush(heap, (load, bin_idx))
+    return bins
+
+
+def _exchanges(costs: List[float], items: List[int], other_items: List[int], gap: float,
+               can_move: bool) -> Iterator[Tuple[float, int, Optional[int], float]]:
+    """
+    Get the moves and swaps between two bins that leave both shorter than the longest one was.
+
+    Moving an item of cost c, or swapping items whose costs differ by c, balances the two bins best
+    when c is closest to half the gap between them. Moving is swapping with an item of cost 0, and
+    only the items whose costs are closest to that are considered.
+
+    :param costs: Cost of each item.
+    :param items: Indexes of the items in the longest bin.
+    :param other_items: Indexes of the items in the other bin.
+    :param gap: How much longer the longest bin is than the other one.
+    :param can_move: Whether the other bin can take one more item.
+    :return: For each move or swap, its score (lower is better), the item of the longest bin, the
+        item of the other bin or None for a move, and the cost that moves between the bins.
+    """
+    candidates = sorted(other_items, key=lambda item: costs[item])
+    if can_move:
+        candidates.insert(0, None)
+    candidate_costs = [costs[item] if item is not None else 0 for item in candidates]
+    for item in items:
+        idx = bisect.bisect_left(candidate_costs, costs[item] - gap / 2)
+        for other_idx in range(max(idx - 1, 0), min(idx + 1, len(candidates))):
+            delta = costs[item] - candidate_costs[other_idx]
+            if 0 < delta < gap:
+                yield (abs(gap / 2 - delta), item, candidates[other_idx], delta)
+
+
+def _improve(costs: List[float], bins: List[List[int]], max_tests_per_suite: Optional[int],
+             max_steps: int = MAX_IMPROVEMENT_STEPS) -> None:
+    """
+    Shorten the longest bin by moving or swapping its items with the other bins, in place.
+
+    Each step makes the move or swap that brings the longest bin and the other bin involved
+    closest to each other, as long as both end up shorter than the longest bin was.
+
+    :param costs: Cost of each item.
+    :param bins: Indexes of the items in each bin.
+    :param max_tests_per_suite: Maximum number of items in a bin.
+    :param max_steps: Maximum number of moves or swaps to make.
+    """
+    loads = [sum(costs[item] for item in items) for items in bins]
+    for _ in range(max_steps):
+        longest = max(range(len(bins)), key=lambda bin_idx: loads[bin_idx])
+        steps = []
+        for (other, items) in enumerate(bins):
+            if loads[other] >= loads[longest]:
+                continue
+            can_move = not max_tests_per_suite or len(items) < max_tests_per_suite
+            exchanges = _exchanges(costs, bins[longest], items, loads[longest] - loads[other],
+                                   can_move)
+            steps.extend(exchange + (other, ) for exchange in exchanges)
+        if not steps:
+            return
+
+        (_, item, other_item, delta, other) = min(steps, key=lambda step: step[0])
+        bins[longest].remove(item)
+        bins[other].append(item)
+        if other_item is not None:
+            bins[other].remove(other_item)
+            bins[longest].append(other_item)
+        loads[longest] -= delta
+        loads[other] += delta
+
+
+def _runtime(tests: List[TestRuntime], per_test_overhead: float) -> float:
+    """Get the expected runtime of a sub-suite of the given tests."""
+    return sum(runtime for (_, runtime) in tests) + len(tests) * per_test_overhead
+
+
+def _to_result(tests_runtimes: List[TestRuntime], bins: List[List[int]],
+               per_test_overhead: float) -> PackingResult:
+    """Get the tests of each non-empty bin, in the order they were given, and their runtimes."""
+    packed = [[tests_runtimes[item] for item in sorted(items)] for items in bins if items]
+    return PackingResult(bins=packed,
+                         runtimes=[_runtime(tests, per_test_overhead) for tests in packed])
+
+
+def pack_tests(  # pylint: disable=too-many-arguments
+        tests_runtimes: List[TestRuntime], max_time_seconds: float,
+        max_suites: Optional[int] = None, max_tests_per_suite: Optional[int] = None,
+        per_test_overhead: float = 0.0, improve: bool = False) -> PackingResult:
+    """
+    Pack the given tests into sub-suites that each run in less than the given time.
+
+    The fewest sub-suites that the packing keeps under `max_time_seconds` are created, unless that
+    would be more than `max_suites`. A test longer than `max_time_seconds` still needs a sub-suite
+    of its own, so the longest test is the lowest runtime aimed for.
+
+    :param tests_runtimes: Tests to pack along with their runtimes.
+    :param max_time_seconds: Target runtime of each sub-suite.
+    :param max_suites: Maximum number of sub-suites to create.
+    :param max_tests_per_suite: Maximum number of tests in a sub-suite, exceeded only if
+        `max_suites` doesn't leave enough sub-suites.
+    :param per_test_overhead: Runtime of the task-level hooks expected to run for each test.
+    :param improve: Whether to run the improvement pass after the packing.
+    :return: Tests of each sub-suite and their expected runtimes.
+    """
+    if not tests_runtimes:
+        return PackingResult(bins=[], runtimes=[])
+
+    costs = [runtime + per_test_overhead for (_, runtime) in tests_runtimes]
+    target = max(max_time_seconds, max(costs))
+    max_bins = len(costs)
+    if max_suites:
+        max_bins = min(max_bins, max_suites)
+
+    num_bins = min(_bins_needed(costs, target, max_tests_per_suite), max_bins)
+    while True:
+        bins = _pack_lpt(costs, num_bins, max_tests_per_suite)
+        if improve:
+            _improve(costs, bins, max_tests_per_suite)
+        if num_bins >= max_bins or max(sum(costs[item] for item in items)
+                                       for items in bins) <= target:
+            break
+        num_bins += 1
+
+    return _to_result(tests_runtimes, bins, per_test_overhead)
+
+
+def pack_tests_into(tests_runtimes: List[TestRuntime], num_suites: int,
+                    max_tests_per_suite: Optional[int] = None, per_test_overhead: float = 0.0,
+                    improve: bool = False) -> PackingResult:
+    """
+    Pack the given tests into the given number of sub-suites, whatever their runtimes.
+
+    :param tests_runtimes: Tests to pack along with their runtimes.
+    :param num_suites: Number of sub-suites to create, fewer if there are fewer tests.
+    :param max_tests_per_suite: Maximum number of tests in a sub-suite, exceeded only if there
+        aren't enough sub-suites.
+    :param per_test_overhead: Runtime of the task-level hooks expected to run for each test.
+    :param improve: Whether to run the improvement pass after the packing.
+    :return: Tests of each sub-suite and their expected runtimes.
+    """
+    costs = [runtime + per_test_overhead for (_, runtime) in tests_runtimes]
+    bins = _pack_lpt(costs, max(1, min(num_suites, len(costs))), max_tests_per_suite)
+    if improve:
+        _improve(costs, bins, max_tests_per_suite)
+    return _to_result(tests_runtimes, bins, per_test_overhead)
+
+
+def simulate(bins: List[List[TestRuntime]], per_test_overhead: float = 0.0) -> PackingResult:
+    """
+    Get the expected runtimes of sub-suites, however their tests were packed.
+
+    :param bins: Tests of each sub-suite.
+    :param per_test_overhead: Runtime of the task-level hooks expected to run for each test.
+    :return: The sub-suites and their expected runtimes.
+    """
+    return PackingResult(bins=bins, runtimes=[_runtime(tests, per_test_overhead) for tests in bins])
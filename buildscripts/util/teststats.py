@@ -1,16 +1,44 @@
 """Utility to support parsing a TestStat."""
+import json
+import math
+import os
+import re
+import time
+from array import array
+from bisect import bisect_left
 from collections import defaultdict
 from dataclasses import dataclass
-from datetime import datetime
-from itertools import chain
-from typing import NamedTuple, List, Callable, Optional
+from datetime import date, datetime, timedelta, timezone
+from itertools import accumulate
+from typing import NamedTuple, List, Callable, Dict, Optional, Tuple
+
+import structlog
+
+try:
+    import numpy as np
+except ImportError:
+    # The runtimes are aggregated in pure Python when NumPy isn't installed.
+    np = None
 
 from evergreen import EvergreenApi, TestStats
 
 from buildscripts.util.testname import split_test_hook_name, is_resmoke_hook, get_short_name_from_test_file
 
+LOGGER = structlog.getLogger(__name__)
+
 TASK_LEVEL_HOOKS = {"CleanEveryN"}
 
+# Percentiles of the runtime of each test reported by TestRuntimeStats.
+RUNTIME_PERCENTILES = (50, 90, 99)
+
+# Environment variables configuring the local cache of the test stats, see TestStatsCache.
+CACHE_DIR_ENV = "MONGO_TEST_STATS_CACHE_DIR"
+CACHE_TTL_ENV = "MONGO_TEST_STATS_CACHE_TTL_SECS"
+CACHE_OFFLINE_ENV = "MONGO_TEST_STATS_OFFLINE"
+DEFAULT_CACHE_TTL_SECS = 60 * 60
+# Evergreen keeps updating the stats of a day for a while after it ends.
+DAY_SETTLE_TIME = timedelta(days=1)
+
 
 class TestRuntime(NamedTuple):
     """
@@ -24,6 +52,44 @@ class TestRuntime(NamedTuple):
     runtime: float
 
 
+class TestRuntimeStats(NamedTuple):
+    """
+    Container for the distribution of the runtime of a test.
+
+    test_name: Name of test.
+    runtime: Average runtime of test.
+    stddev: Standard deviation of the runtime of test.
+    p50: Median runtime of test.
+    p90: 90th percentile of the runtime of test.
+    p99: 99th percentile of the runtime of test.
+    num_runs: Number of passing runs of test seen.
+    num_samples: Number of stat rows, e.g. days, the distribution is made of.
+    """
+
+    test_name: str
+    runtime: float
+    stddev: float
+    p50: float
+    p90: float
+    p99: float
+    num_runs: int
+    num_samples: int
+
+
+class TestFailureRate(NamedTuple):
+    """
+    Container for the failure rate of a test.
+
+    test_name: Name of test.
+    failure_rate: Fraction of the runs of the test that failed.
+    num_runs: Number of test runs seen.
+    """
+
+    test_name: str
+    failure_rate: float
+    num_runs: int
+
+
 @dataclass
 class _RuntimeHistory:
     """
@@ -57,6 +123,21 @@ def normalize_test_name(test_name: str) -> str:
     return test_name.replace("\\", "/")
 
 
+def get_stats_day(test_stats: TestStats) -> Optional[str]:
+    """
+    Get the day of the given stats, as YYYY-MM-DD, if they are grouped by day.
+
+    Depending on the version of evergreen.py, the date of the stats is either parsed or left as
+    the string returned by Evergreen.
+    """
+    day = test_stats.date
+    if not day:
+        return None
+    if isinstance(day, str):
+        return day[:10]
+    return day.strftime("%Y-%m-%d")
+
+
 def _average(value_a: float, num_a: int, value_b: float, num_b: int) -> float:
     """Compute a weighted average of 2 values with associated numbers."""
     divisor = num_a + num_b
@@ -99,13 +180,15 @@ class HistoricTestInfo(NamedTuple):
     num_pass: int
     avg_duration: float
     hooks: List[HistoricHookInfo]
+    num_fail: int = 0
 
     @classmethod
     def from_test_stats(cls, test_stats: TestStats,
                         hooks: List[HistoricHookInfo]) -> "HistoricTestInfo":
         """Create an instance from a test_stats object."""
         return cls(test_name=test_stats.test_file, num_pass=test_stats.num_pass,
-                   avg_duration=test_stats.avg_duration_pass, hooks=hooks)
+                   avg_duration=test_stats.avg_duration_pass, hooks=hooks,
+                   num_fail=test_stats.num_fail)
 
     def normalized_test_name(self) -> str:
         """Get the normalized version of the test name."""
@@ -127,17 +210,286 @@ class HistoricTestInfo(NamedTuple):
         return self.total_hook_runtime(lambda h: h.is_task_level_hook())
 
 
+class _GroupStats(NamedTuple):
+    """
+    Weighted statistics of the values of each group of rows.
+
+    totals: Total weight of each group.
+    counts: Number of rows of each group.
+    means: Weighted mean of each group.
+    stddevs: Weighted standard deviation of each group.
+    percentiles: Weighted value of each group at each of the requested percentiles.
+    """
+
+    totals: List[float]
+    counts: List[int]
+    means: List[float]
+    stddevs: List[float]
+    percentiles: List[List[float]]
+
+
+def _aggregate_with_numpy(groups: array, weights: array, values: array, num_groups: int,
+                          percentiles: Tuple[int, ...]) -> _GroupStats:
+    """Compute the weighted statistics of each group of rows with NumPy, see _aggregate."""
+    groups = np.frombuffer(groups, dtype=np.int64)
+    weights = np.frombuffer(weights, dtype=np.float64)
+    values = np.frombuffer(values, dtype=np.float64)
+
+    totals = np.bincount(groups, weights=weights, minlength=num_groups)
+    nonempty = totals > 0
+    means = np.divide(
+        np.bincount(groups, weights=weights * values, minlength=num_groups), totals,
+        out=np.zeros(num_groups), where=nonempty)
+    squares = np.divide(
+        np.bincount(groups, weights=weights * values * values, minlength=num_groups), totals,
+        out=np.zeros(num_groups), where=nonempty)
+    stddevs = np.sqrt(np.maximum(squares - means * means, 0))
+    counts = np.bincount(groups, minlength=num_groups)
+    percentile_values = _percentiles_with_numpy(groups, weights, values, totals, percentiles)
+
+    return _GroupStats(totals.tolist(), counts.tolist(), means.tolist(), stddevs.tolist(),
+                       percentile_values)
+
+
+def _percentiles_with_numpy(groups: "np.ndarray", weights: "np.ndarray", values: "np.ndarray",
+                            totals: "np.ndarray",
+                            percentiles: Tuple[int, ...]) -> List[List[float]]:
+    """Compute the weighted percentiles of each group of rows with NumPy, see _aggregate."""
+    # Sorting the rows by group and value makes the cumulative weight of the rows increase
+    # within each group, so one search over all the rows finds the percentiles of every group.
+    order = np.lexsort((values, groups))
+    values = values[order]
+    cumulative = np.cumsum(weights[order])
+    counts = np.bincount(groups, minlength=len(totals))
+    ends = np.cumsum(counts)
+    starts = ends - counts
+    start_weights = np.concatenate(([0.0], cumulative))[starts]
+    percentile_values = []
+    for percentile in percentiles:
+        idx = np.searchsorted(cumulative, start_weights + totals * percentile / 100, side="left")
+        idx = np.clip(idx, starts, np.maximum(ends - 1, starts))
+        percentile_values.append(np.where(totals > 0, values[idx], 0.0).tolist())
+    return percentile_values
+
+
+def _aggregate_with_python(groups: array, weights: array, values: array, num_groups: int,
+                           percentiles: Tuple[int, ...]) -> _GroupStats:
+    """Compute the weighted statistics of each group of rows in pure Python, see _aggregate."""
+    rows = [[] for _ in range(num_groups)]
+    for (group, weight, value) in zip(groups, weights, values):
+        rows[group].append((value, weight))
+
+    # Rows always have a group, so there is at least one group to transpose.
+    stats = [_weighted_stats(group_rows, percentiles) for group_rows in rows]
+    (totals, means, stddevs, percentile_values) = zip(*stats)
+    counts = [len(group_rows) for group_rows in rows]
+    return _GroupStats(
+        list(totals), counts, list(means), list(stddevs),
+        [list(group_values) for group_values in zip(*percentile_values)])
+
+
+def _weighted_stats(rows: List[Tuple[float, float]],
+                    percentiles: Tuple[int, ...]) -> Tuple[float, float, float, List[float]]:
+    """Compute the total weight, mean, stddev and percentiles of (value, weight) rows."""
+    total = sum(weight for (_, weight) in rows)
+    if total <= 0:
+        return 0.0, 0.0, 0.0, [0.0] * len(percentiles)
+    mean = sum(weight * value for (value, weight) in rows) / total
+    squares = sum(weight * value * value for (value, weight) in rows) / total
+    stddev = math.sqrt(max(squares - mean**2, 0))
+
+    rows = sorted(rows)
+    cumulative = list(accumulate(weight for (_, weight) in rows))
+    percentile_values = []
+    for percentile in percentiles:
+        idx = bisect_left(cumulative, total * percentile / 100)
+        percentile_values.append(rows[min(idx, len(rows) - 1)][0])
+    return total, mean, stddev, percentile_values
+
+
+def _aggregate(groups: array, weights: array, values: array, num_groups: int,
+               percentiles: Tuple[int, ...] = RUNTIME_PERCENTILES) -> _GroupStats:
+    """
+    Compute the weighted statistics of the values of each group of rows.
+
+    The percentiles are the lowest values of the group that the given percentage of the weight of
+    the group is at or below. Groups without any weight have statistics of 0.
+
+    :param groups: Group of each row, from 0 to `num_groups` - 1.
+    :param weights: Weight of each row.
+    :param values: Value of each row.
+    :param num_groups: Number of groups.
+    :param percentiles: Percentiles to compute.
+    :return: Statistics of each group.
+    """
+    if not groups:
+        return _GroupStats([0.0] * num_groups, [0] * num_groups, [0.0] * num_groups,
+                           [0.0] * num_groups, [[0.0] * num_groups for _ in percentiles])
+    if np is not None:
+        return _aggregate_with_numpy(groups, weights, values, num_groups, percentiles)
+    return _aggregate_with_python(groups, weights, values, num_groups, percentiles)
+
+
+class _Rows(object):
+    """Columns of the group, number of passing runs and average duration of stat rows."""
+
+    def __init__(self) -> None:
+        """Initialize empty columns."""
+        self.groups = array("q")
+        self.num_pass = array("d")
+        self.durations = array("d")
+
+    def append(self, group: int, num_pass: int, duration: float) -> None:
+        """Add a row to the columns."""
+        self.groups.append(group)
+        self.num_pass.append(num_pass)
+        self.durations.append(duration)
+
+    def aggregate(self, num_groups: int) -> _GroupStats:
+        """Compute the statistics of the duration of each group, weighted by its passing runs."""
+        return _aggregate(self.groups, self.num_pass, self.durations, num_groups)
+
+
+class RuntimeColumns(object):
+    """
+    Columnar historic runtimes of the tests and hooks of a task.
+
+    The stat rows are stored as columns, with each test and hook id interned to an index when it
+    is first seen, so the hook ids are only parsed once and the rows of each test or hook are
+    aggregated in bulk, with NumPy when it is installed.
+
+    The runtime distribution of a test is that of the average runtimes of its rows, weighted by
+    their number of passing runs. When the stats are grouped by day, these are the daily averages,
+    which spread less than the runtimes of single runs do.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty columns."""
+        self.test_names = []
+        self._test_idx = {}
+        self._test_rows = _Rows()
+        # Short test name and hook name of each hook id.
+        self.hooks = []
+        self._hook_idx = {}
+        self._hook_rows = _Rows()
+
+    @classmethod
+    def from_stats_list(cls, historic_stats: List[TestStats]) -> "RuntimeColumns":
+        """
+        Build the columns from a list of historic stats.
+
+        :param historic_stats: List of historic stats to build from.
+        :return: Columns of the historic stats.
+        """
+        columns = cls()
+        for stat in historic_stats:
+            columns.add(stat.test_file, stat.num_pass, stat.avg_duration_pass)
+        return columns
+
+    @classmethod
+    def from_historic_test_results(
+            cls, historic_test_results: List[HistoricTestInfo]) -> "RuntimeColumns":
+        """
+        Build the columns from historic test results.
+
+        :param historic_test_results: Historic test results to build from.
+        :return: Columns of the historic test results.
+        """
+        columns = cls()
+        # The tests with the same short name share their list of hooks.
+        seen_hooks = set()
+        for test in historic_test_results:
+            columns.add(test.test_name, test.num_pass, test.avg_duration)
+            if id(test.hooks) not in seen_hooks:
+                seen_hooks.add(id(test.hooks))
+                for hook in test.hooks:
+                    columns.add(hook.hook_id, hook.num_pass, hook.avg_duration)
+        return columns
+
+    def add(self, test_file: str, num_pass: int, avg_duration: float) -> None:
+        """
+        Add a stat row of a test or a hook.
+
+        :param test_file: Name of the test, or id of the hook.
+        :param num_pass: Number of passing runs.
+        :param avg_duration: Average duration of the passing runs.
+        """
+        if is_resmoke_hook(test_file):
+            idx = self._hook_idx.get(test_file)
+            if idx is None:
+                idx = self._hook_idx[test_file] = len(self.hooks)
+                self.hooks.append(split_test_hook_name(test_file))
+            self._hook_rows.append(idx, num_pass, avg_duration)
+        else:
+            test_name = normalize_test_name(test_file)
+            idx = self._test_idx.get(test_name)
+            if idx is None:
+                idx = self._test_idx[test_name] = len(self.test_names)
+                self.test_names.append(test_name)
+            self._test_rows.append(idx, num_pass, avg_duration)
+
+    def _hook_runtimes(self) -> List[float]:
+        """Get the average runtime of each hook id."""
+        return self._hook_rows.aggregate(len(self.hooks)).means
+
+    def get_tests_runtime_stats(self) -> List[TestRuntimeStats]:
+        """
+        Get the runtime distribution of each test, in the order the tests were first seen.
+
+        The average runtime of the hooks of a test that aren't task level hooks is added to its
+        runtimes.
+        """
+        hook_overheads = defaultdict(float)
+        for ((test_name, hook_name), runtime) in zip(self.hooks, self._hook_runtimes()):
+            if hook_name not in TASK_LEVEL_HOOKS:
+                hook_overheads[test_name] += runtime
+
+        stats = self._test_rows.aggregate(len(self.test_names))
+        (p50s, p90s, p99s) = stats.percentiles
+        tests = []
+        for (idx, test_name) in enumerate(self.test_names):
+            overhead = hook_overheads.get(get_short_name_from_test_file(test_name), 0.0)
+            num_runs = int(stats.totals[idx])
+            tests.append(
+                TestRuntimeStats(test_name=test_name, runtime=stats.means[idx] + overhead,
+                                 stddev=stats.stddevs[idx], p50=p50s[idx] + overhead,
+                                 p90=p90s[idx] + overhead, p99=p99s[idx] + overhead,
+                                 num_runs=num_runs, num_samples=stats.counts[idx]))
+        return tests
+
+    def get_avg_hook_runtime(self, hook_name: str) -> float:
+        """Get the average runtime of the hook ids of the specified hook."""
+        runtimes = [
+            runtime for ((_, name), runtime) in zip(self.hooks, self._hook_runtimes())
+            if name == hook_name
+        ]
+        if not runtimes:
+            return 0
+        return sum(runtimes) / len(runtimes)
+
+
 class HistoricTaskData(object):
     """Represent the test statistics for the task that is being analyzed."""
 
-    def __init__(self, historic_test_results: List[HistoricTestInfo]) -> None:
+    def __init__(self, historic_test_results: List[HistoricTestInfo],
+                 runtime_columns: Optional[RuntimeColumns] = None) -> None:
         """Initialize the TestStats with raw results from the Evergreen API."""
         self.historic_test_results = historic_test_results
+        self._runtime_columns = runtime_columns
+
+    @property
+    def runtime_columns(self) -> RuntimeColumns:
+        """Get the columnar runtimes of the historic test results."""
+        if self._runtime_columns is None:
+            self._runtime_columns = RuntimeColumns.from_historic_test_results(
+                self.historic_test_results)
+        return self._runtime_columns
 
     # pylint: disable=too-many-arguments
     @classmethod
     def from_evg(cls, evg_api: EvergreenApi, project: str, start_date: datetime, end_date: datetime,
-                 task: str, variant: str) -> "HistoricTaskData":
+                 task: str, variant: str,
+                 cache: Optional["TestStatsCache"] = None) -> "HistoricTaskData":
         """
         Retrieve test stats from evergreen for a given task.
 
@@ -147,8 +499,18 @@ class HistoricTaskData(object):
         :param end_date: End date to query.
         :param task: Task to query.
         :param variant: Build variant to query.
+        :param cache: Local cache of the test stats, defaults to the one configured by the
+            environment, if any.
         :return: Test stats for the specified task.
         """
+        if cache is None:
+            cache = TestStatsCache.from_env()
+        if cache is not None:
+            daily_stats = cache.get_daily_test_stats(evg_api, project, start_date, end_date, task,
+                                                     variant)
+            # The daily stats give the runtime distribution of the tests across the days.
+            return cls.from_stats_list(_combine_daily_stats(daily_stats, evg_api), daily_stats)
+
         days = (end_date - start_date).days
         historic_stats = evg_api.test_stats_by_project(
             project, after_date=start_date, before_date=end_date, tasks=[task], variants=[variant],
@@ -157,44 +519,266 @@ class HistoricTaskData(object):
         return cls.from_stats_list(historic_stats)
 
     @classmethod
-    def from_stats_list(cls, historic_stats: List[TestStats]) -> "HistoricTaskData":
+    def from_stats_list(cls, historic_stats: List[TestStats],
+                        runtime_stats: Optional[List[TestStats]] = None) -> "HistoricTaskData":
         """
         Build historic task data from a list of historic stats.
 
         :param historic_stats: List of historic stats to build from.
+        :param runtime_stats: Finer grained stats, e.g. daily ones, to build the runtime
+            distributions from, defaults to the historic stats.
         :return: Historic task data from the list of stats.
         """
 
         hooks = defaultdict(list)
-        for hook in [stat for stat in historic_stats if is_resmoke_hook(stat.test_file)]:
-            historical_hook = HistoricHookInfo.from_test_stats(hook)
-            hooks[historical_hook.test_name()].append(historical_hook)
+        tests = []
+        for stat in historic_stats:
+            if is_resmoke_hook(stat.test_file):
+                historical_hook = HistoricHookInfo.from_test_stats(stat)
+                hooks[historical_hook.test_name()].append(historical_hook)
+            else:
+                tests.append(stat)
 
         return cls([
-            HistoricTestInfo.from_test_stats(stat,
-                                             hooks[get_short_name_from_test_file(stat.test_file)])
-            for stat in historic_stats if not is_resmoke_hook(stat.test_file)
-        ])
+            HistoricTestInfo.from_test_stats(stat, hooks[get_short_name_from_test_file(
+                stat.test_file)]) for stat in tests
+        ], RuntimeColumns.from_stats_list(runtime_stats or historic_stats))
 
     def get_tests_runtimes(self) -> List[TestRuntime]:
         """Return the list of (test_file, runtime_in_secs) tuples ordered by decreasing runtime."""
-        tests = [
-            TestRuntime(test_name=test_stats.normalized_test_name(),
-                        runtime=test_stats.total_test_runtime())
-            for test_stats in self.historic_test_results
+        return [
+            TestRuntime(test_name=test.test_name, runtime=test.runtime)
+            for test in self.get_tests_runtime_stats()
         ]
-        return sorted(tests, key=lambda x: x.runtime, reverse=True)
+
+    def get_tests_runtime_stats(self) -> List[TestRuntimeStats]:
+        """Return the runtime distribution of each test ordered by decreasing average runtime."""
+        return sorted(self.runtime_columns.get_tests_runtime_stats(), key=lambda x: x.runtime,
+                      reverse=True)
+
+    def get_tests_failure_rates(self) -> List[TestFailureRate]:
+        """
+        Return the failure rate of each test ordered by decreasing failure rate.
+
+        Results for the same test are combined, so the historic results of several tasks (e.g. the
+        task and its burn_in tasks) can be ranked together.
+        """
+        runs = defaultdict(lambda: [0, 0])
+        for test_stats in self.historic_test_results:
+            counts = runs[test_stats.normalized_test_name()]
+            counts[0] += test_stats.num_fail
+            counts[1] += test_stats.num_pass + test_stats.num_fail
+
+        tests = []
+        for test_name, (num_fail, num_runs) in runs.items():
+            failure_rate = float(num_fail) / num_runs if num_runs else 0.0
+            tests.append(TestFailureRate(test_name, failure_rate, num_runs))
+        return sorted(tests, key=lambda x: (x.failure_rate, x.num_runs), reverse=True)
 
     def get_avg_hook_runtime(self, hook_name: str) -> float:
         """Get the average runtime for the specified hook."""
-        hook_instances = list(
-            chain.from_iterable([[hook for hook in test.hooks if hook.hook_name() == hook_name]
-                                 for test in self.historic_test_results]))
-
-        if not hook_instances:
-            return 0
-        return sum([hook.avg_duration for hook in hook_instances]) / len(hook_instances)
+        return self.runtime_columns.get_avg_hook_runtime(hook_name)
 
     def __len__(self) -> int:
         """Get the number of historical entries."""
         return len(self.historic_test_results)
+
+
+class TestStatsCache(object):
+    """
+    Local on-disk cache of the daily test stats of tasks.
+
+    The stats of each day are kept in a file for each project, variant and task, so any date range
+    can be served from the days already cached, and only the missing days are fetched. The stats
+    of a day are fetched again once they are older than the TTL, unless they were fetched after
+    Evergreen was done updating them. In offline mode, the stats are only read from the cache.
+
+    The cache used by default is configured by the environment:
+      - MONGO_TEST_STATS_CACHE_DIR: directory of the cache, which is only used if this is set.
+      - MONGO_TEST_STATS_CACHE_TTL_SECS: TTL of the stats of the recent days.
+      - MONGO_TEST_STATS_OFFLINE: if set to 1 or true, never query Evergreen.
+    """
+
+    def __init__(self, cache_dir: str, ttl_secs: float = DEFAULT_CACHE_TTL_SECS,
+                 offline: bool = False) -> None:
+        """
+        Initialize the cache.
+
+        :param cache_dir: Directory to keep the cached test stats in.
+        :param ttl_secs: How long the stats of a day Evergreen may still update are valid for.
+        :param offline: Whether to only use the cached test stats.
+        """
+        self.cache_dir = cache_dir
+        self.ttl_secs = ttl_secs
+        self.offline = offline
+
+    @classmethod
+    def from_env(cls) -> Optional["TestStatsCache"]:
+        """Create the cache configured by the environment, if any."""
+        cache_dir = os.environ.get(CACHE_DIR_ENV)
+        if not cache_dir:
+            return None
+        ttl_secs = float(os.environ.get(CACHE_TTL_ENV, DEFAULT_CACHE_TTL_SECS))
+        offline = os.environ.get(CACHE_OFFLINE_ENV, "").lower() in ("1", "true")
+        return cls(cache_dir, ttl_secs, offline)
+
+    def _cache_file(self, project: str, variant: str, task: str) -> str:
+        """Get the file caching the test stats of the given task."""
+        name = "_".join(re.sub(r"[^\w.-]", "-", part) for part in (project, variant, task))
+        return os.path.join(self.cache_dir, name + ".json")
+
+    @staticmethod
+    def _read(cache_file: str) -> Dict[str, Dict]:
+        """Read the days cached in the given file."""
+        try:
+            with open(cache_file) as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            LOGGER.warning("Ignoring corrupt test stats cache", cache_file=cache_file)
+            return {}
+
+    def _write(self, cache_file: str, days: Dict[str, Dict]) -> None:
+        """Replace the days cached in the given file."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "w") as fh:
+            json.dump(days, fh, separators=(",", ":"))
+        os.replace(tmp_file, cache_file)
+
+    def _is_fresh(self, day: date, cached_day: Optional[Dict], now: float) -> bool:
+        """Determine if the cached stats of the given day can be used."""
+        if cached_day is None:
+            return False
+        # The stats are aggregated by UTC day.
+        day_start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+        settled_at = day_start + timedelta(days=1) + DAY_SETTLE_TIME
+        if cached_day["fetched_at"] >= settled_at.timestamp():
+            return True
+        return now - cached_day["fetched_at"] < self.ttl_secs
+
+    @staticmethod
+    def _missing_ranges(missing_days: List[date]) -> List[List[date]]:
+        """Group the given sorted days into ranges of consecutive days."""
+        ranges = []
+        for day in missing_days:
+            if ranges and ranges[-1][-1] + timedelta(days=1) == day:
+                ranges[-1].append(day)
+            else:
+                ranges.append([day])
+        return ranges
+
+    @staticmethod
+    # pylint: disable=too-many-arguments
+    def _fetch(evg_api: EvergreenApi, project: str, days: List[date], task: str, variant: str,
+               now: float) -> Dict[str, Dict]:
+        """Fetch the test stats of each of the given consecutive days from Evergreen."""
+        after_date = datetime(days[0].year, days[0].month, days[0].day)
+        before_date = after_date + timedelta(days=len(days))
+        historic_stats = evg_api.test_stats_by_project(
+            project, after_date=after_date, before_date=before_date, tasks=[task],
+            variants=[variant], group_by="test", group_num_days=1)
+
+        fetched = {day.isoformat(): {"fetched_at": now, "stats": []} for day in days}
+        for stats in historic_stats:
+            key = get_stats_day(stats)
+            if key in fetched:
+                fetched[key]["stats"].append(
+                    [stats.test_file, stats.num_pass, stats.num_fail, stats.avg_duration_pass])
+        return fetched
+
+    # pylint: disable=too-many-arguments
+    def get_test_stats(self, evg_api: EvergreenApi, project: str, start_date: datetime,
+                       end_date: datetime, task: str, variant: str) -> List[TestStats]:
+        """
+        Get the test stats of a task over a date range, fetching the days not cached yet.
+
+        :param evg_api: Evergreen API client.
+        :param project: Project to query.
+        :param start_date: Start date to query.
+        :param end_date: End date to query.
+        :param task: Task to query.
+        :param variant: Build variant to query.
+        :return: Test stats of each test over the date range.
+        """
+        return _combine_daily_stats(
+            self.get_daily_test_stats(evg_api, project, start_date, end_date, task, variant),
+            evg_api)
+
+    # pylint: disable=too-many-arguments
+    def get_daily_test_stats(self, evg_api: EvergreenApi, project: str, start_date: datetime,
+                             end_date: datetime, task: str, variant: str) -> List[TestStats]:
+        """
+        Get the test stats of a task for each day of a date range, fetching the days not cached yet.
+
+        :param evg_api: Evergreen API client.
+        :param project: Project to query.
+        :param start_date: Start date to query.
+        :param end_date: End date to query.
+        :param task: Task to query.
+        :param variant: Build variant to query.
+        :return: Test stats of each test for each day of the date range.
+        """
+        return [
+            TestStats({
+                "test_file": test_file, "num_pass": num_pass, "num_fail": num_fail,
+                "avg_duration_pass": avg_duration_pass, "date": cached_day["date"]
+            }, evg_api) for cached_day in self._get_cached_days(evg_api, project, start_date,
+                                                                end_date, task, variant)
+            for (test_file, num_pass, num_fail, avg_duration_pass) in cached_day["stats"]
+        ]
+
+    # pylint: disable=too-many-arguments
+    def _get_cached_days(self, evg_api: EvergreenApi, project: str, start_date: datetime,
+                         end_date: datetime, task: str, variant: str) -> List[Dict]:
+        """
+        Get the cached stats of each day of a date range, fetching the days not cached yet.
+
+        :param evg_api: Evergreen API client.
+        :param project: Project to query.
+        :param start_date: Start date to query.
+        :param end_date: End date to query.
+        :param task: Task to query.
+        :param variant: Build variant to query.
+        :return: Cached stats of each day of the date range, along with the day.
+        """
+        cache_file = self._cache_file(project, variant, task)
+        cached_days = self._read(cache_file)
+        now = time.time()
+
+        days = [start_date.date() + timedelta(days=i) for i in range((end_date - start_date).days)]
+        missing_days = [
+            day for day in days if not self._is_fresh(day, cached_days.get(day.isoformat()), now)
+        ]
+        if missing_days and self.offline:
+            LOGGER.warning("Test stats missing from the cache in offline mode", task=task,
+                           variant=variant, num_missing_days=len(missing_days))
+        elif missing_days:
+            LOGGER.debug("Fetching test stats missing from the cache", task=task, variant=variant,
+                         num_missing_days=len(missing_days))
+            for missing_range in self._missing_ranges(missing_days):
+                cached_days.update(self._fetch(evg_api, project, missing_range, task, variant, now))
+            self._write(cache_file, cached_days)
+
+        return [
+            dict(cached_days[day.isoformat()], date=day.isoformat()) for day in days
+            if day.isoformat() in cached_days
+        ]
+
+
+def _combine_daily_stats(daily_stats: List[TestStats], evg_api: EvergreenApi) -> List[TestStats]:
+    """Combine the stats of several days into the stats of each test over all the days."""
+    combined = {}
+    for stats in daily_stats:
+        if stats.test_file not in combined:
+            combined[stats.test_file] = {
+                "test_file": stats.test_file, "num_pass": 0, "num_fail": 0, "avg_duration_pass": 0.0
+            }
+        test_stats = combined[stats.test_file]
+        test_stats["avg_duration_pass"] = _average(test_stats["avg_duration_pass"],
+                                                   test_stats["num_pass"], stats.avg_duration_pass,
+                                                   stats.num_pass)
+        test_stats["num_pass"] += stats.num_pass
+        test_stats["num_fail"] += stats.num_fail
+    return [TestStats(test_stats, evg_api) for test_stats in combined.values()]
@@ -0,0 +1,76 @@
+"""Estimate the timeouts of generated tasks from the runtime distributions of their tests.
+
+A test is expected to finish within the high percentile of its runtime, plus a margin of a few
+standard deviations of its runtime.
+
+A task is expected to finish within the expected runtime of all of its test runs, counting the
+repeats of the suite, plus a margin for the variance of that runtime. Since the test runs are
+independent, their variances add up, so the margin grows with the square root of the number of
+test runs, instead of linearly with the runtime like a scaling factor does. The margin still
+covers the test whose high percentile is furthest above its average.
+
+The runtime distributions come from the average runtimes of the tests over each day or period of
+their history, which spread less than single runs do, so the margins are never less than a
+fraction of the expected runtime. A test needs the runtimes of a few days or periods to have a
+distribution at all: without the local test stats cache, its history is a single average.
+"""
+import math
+from typing import List
+
+from buildscripts.util.teststats import TestRuntimeStats
+
+# Number of standard deviations of the runtime allowed above the expected runtime.
+STDDEV_MARGIN = 3
+# Lowest margin allowed above the expected runtime, as a fraction of it.
+MIN_MARGIN_FRACTION = 0.25
+# Fewest stat rows the runtime distribution of a test is made of for it to be usable.
+MIN_SAMPLES = 2
+
+
+def has_runtime_distributions(tests: List[TestRuntimeStats]) -> bool:
+    """
+    Determine if the runtime distributions of the given tests can be used to estimate timeouts.
+
+    :param tests: Runtime distribution of each test.
+    :return: True if each distribution is made of enough stat rows.
+    """
+    return all(test.num_samples >= MIN_SAMPLES for test in tests)
+
+
+def get_test_runtime_limit(test: TestRuntimeStats) -> float:
+    """
+    Get the longest a healthy run of the given test is expected to take.
+
+    :param test: Runtime distribution of the test.
+    :return: Runtime limit of the test (in seconds).
+    """
+    return max(test.p99 + STDDEV_MARGIN * test.stddev, test.runtime * (1 + MIN_MARGIN_FRACTION))
+
+
+def estimate_test_timeout(tests: List[TestRuntimeStats]) -> float:
+    """
+    Get the longest any healthy test run of a suite is expected to take.
+
+    The timeout of a test run doesn't depend on how many times the suite is repeated.
+
+    :param tests: Runtime distribution of each test of the suite.
+    :return: Runtime limit of the tests of the suite (in seconds).
+    """
+    return max((get_test_runtime_limit(test) for test in tests), default=0.0)
+
+
+def estimate_task_timeout(tests: List[TestRuntimeStats], expected_task_runtime: float,
+                          repeat_factor: int = 1) -> float:
+    """
+    Get the longest a healthy run of a task is expected to take.
+
+    :param tests: Runtime distribution of each test of the task.
+    :param expected_task_runtime: Expected runtime of a single repeat of the task, including the
+        overhead of task-level hooks.
+    :param repeat_factor: How many times the suite will be repeated.
+    :return: Runtime limit of the task (in seconds).
+    """
+    expected_runtime = expected_task_runtime * repeat_factor
+    spread = STDDEV_MARGIN * math.sqrt(repeat_factor * sum(test.stddev**2 for test in tests))
+    tail = max((test.p99 - test.runtime for test in tests), default=0.0)
+    return expected_runtime + max(spread, tail, MIN_MARGIN_FRACTION * expected_runtime)
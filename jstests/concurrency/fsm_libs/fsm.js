@@ -26,6 +26,10 @@ var fsm = (function() {
     //                    { stateName: { nextState1: probability,
     //                                   nextState2: ... } }
     // args.iterations = number of iterations to run the FSM for
+    //
+    // returns the time taken by the thread, of the form
+    //    { elapsedMs: number, transitions: number,
+    //      stateDurationsMs: { stateName: [ duration1, duration2, ... ] } }
     function runFSM(args) {
         if (TestData.runInsideTransaction) {
             let overridePath = "jstests/libs/override_methods/";
@@ -100,8 +104,12 @@ var fsm = (function() {
             });
         }
 
+        var stats = {elapsedMs: 0, transitions: 0, stateDurationsMs: {}};
+        var runStartTime = Date.now();
+
         for (var i = 0; i < args.iterations; ++i) {
             var fn = args.states[currentState];
+            var stateStartTime = Date.now();
 
             assert.eq('function', typeof fn, 'states.' + currentState + ' is not a function');
 
@@ -132,16 +140,26 @@ var fsm = (function() {
                 fn.call(args.data, args.db, args.collName, connCache);
             }
 
+            if (!stats.stateDurationsMs.hasOwnProperty(currentState)) {
+                stats.stateDurationsMs[currentState] = [];
+            }
+            stats.stateDurationsMs[currentState].push(Date.now() - stateStartTime);
+
             var nextState = getWeightedRandomChoice(args.transitions[currentState], Random.rand());
             currentState = nextState;
+            ++stats.transitions;
         }
 
+        stats.elapsedMs = Date.now() - runStartTime;
+
         // Null out the workload connection cache and perform garbage collection to clean up,
         // i.e., close, the open connections.
         if (args.passConnectionCache) {
             connCache = null;
             gc();
         }
+
+        return stats;
     }
 
     // doc = document of the form
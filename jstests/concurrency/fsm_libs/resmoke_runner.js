@@ -14,6 +14,37 @@ const setIterations = runner.internals.setIterations;
 const setThreadCount = runner.internals.setThreadCount;
 const loadWorkloadContext = runner.internals.loadWorkloadContext;
 
+// Combines the time taken by the worker threads of each workload and writes it to the
+// TestData.fsmMetricsFile for resmoke.py to add to its report.
+function writeWorkloadMetrics(threadStats) {
+    const metrics = {};
+    threadStats.forEach(function(stats) {
+        Object.keys(stats).forEach(function(workload) {
+            if (!metrics.hasOwnProperty(workload)) {
+                metrics[workload] =
+                    {numThreads: 0, elapsedMs: 0, transitions: 0, stateDurationsMs: {}};
+            }
+            const workloadMetrics = metrics[workload];
+            const threadMetrics = stats[workload];
+
+            // The worker threads run concurrently, so the workload took as long as its slowest
+            // thread.
+            ++workloadMetrics.numThreads;
+            workloadMetrics.elapsedMs =
+                Math.max(workloadMetrics.elapsedMs, threadMetrics.elapsedMs);
+            workloadMetrics.transitions += threadMetrics.transitions;
+
+            Object.keys(threadMetrics.stateDurationsMs).forEach(function(state) {
+                const durations = workloadMetrics.stateDurationsMs[state] || [];
+                workloadMetrics.stateDurationsMs[state] =
+                    durations.concat(threadMetrics.stateDurationsMs[state]);
+            });
+        });
+    });
+
+    writeFile(TestData.fsmMetricsFile, JSON.stringify(metrics));
+}
+
 // Returns true if the workload's teardown succeeds and false if the workload's teardown fails.
 function cleanupWorkload(workload, context, cluster, errors, header) {
     const phase = 'before workload ' + workload + ' teardown';
@@ -165,6 +196,10 @@ function runWorkloads(workloads,
                 errors.push(...threadMgr.joinAll().map(
                     e => new WorkloadFailure(
                         e.err, e.stack, e.tid, 'Foreground ' + e.workloads.join(' '))));
+
+                if (TestData.fsmMetricsFile !== undefined) {
+                    writeWorkloadMetrics(threadMgr.getThreadStats());
+                }
             }
         } finally {
             // Until we are guaranteed that the stepdown thread isn't running, it isn't safe for
@@ -40,6 +40,7 @@ var ThreadManager = function(clusterOptions, executionMode = {composed: false})
 
     var initialized = false;
     var threads = [];
+    var threadStats = [];
 
     var _workloads, _context;
 
@@ -174,6 +175,7 @@ var ThreadManager = function(clusterOptions, executionMode = {composed: false})
         }
 
         var errors = [];
+        threadStats = [];
 
         threads.forEach(function(t) {
             t.join();
@@ -181,6 +183,8 @@ var ThreadManager = function(clusterOptions, executionMode = {composed: false})
             var data = t.returnData();
             if (data && !data.ok) {
                 errors.push(data);
+            } else if (data && data.stats) {
+                threadStats.push(data.stats);
             }
         });
 
@@ -189,6 +193,12 @@ var ThreadManager = function(clusterOptions, executionMode = {composed: false})
 
         return errors;
     };
+
+    // Returns the time taken by each worker thread which succeeded in the last call to joinAll(),
+    // of the form [ { workloadName: stats returned by fsm.run() } ].
+    this.getThreadStats = function getThreadStats() {
+        return threadStats;
+    };
 };
 
 /**
@@ -203,7 +213,9 @@ workerThread.fsm = function(workloads, args, options) {
     return workerThread.main(workloads, args, function(configs) {
         var workloads = Object.keys(configs);
         assert.eq(1, workloads.length);
-        fsm.run(configs[workloads[0]]);
+        var stats = {};
+        stats[workloads[0]] = fsm.run(configs[workloads[0]]);
+        return stats;
     });
 };
 
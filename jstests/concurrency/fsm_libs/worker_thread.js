@@ -214,8 +214,9 @@ var workerThread = (function() {
                 args.latch.await();  // wait for all threads to start
 
                 Random.setRandomSeed(args.seed);
-                run(configs);
-                return {ok: 1};
+                // The time taken by each workload, if 'run' measured it.
+                const stats = run(configs);
+                return {ok: 1, stats: stats};
             } catch (e) {
                 args.errorLatch.countDown();
                 return {